@@ -0,0 +1,28 @@
+"""
+📡 API de Análisis IA en Streaming
+Envía insights, riesgos y recomendaciones al frontend según los genera el LLM
+"""
+
+from fastapi import APIRouter, Depends
+from fastapi.responses import StreamingResponse
+
+from api.deps import get_ai_director, get_org_snapshot
+from api.sse import format_sse, SSE_HEADERS
+from services.org_snapshot import OrgSnapshot
+
+router = APIRouter()
+
+@router.get("/analyze/stream")
+async def stream_global_analysis(delta: bool = False,
+                                 snapshot: OrgSnapshot = Depends(get_org_snapshot),
+                                 ai_director=Depends(get_ai_director)):
+    """Análisis global en streaming (Server-Sent Events); delta=true envía solo cambios"""
+
+    async def event_stream():
+        async for event in ai_director.stream_global_analysis(
+            snapshot.teams, snapshot.projects, snapshot.cards, snapshot.users,
+            delta=delta, delta_key='stream'
+        ):
+            yield format_sse(event['type'], event)
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream", headers=SSE_HEADERS)
@@ -0,0 +1,99 @@
+"""
+🗂️ API de Tableros
+Lectura de un tablero completo (columnas, tarjetas y responsables)
+"""
+
+import io
+import logging
+from typing import Optional
+
+from fastapi import APIRouter, BackgroundTasks, Depends, File, HTTPException, Request, UploadFile
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+from sqlalchemy.orm import Session
+
+from api.deps import get_db_session
+from models.database import Board, Column
+from services.board_reader import load_board
+from services.markdown_board import MarkdownBoardSync
+from services.ranking import RankingService
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+ranking = RankingService()
+markdown_sync = MarkdownBoardSync()
+
+class ColumnMove(BaseModel):
+    """Vecinos de la columna en su nueva posición (None = al final)"""
+    before_id: Optional[str] = None
+    after_id: Optional[str] = None
+
+def rebalance_board(request: Request, board_id: str):
+    """Reequilibrado en segundo plano con su propia sesión"""
+    with request.app.state.db.get_session() as session:
+        ranking.rebalance_board(session, board_id)
+
+@router.get("/{board_id}")
+def get_board(board_id: str, session: Session = Depends(get_db_session)):
+    """Tablero con columnas y tarjetas ordenadas"""
+    board = load_board(session, board_id)
+    if board is None:
+        raise HTTPException(status_code=404, detail="Tablero no encontrado")
+    return board
+
+@router.post("/{board_id}/columns/{column_id}/move")
+def move_column(board_id: str,
+                column_id: str,
+                move: ColumnMove,
+                request: Request,
+                background_tasks: BackgroundTasks,
+                session: Session = Depends(get_db_session)):
+    """Reordenar una columna actualizando solo su fila"""
+    column = session.get(Column, column_id)
+    if column is None or column.board_id != board_id:
+        raise HTTPException(status_code=404, detail="Columna no encontrada")
+
+    try:
+        rebalance = ranking.move_column(session, column, move.before_id, move.after_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    session.commit()
+
+    if rebalance:
+        background_tasks.add_task(rebalance_board, request, board_id)
+
+    return {'id': column.id, 'position': column.position}
+
+@router.post("/{board_id}/markdown")
+def import_markdown(board_id: str,
+                    file: UploadFile = File(...),
+                    prune: bool = False,
+                    session: Session = Depends(get_db_session)):
+    """Importar un tablero markdown (formato kanban/board.md); idempotente"""
+    board = session.get(Board, board_id)
+    if board is None:
+        raise HTTPException(status_code=404, detail="Tablero no encontrado")
+
+    try:
+        stats = markdown_sync.import_board(
+            session, board, io.TextIOWrapper(file.file, encoding='utf-8'), prune=prune
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return stats
+
+@router.get("/{board_id}/markdown")
+def export_markdown(board_id: str, session: Session = Depends(get_db_session)):
+    """Exportar el tablero en el formato de kanban/board.md"""
+    board = session.get(Board, board_id)
+    if board is None:
+        raise HTTPException(status_code=404, detail="Tablero no encontrado")
+
+    return StreamingResponse(
+        markdown_sync.export_board(session, board),
+        media_type="text/markdown; charset=utf-8",
+        headers={"Content-Disposition": f'attachment; filename="{board_id}.md"'}
+    )
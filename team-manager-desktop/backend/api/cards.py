@@ -0,0 +1,161 @@
+"""
+🃏 API de Tarjetas
+Listado paginado por clave con proyección de campos
+"""
+
+from typing import Optional, List, Dict, Any, Literal
+
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Request
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, Field
+from sqlalchemy.orm import Session, selectinload
+
+from api.deps import get_db_session
+from models.database import Card, User
+from services.card_batch import CardBatchService, BatchError
+from services.listing import paginate_keyset, parse_fields, project
+from services.ranking import RankingService
+
+router = APIRouter()
+
+CARD_FIELDS = {
+    'id', 'title', 'description', 'card_type', 'priority', 'status', 'team_id', 'project_id',
+    'column_id', 'assigned_to', 'position', 'estimated_hours', 'actual_hours', 'story_points',
+    'blocked_reason', 'tags', 'acceptance_criteria', 'created_at', 'updated_at', 'started_at',
+    'completed_at'
+}
+# Sin description ni acceptance_criteria salvo que se pidan
+DEFAULT_CARD_FIELDS = [
+    'id', 'title', 'card_type', 'priority', 'status', 'team_id', 'project_id', 'column_id',
+    'assigned_to', 'position', 'estimated_hours', 'story_points', 'updated_at'
+]
+CARD_EXPANSIONS = {'assignee'}
+
+ranking = RankingService()
+card_batch = CardBatchService()
+
+class CardMove(BaseModel):
+    """Destino de una tarjeta: columna y vecinos (None = al final)"""
+    column_id: str
+    before_id: Optional[str] = None
+    after_id: Optional[str] = None
+
+class BatchOperation(BaseModel):
+    """Operación de un lote: create, update, move o delete"""
+    op: Literal['create', 'update', 'move', 'delete']
+    id: Optional[str] = None
+    data: Optional[Dict[str, Any]] = None
+    column_id: Optional[str] = None
+    before_id: Optional[str] = None
+    after_id: Optional[str] = None
+
+class CardBatch(BaseModel):
+    operations: List[BatchOperation] = Field(..., min_length=1)
+    enforce_wip: bool = True
+
+def rebalance_column(request: Request, column_id: str):
+    """Reequilibrado en segundo plano con su propia sesión"""
+    with request.app.state.db.get_session() as session:
+        ranking.rebalance_column(session, column_id)
+
+@router.get("")
+def list_cards(team_id: Optional[str] = None,
+               project_id: Optional[str] = None,
+               column_id: Optional[str] = None,
+               status: Optional[str] = None,
+               assigned_to: Optional[str] = None,
+               fields: Optional[str] = Query(None, description="Campos separados por comas"),
+               expand: Optional[str] = Query(None, description="Relaciones a incluir: assignee"),
+               limit: int = Query(50, ge=1, le=500),
+               cursor: Optional[str] = None,
+               order: str = Query("desc", pattern="^(asc|desc)$"),
+               session: Session = Depends(get_db_session)):
+    """Tarjetas ordenadas por (updated_at, id), paginadas por cursor"""
+    try:
+        selected = parse_fields(fields, CARD_FIELDS, DEFAULT_CARD_FIELDS)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    expansions = {item for item in (expand or '').split(',') if item}
+    if expansions - CARD_EXPANSIONS:
+        raise HTTPException(status_code=400, detail=f"Relaciones no permitidas: {', '.join(expansions - CARD_EXPANSIONS)}")
+
+    filters = []
+    for column, value in ((Card.team_id, team_id), (Card.project_id, project_id), (Card.column_id, column_id),
+                          (Card.status, status), (Card.assigned_to, assigned_to)):
+        if value is not None:
+            filters.append(column == value)
+
+    # Relaciones cargadas en una sola consulta adicional por relación (selectin)
+    options = []
+    if 'assignee' in expansions:
+        if 'assigned_to' not in selected:
+            selected.append('assigned_to')
+        options.append(selectinload(Card.assignee).load_only(User.id, User.name, User.avatar))
+
+    try:
+        cards, next_cursor = paginate_keyset(
+            session, Card, selected, filters=filters, options=options,
+            limit=limit, cursor=cursor, descending=order == "desc"
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    items = []
+    for card in cards:
+        item = project(card, selected)
+        if 'assignee' in expansions:
+            item['assignee'] = (
+                {'id': card.assignee.id, 'name': card.assignee.name, 'avatar': card.assignee.avatar}
+                if card.assignee else None
+            )
+        items.append(item)
+
+    return {'items': items, 'next_cursor': next_cursor}
+
+@router.post("/{card_id}/move")
+def move_card(card_id: str,
+              move: CardMove,
+              request: Request,
+              background_tasks: BackgroundTasks,
+              session: Session = Depends(get_db_session)):
+    """Mover una tarjeta actualizando solo su fila"""
+    card = session.get(Card, card_id)
+    if card is None:
+        raise HTTPException(status_code=404, detail="Tarjeta no encontrada")
+
+    try:
+        rebalance = ranking.move_card(session, card, move.column_id, move.before_id, move.after_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    session.commit()
+
+    if rebalance:
+        background_tasks.add_task(rebalance_column, request, move.column_id)
+
+    return {'id': card.id, 'column_id': card.column_id, 'status': card.status, 'position': card.position}
+
+@router.post("/batch")
+def batch_cards(batch: CardBatch,
+                request: Request,
+                background_tasks: BackgroundTasks,
+                session: Session = Depends(get_db_session)):
+    """
+    Aplicar un lote de operaciones en una sola transacción.
+    Si alguna falla no se aplica ninguna (422 con el resultado de cada una).
+    """
+    try:
+        result = card_batch.apply(
+            session,
+            [operation.model_dump() for operation in batch.operations],
+            enforce_wip=batch.enforce_wip
+        )
+    except BatchError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    for column_id in result.pop('rebalance_columns'):
+        background_tasks.add_task(rebalance_column, request, column_id)
+
+    if not result['committed']:
+        return JSONResponse(status_code=422, content=result)
+    return result
@@ -0,0 +1,109 @@
+"""
+🕸️ API de Dependencias
+Orden topológico, camino crítico y cadenas de bloqueo de tarjetas y proyectos
+"""
+
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from pydantic import BaseModel
+from sqlalchemy.orm import Session
+
+from api.deps import get_db_session
+from models.database import Card
+from services.dependency_graph import DependencyGraphService, DependencyCycleError
+
+router = APIRouter()
+
+class DependencyCreate(BaseModel):
+    """Tarjeta que debe terminarse antes"""
+    depends_on_id: str
+
+def get_dependency_graph(request: Request,
+                         session: Session = Depends(get_db_session)) -> DependencyGraphService:
+    """Grafo compartido, al día con los cambios confirmados"""
+    graph = request.app.state.dependency_graph
+    graph.sync(session)
+    return graph
+
+@router.get("")
+def get_stats(graph: DependencyGraphService = Depends(get_dependency_graph)):
+    """Tamaño del grafo y dependencias circulares ignoradas"""
+    return graph.stats()
+
+@router.get("/cards/order")
+def get_card_order(project_id: Optional[str] = None, team_id: Optional[str] = None,
+                   graph: DependencyGraphService = Depends(get_dependency_graph)):
+    """Tarjetas en un orden que respeta todas las dependencias"""
+    return {'items': graph.card_order(project_id, team_id)}
+
+@router.get("/cards/critical-path")
+def get_card_critical_path(project_id: Optional[str] = None, team_id: Optional[str] = None,
+                           graph: DependencyGraphService = Depends(get_dependency_graph)):
+    """Cadena de tarjetas pendientes con más horas estimadas"""
+    path = graph.card_critical_path(project_id, team_id)
+    return {'hours': path['hours'], 'length': path['length'], 'cards': path['nodes'], 'blocked': path['blocked']}
+
+@router.get("/cards/blocked")
+def get_blocked_chains(project_id: Optional[str] = None, team_id: Optional[str] = None,
+                       limit: int = Query(50, ge=1, le=1000),
+                       graph: DependencyGraphService = Depends(get_dependency_graph)):
+    """Tarjetas bloqueadas y el trabajo que frenan, de mayor a menor impacto"""
+    return {'items': graph.blocked_chains(project_id, team_id, limit=limit)}
+
+@router.get("/cards/{card_id}/blockers")
+def get_card_blockers(card_id: str, graph: DependencyGraphService = Depends(get_dependency_graph)):
+    """Tarjetas bloqueadas de las que depende (directa o indirectamente)"""
+    return {'card_id': card_id, 'blockers': graph.blockers(card_id)}
+
+@router.post("/cards/{card_id}/dependencies")
+def add_card_dependency(card_id: str, dependency: DependencyCreate, request: Request,
+                        session: Session = Depends(get_db_session)):
+    """Añadir una dependencia; 409 si cerraría un ciclo"""
+    card = session.get(Card, card_id)
+    depends_on = session.get(Card, dependency.depends_on_id)
+    if card is None or depends_on is None:
+        raise HTTPException(status_code=404, detail="Tarjeta no encontrada")
+
+    if depends_on not in card.dependencies:
+        card.dependencies.append(depends_on)
+        try:
+            session.commit()
+        except DependencyCycleError as e:
+            session.rollback()
+            raise HTTPException(status_code=409, detail={'message': str(e), 'cycle': e.cycle})
+
+    return {'card_id': card_id, 'depends_on_id': dependency.depends_on_id,
+            'blockers': request.app.state.dependency_graph.blockers(card_id)}
+
+@router.delete("/cards/{card_id}/dependencies/{depends_on_id}")
+def remove_card_dependency(card_id: str, depends_on_id: str, session: Session = Depends(get_db_session)):
+    """Quitar una dependencia"""
+    card = session.get(Card, card_id)
+    if card is None:
+        raise HTTPException(status_code=404, detail="Tarjeta no encontrada")
+
+    depends_on = next((other for other in card.dependencies if other.id == depends_on_id), None)
+    if depends_on is None:
+        raise HTTPException(status_code=404, detail="Dependencia no encontrada")
+
+    card.dependencies.remove(depends_on)
+    session.commit()
+    return {'message': 'Dependencia eliminada'}
+
+@router.get("/projects/order")
+def get_project_order(graph: DependencyGraphService = Depends(get_dependency_graph)):
+    """Proyectos en un orden que respeta sus dependencias"""
+    return {'items': graph.project_order()}
+
+@router.get("/projects/critical-path")
+def get_project_critical_path(graph: DependencyGraphService = Depends(get_dependency_graph)):
+    """Cadena de proyectos con más horas restantes"""
+    path = graph.project_critical_path()
+    return {'hours': path['hours'], 'length': path['length'], 'projects': path['nodes'], 'blocked': path['blocked']}
+
+@router.get("/risks")
+def get_dependency_risks(min_affected: int = Query(3, ge=1),
+                         graph: DependencyGraphService = Depends(get_dependency_graph)):
+    """Riesgos derivados de las dependencias (mismo formato que los riesgos del detector)"""
+    return {'items': graph.risks(min_affected=min_affected)}
@@ -0,0 +1,22 @@
+"""
+🔗 Dependencias de la API
+Acceso a la sesión de base de datos y a los servicios globales desde los routers
+"""
+
+from typing import Iterator
+
+from fastapi import Request
+from sqlalchemy.orm import Session
+
+def get_db_session(request: Request) -> Iterator[Session]:
+    """Sesión de base de datos por petición"""
+    with request.app.state.db.get_session() as session:
+        yield session
+
+async def get_ai_director(request: Request):
+    """Director de IA (la primera petición lo importa y construye en un hilo)"""
+    return await request.app.state.ai_director.aget()
+
+async def get_org_snapshot(request: Request):
+    """Snapshot inmutable de la organización para los análisis (se recarga solo si hubo cambios)"""
+    return await request.app.state.org_snapshots.aget()
@@ -0,0 +1,87 @@
+"""
+📣 API de Cambios en Tiempo Real
+WebSocket y SSE con los diffs de tableros, insights y riesgos
+"""
+
+import asyncio
+import json
+import logging
+from typing import List, Optional
+
+from fastapi import APIRouter, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
+
+from api.sse import format_sse, SSE_HEADERS
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+# Intervalo de keep-alive para SSE (segundos)
+HEARTBEAT_SECONDS = 15
+
+def _split(value: Optional[str]) -> List[str]:
+    return [item for item in (value or '').split(',') if item]
+
+@router.websocket("/ws")
+async def change_feed_socket(websocket: WebSocket):
+    """
+    Feed de cambios por WebSocket.
+
+    Filtros iniciales por query (?teams=a,b&boards=x). El cliente puede
+    cambiarlos enviando {"teams": [...], "boards": [...]}.
+    """
+    feed = websocket.app.state.change_feed
+    await websocket.accept()
+
+    subscription = feed.subscribe(
+        teams=_split(websocket.query_params.get('teams')),
+        boards=_split(websocket.query_params.get('boards'))
+    )
+
+    async def receive_filters():
+        while True:
+            message = await websocket.receive_json()
+            subscription.update(teams=message.get('teams'), boards=message.get('boards'))
+
+    async def send_changes():
+        while True:
+            batch = await subscription.next_batch(feed.coalesce_seconds)
+            # Un cliente que no consume en send_timeout se desconecta
+            await asyncio.wait_for(websocket.send_json(batch), timeout=feed.send_timeout)
+
+    tasks = [asyncio.ensure_future(receive_filters()), asyncio.ensure_future(send_changes())]
+    try:
+        done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            error = task.exception()
+            if error and not isinstance(error, (WebSocketDisconnect, asyncio.TimeoutError, json.JSONDecodeError)):
+                logger.warning(f"Error en feed de cambios: {error}")
+    finally:
+        for task in tasks:
+            task.cancel()
+        feed.unsubscribe(subscription)
+        if subscription.dropped:
+            logger.info(f"Cliente lento: {subscription.dropped} cambios descartados por resincronización")
+
+@router.get("/stream")
+async def change_feed_stream(request: Request, teams: Optional[str] = None, boards: Optional[str] = None):
+    """Feed de cambios por Server-Sent Events (?teams=a,b&boards=x)"""
+    feed = request.app.state.change_feed
+    subscription = feed.subscribe(teams=_split(teams), boards=_split(boards))
+
+    async def event_stream():
+        try:
+            while True:
+                try:
+                    batch = await asyncio.wait_for(
+                        subscription.next_batch(feed.coalesce_seconds), timeout=HEARTBEAT_SECONDS
+                    )
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield format_sse(batch['type'], batch)
+        finally:
+            feed.unsubscribe(subscription)
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream", headers=SSE_HEADERS)
@@ -0,0 +1,39 @@
+"""
+⏱️ API de Flujo
+Historial de columnas de una tarjeta, envejecimiento del WIP y tiempos de ciclo desde card_status_history
+"""
+
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from sqlalchemy.orm import Session
+
+from api.deps import get_db_session
+from models.database import Board, Card
+
+router = APIRouter()
+
+@router.get("/cards/{card_id}/history")
+def get_card_history(card_id: str, request: Request, session: Session = Depends(get_db_session)):
+    """Transiciones de la tarjeta y tiempo acumulado en cada columna"""
+    if session.get(Card, card_id) is None:
+        raise HTTPException(status_code=404, detail="Tarjeta no encontrada")
+    return request.app.state.card_history.card_history(session, card_id)
+
+@router.get("/boards/{board_id}/aging")
+def get_aging(board_id: str, request: Request,
+              days: int = Query(90, ge=1, le=3650),
+              session: Session = Depends(get_db_session)):
+    """Percentiles de edad del WIP por columna (y de la duración histórica en cada una)"""
+    if session.get(Board, board_id) is None:
+        raise HTTPException(status_code=404, detail="Tablero no encontrado")
+    return request.app.state.card_history.aging(session, board_id, days)
+
+@router.get("/cycle-times")
+def get_cycle_times(request: Request,
+                    team_id: Optional[str] = None,
+                    project_id: Optional[str] = None,
+                    days: int = Query(90, ge=1, le=3650),
+                    session: Session = Depends(get_db_session)):
+    """Puntos del diagrama de dispersión de tiempos de ciclo y sus percentiles"""
+    return request.app.state.card_history.cycle_times(session, team_id, project_id, days)
@@ -0,0 +1,50 @@
+"""
+💓 API de Salud
+Responde desde el primer instante del arranque: etapa actual, tiempos y servicios cargados
+"""
+
+from fastapi import APIRouter, Request
+from fastapi.responses import JSONResponse
+
+router = APIRouter()
+
+@router.get("")
+async def health(request: Request):
+    """Proceso vivo; incluye la etapa de arranque (siempre 200)"""
+    return {'status': 'ok', **request.app.state.startup.to_dict()}
+
+@router.get("/ready")
+async def readiness(request: Request):
+    """200 cuando el backend puede atender peticiones; 503 mientras arranca o si falló"""
+    startup = request.app.state.startup
+    if startup.ready:
+        return {'status': 'ready'}
+    return JSONResponse(
+        status_code=503,
+        content={'status': startup.stage, 'error': startup.error},
+        headers={'Retry-After': '1'}
+    )
+
+class ReadinessMiddleware:
+    """
+    Mientras el backend arranca, las rutas /api (salvo /api/health) responden
+    503 con Retry-After en vez de fallar por servicios aún sin crear.
+    ASGI puro para no envolver las respuestas en streaming (SSE).
+    """
+
+    def __init__(self, app, exempt: tuple = ("/api/health",)):
+        self.app = app
+        self.exempt = exempt
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'http' and scope['path'].startswith('/api/') and not scope['path'].startswith(self.exempt):
+            startup = getattr(scope['app'].state, 'startup', None)
+            if startup is not None and not startup.ready:
+                response = JSONResponse(
+                    status_code=503,
+                    content={'detail': 'El backend se está iniciando', 'stage': startup.stage, 'error': startup.error},
+                    headers={'Retry-After': '1'}
+                )
+                await response(scope, receive, send)
+                return
+        await self.app(scope, receive, send)
@@ -0,0 +1,96 @@
+"""
+📈 API de Métricas
+Exposición Prometheus en /api/metrics y middleware que mide cada petición (latencia y SQL)
+"""
+
+import logging
+import time
+from typing import Dict, Optional
+
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from starlette.routing import Route
+
+from services.metrics import (
+    REGISTRY, HTTP_REQUESTS, HTTP_LATENCY, HTTP_SQL_QUERIES, HTTP_SQL_TIME,
+    start_request_queries, end_request_queries
+)
+
+logger = logging.getLogger(__name__)
+
+# Máximo de sentencias que se vuelcan en el log de peticiones lentas
+SLOW_LOG_MAX_STATEMENTS = 20
+
+router = APIRouter()
+
+@router.get("", response_class=PlainTextResponse)
+def get_metrics():
+    """Métricas en formato de texto de Prometheus (síncrono: algunos collectors consultan la base de datos)"""
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+class MetricsMiddleware:
+    """
+    Latencia, estado y consultas SQL por ruta (plantilla, p. ej. /api/cards/{card_id},
+    para no crear una serie por id) de todas las peticiones /api.
+
+    Si slow_request_ms > 0, las peticiones más lentas se registran en el log
+    con sus sentencias SQL y lo que tardó cada una.
+    ASGI puro: las respuestas en streaming (SSE) no se envuelven y solo se cuentan.
+    """
+
+    def __init__(self, app, slow_request_ms: float = 0.0):
+        self.app = app
+        self.slow_request_ms = slow_request_ms
+        self._routes: Optional[Dict[object, str]] = None
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http' or not scope['path'].startswith('/api'):
+            await self.app(scope, receive, send)
+            return
+
+        response = {'status': 500, 'streaming': False}
+
+        async def send_wrapper(message):
+            if message['type'] == 'http.response.start':
+                response['status'] = message['status']
+                headers = dict(message.get('headers') or ())
+                response['streaming'] = headers.get(b'content-type', b'').startswith(b'text/event-stream')
+            await send(message)
+
+        queries, token = start_request_queries()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            end_request_queries(token)
+            self._record(scope, response, elapsed, queries)
+
+    def _record(self, scope, response, elapsed: float, queries):
+        method = scope['method']
+        route = self._route_for(scope)
+        HTTP_REQUESTS.inc(method, route, str(response['status']))
+        if response['streaming']:
+            return
+
+        HTTP_LATENCY.observe(elapsed, method, route)
+        HTTP_SQL_QUERIES.observe(queries.count, method, route)
+        HTTP_SQL_TIME.observe(queries.total_ms / 1000, method, route)
+
+        elapsed_ms = elapsed * 1000
+        if self.slow_request_ms and elapsed_ms >= self.slow_request_ms:
+            lines = [
+                f"🐢 {method} {scope['path']} ({route}) {response['status']} en {elapsed_ms:.0f} ms: "
+                f"{queries.count} consultas SQL, {queries.total_ms:.0f} ms en SQL"
+            ]
+            for statement, duration in queries.statements[:SLOW_LOG_MAX_STATEMENTS]:
+                lines.append(f"    {duration:7.1f} ms  {' '.join(statement.split())[:500]}")
+            if queries.count > SLOW_LOG_MAX_STATEMENTS:
+                lines.append(f"    ... y {queries.count - SLOW_LOG_MAX_STATEMENTS} más")
+            logger.warning('\n'.join(lines))
+
+    def _route_for(self, scope) -> str:
+        """Plantilla de la ruta resuelta por el router ('unmatched' si ninguna)"""
+        if self._routes is None:
+            self._routes = {route.endpoint: route.path for route in scope['app'].routes if isinstance(route, Route)}
+        return self._routes.get(scope.get('endpoint'), 'unmatched')
@@ -0,0 +1,75 @@
+"""
+🔬 API de Perfiles
+Perfilado de una petición con ?profile= y descarga de los perfiles guardados en data/profiles
+"""
+
+from datetime import datetime
+from urllib.parse import parse_qs
+
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import FileResponse
+
+from services.profiling import profile_run, parse_mode, settings
+
+router = APIRouter()
+
+@router.get("")
+async def list_profiles():
+    """Perfiles guardados, del más reciente al más antiguo"""
+    if not settings.directory.exists():
+        return {'items': []}
+    files = sorted(
+        (path for path in settings.directory.iterdir() if path.suffix in ('.json', '.pstats')),
+        key=lambda path: path.name, reverse=True
+    )
+    return {'items': [
+        {
+            'file': path.name,
+            'size': path.stat().st_size,
+            'created_at': datetime.fromtimestamp(path.stat().st_mtime).isoformat()
+        }
+        for path in files
+    ]}
+
+@router.get("/{file_name}")
+async def download_profile(file_name: str):
+    """Descargar un perfil (.speedscope.json se abre en speedscope.app; .pstats con pstats/snakeviz)"""
+    path = settings.directory / file_name
+    if path.parent != settings.directory or path.suffix not in ('.json', '.pstats') or not path.is_file():
+        raise HTTPException(status_code=404, detail="Perfil no encontrado")
+    return FileResponse(path, filename=file_name)
+
+class ProfilingMiddleware:
+    """
+    Perfila la petición completa si lleva ?profile=speedscope|cprofile (o 1).
+    Los métodos del director de IA, las llamadas al LLM y el SQL que se
+    ejecuten dentro quedan como spans; la cabecera X-Profile indica el fichero.
+    Sin el parámetro solo cuesta mirar la query string.
+    En /api/scheduler el parámetro perfila la tarea, no la petición.
+    """
+
+    def __init__(self, app, exempt: tuple = ("/api/scheduler",)):
+        self.app = app
+        self.exempt = exempt
+
+    async def __call__(self, scope, receive, send):
+        if (scope['type'] != 'http' or b'profile=' not in scope.get('query_string', b'')
+                or scope['path'].startswith(self.exempt)):
+            await self.app(scope, receive, send)
+            return
+
+        values = parse_qs(scope['query_string'].decode('latin-1')).get('profile')
+        mode = parse_mode(values[0] if values else None)
+        if mode is None:
+            await self.app(scope, receive, send)
+            return
+
+        async with profile_run(f"{scope['method']} {scope['path']}", mode) as profile:
+            async def send_wrapper(message):
+                if message['type'] == 'http.response.start' and profile is not None:
+                    message['headers'] = list(message.get('headers') or []) + [
+                        (b'x-profile', profile.stem.encode('latin-1'))
+                    ]
+                await send(message)
+
+            await self.app(scope, receive, send_wrapper)
@@ -0,0 +1,33 @@
+"""
+⏰ API del Planificador
+Estado de las tareas en segundo plano y ejecución manual
+"""
+
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Request
+
+from services.profiling import parse_mode
+
+router = APIRouter()
+
+@router.get("")
+async def get_jobs(request: Request):
+    """Tareas programadas con su última ejecución y la siguiente"""
+    return {'items': request.app.state.scheduler.status()}
+
+@router.post("/{name}/run", status_code=202)
+async def run_job(name: str, request: Request, profile: Optional[str] = None):
+    """
+    Ejecutar una tarea cuanto antes (409 si ya está en marcha).
+    Con ?profile=speedscope|cprofile la ejecución se perfila en data/profiles.
+    """
+    scheduler = request.app.state.scheduler
+    if name not in scheduler.jobs:
+        raise HTTPException(status_code=404, detail="Tarea no encontrada")
+    mode = parse_mode(profile)
+    if profile and mode is None:
+        raise HTTPException(status_code=400, detail="Modo de perfilado no válido (speedscope o cprofile)")
+    if not scheduler.trigger(name, profile=mode):
+        raise HTTPException(status_code=409, detail="La tarea ya está en ejecución")
+    return {'message': f'Tarea {name} programada', 'profile': mode}
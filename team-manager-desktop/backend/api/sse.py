@@ -0,0 +1,17 @@
+"""
+📡 Server-Sent Events
+Formato de eventos SSE para los endpoints en streaming
+"""
+
+import json
+from typing import Any
+
+SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    "X-Accel-Buffering": "no"
+}
+
+def format_sse(event: str, data: Any) -> str:
+    """Serializar un evento SSE"""
+    payload = json.dumps(data, ensure_ascii=False, separators=(',', ':'), default=str)
+    return f"event: {event}\ndata: {payload}\n\n"
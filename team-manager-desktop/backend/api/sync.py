@@ -0,0 +1,24 @@
+"""
+🔄 API de Sincronización Delta
+Devuelve solo las filas cambiadas/eliminadas desde un cursor de versión
+"""
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+
+from api.deps import get_db_session
+from services.sync import SyncService
+
+router = APIRouter()
+sync_service = SyncService()
+
+@router.get("")
+def sync_changes(since: int = Query(0, ge=0, description="Cursor devuelto por la sincronización anterior"),
+                 limit: int = Query(1000, ge=1, le=10000),
+                 session: Session = Depends(get_db_session)):
+    """
+    Cambios de equipos, proyectos, tableros, columnas y tarjetas desde `since`.
+    Con since=0 se obtiene el estado completo (las filas anteriores al versionado
+    reciben versión al arrancar, ver migrate_sync_state).
+    """
+    return sync_service.changes_since(session, since=since, limit=limit)
@@ -0,0 +1,54 @@
+"""
+👤 API de Usuarios
+Listado paginado por clave con proyección de campos
+"""
+
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+
+from api.deps import get_db_session
+from models.database import User, team_members
+from services.listing import paginate_keyset, parse_fields, project
+
+router = APIRouter()
+
+USER_FIELDS = {
+    'id', 'name', 'email', 'avatar', 'role', 'skills', 'capacity', 'timezone', 'is_active',
+    'created_at', 'updated_at'
+}
+DEFAULT_USER_FIELDS = ['id', 'name', 'email', 'avatar', 'role', 'capacity', 'updated_at']
+
+@router.get("")
+def list_users(team_id: Optional[str] = None,
+               active: Optional[bool] = True,
+               fields: Optional[str] = Query(None, description="Campos separados por comas"),
+               limit: int = Query(50, ge=1, le=500),
+               cursor: Optional[str] = None,
+               order: str = Query("desc", pattern="^(asc|desc)$"),
+               session: Session = Depends(get_db_session)):
+    """Usuarios ordenados por (updated_at, id), paginados por cursor"""
+    try:
+        selected = parse_fields(fields, USER_FIELDS, DEFAULT_USER_FIELDS)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    filters = []
+    if active is not None:
+        filters.append(User.is_active == active)
+    if team_id is not None:
+        # Subconsulta en vez de cargar Team.members
+        filters.append(User.id.in_(
+            team_members.select().with_only_columns(team_members.c.user_id).where(team_members.c.team_id == team_id)
+        ))
+
+    try:
+        users, next_cursor = paginate_keyset(
+            session, User, selected, filters=filters,
+            limit=limit, cursor=cursor, descending=order == "desc"
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return {'items': [project(user, selected) for user in users], 'next_cursor': next_cursor}
@@ -0,0 +1,28 @@
+"""
+⚖️ API del Optimizador de Carga
+Propuestas de reasignación de tarjetas entre miembros de un equipo
+"""
+
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+
+from api.deps import get_db_session
+from services.workload_optimizer import WorkloadOptimizer
+
+router = APIRouter()
+
+@router.get("")
+def optimize_workload(team_id: Optional[List[str]] = Query(None),
+                      horizon_days: int = Query(5, ge=1, le=30),
+                      max_utilization: float = Query(0.9, gt=0, le=1.5),
+                      move_in_progress: bool = False,
+                      session: Session = Depends(get_db_session)):
+    """Reasignaciones propuestas (no se aplican; usar POST /api/cards/batch)"""
+    optimizer = WorkloadOptimizer(
+        horizon_days=horizon_days,
+        max_utilization=max_utilization,
+        move_in_progress=move_in_progress
+    )
+    return optimizer.optimize(session, team_ids=team_id)
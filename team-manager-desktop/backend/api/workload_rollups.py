@@ -0,0 +1,37 @@
+"""
+📈 API de Agregados de Carga
+Series temporales de horas, capacidad y utilización desde workload_rollups
+"""
+
+from datetime import datetime, timedelta
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Query, Request
+from sqlalchemy.orm import Session
+
+from api.deps import get_db_session
+
+router = APIRouter()
+
+@router.get("")
+def get_rollups(request: Request,
+                scope_type: str = Query("team", pattern="^(user|team|project)$"),
+                scope_id: Optional[str] = None,
+                granularity: str = Query("week", pattern="^(day|week|month)$"),
+                start: Optional[datetime] = None,
+                end: Optional[datetime] = None,
+                session: Session = Depends(get_db_session)):
+    """Serie por periodo (por defecto, el último año)"""
+    end = end or datetime.now()
+    start = start or end - timedelta(days=365)
+
+    items = request.app.state.workload_rollups.series(
+        session, scope_type, granularity, start, end, scope_id=scope_id
+    )
+    return {
+        'scope_type': scope_type,
+        'granularity': granularity,
+        'start': start.isoformat(),
+        'end': end.isoformat(),
+        'items': items
+    }
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+⏱️ Benchmark del Ejecutor de Análisis
+Latencia del event loop (la que percibe cualquier otra petición) mientras corre un análisis pesado:
+en el propio loop, en un hilo y en el pool de procesos
+
+Uso (desde backend/): python -m benchmarks.bench_analysis_executor --cards 200000 --runs 3
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import time
+from datetime import datetime, timedelta
+
+from services.analysis_executor import AnalysisExecutor
+from services.analysis_tasks import build_context, compact
+
+STATUSES = ('backlog', 'ready', 'in_progress', 'review', 'blocked', 'done')
+
+def synthetic_organization(teams: int, projects: int, cards: int, users: int, seed: int = 42):
+    """Filas con el mismo formato que producen los snapshot_* de analysis_tasks"""
+    rng = random.Random(seed)
+    now = datetime.now()
+    user_rows = [(f'user-{i}', 8.0) for i in range(users)]
+    team_rows = [
+        (f'team-{i}', f'Equipo {i}', tuple(compact(user_id) for user_id, _ in user_rows[i::teams]),
+         {'in_progress': 10, 'review': 5})
+        for i in range(teams)
+    ]
+    project_rows = [
+        (f'project-{i}', f'Proyecto {i}', rng.choice(('active', 'planning', 'on_hold')),
+         rng.choice(('low', 'medium', 'high', 'critical')),
+         (compact(f'team-{i % teams}'), compact(f'team-{(i + 1) % teams}')), rng.uniform(0, 100),
+         now - timedelta(days=rng.randrange(10, 200)), now + timedelta(days=rng.randrange(-20, 200)))
+        for i in range(projects)
+    ]
+    # Cadenas nuevas en cada fila, como las que devuelve SQLite
+    card_rows = [
+        (compact(f'team-{i % teams}'), compact(f'project-{i % projects}'), compact(rng.choice(STATUSES)),
+         compact(f'user-{rng.randrange(users)}'), float(rng.choice((1, 2, 3, 5, 8))))
+        for i in range(cards)
+    ]
+    return team_rows, project_rows, card_rows, user_rows
+
+async def probe(stop: asyncio.Event, interval: float = 0.005):
+    """Petición mínima repetida: mide cuánto tarda el loop en atenderla"""
+    latencies = []
+    while not stop.is_set():
+        scheduled = time.perf_counter()
+        await asyncio.sleep(interval)
+        latencies.append((time.perf_counter() - scheduled - interval) * 1000)
+    return latencies
+
+async def measure(label: str, analysis, runs: int):
+    stop = asyncio.Event()
+    probe_task = asyncio.create_task(probe(stop))
+    await asyncio.sleep(0.1)
+
+    start = time.perf_counter()
+    for _ in range(runs):
+        await analysis()
+    elapsed = time.perf_counter() - start
+
+    stop.set()
+    latencies = sorted(await probe_task)
+    p95 = latencies[int(len(latencies) * 0.95) - 1] if latencies else 0.0
+    print(f"  {label:<16} análisis {elapsed / runs * 1000:8.1f} ms | latencia p50 "
+          f"{statistics.median(latencies):7.2f} ms, p95 {p95:7.2f} ms, máx {latencies[-1]:7.2f} ms")
+
+async def run(args):
+    organization = synthetic_organization(args.teams, args.projects, args.cards, args.users)
+    executor = AnalysisExecutor(max_workers=args.workers)
+
+    async def inline():
+        # Como antes: el análisis se ejecuta dentro del handler async
+        build_context(*organization, 6000)
+
+    async def threaded():
+        await asyncio.to_thread(build_context, *organization, 6000)
+
+    async def pooled():
+        await executor.run(build_context, *organization, 6000)
+
+    print(f"⏱️ Contexto de {args.cards} tarjetas, {args.projects} proyectos, {args.teams} equipos "
+          f"({args.runs} ejecuciones)")
+    await measure("Sin carga", lambda: asyncio.sleep(0.5), 1)
+    await measure("En el loop", inline, args.runs)
+    await measure("En un hilo", threaded, args.runs)
+    await pooled()  # Arranque de los procesos fuera de la medición
+    await measure("Pool de procesos", pooled, args.runs)
+
+    # Timeout: el proceso se termina y el pool se recrea
+    try:
+        await executor.run(time.sleep, 5, timeout=0.5)
+    except TimeoutError:
+        pass
+    await executor.run(build_context, *organization, 6000)
+    print(f"  Estado del ejecutor: {executor.status()}")
+    executor.shutdown()
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark del ejecutor de análisis en procesos")
+    parser.add_argument('--cards', type=int, default=200000, help="Tarjetas")
+    parser.add_argument('--projects', type=int, default=500, help="Proyectos")
+    parser.add_argument('--teams', type=int, default=50, help="Equipos")
+    parser.add_argument('--users', type=int, default=400, help="Usuarios")
+    parser.add_argument('--runs', type=int, default=3, help="Análisis por escenario")
+    parser.add_argument('--workers', type=int, default=2, help="Procesos del pool")
+    asyncio.run(run(parser.parse_args()))
+
+if __name__ == "__main__":
+    main()
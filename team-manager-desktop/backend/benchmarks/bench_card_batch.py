@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+⏱️ Benchmark de Operaciones por Lotes
+Una transacción por tarjeta frente a CardBatchService en una sola transacción
+
+Uso (desde backend/): python -m benchmarks.bench_card_batch --cards 200
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+
+from models.database import Base, Column, Card
+from services.card_batch import CardBatchService
+from services.query_counter import QueryCounter
+from services.ranking import rank_between
+
+def create_columns(Session):
+    with Session() as session:
+        session.add_all([
+            Column(id='col-todo', name='To Do', board_id='board', column_type='ready', position='F'),
+            Column(id='col-done', name='Done', board_id='board', column_type='done', position='V')
+        ])
+        session.commit()
+
+def card_data(i: int):
+    return {'title': f'Tarjeta {i}', 'team_id': 'team', 'project_id': 'project', 'tags': ['bench']}
+
+def bench_one_by_one(Session, engine, cards: int):
+    """Lo que hace hoy el frontend: una petición (y transacción) por tarjeta"""
+    start = time.perf_counter()
+    with QueryCounter(engine) as counter:
+        last = None
+        for i in range(cards):
+            with Session() as session:
+                last = rank_between(last, None)
+                session.add(Card(id=f'single-{i}', column_id='col-todo', position=last, **{
+                    k: v for k, v in card_data(i).items() if k != 'tags'
+                }))
+                session.commit()
+        for i in range(cards):
+            with Session() as session:
+                card = session.get(Card, f'single-{i}')
+                card.column_id = 'col-done'
+                session.commit()
+    return time.perf_counter() - start, counter.count
+
+def bench_batch(Session, engine, cards: int):
+    service = CardBatchService()
+    start = time.perf_counter()
+    with QueryCounter(engine) as counter:
+        with Session() as session:
+            result = service.apply(session, [
+                {'op': 'create', 'id': f'batch-{i}', 'column_id': 'col-todo', 'data': card_data(i)}
+                for i in range(cards)
+            ])
+            assert result['committed'], result
+        with Session() as session:
+            result = service.apply(session, [
+                {'op': 'move', 'id': f'batch-{i}', 'column_id': 'col-done'} for i in range(cards)
+            ])
+            assert result['committed'], result
+    return time.perf_counter() - start, counter.count
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de la API de lotes de tarjetas")
+    parser.add_argument('--cards', type=int, default=200, help="Tarjetas a crear y mover")
+    args = parser.parse_args()
+
+    # Fichero real: el coste de cada commit (fsync) forma parte de la medida
+    directory = tempfile.mkdtemp()
+    engine = create_engine(f"sqlite:///{os.path.join(directory, 'bench.db')}")
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+    create_columns(Session)
+
+    single_time, single_queries = bench_one_by_one(Session, engine, args.cards)
+    batch_time, batch_queries = bench_batch(Session, engine, args.cards)
+
+    with Session() as session:
+        done = session.execute(select(Card.id).where(Card.column_id == 'col-done')).scalars().all()
+        assert len(done) == args.cards * 2
+
+    total = args.cards * 2
+    print(f"⏱️ Crear y mover {args.cards} tarjetas ({total} operaciones)")
+    print(f"  Una transacción por tarjeta: {single_time * 1000:.1f} ms, {single_queries} sentencias, "
+          f"{total / single_time:.0f} ops/s")
+    print(f"  Lote (CardBatchService):     {batch_time * 1000:.1f} ms, {batch_queries} sentencias, "
+          f"{total / batch_time:.0f} ops/s")
+
+if __name__ == "__main__":
+    main()
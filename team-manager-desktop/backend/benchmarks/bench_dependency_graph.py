@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+⏱️ Benchmark del Grafo de Dependencias
+Carga, inserciones incrementales con detección de ciclos y consultas sobre un DAG grande
+
+Uso (desde backend/): python -m benchmarks.bench_dependency_graph --cards 30000 --edges 100000
+"""
+
+import argparse
+import random
+import time
+
+from services.dependency_graph import DependencyGraph, DependencyCycleError, BLOCKED, DONE, OPEN
+
+def synthetic_graph(cards: int, edges: int, teams: int, seed: int = 42):
+    """Tarjetas con estado y horas aleatorias; aristas solo hacia índices mayores (sin ciclos)"""
+    rng = random.Random(seed)
+    nodes = [
+        (f'card-{i}', float(rng.choice((1, 2, 3, 5, 8, 13))),
+         rng.choices((OPEN, BLOCKED, DONE), weights=(80, 3, 17))[0],
+         (f'team-{i % teams}',), f'project-{i % (teams * 2)}')
+        for i in range(cards)
+    ]
+    pairs = set()
+    while len(pairs) < edges:
+        a, b = rng.randrange(cards), rng.randrange(cards)
+        if a < b:
+            pairs.add((f'card-{a}', f'card-{b}'))
+    pairs = list(pairs)
+    rng.shuffle(pairs)
+    return nodes, pairs
+
+def check_order(graph: DependencyGraph):
+    position = {node_id: i for i, node_id in enumerate(graph.topological_order())}
+    for node_id in position:
+        for before_id in graph.predecessors(node_id):
+            assert position[before_id] < position[node_id], "Orden topológico inválido"
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark del grafo de dependencias")
+    parser.add_argument('--cards', type=int, default=30000, help="Tarjetas (nodos)")
+    parser.add_argument('--edges', type=int, default=100000, help="Dependencias (aristas)")
+    parser.add_argument('--teams', type=int, default=20, help="Equipos")
+    parser.add_argument('--probes', type=int, default=2000, help="Inserciones que podrían cerrar un ciclo")
+    args = parser.parse_args()
+
+    nodes, pairs = synthetic_graph(args.cards, args.edges, args.teams)
+    half = len(pairs) // 2
+
+    graph = DependencyGraph()
+    start = time.perf_counter()
+    graph.build(nodes, pairs[:half])
+    build_time = time.perf_counter() - start
+
+    # La otra mitad llega una a una, como desde la API
+    start = time.perf_counter()
+    for before_id, after_id in pairs[half:]:
+        graph.add_edge(before_id, after_id)
+    incremental_time = time.perf_counter() - start
+
+    rng = random.Random(7)
+    cycles = 0
+    start = time.perf_counter()
+    for _ in range(args.probes):
+        a, b = sorted(rng.sample(range(args.cards), 2))
+        try:
+            graph.validate([(f'card-{b}', f'card-{a}')])
+        except DependencyCycleError:
+            cycles += 1
+    probe_time = time.perf_counter() - start
+
+    check_order(graph)
+
+    start = time.perf_counter()
+    path = graph.critical_path()
+    critical_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    chains = graph.blocked_chains(team='team-0')
+    blocked_time = time.perf_counter() - start
+
+    print(f"⏱️ Grafo de {args.cards} tarjetas y {graph.edge_count} dependencias")
+    print(f"  Carga inicial ({half} aristas): {build_time * 1000:.1f} ms")
+    print(f"  Inserciones incrementales ({len(pairs) - half}): {incremental_time * 1000:.1f} ms "
+          f"({incremental_time / max(len(pairs) - half, 1) * 1e6:.1f} µs por arista)")
+    print(f"  Validaciones inversas ({args.probes}): {probe_time * 1000:.1f} ms, {cycles} ciclos detectados")
+    print(f"  Camino crítico: {critical_time * 1000:.1f} ms ({path['length']} tarjetas, {path['hours']}h)")
+    print(f"  Cadenas de bloqueo de un equipo: {blocked_time * 1000:.1f} ms ({len(chains)} cadenas)")
+
+if __name__ == "__main__":
+    main()
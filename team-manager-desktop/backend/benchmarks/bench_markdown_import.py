@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+⏱️ Benchmark de Importación Markdown
+Importa, reimporta (idempotente) y exporta un tablero markdown sintético
+
+Uso (desde backend/): python -m benchmarks.bench_markdown_import --items 20000
+"""
+
+import argparse
+import random
+import time
+from typing import Iterator
+
+from sqlalchemy import create_engine, select, func
+from sqlalchemy.orm import sessionmaker
+
+from models.database import Base, Board, Card
+from services.markdown_board import MarkdownBoardSync, SECTION_COLUMNS, BACKLOG_PRIORITIES
+
+def synthetic_board(items: int, changed: float = 0.0, seed: int = 7) -> Iterator[str]:
+    """Tablero markdown con `items` elementos repartidos entre secciones"""
+    rng = random.Random(seed)
+    per_section = items // len(SECTION_COLUMNS)
+
+    yield "# 📊 TABLERO KANBAN PRINCIPAL\n\n"
+    counter = 0
+    for _, column_type, heading in SECTION_COLUMNS:
+        yield f"## {heading}\n\n"
+        subsections = BACKLOG_PRIORITIES if column_type == 'backlog' else [(None, None, None)]
+        for _, _, subheading in subsections:
+            if subheading:
+                yield f"### {subheading}\n"
+            for _ in range(per_section // len(subsections)):
+                prefix = rng.choice(['US', 'T', 'EP'])
+                suffix = " (revisado)" if rng.random() < changed else ""
+                yield f"- [ ] **[{prefix}-2024-01-01-{counter:06d}]** Elemento {counter}{suffix}\n"
+                yield f"  - **Valor**: valor de negocio {counter}\n"
+                counter += 1
+        yield "\n---\n\n"
+
+def timed(label: str, func_):
+    start = time.perf_counter()
+    result = func_()
+    print(f"  {label}: {(time.perf_counter() - start) * 1000:.0f} ms {result if result is not None else ''}")
+    return result
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark del importador markdown")
+    parser.add_argument('--items', type=int, default=20000, help="Elementos en el tablero")
+    args = parser.parse_args()
+
+    engine = create_engine('sqlite://')
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+    sync = MarkdownBoardSync()
+
+    with Session() as session:
+        session.add(Board(id='board-md', name='Tablero markdown', team_id='team', project_id='project'))
+        session.commit()
+
+    def run_import(changed: float = 0.0):
+        with Session() as session:
+            board = session.get(Board, 'board-md')
+            return sync.import_board(session, board, synthetic_board(args.items, changed))
+
+    def run_export():
+        with Session() as session:
+            board = session.get(Board, 'board-md')
+            return sum(1 for _ in sync.export_board(session, board))
+
+    print(f"⏱️ Tablero markdown con {args.items} elementos")
+    timed("Importación inicial", run_import)
+    unchanged = timed("Reimportación sin cambios", run_import)
+    assert unchanged['created'] == 0 and unchanged['updated'] == 0, unchanged
+    timed("Reimportación con 10% modificado", lambda: run_import(0.1))
+    timed("Exportación", run_export)
+
+    with Session() as session:
+        total = session.execute(select(func.count()).select_from(Card)).scalar_one()
+    print(f"  Tarjetas en la base de datos: {total}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+⏱️ Benchmark de Ordenación
+Movimientos de tarjetas con claves fraccionarias frente a renumerar posiciones enteras
+
+Uso (desde backend/): python -m benchmarks.bench_ranking --cards 5000 --moves 1000
+"""
+
+import argparse
+import random
+import time
+
+from sqlalchemy import create_engine, Table, Column as SAColumn, MetaData, Integer, String, Index, insert, select, update
+from sqlalchemy.orm import sessionmaker
+
+from models.database import Base, Card
+from services.query_counter import QueryCounter
+from services.ranking import RankingService, spread_ranks, MAX_RANK_LENGTH
+
+COLUMN_ID = 'column-bench'
+
+def setup_ranked(engine, cards: int):
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(insert(Card.__table__), [
+            {'id': f'card-{i}', 'title': f'Tarjeta {i}', 'team_id': 'team', 'project_id': 'project',
+             'column_id': COLUMN_ID, 'position': rank, 'change_version': 0}
+            for i, rank in enumerate(spread_ranks(cards))
+        ])
+
+def setup_legacy(engine, cards: int) -> Table:
+    """Tabla equivalente al esquema anterior (position entera)"""
+    metadata = MetaData()
+    legacy = Table(
+        'legacy_cards', metadata,
+        SAColumn('id', String, primary_key=True),
+        SAColumn('column_id', String, nullable=False),
+        SAColumn('position', Integer, nullable=False),
+        Index('ix_legacy_cards_column_position', 'column_id', 'position')
+    )
+    metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(insert(legacy), [
+            {'id': f'card-{i}', 'column_id': COLUMN_ID, 'position': i} for i in range(cards)
+        ])
+    return legacy
+
+def bench_legacy(engine, legacy: Table, cards: int, moves: int):
+    """Mover = desplazar todos los hermanos entre origen y destino"""
+    rng = random.Random(42)
+    rows = 0
+    start = time.perf_counter()
+    with engine.begin() as conn:
+        for _ in range(moves):
+            card_id = f'card-{rng.randrange(cards)}'
+            source = conn.execute(select(legacy.c.position).where(legacy.c.id == card_id)).scalar_one()
+            target = rng.randrange(cards)
+            if target == source:
+                continue
+            if target > source:
+                shift = update(legacy).where(
+                    legacy.c.column_id == COLUMN_ID, legacy.c.position > source, legacy.c.position <= target
+                ).values(position=legacy.c.position - 1)
+            else:
+                shift = update(legacy).where(
+                    legacy.c.column_id == COLUMN_ID, legacy.c.position >= target, legacy.c.position < source
+                ).values(position=legacy.c.position + 1)
+            rows += conn.execute(shift).rowcount
+            rows += conn.execute(update(legacy).where(legacy.c.id == card_id).values(position=target)).rowcount
+    elapsed = time.perf_counter() - start
+    return elapsed, rows
+
+def bench_ranked(engine, cards: int, moves: int):
+    """Mover = leer dos vecinos y actualizar una fila"""
+    rng = random.Random(42)
+    Session = sessionmaker(bind=engine, expire_on_commit=False)
+    ranking = RankingService()
+    rebalances = 0
+
+    with Session() as session:
+        order = session.execute(
+            select(Card.id).where(Card.column_id == COLUMN_ID).order_by(Card.position)
+        ).scalars().all()
+
+        start = time.perf_counter()
+        with QueryCounter(engine) as counter:
+            for _ in range(moves):
+                card_id = order.pop(rng.randrange(len(order)))
+                index = rng.randrange(len(order) + 1)
+                before_id = order[index - 1] if index > 0 else None
+                after_id = order[index] if index < len(order) else None
+
+                card = session.get(Card, card_id)
+                if ranking.move_card(session, card, COLUMN_ID, before_id, after_id):
+                    session.commit()
+                    ranking.rebalance_column(session, COLUMN_ID)
+                    rebalances += 1
+                session.commit()
+                order.insert(index, card_id)
+        elapsed = time.perf_counter() - start
+
+        positions = session.execute(
+            select(Card.id).where(Card.column_id == COLUMN_ID).order_by(Card.position, Card.id)
+        ).scalars().all()
+        assert positions == order, "El orden persistido no coincide con el esperado"
+
+    return elapsed, counter, rebalances
+
+def bench_worst_case(inserts: int) -> int:
+    """Inserciones repetidas en el mismo hueco: cuántas antes de reequilibrar"""
+    from services.ranking import rank_between
+
+    low, high = 'V', 'W'
+    for i in range(inserts):
+        high = rank_between(low, high)
+        if len(high) > MAX_RANK_LENGTH:
+            return i + 1
+    return inserts
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de claves de orden fraccionarias")
+    parser.add_argument('--cards', type=int, default=5000, help="Tarjetas en la columna")
+    parser.add_argument('--moves', type=int, default=1000, help="Movimientos aleatorios")
+    args = parser.parse_args()
+
+    engine = create_engine('sqlite://')
+    setup_ranked(engine, args.cards)
+    legacy = setup_legacy(engine, args.cards)
+
+    legacy_time, legacy_rows = bench_legacy(engine, legacy, args.cards, args.moves)
+    ranked_time, counter, rebalances = bench_ranked(engine, args.cards, args.moves)
+
+    print(f"⏱️ {args.moves} movimientos en una columna de {args.cards} tarjetas")
+    print(f"  Posición entera:   {legacy_time * 1000:.1f} ms, {legacy_rows} filas escritas "
+          f"({legacy_rows / args.moves:.1f} por movimiento)")
+    print(f"  Clave fraccionaria: {ranked_time * 1000:.1f} ms, {counter.count} sentencias "
+          f"({counter.count / args.moves:.1f} por movimiento), {rebalances} reequilibrados")
+    print(f"  Peor caso: {bench_worst_case(10000)} inserciones en el mismo hueco antes de reequilibrar")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+🚀 Benchmark de Arranque
+Tiempo de importación por módulo (python -X importtime) y, con --serve, cuánto tarda
+el backend en responder /api/health y en estar listo
+
+Uso (desde backend/):
+  python -m benchmarks.bench_startup --runs 5
+  python -m benchmarks.bench_startup --module api.workload_optimizer --top 15
+  python -m benchmarks.bench_startup --serve --runs 3
+"""
+
+import argparse
+import json
+import os
+import re
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+# "import time:       self [us] |  cumulative | imported package"
+IMPORTTIME_LINE = re.compile(r'^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|( *)(\S+)')
+
+def profile_import(module: str) -> Tuple[float, List[Tuple[str, int, int]]]:
+    """Importar el módulo en un intérprete nuevo; devuelve (ms totales, [(módulo, self_us, cumulative_us)])"""
+    started = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=BACKEND_DIR, capture_output=True, text=True
+    )
+    elapsed = (time.perf_counter() - started) * 1000
+    if completed.returncode != 0:
+        error = completed.stderr.strip().splitlines()[-1] if completed.stderr.strip() else 'error desconocido'
+        raise RuntimeError(f"No se pudo importar {module}: {error}")
+
+    entries = []
+    for line in completed.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, _, name = match.groups()
+            entries.append((name, int(self_us), int(cumulative_us)))
+    return elapsed, entries
+
+def report_imports(module: str, runs: int, top: int):
+    totals = []
+    cumulative: Dict[str, List[int]] = defaultdict(list)
+    for _ in range(runs):
+        elapsed, entries = profile_import(module)
+        totals.append(elapsed)
+        for name, _, cumulative_us in entries:
+            cumulative[name].append(cumulative_us)
+
+    print(f"📦 import {module}: mediana {statistics.median(totals):.0f} ms "
+          f"(mín {min(totals):.0f}, máx {max(totals):.0f}) en {runs} intérpretes nuevos")
+
+    # Paquetes de primer nivel (numpy, sqlalchemy...) y módulos propios
+    packages: Dict[str, float] = {}
+    for name, values in cumulative.items():
+        root = name.split('.')[0]
+        if root == name or name.startswith(('api.', 'services.', 'models.')):
+            packages[name] = max(packages.get(name, 0.0), statistics.median(values) / 1000)
+
+    print("  Módulos más caros (acumulado, ms):")
+    for name, ms in sorted(packages.items(), key=lambda item: item[1], reverse=True)[:top]:
+        print(f"    {ms:8.1f}  {name}")
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+def measure_server(timeout: float) -> Dict[str, float]:
+    """Arrancar main.py como lo hace Electron y sondear /api/health hasta que esté listo"""
+    port = free_port()
+    env = {**os.environ, 'PORT': str(port), 'SCHEDULER_ENABLED': '0', 'PRELOAD_SERVICES': '0'}
+    started = time.perf_counter()
+    process = subprocess.Popen([sys.executable, 'main.py'], cwd=BACKEND_DIR, env=env,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    first_response = ready = None
+    health = {}
+    try:
+        while time.perf_counter() - started < timeout:
+            if process.poll() is not None:
+                raise RuntimeError(f"El backend terminó con código {process.returncode}: "
+                                   f"{process.stderr.read().strip().splitlines()[-1:]}")
+            try:
+                with urllib.request.urlopen(f'http://127.0.0.1:{port}/api/health', timeout=1) as response:
+                    health = json.load(response)
+            except (urllib.error.URLError, ConnectionError):
+                time.sleep(0.01)
+                continue
+
+            if first_response is None:
+                first_response = time.perf_counter() - started
+            if health.get('ready') or health.get('stage') == 'failed':
+                ready = time.perf_counter() - started
+                break
+            time.sleep(0.01)
+        else:
+            raise RuntimeError(f"El backend no respondió en {timeout}s")
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+    if health.get('stage') == 'failed':
+        raise RuntimeError(f"Arranque fallido: {health.get('error')}")
+    return {
+        'first_response_ms': first_response * 1000,
+        'ready_ms': ready * 1000,
+        'import_ms': health.get('import_ms') or 0.0,
+        'stages': {stage['name']: stage['ms'] for stage in health.get('stages', [])}
+    }
+
+def report_server(runs: int, timeout: float):
+    results = [measure_server(timeout) for _ in range(runs)]
+
+    def median(key: str) -> float:
+        return statistics.median(result[key] for result in results)
+
+    print(f"🚀 Servidor ({runs} arranques): primera respuesta de /api/health {median('first_response_ms'):.0f} ms, "
+          f"listo {median('ready_ms'):.0f} ms (importar main {median('import_ms'):.0f} ms)")
+    for name in results[0]['stages']:
+        print(f"    {statistics.median(result['stages'].get(name, 0.0) for result in results):8.1f} ms  etapa {name}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark del arranque del backend")
+    parser.add_argument('--module', default='main', help="Módulo a importar (por defecto main)")
+    parser.add_argument('--runs', type=int, default=5, help="Repeticiones")
+    parser.add_argument('--top', type=int, default=20, help="Módulos a mostrar")
+    parser.add_argument('--serve', action='store_true', help="Medir también el arranque del servidor")
+    parser.add_argument('--timeout', type=float, default=60.0, help="Espera máxima por arranque (s)")
+    args = parser.parse_args()
+
+    report_imports(args.module, args.runs, args.top)
+    if args.serve:
+        report_server(args.runs, args.timeout)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+⏱️ Benchmark del Optimizador de Carga
+Resuelve dos snapshots sintéticos con los mismos usuarios: uno saturado (por
+defecto 500 usuarios × 10.000 tarjetas, casi sin holgura a la que mover nada)
+y otro con holgura real (1.700 tarjetas, ~60% de la capacidad total, concentradas
+en una parte de cada equipo)
+
+Uso (desde backend/): python -m benchmarks.bench_workload_optimizer --users 500 --cards 10000 --spare-cards 1700 --teams 50
+"""
+
+import argparse
+import json
+import random
+import time
+from collections import namedtuple
+from datetime import date, timedelta
+
+from services.workload_optimizer import WorkloadOptimizer
+
+Membership = namedtuple('Membership', 'team_id user_id capacity')
+UserRow = namedtuple('UserRow', 'id name capacity skills')
+CardRow = namedtuple('CardRow', 'id title team_id assigned_to status priority estimated_hours actual_hours story_points tags')
+
+SKILLS = ['python', 'react', 'sql', 'devops', 'design', 'qa', 'data', 'mobile']
+
+def synthetic_snapshot(users: int, cards: int, teams: int, seed: int = 3):
+    rng = random.Random(seed)
+    start = date.today()
+    days = [start + timedelta(days=i) for i in range(10) if (start + timedelta(days=i)).weekday() < 5][:5]
+
+    user_rows = {
+        f'user-{u}': UserRow(f'user-{u}', f'Usuario {u}', 8.0, json.dumps(rng.sample(SKILLS, 3)))
+        for u in range(users)
+    }
+    memberships = [Membership(f'team-{u % teams}', f'user-{u}', rng.choice([4.0, 6.0, 8.0])) for u in range(users)]
+    members_by_team = {}
+    for membership in memberships:
+        members_by_team.setdefault(membership.team_id, []).append(membership.user_id)
+
+    # Carga sesgada: una parte de cada equipo concentra la mayoría de tarjetas
+    card_rows = []
+    for c in range(cards):
+        team_id = f'team-{c % teams}'
+        team_members = members_by_team[team_id]
+        owner = team_members[int(len(team_members) * rng.random() ** 2)]
+        card_rows.append(CardRow(
+            f'card-{c}', f'Tarjeta {c}', team_id, owner,
+            rng.choice(['ready', 'ready', 'in_progress', 'review']),
+            rng.choice(['low', 'medium', 'high', 'critical']),
+            rng.choice([1.0, 2.0, 4.0, 8.0, None]), 0.0, rng.choice([1, 2, 3, 5]),
+            json.dumps(rng.sample(SKILLS, 2))
+        ))
+
+    availability = {
+        f'user-{u}': {days[0]: 0.0} for u in rng.sample(range(users), users // 10)  # 10% ausentes el primer día
+    }
+    return {
+        'days': days,
+        'memberships': memberships,
+        'users': user_rows,
+        'availability': availability,
+        'wip_per_user': {f'team-{t}': 3 for t in range(teams)},
+        'cards': card_rows,
+        'related_owners': {}
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark del optimizador de carga")
+    parser.add_argument('--users', type=int, default=500)
+    parser.add_argument('--cards', type=int, default=10000)
+    parser.add_argument('--spare-cards', type=int, default=1700)
+    parser.add_argument('--teams', type=int, default=50)
+    args = parser.parse_args()
+
+    optimizer = WorkloadOptimizer()
+    for label, cards in (('saturado', args.cards), ('con holgura', args.spare_cards)):
+        snapshot = synthetic_snapshot(args.users, cards, args.teams)
+
+        start = time.perf_counter()
+        result = optimizer.solve(snapshot)
+        elapsed = (time.perf_counter() - start) * 1000
+
+        overloaded_before = sum(1 for item in result['utilization_before'] if item['value'] > optimizer.max_utilization)
+        overloaded_after = sum(1 for item in result['utilization_after'] if item['value'] > optimizer.max_utilization)
+
+        print(f"⏱️ {args.users} usuarios × {cards} tarjetas en {args.teams} equipos ({label})")
+        print(f"  Tiempo de resolución: {elapsed:.0f} ms")
+        print(f"  Reasignaciones propuestas: {len(result['reassignments'])}")
+        print(f"  Miembros sobrecargados: {overloaded_before} → {overloaded_after}")
+        print(f"  Tarjetas sin destino: {len(result['unassigned_cards'])}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,631 @@
+#!/usr/bin/env python3
+"""
+🏁 Suite de Benchmarks
+Carga de tableros, movimientos de tarjetas, análisis del director de IA en modo simulación,
+agregados del almacén columnar de tarjetas, detector de riesgos, métricas de flujo, recolección de métricas
+(tools/metrics-collector.py) y sincronización con GitHub contra un servidor simulado, sobre una
+organización sintética; resultados en JSON para comparar regresiones
+
+Uso (desde backend/):
+  python -m benchmarks.run_suite
+  python -m benchmarks.run_suite --cards 50000 --teams 25 --only board_load,card_moves
+  python -m benchmarks.run_suite --compare benchmarks/results/baseline.json --threshold 15
+"""
+
+import argparse
+import asyncio
+import contextlib
+import importlib.util
+import io
+import json
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Callable
+
+from sqlalchemy import select, update
+from sqlalchemy.orm import sessionmaker, selectinload
+
+from benchmarks.synthetic import (
+    OrganizationSpec, STATUSES, create_database, generate_organization, write_markdown_board
+)
+from models.database import Team, Project, Card, User
+from services.board_reader import load_board
+from services.org_snapshot import OrgSnapshotCache
+from services.query_counter import QueryCounter
+from services.ranking import RankingService
+from services.sync import install_version_hooks
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+TOOLS_DIR = BACKEND_DIR.parent.parent / 'tools'
+RESULTS_DIR = Path(__file__).resolve().parent / 'results'
+
+class SuiteContext:
+    """Lo que comparten los escenarios: base de datos, organización generada y opciones"""
+
+    def __init__(self, args, engine, organization: Dict[str, Any], work_dir: Path):
+        self.args = args
+        self.engine = engine
+        self.Session = sessionmaker(bind=engine)
+        self.organization = organization
+        self.work_dir = work_dir
+
+SCENARIOS: Dict[str, Callable[[SuiteContext], Dict[str, Any]]] = {}
+
+def scenario(name: str):
+    def register(func):
+        SCENARIOS[name] = func
+        return func
+    return register
+
+class ScenarioSkipped(Exception):
+    """El escenario no puede ejecutarse en este entorno (falta una dependencia opcional)"""
+
+def measure(func: Callable[[], Any], repeat: int, warmup: int = 1) -> Dict[str, Any]:
+    """Ejecutar `func` warmup + repeat veces; estadísticas en ms de las medidas"""
+    for _ in range(warmup):
+        func()
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - started) * 1000)
+    return summarize(samples)
+
+def summarize(samples: List[float]) -> Dict[str, Any]:
+    """Estadísticas en ms de una lista de medidas"""
+    ordered = sorted(samples)
+    return {
+        'median_ms': round(statistics.median(samples), 3),
+        'p95_ms': round(ordered[min(len(ordered) - 1, int(round(0.95 * (len(ordered) - 1))))], 3),
+        'min_ms': round(ordered[0], 3),
+        'max_ms': round(ordered[-1], 3),
+        'runs': len(samples)
+    }
+
+@scenario('board_load')
+def bench_board_load(ctx: SuiteContext) -> Dict[str, Any]:
+    """Lectura completa del tablero más grande (GET /api/boards/{id}) con sesión nueva cada vez"""
+    board_id = ctx.organization['largest_board']
+    info: Dict[str, Any] = {}
+
+    def run():
+        with ctx.Session() as session, QueryCounter(ctx.engine) as counter:
+            board = load_board(session, board_id)
+        info['queries'] = counter.count
+        info['cards'] = sum(len(column['cards']) for column in board['columns'])
+
+    return {'load': measure(run, ctx.args.repeat), **info}
+
+@scenario('card_moves')
+def bench_card_moves(ctx: SuiteContext) -> Dict[str, Any]:
+    """Movimientos sueltos como POST /api/cards/{id}/move: una transacción por tarjeta"""
+    ranking = RankingService()
+    rng = random.Random(ctx.args.seed)
+    with ctx.Session() as session:
+        cards = session.execute(select(Card.id, Card.team_id)).all()
+    moves = ctx.args.moves
+
+    def run():
+        for card_id, team_id in rng.sample(cards, min(moves, len(cards))):
+            with ctx.Session() as session:
+                card = session.get(Card, card_id)
+                column_id = f"board-{team_id.split('-', 1)[1]}-{rng.choice(STATUSES)}"
+                ranking.move_card(session, card, column_id)
+                session.commit()
+
+    result = measure(run, ctx.args.repeat)
+    return {'moves': result, 'per_move_ms': round(result['median_ms'] / max(1, moves), 3), 'moves_per_run': moves}
+
+@scenario('ai_director')
+def bench_ai_director(ctx: SuiteContext) -> Dict[str, Any]:
+    """
+    Análisis del AIDirectorService sin proveedores (modo simulación), sin pool de procesos.
+    review_* son los cuatro análisis seguidos con su carga de datos: objetos ORM
+    frente al snapshot compartido (una carga, el resto comprueban la versión)
+    """
+    from services.ai_director import AIDirectorService
+    from services.ai_providers import ProviderRouter
+    from services.dependency_graph import DependencyGraphService
+
+    # Router vacío inyectado: no se leen claves del entorno ni se importan los SDKs
+    director = AIDirectorService(providers=ProviderRouter([]))
+    dependencies = DependencyGraphService(ctx.Session)
+    snapshots = OrgSnapshotCache(ctx.Session)
+    loop = asyncio.new_event_loop()
+
+    def load_orm(session):
+        """Lo que cargaba el análisis programado antes del snapshot"""
+        return (
+            session.execute(select(Team).where(Team.is_active == True)).scalars().all(),  # noqa: E712
+            session.execute(select(Project).options(selectinload(Project.teams))
+                            .where(Project.is_active == True)).scalars().all(),  # noqa: E712
+            session.execute(select(Card)).scalars().all(),
+            session.execute(select(User).where(User.is_active == True)).scalars().all()  # noqa: E712
+        )
+
+    async def review(teams, projects, cards, users, next_data=None):
+        """Global, cuellos de botella, carga y coordinación; next_data() vuelve a pedir los datos"""
+        await director.analyze_global_state(teams, projects, cards, users, hierarchical=False)
+        teams, projects, cards, users = next_data() if next_data else (teams, projects, cards, users)
+        await director.detect_bottlenecks(teams, cards, dependencies)
+        teams, projects, cards, users = next_data() if next_data else (teams, projects, cards, users)
+        await director.optimize_workload(teams, users, cards)
+        teams, projects, cards, users = next_data() if next_data else (teams, projects, cards, users)
+        await director.coordinate_teams(teams, projects, cards, dependencies)
+
+    def review_orm():
+        with ctx.Session() as session:
+            loop.run_until_complete(review(*load_orm(session)))
+
+    def review_snapshot():
+        snapshots.invalidate()
+
+        def data(columnar: bool = True):
+            # Tras el análisis global, las tarjetas en columnas del snapshot
+            snapshot = snapshots.get()
+            cards = snapshot.card_store if columnar else snapshot.cards
+            return snapshot.teams, snapshot.projects, cards, snapshot.users
+
+        loop.run_until_complete(review(*data(columnar=False), next_data=data))
+
+    with ctx.Session() as session:
+        # Las relaciones perezosas (team.members) se cargan en el calentamiento de cada medida
+        teams, projects, cards, users = load_orm(session)
+
+        analyses = {
+            'global_flat': lambda: director.analyze_global_state(teams, projects, cards, users, hierarchical=False),
+            'global_hierarchical': lambda: director.analyze_global_state(teams, projects, cards, users, hierarchical=True),
+            'bottlenecks': lambda: director.detect_bottlenecks(teams, cards, dependencies),
+            'workload': lambda: director.optimize_workload(teams, users, cards),
+            'coordination': lambda: director.coordinate_teams(teams, projects, cards, dependencies)
+        }
+        try:
+            results = {
+                name: measure(lambda: loop.run_until_complete(analysis()), ctx.args.repeat)
+                for name, analysis in analyses.items()
+            }
+            with QueryCounter(ctx.engine) as orm_queries:
+                results['review_orm'] = measure(review_orm, ctx.args.repeat)
+            with QueryCounter(ctx.engine) as snapshot_queries:
+                results['review_snapshot'] = measure(review_snapshot, ctx.args.repeat)
+        finally:
+            loop.close()
+
+    runs = ctx.args.repeat + 1
+    results['review_orm_queries'] = orm_queries.count // runs
+    results['review_snapshot_queries'] = snapshot_queries.count // runs
+    results['snapshot_load_ms'] = snapshots.status()['load_ms']
+    return results
+
+def _load_tool(file_name: str, module_name: str):
+    """Importar un script de tools/ (los nombres llevan guiones)"""
+    spec = importlib.util.spec_from_file_location(module_name, TOOLS_DIR / file_name)
+    module = importlib.util.module_from_spec(spec)
+    try:
+        spec.loader.exec_module(module)
+    except ImportError as e:
+        raise ScenarioSkipped(f"{file_name}: {e}")
+    return module
+
+@scenario('card_store')
+def bench_card_store(ctx: SuiteContext) -> Dict[str, Any]:
+    """
+    Almacén columnar de tarjetas: construcción (SQL o snapshot) y los agregados
+    de cuellos de botella, carga y coordinación frente al recorrido en Python
+    """
+    from services import analysis_tasks
+    from services.card_store import CardStore
+    from services.context_builder import ACTIVE_STATUSES
+
+    with ctx.Session() as session:
+        snapshot = OrgSnapshotCache(ctx.Session).get(session)
+    teams = [(team.id, team.name) for team in snapshot.teams]
+    users = analysis_tasks.snapshot_users(snapshot.users)
+    projects = [(project.id, tuple(team.id for team in project.teams)) for project in snapshot.projects]
+    store = CardStore.from_cards(snapshot.cards)
+
+    def load_sql():
+        with ctx.Session() as session:
+            CardStore.load(session)
+
+    def aggregate_columnar():
+        analysis_tasks.detect_bottlenecks(teams, store)
+        analysis_tasks.analyze_workload(users, store)
+        analysis_tasks.team_progress(projects, store)
+
+    def aggregate_python():
+        # Lo que hacían los análisis antes: un recorrido por agregado
+        status_counts: Dict[tuple, int] = {}
+        hours: Dict[str, float] = {}
+        progress: Dict[tuple, List[int]] = {}
+        for card in snapshot.cards:
+            status_counts[card.team_id, card.status] = status_counts.get((card.team_id, card.status), 0) + 1
+        for card in snapshot.cards:
+            if card.assigned_to and card.status in ACTIVE_STATUSES:
+                hours[card.assigned_to] = hours.get(card.assigned_to, 0.0) + (card.estimated_hours or 0)
+        for card in snapshot.cards:
+            done_total = progress.setdefault((card.project_id, card.team_id), [0, 0])
+            done_total[0] += card.status == 'done'
+            done_total[1] += 1
+
+    return {
+        'load_sql': measure(load_sql, ctx.args.repeat),
+        'from_snapshot': measure(lambda: CardStore.from_cards(snapshot.cards), ctx.args.repeat),
+        'aggregate_columnar': measure(aggregate_columnar, ctx.args.repeat),
+        'aggregate_python': measure(aggregate_python, ctx.args.repeat),
+        'cards': len(store)
+    }
+
+@scenario('risk_detection')
+def bench_risk_detection(ctx: SuiteContext) -> Dict[str, Any]:
+    """
+    RiskDetector: cada medida empieza cambiando de columna --risk-changes
+    tarjetas en una escritura masiva (write, fuera de la medida). Se alternan
+    pasadas incrementales y cargas completas con un detector nuevo, de modo que
+    ambas ven un lote de cambios sin procesar y escriben los riesgos que
+    provoca. Si los cambios superan reload_ratio de las tarjetas, la pasada
+    incremental recarga (reloads)
+    """
+    from services.dependency_graph import DependencyGraphService
+    from services.risk_detector import RiskDetector
+    from services.sync import next_change_version
+
+    def full():
+        RiskDetector(ctx.Session, DependencyGraphService(ctx.Session)).detect()
+
+    detector = RiskDetector(ctx.Session, DependencyGraphService(ctx.Session))
+    detector.detect()
+    rng = random.Random(ctx.args.seed)
+    with ctx.Session() as session:
+        cards = session.execute(select(Card.id, Card.team_id)).all()
+    changes = min(ctx.args.risk_changes, len(cards))
+
+    def write_changes():
+        with ctx.Session() as session:
+            version = next_change_version(session)
+            rows = []
+            for card_id, team_id in rng.sample(cards, changes):
+                status = rng.choice(STATUSES)
+                rows.append({'id': card_id, 'status': status, 'change_version': version,
+                             'column_id': f"board-{team_id.split('-', 1)[1]}-{status}"})
+            session.execute(update(Card), rows)
+            session.commit()
+
+    def timed(func) -> float:
+        started = time.perf_counter()
+        func()
+        return (time.perf_counter() - started) * 1000
+
+    samples: Dict[str, List[float]] = {'write': [], 'incremental': [], 'full': []}
+    for run in range(ctx.args.repeat + 1):  # la primera ronda es de calentamiento
+        write_ms = timed(write_changes)
+        full_ms = timed(full)
+        detector.detect()  # ponerse al día sin medir
+        timed(write_changes)
+        incremental_ms = timed(detector.detect)
+        if run:
+            samples['write'].append(write_ms)
+            samples['full'].append(full_ms)
+            samples['incremental'].append(incremental_ms)
+
+    result = {name: summarize(values) for name, values in samples.items()}
+    incremental_median = result['incremental']['median_ms']
+    result.update({
+        'changes_per_run': changes,
+        'cards_per_second': round(changes / (incremental_median / 1000)) if incremental_median else None,
+        'reloads': detector.status()['reloads'],
+        'active': detector.status()['active']
+    })
+    return result
+
+@scenario('flow_metrics')
+def bench_flow_metrics(ctx: SuiteContext) -> Dict[str, Any]:
+    """
+    CardHistoryService: historial inicial de todas las tarjetas, --risk-changes
+    transiciones en bloque y las consultas de /api/flow (historial de una
+    tarjeta, envejecimiento del tablero más grande y tiempos de ciclo por equipo)
+    """
+    from services.card_history import CardHistoryService, Transition, record_transitions
+    from services.sync import next_change_version
+
+    history = CardHistoryService(ctx.Session)
+    started = time.perf_counter()
+    backfilled = history.backfill()
+    backfill_ms = round((time.perf_counter() - started) * 1000, 3)
+
+    rng = random.Random(ctx.args.seed)
+    with ctx.Session() as session:
+        cards = session.execute(select(Card.id, Card.team_id, Card.project_id)).all()
+    changes = min(ctx.args.risk_changes, len(cards))
+    board_id = ctx.organization['largest_board']
+    team_ids = sorted({team_id for _, team_id, _ in cards})
+
+    def transitions():
+        with ctx.Session() as session:
+            version = next_change_version(session)
+            rows, moved = [], []
+            for card_id, team_id, project_id in rng.sample(cards, changes):
+                status = rng.choice(STATUSES)
+                column_id = f"board-{team_id.split('-', 1)[1]}-{status}"
+                rows.append({'id': card_id, 'status': status, 'column_id': column_id, 'change_version': version})
+                moved.append(Transition(card_id, team_id, project_id, column_id, status, None, None))
+            session.execute(update(Card), rows)
+            record_transitions(session.connection(), moved, datetime.now())
+            session.commit()
+
+    def card_history():
+        with ctx.Session() as session:
+            for card_id, _, _ in rng.sample(cards, min(100, len(cards))):
+                history.card_history(session, card_id)
+
+    def aging_cold():
+        with ctx.Session() as session:
+            next_change_version(session)
+            session.commit()
+            history.aging(session, board_id)
+
+    def aging_cached():
+        with ctx.Session() as session:
+            history.aging(session, board_id)
+
+    def cycle_times():
+        with ctx.Session() as session:
+            for team_id in team_ids:
+                history.cycle_times(session, team_id=team_id, days=365)
+
+    with ctx.Session() as session:
+        sample = history.cycle_times(session, team_id=team_ids[0], days=365) if team_ids else {'count': 0}
+    return {
+        'backfill_ms': backfill_ms,
+        'backfilled': backfilled,
+        'transitions': measure(transitions, ctx.args.repeat),
+        'card_history_x100': measure(card_history, ctx.args.repeat),
+        'aging': measure(aging_cold, ctx.args.repeat),
+        'aging_cached': measure(aging_cached, ctx.args.repeat),
+        'cycle_times_per_team': measure(cycle_times, ctx.args.repeat),
+        'changes_per_run': changes,
+        'teams': len(team_ids),
+        'cycle_points_first_team': sample['count']
+    }
+
+@scenario('metrics_collection')
+def bench_metrics_collection(ctx: SuiteContext) -> Dict[str, Any]:
+    """Snapshot y cálculo de métricas de tools/metrics-collector.py sobre un tablero markdown grande"""
+    module = _load_tool('metrics-collector.py', 'metrics_collector')
+    metrics_dir = ctx.work_dir / 'metrics'
+    metrics_dir.mkdir(exist_ok=True)
+    board_path = write_markdown_board(ctx.work_dir / 'board.md', ctx.args.board_items, ctx.args.seed)
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        collector = module.MetricsCollector()
+    collector.board_path = board_path
+    collector.metrics_path = metrics_dir
+    collector.data_file = metrics_dir / 'data.json'
+
+    # Dos semanas de historial para que calculate_metrics tenga tendencias
+    with open(board_path, encoding='utf-8') as f:
+        columns = collector.analyze_board_content(f.read())
+    today = datetime.now().date()
+    history = [
+        {'date': (today - timedelta(days=days)).isoformat(),
+         'timestamp': f"{(today - timedelta(days=days)).isoformat()}T00:00:00", 'columns': columns,
+         'wip_limits': {}, 'blocked_items': 0}
+        for days in range(13, 0, -1)
+    ]
+
+    def reset():
+        collector.data = {'daily_snapshots': list(history), 'item_history': {}, 'metrics_history': []}
+
+    def snapshot():
+        reset()
+        collector.take_daily_snapshot()
+
+    def metrics():
+        reset()
+        collector.data['daily_snapshots'].append(dict(history[-1], date=today.isoformat()))
+        collector.calculate_metrics()
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        return {
+            'snapshot': measure(snapshot, ctx.args.repeat),
+            'metrics': measure(metrics, ctx.args.repeat),
+            'board_items': ctx.args.board_items,
+            'board_kb': round(board_path.stat().st_size / 1024, 1)
+        }
+
+class GitHubStub(BaseHTTPRequestHandler):
+    """Lo mínimo de la API de GitHub que usa tools/github-integration.py"""
+
+    latency = 0.0
+    issues = 0
+    lock = threading.Lock()
+
+    def do_GET(self):
+        repo = self.path.split('/repos/', 1)[-1]
+        self._reply(200, {'full_name': repo})
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+        with self.lock:
+            GitHubStub.issues += 1
+            number = GitHubStub.issues
+        self._reply(201, {'number': number, 'title': body.get('title')})
+
+    def _reply(self, status: int, payload: Dict[str, Any]):
+        if self.latency:
+            time.sleep(self.latency)
+        data = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+@scenario('github_sync')
+def bench_github_sync(ctx: SuiteContext) -> Dict[str, Any]:
+    """sync_board_to_github de tools/github-integration.py contra un servidor local que simula la API"""
+    module = _load_tool('github-integration.py', 'github_integration')
+    GitHubStub.latency = ctx.args.github_latency_ms / 1000
+    server = ThreadingHTTPServer(('127.0.0.1', 0), GitHubStub)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    story = (TOOLS_DIR.parent / 'templates' / 'user-story.md').read_text(encoding='utf-8')
+    task = (TOOLS_DIR.parent / 'templates' / 'task.md').read_text(encoding='utf-8')
+    runs = iter(range(ctx.args.repeat + 1))
+
+    def prepare() -> Path:
+        """Historias y tareas sin issue (la sincronización las marca, así que cada ejecución usa las suyas)"""
+        base = ctx.work_dir / f'github-{next(runs)}'
+        for folder, prefix, template in (('stories', 'US', story), ('tasks', 'T', task)):
+            (base / folder).mkdir(parents=True)
+            for i in range(ctx.args.issues // 2):
+                (base / folder / f'{prefix}-{i:05d}.md').write_text(template, encoding='utf-8')
+        return base
+
+    integration = module.GitHubIntegration(
+        token='bench', repo='bench/kanban', api_url=f'http://127.0.0.1:{server.server_port}'
+    )
+    bases = [prepare() for _ in range(ctx.args.repeat + 1)]
+    pending = iter(bases)
+    synced = []
+
+    def run():
+        integration.base_path = next(pending)
+        synced.append(integration.sync_board_to_github())
+
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = measure(run, ctx.args.repeat)
+    finally:
+        server.shutdown()
+        server.server_close()
+    return {'sync': result, 'issues_per_run': synced[-1],
+            'per_issue_ms': round(result['median_ms'] / max(1, synced[-1]), 3)}
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=BACKEND_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def _medians(results: Dict[str, Any], prefix: str = '') -> Dict[str, float]:
+    """Aplanar {'escenario': {'medida': {'median_ms': ...}}} → {'escenario.medida': ms}"""
+    flat = {}
+    for key, value in results.items():
+        if isinstance(value, dict):
+            if 'median_ms' in value:
+                flat[f'{prefix}{key}'] = value['median_ms']
+            else:
+                flat.update(_medians(value, f'{prefix}{key}.'))
+    return flat
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> List[str]:
+    """Imprimir la comparación de medianas; devuelve las medidas que empeoran más de `threshold` %"""
+    now, before = _medians(current['results']), _medians(baseline['results'])
+    if baseline.get('spec') != current.get('spec'):
+        print("⚠️ La referencia se generó con otra organización; la comparación es orientativa")
+
+    regressions = []
+    print(f"\n📊 Comparación con {baseline.get('git_commit') or 'referencia'} ({baseline.get('created_at')})")
+    for name in sorted(set(now) & set(before)):
+        delta = (now[name] - before[name]) / before[name] * 100 if before[name] else 0.0
+        flag = ''
+        if delta > threshold:
+            flag = ' 🔴'
+            regressions.append(name)
+        elif delta < -threshold:
+            flag = ' 🟢'
+        print(f"  {name:<40} {before[name]:>10.2f} → {now[name]:>10.2f} ms ({delta:+.1f}%){flag}")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Suite de benchmarks sobre una organización sintética")
+    parser.add_argument('--teams', type=int, default=10)
+    parser.add_argument('--users', type=int, default=80)
+    parser.add_argument('--projects', type=int, default=20)
+    parser.add_argument('--cards', type=int, default=10000)
+    parser.add_argument('--dependencies', type=int, default=3000)
+    parser.add_argument('--time-entries', type=int, default=20000)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--repeat', type=int, default=5, help="Medidas por escenario (más una de calentamiento)")
+    parser.add_argument('--moves', type=int, default=200, help="Movimientos de tarjeta por medida")
+    parser.add_argument('--risk-changes', type=int, default=2000, help="Tarjetas modificadas por pasada (detector de riesgos y métricas de flujo)")
+    parser.add_argument('--board-items', type=int, default=5000, help="Elementos del tablero markdown")
+    parser.add_argument('--issues', type=int, default=100, help="Historias + tareas por sincronización")
+    parser.add_argument('--github-latency-ms', type=float, default=0.0, help="Latencia simulada del servidor de GitHub")
+    parser.add_argument('--only', help=f"Escenarios separados por comas ({', '.join(SCENARIOS)})")
+    parser.add_argument('--output', type=Path, help="Fichero de resultados (por defecto benchmarks/results/<fecha>.json)")
+    parser.add_argument('--compare', type=Path, help="Resultados de referencia con los que comparar")
+    parser.add_argument('--threshold', type=float, default=15.0, help="%% de empeoramiento que cuenta como regresión")
+    args = parser.parse_args()
+
+    selected = args.only.split(',') if args.only else list(SCENARIOS)
+    unknown = [name for name in selected if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"escenarios desconocidos: {', '.join(unknown)}")
+
+    install_version_hooks()
+    spec = OrganizationSpec(args.teams, args.users, args.projects, args.cards,
+                            args.dependencies, args.time_entries, args.seed)
+
+    with tempfile.TemporaryDirectory(prefix='kanban-bench-') as tmp:
+        work_dir = Path(tmp)
+        engine = create_database(str(work_dir / 'org.db'))
+        organization = generate_organization(engine, spec)
+        print(f"🏭 Organización sintética: {organization['rows']} ({organization['load_ms']} ms)")
+        ctx = SuiteContext(args, engine, organization, work_dir)
+
+        results: Dict[str, Any] = {}
+        for name in selected:
+            started = time.perf_counter()
+            try:
+                results[name] = SCENARIOS[name](ctx)
+            except ScenarioSkipped as e:
+                print(f"⏭️ {name}: omitido ({e})")
+                results[name] = {'skipped': str(e)}
+                continue
+            summary = ', '.join(f"{key} {ms:.2f} ms" for key, ms in _medians(results[name]).items())
+            print(f"⏱️ {name} ({time.perf_counter() - started:.1f} s): {summary}")
+        engine.dispose()
+
+    report = {
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'git_commit': _git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'spec': spec.to_dict(),
+        'options': {key: getattr(args, key) for key in ('repeat', 'moves', 'risk_changes', 'board_items', 'issues',
+                                                        'github_latency_ms')},
+        'setup': {'rows': organization['rows'], 'load_ms': organization['load_ms']},
+        'results': results
+    }
+
+    output = args.output or RESULTS_DIR / f"{datetime.now().strftime('%Y%m%d-%H%M%S')}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(f"💾 Resultados en {output}")
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.threshold)
+        if regressions:
+            print(f"🔴 {len(regressions)} regresiones por encima del {args.threshold}%: {', '.join(regressions)}")
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+"""
+🏭 Organización Sintética
+Generador con semilla de equipos, usuarios, proyectos, tableros, tarjetas, dependencias y registros
+de horas sobre el esquema de models/database.py, y de tableros markdown grandes para tools/
+
+Uso (desde backend/):
+    python -m benchmarks.synthetic --db /tmp/org.db --teams 20 --cards 50000
+    python -m benchmarks.synthetic --board /tmp/board.md --items 20000
+"""
+
+import argparse
+import json
+import random
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, Any, List, Iterator, Optional
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.engine import Engine
+
+from models.database import (
+    Base, User, Team, Project, Board, Column, Card, TimeEntry, SyncSequence,
+    team_members, project_teams, card_dependencies
+)
+from services.markdown_board import SECTION_COLUMNS, BACKLOG_PRIORITIES
+from services.ranking import spread_ranks
+
+STATUSES = [column_type for _, column_type, _ in SECTION_COLUMNS]
+STATUS_WEIGHTS = {'backlog': 30, 'ready': 12, 'in_progress': 15, 'review': 8, 'blocked': 4, 'done': 31}
+PRIORITIES = ('critical', 'high', 'medium', 'low')
+CARD_TYPES = ('story', 'task', 'task', 'bug', 'improvement')
+SKILLS = ('python', 'react', 'sql', 'devops', 'design', 'qa', 'electron', 'data')
+WIP_LIMITS = {'ready': 10, 'in_progress': 8, 'review': 5, 'blocked': 3}
+# Columnas del tablero markdown con límite WIP (el formato de kanban/board.md)
+MARKDOWN_WIP = {'ready': 3, 'in_progress': 3, 'review': 2, 'blocked': 1}
+
+# Lotes de INSERT: por debajo del límite de variables de SQLite
+INSERT_CHUNK = 500
+
+class OrganizationSpec:
+    """Tamaño de la organización sintética; la misma semilla genera siempre los mismos datos"""
+
+    def __init__(self, teams: int = 10, users: int = 80, projects: int = 20, cards: int = 10000,
+                 dependencies: int = 3000, time_entries: int = 20000, seed: int = 42):
+        self.teams = max(1, teams)
+        self.users = max(self.teams, users)
+        self.projects = max(1, projects)
+        self.cards = cards
+        self.dependencies = dependencies
+        self.time_entries = time_entries
+        self.seed = seed
+
+    def to_dict(self) -> Dict[str, int]:
+        return dict(vars(self))
+
+def create_database(path: Optional[str] = None) -> Engine:
+    """Motor SQLite (en memoria si no hay ruta) con el esquema creado"""
+    engine = create_engine(f'sqlite:///{path}' if path else 'sqlite://')
+    Base.metadata.create_all(engine)
+    return engine
+
+def generate_organization(engine: Engine, spec: OrganizationSpec) -> Dict[str, Any]:
+    """
+    Cargar una organización completa con INSERT masivos (sin pasar por el ORM,
+    así que los hooks de sesión no intervienen). Todas las filas quedan con
+    change_version 1, como tras una primera sincronización.
+
+    Cada equipo tiene un tablero con las seis columnas del flujo; el estado de
+    cada tarjeta coincide con el tipo de su columna. Las dependencias apuntan
+    siempre a tarjetas creadas antes (sin ciclos).
+    """
+    rng = random.Random(spec.seed)
+    now = datetime.now().replace(microsecond=0)
+    rows: Dict[str, List[Dict[str, Any]]] = {}
+
+    rows['users'] = [
+        {
+            'id': f'user-{i}', 'name': f'Usuario {i}', 'email': f'user{i}@example.com',
+            'role': 'manager' if i < spec.teams else 'member',
+            'skills': json.dumps(rng.sample(SKILLS, 3)), 'capacity': rng.choice((6.0, 7.0, 8.0))
+        }
+        for i in range(spec.users)
+    ]
+
+    rows['teams'] = [
+        {
+            'id': f'team-{i}', 'name': f'Equipo {i}', 'description': f'Equipo sintético {i}',
+            'wip_limits': json.dumps(WIP_LIMITS), 'settings': json.dumps({}), 'change_version': 1
+        }
+        for i in range(spec.teams)
+    ]
+    members: Dict[str, List[str]] = {f'team-{i}': [] for i in range(spec.teams)}
+    rows['team_members'] = []
+    for i in range(spec.users):
+        team_id = f'team-{i % spec.teams}'
+        members[team_id].append(f'user-{i}')
+        rows['team_members'].append({
+            'team_id': team_id, 'user_id': f'user-{i}',
+            'role': 'lead' if i < spec.teams else 'member', 'capacity': 8.0
+        })
+
+    rows['projects'] = []
+    rows['project_teams'] = []
+    team_projects: Dict[str, List[str]] = {f'team-{i}': [] for i in range(spec.teams)}
+    for i in range(spec.projects):
+        start = now - timedelta(days=rng.randrange(10, 200))
+        owners = {i % spec.teams}
+        # Uno de cada cuatro proyectos es multi-equipo
+        if spec.teams > 1 and rng.random() < 0.25:
+            owners.add(rng.randrange(spec.teams))
+        rows['projects'].append({
+            'id': f'project-{i}', 'name': f'Proyecto {i}',
+            'status': rng.choice(('active', 'active', 'planning', 'on_hold')),
+            'priority': rng.choice(PRIORITIES), 'start_date': start,
+            'end_date': start + timedelta(days=rng.randrange(30, 300)),
+            'estimated_hours': float(rng.randrange(200, 4000)), 'progress': round(rng.uniform(0, 100), 1),
+            'tags': json.dumps([]), 'dependencies': json.dumps([]), 'change_version': 1
+        })
+        for owner in sorted(owners):
+            rows['project_teams'].append({'project_id': f'project-{i}', 'team_id': f'team-{owner}'})
+            team_projects[f'team-{owner}'].append(f'project-{i}')
+
+    rows['boards'] = []
+    rows['columns'] = []
+    column_ranks = spread_ranks(len(STATUSES))
+    for i in range(spec.teams):
+        team_id = f'team-{i}'
+        if not team_projects[team_id]:
+            team_projects[team_id].append(f'project-{i % spec.projects}')
+        rows['boards'].append({
+            'id': f'board-{i}', 'name': f'Tablero {i}', 'team_id': team_id,
+            'project_id': team_projects[team_id][0], 'wip_limits': json.dumps(WIP_LIMITS),
+            'settings': json.dumps({}), 'change_version': 1
+        })
+        for status, rank in zip(STATUSES, column_ranks):
+            rows['columns'].append({
+                'id': f'board-{i}-{status}', 'name': status.replace('_', ' ').title(), 'board_id': f'board-{i}',
+                'column_type': status, 'position': rank, 'wip_limit': WIP_LIMITS.get(status),
+                'change_version': 1
+            })
+
+    rows['cards'] = []
+    per_column: Dict[str, int] = {}
+    statuses = rng.choices(STATUSES, weights=[STATUS_WEIGHTS[s] for s in STATUSES], k=spec.cards)
+    for i, status in enumerate(statuses):
+        team = i % spec.teams
+        column_id = f'board-{team}-{status}'
+        per_column[column_id] = per_column.get(column_id, 0) + 1
+        created = now - timedelta(days=rng.randrange(1, 180), minutes=rng.randrange(1440))
+        started = created + timedelta(days=rng.randrange(0, 10)) if status in ('in_progress', 'review', 'blocked', 'done') else None
+        estimated = float(rng.choice((1, 2, 3, 5, 8, 13)))
+        rows['cards'].append({
+            'id': f'card-{i}', 'title': f'Tarjeta {i}', 'description': f'Descripción sintética de la tarjeta {i}',
+            'card_type': rng.choice(CARD_TYPES), 'priority': rng.choice(PRIORITIES), 'status': status,
+            'team_id': f'team-{team}', 'project_id': rng.choice(team_projects[f'team-{team}']),
+            'column_id': column_id, 'position': None,
+            'assigned_to': rng.choice(members[f'team-{team}']) if status != 'backlog' else None,
+            'estimated_hours': estimated, 'actual_hours': 0.0, 'story_points': int(estimated),
+            'blocked_reason': 'Esperando a otro equipo' if status == 'blocked' else None,
+            'tags': json.dumps([rng.choice(SKILLS)]), 'acceptance_criteria': json.dumps([]),
+            'created_at': created, 'updated_at': created, 'started_at': started,
+            'completed_at': started + timedelta(days=rng.randrange(1, 15)) if status == 'done' else None,
+            'change_version': 1
+        })
+
+    # Claves de orden repartidas dentro de cada columna
+    ranks = {column_id: iter(spread_ranks(count)) for column_id, count in per_column.items()}
+    for row in rows['cards']:
+        row['position'] = next(ranks[row['column_id']])
+
+    rows['card_dependencies'] = []
+    if spec.cards > 1:
+        pairs = set()
+        limit = min(spec.dependencies, spec.cards * (spec.cards - 1) // 2)
+        while len(pairs) < limit:
+            card = rng.randrange(1, spec.cards)
+            # Mayoría de dependencias cercanas (mismo equipo/proyecto), algunas lejanas
+            depends_on = max(0, card - rng.randrange(1, 50)) if rng.random() < 0.8 else rng.randrange(card)
+            pairs.add((card, depends_on))
+        rows['card_dependencies'] = [
+            {'card_id': f'card-{card}', 'depends_on_id': f'card-{depends_on}'} for card, depends_on in sorted(pairs)
+        ]
+
+    rows['time_entries'] = []
+    worked = [row for row in rows['cards'] if row['started_at'] is not None]
+    for i in range(spec.time_entries if worked else 0):
+        card = rng.choice(worked)
+        hours = float(rng.choice((0.5, 1, 1.5, 2, 3, 4)))
+        card['actual_hours'] += hours
+        rows['time_entries'].append({
+            'id': f'time-{i}', 'card_id': card['id'],
+            'user_id': card['assigned_to'] or rng.choice(members[card['team_id']]),
+            'hours': hours, 'description': 'Trabajo sintético',
+            'date': max(card['started_at'], now - timedelta(days=rng.randrange(0, 90)))
+        })
+
+    started = time.perf_counter()
+    with engine.begin() as connection:
+        for model, key in ((User, 'users'), (Team, 'teams'), (team_members, 'team_members'),
+                           (Project, 'projects'), (project_teams, 'project_teams'), (Board, 'boards'),
+                           (Column, 'columns'), (Card, 'cards'), (card_dependencies, 'card_dependencies'),
+                           (TimeEntry, 'time_entries')):
+            for offset in range(0, len(rows[key]), INSERT_CHUNK):
+                connection.execute(insert(model), rows[key][offset:offset + INSERT_CHUNK])
+        connection.execute(insert(SyncSequence).values(id=1, value=1))
+
+    return {
+        'spec': spec.to_dict(),
+        'rows': {key: len(value) for key, value in rows.items()},
+        'load_ms': round((time.perf_counter() - started) * 1000, 1),
+        'largest_board': max(rows['boards'], key=lambda board: sum(
+            count for column_id, count in per_column.items() if column_id.startswith(f"{board['id']}-")
+        ))['id']
+    }
+
+def markdown_board(items: int, seed: int = 42, wip: bool = True) -> Iterator[str]:
+    """
+    Tablero markdown con el formato de kanban/board.md: lo leen tanto
+    tools/metrics-collector.py como MarkdownBoardSync. Con wip=True los
+    encabezados llevan el contador (WIP: n/m) que extrae el recolector.
+    """
+    rng = random.Random(seed)
+    statuses = rng.choices(STATUSES, weights=[STATUS_WEIGHTS[s] for s in STATUSES], k=items)
+    by_status: Dict[str, List[int]] = {status: [] for status in STATUSES}
+    for index, status in enumerate(statuses):
+        by_status[status].append(index)
+
+    yield "# 📊 TABLERO KANBAN PRINCIPAL\n\n"
+    yield f"*Generado: {datetime.now().strftime('%Y-%m-%d')} | {items} elementos sintéticos*\n\n---\n\n"
+    for _, column_type, heading in SECTION_COLUMNS:
+        indexes = by_status[column_type]
+        if wip and column_type in MARKDOWN_WIP:
+            heading = f"{heading} (WIP: {len(indexes)}/{MARKDOWN_WIP[column_type]})"
+        yield f"## {heading}\n\n"
+        subsections = BACKLOG_PRIORITIES if column_type == 'backlog' else [(None, None, None)]
+        for number, (_, _, subheading) in enumerate(subsections):
+            if subheading:
+                yield f"### {subheading}\n"
+            for index in indexes[number::len(subsections)]:
+                prefix = rng.choice(('US', 'T', 'EP'))
+                yield f"- [ ] **[{prefix}-{index:06d}]** Elemento sintético {index}\n"
+                yield f"  - **Prioridad**: {rng.choice(('Crítica', 'Alta', 'Media', 'Baja'))}\n"
+                yield f"  - **Estimación**: {rng.choice(('XS', 'S', 'M', 'L', 'XL'))}\n"
+            yield "\n"
+        yield "---\n\n"
+
+def write_markdown_board(path: Path, items: int, seed: int = 42) -> Path:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.writelines(markdown_board(items, seed))
+    return path
+
+def main():
+    parser = argparse.ArgumentParser(description="Generador de organizaciones y tableros sintéticos")
+    parser.add_argument('--db', help="Fichero SQLite a crear con la organización")
+    parser.add_argument('--teams', type=int, default=10)
+    parser.add_argument('--users', type=int, default=80)
+    parser.add_argument('--projects', type=int, default=20)
+    parser.add_argument('--cards', type=int, default=10000)
+    parser.add_argument('--dependencies', type=int, default=3000)
+    parser.add_argument('--time-entries', type=int, default=20000)
+    parser.add_argument('--board', help="Tablero markdown a generar (formato de kanban/board.md)")
+    parser.add_argument('--items', type=int, default=5000, help="Elementos del tablero markdown")
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    if not args.db and not args.board:
+        parser.error("indica --db y/o --board")
+
+    if args.db:
+        if Path(args.db).exists():
+            parser.error(f"{args.db} ya existe")
+        spec = OrganizationSpec(args.teams, args.users, args.projects, args.cards,
+                                args.dependencies, args.time_entries, args.seed)
+        result = generate_organization(create_database(args.db), spec)
+        print(f"🏭 {args.db}: {result['rows']} en {result['load_ms']} ms")
+
+    if args.board:
+        write_markdown_board(Path(args.board), args.items, args.seed)
+        print(f"📝 {args.board}: {args.items} elementos")
+
+if __name__ == "__main__":
+    main()
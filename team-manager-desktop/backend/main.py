@@ -4,10 +4,15 @@
 FastAPI backend con IA integrada para gestión multi-equipo
 """
 
+import time
+_IMPORT_STARTED = time.perf_counter()
+
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from contextlib import asynccontextmanager
+from typing import TYPE_CHECKING
+import asyncio
 import uvicorn
 import os
 import sys
@@ -21,19 +26,52 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# Importar routers
+# Importar routers (ligeros: lo pesado se importa en el primer uso)
 from api.teams import router as teams_router
 from api.projects import router as projects_router
 from api.boards import router as boards_router
 from api.workload import router as workload_router
 from api.ai import router as ai_router
-from api.health import router as health_router
+from api.ai_stream import router as ai_stream_router
+from api.events import router as events_router
+from api.sync import router as sync_router
+from api.workload_rollups import router as workload_rollups_router
+from api.workload_optimizer import router as workload_optimizer_router
+from api.cards import router as cards_router
+from api.users import router as users_router
+from api.dependencies import router as dependencies_router
+from api.scheduler import router as scheduler_router
+from api.flow import router as flow_router
+from api.health import router as health_router, ReadinessMiddleware
+from api.metrics import router as metrics_router, MetricsMiddleware
+from api.profiles import router as profiles_router, ProfilingMiddleware
 
-# Importar servicios
+# Importar servicios (IA y analizadores se cargan bajo demanda con LazyService)
 from services.database import DatabaseService
-from services.ai_director import AIDirectorService
-from services.workload_analyzer import WorkloadAnalyzer
+from services.llm_cache import LLMResponseCache
+from services.change_feed import ChangeFeed
+from services.sync import install_version_hooks, migrate_sync_state
+from services.ranking import migrate_legacy_positions
+from services.workload_rollups import WorkloadRollupService
+from services.dependency_graph import DependencyGraphService
+from services.org_snapshot import OrgSnapshotCache
 from services.risk_detector import RiskDetector
+from services.card_history import CardHistoryService
+from services.scheduler import JobScheduler
+from services.analysis_executor import AnalysisExecutor
+from services.background_jobs import run_ai_analysis, snapshot_workload, backup_database
+from services.startup import LazyService, StartupState
+from services.metrics import (
+    REGISTRY, install_sql_hooks, llm_cache_metrics, scheduler_metrics, analysis_executor_metrics,
+    org_snapshot_metrics, risk_detector_metrics, card_history_metrics
+)
+from services import profiling
+
+if TYPE_CHECKING:
+    from services.ai_director import AIDirectorService
+    from services.workload_analyzer import WorkloadAnalyzer
+
+IMPORT_MS = round((time.perf_counter() - _IMPORT_STARTED) * 1000, 1)
 
 # Configuración
 BASE_DIR = Path(__file__).parent
@@ -49,39 +87,178 @@ risk_detector = None
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Gestión del ciclo de vida de la aplicación"""
-    global db_service, ai_director, workload_analyzer, risk_detector
-    
-    # Startup
+    # Startup: el puerto se abre enseguida y /api/health informa del progreso
     logger.info("🚀 Iniciando Team Manager Backend...")
+    startup = StartupState(import_ms=IMPORT_MS)
+    app.state.startup = startup
     
-    # Crear directorio de datos
-    DATA_DIR.mkdir(exist_ok=True)
+    # Feed de cambios en tiempo real (los websockets no pasan por ReadinessMiddleware)
+    change_feed = ChangeFeed(
+        coalesce_ms=int(os.getenv("CHANGE_FEED_COALESCE_MS", 100)),
+        max_pending=int(os.getenv("CHANGE_FEED_MAX_PENDING", 500))
+    )
+    change_feed.bind_loop(asyncio.get_running_loop())
+    change_feed.install_hooks()
+    app.state.change_feed = change_feed
     
-    # Inicializar base de datos
-    db_service = DatabaseService(DATA_DIR / "team_manager.db")
-    await db_service.initialize()
-    
-    # Inicializar servicios de IA
-    ai_director = AIDirectorService()
-    workload_analyzer = WorkloadAnalyzer(db_service)
-    risk_detector = RiskDetector(db_service)
-    
-    # Configurar servicios en la app
-    app.state.db = db_service
-    app.state.ai_director = ai_director
-    app.state.workload_analyzer = workload_analyzer
-    app.state.risk_detector = risk_detector
-    
-    logger.info("✅ Backend iniciado correctamente")
-    logger.info(f"📁 Base de datos: {DATA_DIR / 'team_manager.db'}")
+    initialization = asyncio.create_task(initialize_services(app, startup))
     
     yield
     
     # Shutdown
     logger.info("🛑 Cerrando Team Manager Backend...")
+    initialization.cancel()
+    await asyncio.gather(initialization, return_exceptions=True)
+    scheduler = getattr(app.state, "scheduler", None)
+    if scheduler:
+        await scheduler.stop()
+    analysis_executor = getattr(app.state, "analysis_executor", None)
+    if analysis_executor:
+        analysis_executor.shutdown()
+    if ai_director and ai_director.loaded:
+        await ai_director.instance.close()
     if db_service:
         await db_service.close()
 
+async def initialize_services(app: FastAPI, startup: StartupState):
+    """Inicializar base de datos, servicios y planificador con la API ya escuchando"""
+    global db_service, ai_director, workload_analyzer, risk_detector
+    
+    try:
+        # Inicializar base de datos
+        startup.begin("database")
+        DATA_DIR.mkdir(exist_ok=True)
+        db_service = DatabaseService(DATA_DIR / "team_manager.db")
+        await db_service.initialize()
+        await asyncio.to_thread(migrate_sync_state, db_service.get_session)
+        await asyncio.to_thread(migrate_legacy_positions, db_service.get_session)
+        install_version_hooks()
+        install_sql_hooks()
+        # Perfilado bajo demanda (PROFILING=speedscope|cprofile, ?profile=, PROFILE_JOBS)
+        profiling.configure(directory=DATA_DIR / "profiles")
+        profiling.install_sql_hooks()
+        
+        # Inicializar servicios de IA
+        startup.begin("services")
+        response_cache = LLMResponseCache(
+            db_service.get_session,
+            ttl_seconds=int(os.getenv("AI_CACHE_TTL_SECONDS", 3600)),
+            max_entries=int(os.getenv("AI_CACHE_MAX_ENTRIES", 500))
+        )
+        response_cache.install_invalidation_hooks()
+        # Análisis pesados en CPU fuera del event loop (pool de procesos)
+        analysis_executor = AnalysisExecutor(
+            max_workers=int(os.getenv("ANALYSIS_WORKERS", 0)) or None,
+            default_timeout=float(os.getenv("ANALYSIS_TIMEOUT", 120))
+        )
+        # SDKs de IA, NumPy, pandas...: se importan al usarlos por primera vez
+        ai_director = startup.register(LazyService(
+            "ai_director", "services.ai_director:AIDirectorService",
+            response_cache=response_cache, analysis_executor=analysis_executor
+        ))
+        workload_analyzer = startup.register(LazyService(
+            "workload_analyzer", "services.workload_analyzer:WorkloadAnalyzer", db_service
+        ))
+        
+        # Agregados de carga mantenidos en segundo plano
+        workload_rollups = WorkloadRollupService(
+            db_service.get_session,
+            raw_retention_days=int(os.getenv("WORKLOAD_RAW_RETENTION_DAYS", 180)),
+            daily_retention_days=int(os.getenv("WORKLOAD_DAILY_RETENTION_DAYS", 730))
+        )
+        workload_rollups.install_hooks()
+        
+        # Grafo de dependencias en memoria
+        dependency_graph = DependencyGraphService(db_service.get_session)
+        dependency_graph.install_hooks()
+        
+        # Snapshot de la organización compartido por los análisis de IA
+        org_snapshots = OrgSnapshotCache(db_service.get_session)
+        org_snapshots.install_hooks()
+        
+        # Reglas de riesgo evaluadas sobre los cambios desde la última pasada
+        risk_detector = RiskDetector(
+            db_service.get_session, dependency_graph,
+            aging_days=int(os.getenv("RISK_AGING_DAYS", 14)),
+            overload=float(os.getenv("RISK_OVERLOAD", 1.0)),
+            slip_margin=float(os.getenv("RISK_SLIP_MARGIN", 0.2))
+        )
+        risk_detector.install_hooks()
+        
+        # Historial de columnas/estados de las tarjetas (métricas de flujo)
+        card_history = CardHistoryService(db_service.get_session)
+        card_history.install_hooks()
+        
+        # Tareas periódicas en segundo plano (sustituye a los cron de automatización)
+        startup.begin("scheduler")
+        scheduler = JobScheduler(
+            DATA_DIR / "scheduler_state.json",
+            max_workers=int(os.getenv("SCHEDULER_WORKERS", 2)),
+            profile_jobs=os.getenv("PROFILE_JOBS", "").split(",")
+        )
+        
+        async def ai_analysis_job():
+            return await run_ai_analysis(db_service.get_session, await ai_director.aget(), org_snapshots)
+        
+        # Las agregaciones y análisis síncronos van al pool propio del planificador
+        scheduler.add_job("workload_rollups", workload_rollups.tick,
+                          float(os.getenv("WORKLOAD_ROLLUP_INTERVAL", 60)), cpu_bound=True, run_on_start=True)
+        scheduler.add_job("dependency_graph", dependency_graph.sync,
+                          float(os.getenv("DEPENDENCY_SYNC_INTERVAL", 30)), run_on_start=True)
+        scheduler.add_job("risk_detection", risk_detector.detect,
+                          float(os.getenv("RISK_DETECTION_INTERVAL", 60)), cpu_bound=True, run_on_start=True)
+        scheduler.add_job("card_history_backfill", card_history.backfill,
+                          float(os.getenv("CARD_HISTORY_BACKFILL_INTERVAL", 3600)), cpu_bound=True,
+                          run_on_start=True)
+        scheduler.add_job("workload_snapshot", lambda: snapshot_workload(db_service.get_session),
+                          float(os.getenv("WORKLOAD_SNAPSHOT_INTERVAL", 3600)), cpu_bound=True)
+        scheduler.add_job("ai_analysis", ai_analysis_job,
+                          float(os.getenv("AI_ANALYSIS_INTERVAL", 3600)), timeout=600)
+        scheduler.add_job("database_backup",
+                          lambda: backup_database(DATA_DIR / "team_manager.db", DATA_DIR / "backups",
+                                                  keep=int(os.getenv("BACKUP_KEEP", 7))),
+                          float(os.getenv("BACKUP_INTERVAL", 86400)))
+        
+        # Configurar servicios en la app
+        app.state.db = db_service
+        app.state.response_cache = response_cache
+        app.state.ai_director = ai_director
+        app.state.workload_analyzer = workload_analyzer
+        app.state.risk_detector = risk_detector
+        app.state.workload_rollups = workload_rollups
+        app.state.dependency_graph = dependency_graph
+        app.state.org_snapshots = org_snapshots
+        app.state.card_history = card_history
+        app.state.scheduler = scheduler
+        app.state.analysis_executor = analysis_executor
+        
+        # Estadísticas de los servicios, leídas en cada scrape de /api/metrics
+        REGISTRY.register_collector("ai_cache", lambda: llm_cache_metrics(response_cache))
+        REGISTRY.register_collector("scheduler", lambda: scheduler_metrics(scheduler))
+        REGISTRY.register_collector("analysis_executor", lambda: analysis_executor_metrics(analysis_executor))
+        REGISTRY.register_collector("org_snapshot", lambda: org_snapshot_metrics(org_snapshots))
+        REGISTRY.register_collector("risk_detector", lambda: risk_detector_metrics(risk_detector))
+        REGISTRY.register_collector("card_history", lambda: card_history_metrics(card_history))
+        
+        if os.getenv("SCHEDULER_ENABLED", "1") != "0":
+            scheduler.start()
+    except Exception as e:
+        startup.mark_failed(e)
+        logger.exception(f"❌ Error iniciando el backend: {e}")
+        return
+    
+    startup.mark_ready()
+    logger.info(f"📁 Base de datos: {DATA_DIR / 'team_manager.db'}")
+    
+    # Con la app ya usable, precargar lo diferido para que la primera petición de IA no lo pague
+    if os.getenv("PRELOAD_SERVICES", "1") != "0":
+        await asyncio.sleep(float(os.getenv("PRELOAD_SERVICES_DELAY", 5)))
+        for service in startup.services.values():
+            try:
+                await service.aget()
+            except Exception:
+                pass  # El error queda en /api/health y se reintenta en el primer uso
+
 # Crear aplicación FastAPI
 app = FastAPI(
     title="Team Manager Desktop API",
@@ -90,6 +267,15 @@ app = FastAPI(
     lifespan=lifespan
 )
 
+# Responder 503 mientras arranca (antes que CORS para que la respuesta lleve sus cabeceras)
+app.add_middleware(ReadinessMiddleware, exempt=("/api/health", "/api/metrics"))
+
+# ?profile=speedscope|cprofile perfila la petición y guarda el resultado en data/profiles
+app.add_middleware(ProfilingMiddleware)
+
+# Latencia y SQL por ruta; SLOW_REQUEST_MS > 0 registra las peticiones lentas con sus sentencias
+app.add_middleware(MetricsMiddleware, slow_request_ms=float(os.getenv("SLOW_REQUEST_MS", 0)))
+
 # Configurar CORS
 app.add_middleware(
     CORSMiddleware,
@@ -104,8 +290,21 @@ app.include_router(health_router, prefix="/api/health", tags=["health"])
 app.include_router(teams_router, prefix="/api/teams", tags=["teams"])
 app.include_router(projects_router, prefix="/api/projects", tags=["projects"])
 app.include_router(boards_router, prefix="/api/boards", tags=["boards"])
+# Antes que /api/workload para que sus rutas con parámetros no capturen /rollups
+app.include_router(workload_rollups_router, prefix="/api/workload/rollups", tags=["workload"])
+app.include_router(workload_optimizer_router, prefix="/api/workload/optimize", tags=["workload"])
 app.include_router(workload_router, prefix="/api/workload", tags=["workload"])
 app.include_router(ai_router, prefix="/api/ai", tags=["ai"])
+app.include_router(ai_stream_router, prefix="/api/ai", tags=["ai"])
+app.include_router(events_router, prefix="/api/events", tags=["events"])
+app.include_router(sync_router, prefix="/api/sync", tags=["sync"])
+app.include_router(cards_router, prefix="/api/cards", tags=["cards"])
+app.include_router(users_router, prefix="/api/users", tags=["users"])
+app.include_router(dependencies_router, prefix="/api/dependencies", tags=["dependencies"])
+app.include_router(flow_router, prefix="/api/flow", tags=["flow"])
+app.include_router(scheduler_router, prefix="/api/scheduler", tags=["scheduler"])
+app.include_router(metrics_router, prefix="/api/metrics", tags=["metrics"])
+app.include_router(profiles_router, prefix="/api/profiles", tags=["profiles"])
 
 # Servir frontend estático (en producción)
 if FRONTEND_DIR.exists():
@@ -124,7 +323,16 @@ async def root():
             "projects": "/api/projects",
             "boards": "/api/boards",
             "workload": "/api/workload",
-            "ai": "/api/ai"
+            "ai": "/api/ai",
+            "events": "/api/events",
+            "sync": "/api/sync",
+            "cards": "/api/cards",
+            "users": "/api/users",
+            "dependencies": "/api/dependencies",
+            "flow": "/api/flow",
+            "scheduler": "/api/scheduler",
+            "metrics": "/api/metrics",
+            "profiles": "/api/profiles"
         }
     }
 
@@ -133,13 +341,13 @@ def get_db_service() -> DatabaseService:
     """Obtener servicio de base de datos"""
     return app.state.db
 
-def get_ai_director() -> AIDirectorService:
-    """Obtener director de IA"""
-    return app.state.ai_director
+def get_ai_director() -> "AIDirectorService":
+    """Obtener director de IA (se construye en el primer uso)"""
+    return app.state.ai_director.get()
 
-def get_workload_analyzer() -> WorkloadAnalyzer:
-    """Obtener analizador de carga"""
-    return app.state.workload_analyzer
+def get_workload_analyzer() -> "WorkloadAnalyzer":
+    """Obtener analizador de carga (se construye en el primer uso)"""
+    return app.state.workload_analyzer.get()
 
 def get_risk_detector() -> RiskDetector:
     """Obtener detector de riesgos"""
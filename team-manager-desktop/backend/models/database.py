@@ -3,7 +3,8 @@
 Definición de tablas SQLAlchemy para Team Manager
 """
 
-from sqlalchemy import Column, String, Integer, Float, Boolean, DateTime, Text, ForeignKey, Table
+# SAColumn: el nombre Column es el modelo de columnas de tablero
+from sqlalchemy import Column as SAColumn, String, Integer, Float, Boolean, DateTime, Text, ForeignKey, Table, Index
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -17,46 +18,49 @@ Base = declarative_base()
 team_members = Table(
     'team_members',
     Base.metadata,
-    Column('team_id', String, ForeignKey('teams.id'), primary_key=True),
-    Column('user_id', String, ForeignKey('users.id'), primary_key=True),
-    Column('role', String, nullable=False),
-    Column('capacity', Float, default=8.0),
-    Column('joined_at', DateTime, default=func.now()),
-    Column('is_active', Boolean, default=True)
+    SAColumn('team_id', String, ForeignKey('teams.id'), primary_key=True),
+    SAColumn('user_id', String, ForeignKey('users.id'), primary_key=True),
+    SAColumn('role', String, nullable=False),
+    SAColumn('capacity', Float, default=8.0),
+    SAColumn('joined_at', DateTime, default=func.now()),
+    SAColumn('is_active', Boolean, default=True)
 )
 
 project_teams = Table(
     'project_teams',
     Base.metadata,
-    Column('project_id', String, ForeignKey('projects.id'), primary_key=True),
-    Column('team_id', String, ForeignKey('teams.id'), primary_key=True),
-    Column('assigned_at', DateTime, default=func.now())
+    SAColumn('project_id', String, ForeignKey('projects.id'), primary_key=True),
+    SAColumn('team_id', String, ForeignKey('teams.id'), primary_key=True),
+    SAColumn('assigned_at', DateTime, default=func.now())
 )
 
 card_dependencies = Table(
     'card_dependencies',
     Base.metadata,
-    Column('card_id', String, ForeignKey('cards.id'), primary_key=True),
-    Column('depends_on_id', String, ForeignKey('cards.id'), primary_key=True),
-    Column('created_at', DateTime, default=func.now())
+    SAColumn('card_id', String, ForeignKey('cards.id'), primary_key=True),
+    SAColumn('depends_on_id', String, ForeignKey('cards.id'), primary_key=True),
+    SAColumn('created_at', DateTime, default=func.now())
 )
 
 class User(Base):
     """Modelo de Usuario"""
     __tablename__ = 'users'
+    __table_args__ = (
+        Index('ix_users_updated_at_id', 'updated_at', 'id'),  # Paginación por clave
+    )
     
-    id = Column(String, primary_key=True)
-    name = Column(String, nullable=False)
-    email = Column(String, unique=True, nullable=False)
-    avatar = Column(String)
-    role = Column(String, nullable=False, default='member')  # admin, manager, member
-    skills = Column(Text)  # JSON array
-    capacity = Column(Float, default=8.0)  # Horas por día
-    timezone = Column(String, default='UTC')
-    is_active = Column(Boolean, default=True)
+    id = SAColumn(String, primary_key=True)
+    name = SAColumn(String, nullable=False)
+    email = SAColumn(String, unique=True, nullable=False)
+    avatar = SAColumn(String)
+    role = SAColumn(String, nullable=False, default='member')  # admin, manager, member
+    skills = SAColumn(Text)  # JSON array
+    capacity = SAColumn(Float, default=8.0)  # Horas por día
+    timezone = SAColumn(String, default='UTC')
+    is_active = SAColumn(Boolean, default=True)
     
-    created_at = Column(DateTime, default=func.now())
-    updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
+    created_at = SAColumn(DateTime, default=func.now())
+    updated_at = SAColumn(DateTime, default=func.now(), onupdate=func.now())
     
     # Relaciones
     teams = relationship("Team", secondary=team_members, back_populates="members")
@@ -76,18 +80,19 @@ class Team(Base):
     """Modelo de Equipo"""
     __tablename__ = 'teams'
     
-    id = Column(String, primary_key=True)
-    name = Column(String, nullable=False)
-    description = Column(Text)
-    color = Column(String, default='#3b82f6')
+    id = SAColumn(String, primary_key=True)
+    name = SAColumn(String, nullable=False)
+    description = SAColumn(Text)
+    color = SAColumn(String, default='#3b82f6')
     
     # Configuración
-    wip_limits = Column(Text)  # JSON object
-    settings = Column(Text)  # JSON object
+    wip_limits = SAColumn(Text)  # JSON object
+    settings = SAColumn(Text)  # JSON object
     
-    is_active = Column(Boolean, default=True)
-    created_at = Column(DateTime, default=func.now())
-    updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
+    is_active = SAColumn(Boolean, default=True)
+    created_at = SAColumn(DateTime, default=func.now())
+    updated_at = SAColumn(DateTime, default=func.now(), onupdate=func.now())
+    change_version = SAColumn(Integer, nullable=False, default=0, index=True)  # Cursor de sincronización
     
     # Relaciones
     members = relationship("User", secondary=team_members, back_populates="teams")
@@ -115,28 +120,29 @@ class Project(Base):
     """Modelo de Proyecto"""
     __tablename__ = 'projects'
     
-    id = Column(String, primary_key=True)
-    name = Column(String, nullable=False)
-    description = Column(Text)
-    status = Column(String, nullable=False, default='planning')  # planning, active, on_hold, completed, cancelled
-    priority = Column(String, nullable=False, default='medium')  # critical, high, medium, low
+    id = SAColumn(String, primary_key=True)
+    name = SAColumn(String, nullable=False)
+    description = SAColumn(Text)
+    status = SAColumn(String, nullable=False, default='planning')  # planning, active, on_hold, completed, cancelled
+    priority = SAColumn(String, nullable=False, default='medium')  # critical, high, medium, low
     
     # Fechas
-    start_date = Column(DateTime)
-    end_date = Column(DateTime)
+    start_date = SAColumn(DateTime)
+    end_date = SAColumn(DateTime)
     
     # Estimaciones
-    estimated_hours = Column(Float)
-    actual_hours = Column(Float, default=0.0)
-    progress = Column(Float, default=0.0)  # 0-100
+    estimated_hours = SAColumn(Float)
+    actual_hours = SAColumn(Float, default=0.0)
+    progress = SAColumn(Float, default=0.0)  # 0-100
     
     # Metadatos
-    tags = Column(Text)  # JSON array
-    dependencies = Column(Text)  # JSON array de project IDs
+    tags = SAColumn(Text)  # JSON array
+    dependencies = SAColumn(Text)  # JSON array de project IDs
     
-    is_active = Column(Boolean, default=True)
-    created_at = Column(DateTime, default=func.now())
-    updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
+    is_active = SAColumn(Boolean, default=True)
+    created_at = SAColumn(DateTime, default=func.now())
+    updated_at = SAColumn(DateTime, default=func.now(), onupdate=func.now())
+    change_version = SAColumn(Integer, nullable=False, default=0, index=True)  # Cursor de sincronización
     
     # Relaciones
     teams = relationship("Team", secondary=project_teams, back_populates="projects")
@@ -163,18 +169,19 @@ class Board(Base):
     """Modelo de Tablero Kanban"""
     __tablename__ = 'boards'
     
-    id = Column(String, primary_key=True)
-    name = Column(String, nullable=False)
-    team_id = Column(String, ForeignKey('teams.id'), nullable=False)
-    project_id = Column(String, ForeignKey('projects.id'))
+    id = SAColumn(String, primary_key=True)
+    name = SAColumn(String, nullable=False)
+    team_id = SAColumn(String, ForeignKey('teams.id'), nullable=False)
+    project_id = SAColumn(String, ForeignKey('projects.id'))
     
     # Configuración
-    wip_limits = Column(Text)  # JSON object
-    settings = Column(Text)  # JSON object
+    wip_limits = SAColumn(Text)  # JSON object
+    settings = SAColumn(Text)  # JSON object
     
-    is_active = Column(Boolean, default=True)
-    created_at = Column(DateTime, default=func.now())
-    updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
+    is_active = SAColumn(Boolean, default=True)
+    created_at = SAColumn(DateTime, default=func.now())
+    updated_at = SAColumn(DateTime, default=func.now(), onupdate=func.now())
+    change_version = SAColumn(Integer, nullable=False, default=0, index=True)  # Cursor de sincronización
     
     # Relaciones
     team = relationship("Team", back_populates="boards")
@@ -184,16 +191,20 @@ class Board(Base):
 class Column(Base):
     """Modelo de Columna de Tablero"""
     __tablename__ = 'columns'
+    __table_args__ = (
+        Index('ix_columns_board_position', 'board_id', 'position'),  # Orden dentro del tablero
+    )
     
-    id = Column(String, primary_key=True)
-    name = Column(String, nullable=False)
-    board_id = Column(String, ForeignKey('boards.id'), nullable=False)
-    column_type = Column(String, nullable=False)  # backlog, ready, in_progress, review, blocked, done
-    position = Column(Integer, nullable=False)
-    wip_limit = Column(Integer)
+    id = SAColumn(String, primary_key=True)
+    name = SAColumn(String, nullable=False)
+    board_id = SAColumn(String, ForeignKey('boards.id'), nullable=False)
+    column_type = SAColumn(String, nullable=False)  # backlog, ready, in_progress, review, blocked, done
+    position = SAColumn(String, nullable=False)  # Clave de orden lexicográfica (services/ranking.py)
+    wip_limit = SAColumn(Integer)
     
-    created_at = Column(DateTime, default=func.now())
-    updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
+    created_at = SAColumn(DateTime, default=func.now())
+    updated_at = SAColumn(DateTime, default=func.now(), onupdate=func.now())
+    change_version = SAColumn(Integer, nullable=False, default=0, index=True)  # Cursor de sincronización
     
     # Relaciones
     board = relationship("Board", back_populates="columns")
@@ -202,40 +213,49 @@ class Column(Base):
 class Card(Base):
     """Modelo de Tarjeta"""
     __tablename__ = 'cards'
+    __table_args__ = (
+        Index('ix_cards_updated_at_id', 'updated_at', 'id'),  # Paginación por clave
+        Index('ix_cards_column_position', 'column_id', 'position'),  # Orden dentro de la columna
+    )
     
-    id = Column(String, primary_key=True)
-    title = Column(String, nullable=False)
-    description = Column(Text)
+    id = SAColumn(String, primary_key=True)
+    title = SAColumn(String, nullable=False)
+    description = SAColumn(Text)
     
     # Clasificación
-    card_type = Column(String, nullable=False, default='task')  # epic, story, task, bug, improvement
-    priority = Column(String, nullable=False, default='medium')  # critical, high, medium, low
-    status = Column(String, nullable=False, default='backlog')  # backlog, ready, in_progress, review, blocked, done
+    card_type = SAColumn(String, nullable=False, default='task')  # epic, story, task, bug, improvement
+    priority = SAColumn(String, nullable=False, default='medium')  # critical, high, medium, low
+    status = SAColumn(String, nullable=False, default='backlog')  # backlog, ready, in_progress, review, blocked, done
     
     # Asignación
-    team_id = Column(String, ForeignKey('teams.id'), nullable=False)
-    project_id = Column(String, ForeignKey('projects.id'), nullable=False)
-    column_id = Column(String, ForeignKey('columns.id'), nullable=False)
-    assigned_to = Column(String, ForeignKey('users.id'))
-    position = Column(Integer, default=0)
+    team_id = SAColumn(String, ForeignKey('teams.id'), nullable=False)
+    project_id = SAColumn(String, ForeignKey('projects.id'), nullable=False)
+    column_id = SAColumn(String, ForeignKey('columns.id'), nullable=False)
+    assigned_to = SAColumn(String, ForeignKey('users.id'))
+    position = SAColumn(String)  # Clave de orden lexicográfica (services/ranking.py)
     
     # Estimaciones y tiempo
-    estimated_hours = Column(Float)
-    actual_hours = Column(Float, default=0.0)
-    story_points = Column(Integer)
+    estimated_hours = SAColumn(Float)
+    actual_hours = SAColumn(Float, default=0.0)
+    story_points = SAColumn(Integer)
     
     # Estado
-    blocked_reason = Column(Text)
+    blocked_reason = SAColumn(Text)
     
     # Metadatos
-    tags = Column(Text)  # JSON array
-    acceptance_criteria = Column(Text)  # JSON array
+    tags = SAColumn(Text)  # JSON array
+    acceptance_criteria = SAColumn(Text)  # JSON array
+    
+    # Origen en el tablero markdown (kanban/board.md)
+    import_key = SAColumn(String, index=True)  # ID del elemento (US-..., T-...) o título normalizado
+    import_hash = SAColumn(String)  # Hash del contenido importado
     
     # Fechas
-    created_at = Column(DateTime, default=func.now())
-    updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
-    started_at = Column(DateTime)
-    completed_at = Column(DateTime)
+    created_at = SAColumn(DateTime, default=func.now())
+    updated_at = SAColumn(DateTime, default=func.now(), onupdate=func.now())
+    started_at = SAColumn(DateTime)
+    completed_at = SAColumn(DateTime)
+    change_version = SAColumn(Integer, nullable=False, default=0, index=True)  # Cursor de sincronización
     
     # Relaciones
     team = relationship("Team", back_populates="cards")
@@ -281,13 +301,13 @@ class Comment(Base):
     """Modelo de Comentario"""
     __tablename__ = 'comments'
     
-    id = Column(String, primary_key=True)
-    content = Column(Text, nullable=False)
-    card_id = Column(String, ForeignKey('cards.id'), nullable=False)
-    author_id = Column(String, ForeignKey('users.id'), nullable=False)
+    id = SAColumn(String, primary_key=True)
+    content = SAColumn(Text, nullable=False)
+    card_id = SAColumn(String, ForeignKey('cards.id'), nullable=False)
+    author_id = SAColumn(String, ForeignKey('users.id'), nullable=False)
     
-    created_at = Column(DateTime, default=func.now())
-    updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
+    created_at = SAColumn(DateTime, default=func.now())
+    updated_at = SAColumn(DateTime, default=func.now(), onupdate=func.now())
     
     # Relaciones
     card = relationship("Card", back_populates="comments")
@@ -297,15 +317,15 @@ class TimeEntry(Base):
     """Modelo de Registro de Tiempo"""
     __tablename__ = 'time_entries'
     
-    id = Column(String, primary_key=True)
-    card_id = Column(String, ForeignKey('cards.id'), nullable=False)
-    user_id = Column(String, ForeignKey('users.id'), nullable=False)
+    id = SAColumn(String, primary_key=True)
+    card_id = SAColumn(String, ForeignKey('cards.id'), nullable=False)
+    user_id = SAColumn(String, ForeignKey('users.id'), nullable=False)
     
-    hours = Column(Float, nullable=False)
-    description = Column(Text)
-    date = Column(DateTime, nullable=False)
+    hours = SAColumn(Float, nullable=False)
+    description = SAColumn(Text)
+    date = SAColumn(DateTime, nullable=False, index=True)
     
-    created_at = Column(DateTime, default=func.now())
+    created_at = SAColumn(DateTime, default=func.now())
     
     # Relaciones
     card = relationship("Card", back_populates="time_entries")
@@ -315,13 +335,13 @@ class UserAvailability(Base):
     """Modelo de Disponibilidad de Usuario"""
     __tablename__ = 'user_availability'
     
-    id = Column(String, primary_key=True)
-    user_id = Column(String, ForeignKey('users.id'), nullable=False)
-    date = Column(DateTime, nullable=False)
-    hours = Column(Float, nullable=False)
-    note = Column(Text)
+    id = SAColumn(String, primary_key=True)
+    user_id = SAColumn(String, ForeignKey('users.id'), nullable=False)
+    date = SAColumn(DateTime, nullable=False)
+    hours = SAColumn(Float, nullable=False)
+    note = SAColumn(Text)
     
-    created_at = Column(DateTime, default=func.now())
+    created_at = SAColumn(DateTime, default=func.now())
     
     # Relaciones
     user = relationship("User", back_populates="availability")
@@ -330,19 +350,19 @@ class WorkloadData(Base):
     """Modelo de Datos de Carga de Trabajo"""
     __tablename__ = 'workload_data'
     
-    id = Column(String, primary_key=True)
-    user_id = Column(String, ForeignKey('users.id'), nullable=False)
-    team_id = Column(String, ForeignKey('teams.id'), nullable=False)
-    date = Column(DateTime, nullable=False)
+    id = SAColumn(String, primary_key=True)
+    user_id = SAColumn(String, ForeignKey('users.id'), nullable=False)
+    team_id = SAColumn(String, ForeignKey('teams.id'), nullable=False)
+    date = SAColumn(DateTime, nullable=False, index=True)
     
-    planned_hours = Column(Float, default=0.0)
-    actual_hours = Column(Float, default=0.0)
-    capacity = Column(Float, nullable=False)
-    utilization = Column(Float, default=0.0)  # 0-1
-    overloaded = Column(Boolean, default=False)
+    planned_hours = SAColumn(Float, default=0.0)
+    actual_hours = SAColumn(Float, default=0.0)
+    capacity = SAColumn(Float, nullable=False)
+    utilization = SAColumn(Float, default=0.0)  # 0-1
+    overloaded = SAColumn(Boolean, default=False)
     
-    created_at = Column(DateTime, default=func.now())
-    updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
+    created_at = SAColumn(DateTime, default=func.now())
+    updated_at = SAColumn(DateTime, default=func.now(), onupdate=func.now())
     
     # Relaciones
     user = relationship("User", back_populates="workload_data")
@@ -352,25 +372,25 @@ class Risk(Base):
     """Modelo de Riesgo"""
     __tablename__ = 'risks'
     
-    id = Column(String, primary_key=True)
-    title = Column(String, nullable=False)
-    description = Column(Text, nullable=False)
-    severity = Column(String, nullable=False)  # low, medium, high, critical
-    probability = Column(Float, nullable=False)  # 0-1
-    impact = Column(Float, nullable=False)  # 0-1
-    category = Column(String, nullable=False)  # technical, resource, timeline, quality, external
+    id = SAColumn(String, primary_key=True)
+    title = SAColumn(String, nullable=False)
+    description = SAColumn(Text, nullable=False)
+    severity = SAColumn(String, nullable=False)  # low, medium, high, critical
+    probability = SAColumn(Float, nullable=False)  # 0-1
+    impact = SAColumn(Float, nullable=False)  # 0-1
+    category = SAColumn(String, nullable=False)  # technical, resource, timeline, quality, external
     
     # Entidades afectadas
-    affected_teams = Column(Text)  # JSON array
-    affected_projects = Column(Text)  # JSON array
+    affected_teams = SAColumn(Text)  # JSON array
+    affected_projects = SAColumn(Text)  # JSON array
     
     # Gestión
-    mitigation = Column(Text)
-    owner_id = Column(String, ForeignKey('users.id'))
-    status = Column(String, default='open')  # open, mitigating, resolved
+    mitigation = SAColumn(Text)
+    owner_id = SAColumn(String, ForeignKey('users.id'))
+    status = SAColumn(String, default='open')  # open, mitigating, resolved
     
-    detected_at = Column(DateTime, default=func.now())
-    resolved_at = Column(DateTime)
+    detected_at = SAColumn(DateTime, default=func.now())
+    resolved_at = SAColumn(DateTime)
     
     # Relaciones
     owner = relationship("User")
@@ -395,23 +415,23 @@ class AIInsight(Base):
     """Modelo de Insight de IA"""
     __tablename__ = 'ai_insights'
     
-    id = Column(String, primary_key=True)
-    insight_type = Column(String, nullable=False)  # bottleneck, overload, underutilization, dependency, quality, timeline
-    title = Column(String, nullable=False)
-    description = Column(Text, nullable=False)
-    severity = Column(String, nullable=False)  # info, warning, critical
-    confidence = Column(Float, nullable=False)  # 0-1
+    id = SAColumn(String, primary_key=True)
+    insight_type = SAColumn(String, nullable=False)  # bottleneck, overload, underutilization, dependency, quality, timeline
+    title = SAColumn(String, nullable=False)
+    description = SAColumn(Text, nullable=False)
+    severity = SAColumn(String, nullable=False)  # info, warning, critical
+    confidence = SAColumn(Float, nullable=False)  # 0-1
     
     # Recomendaciones
-    recommendations = Column(Text)  # JSON array
+    recommendations = SAColumn(Text)  # JSON array
     
     # Entidades afectadas
-    affected_teams = Column(Text)  # JSON array
-    affected_projects = Column(Text)  # JSON array
-    affected_users = Column(Text)  # JSON array
+    affected_teams = SAColumn(Text)  # JSON array
+    affected_projects = SAColumn(Text)  # JSON array
+    affected_users = SAColumn(Text)  # JSON array
     
-    acknowledged = Column(Boolean, default=False)
-    created_at = Column(DateTime, default=func.now())
+    acknowledged = SAColumn(Boolean, default=False)
+    created_at = SAColumn(DateTime, default=func.now())
     
     @property
     def recommendations_list(self) -> List[str]:
@@ -443,4 +463,97 @@ class AIInsight(Base):
     
     @affected_users_list.setter
     def affected_users_list(self, value: List[str]):
-        self.affected_users = json.dumps(value)
\ No newline at end of file
+        self.affected_users = json.dumps(value)
+
+class AIResponseCache(Base):
+    """Modelo de Cache de Respuestas de IA"""
+    __tablename__ = 'ai_response_cache'
+    
+    cache_key = SAColumn(String, primary_key=True)  # sha256(prompt + contexto + modelo)
+    model = SAColumn(String, nullable=False)
+    response = SAColumn(Text, nullable=False)
+    
+    # Entidades cubiertas por la respuesta (para invalidación)
+    scopes = SAColumn(Text)  # JSON array de team/project IDs
+    
+    hit_count = SAColumn(Integer, default=0)
+    created_at = SAColumn(DateTime, default=func.now())
+    last_accessed_at = SAColumn(DateTime, default=func.now(), index=True)
+    expires_at = SAColumn(DateTime, nullable=False, index=True)
+    
+    @property
+    def scopes_list(self) -> List[str]:
+        return json.loads(self.scopes) if self.scopes else []
+    
+    @scopes_list.setter
+    def scopes_list(self, value: List[str]):
+        self.scopes = json.dumps(value)
+
+class SyncSequence(Base):
+    """Contador global de versiones de cambio (una sola fila)"""
+    __tablename__ = 'sync_sequence'
+    
+    id = SAColumn(Integer, primary_key=True)
+    value = SAColumn(Integer, nullable=False, default=0)
+
+class SyncTombstone(Base):
+    """Registro de filas eliminadas para la sincronización delta"""
+    __tablename__ = 'sync_tombstones'
+    
+    id = SAColumn(Integer, primary_key=True, autoincrement=True)
+    entity = SAColumn(String, nullable=False)  # teams, projects, boards, columns, cards
+    entity_id = SAColumn(String, nullable=False)
+    change_version = SAColumn(Integer, nullable=False, index=True)
+    deleted_at = SAColumn(DateTime, default=func.now())
+
+class CardStatusHistory(Base):
+    """Transición de una tarjeta a una columna/estado (una fila por tramo, la abierta es la actual)"""
+    __tablename__ = 'card_status_history'
+    __table_args__ = (
+        Index('ix_card_status_history_card', 'card_id', 'entered_at'),  # Historial de una tarjeta
+        Index('ix_card_status_history_open', 'column_id', 'exited_at', 'entered_at'),  # WIP por columna
+        Index('ix_card_status_history_flow', 'status', 'team_id', 'entered_at'),  # Tiempos de ciclo
+    )
+    
+    id = SAColumn(Integer, primary_key=True, autoincrement=True)
+    card_id = SAColumn(String, ForeignKey('cards.id'), nullable=False)
+    team_id = SAColumn(String)
+    project_id = SAColumn(String)
+    
+    # Destino y origen de la transición (origen vacío = alta de la tarjeta)
+    column_id = SAColumn(String)
+    status = SAColumn(String)
+    from_column_id = SAColumn(String)
+    from_status = SAColumn(String)
+    
+    entered_at = SAColumn(DateTime, nullable=False)
+    exited_at = SAColumn(DateTime)  # NULL mientras la tarjeta sigue en el tramo
+    duration_seconds = SAColumn(Float)  # Al salir del tramo
+    cycle_seconds = SAColumn(Float)  # Tramos en done: desde el primer inicio de trabajo
+
+class WorkloadRollup(Base):
+    """Agregado de horas y carga por periodo (día/semana/mes) y ámbito (usuario/equipo/proyecto)"""
+    __tablename__ = 'workload_rollups'
+    __table_args__ = (
+        Index('ix_workload_rollups_lookup', 'scope_type', 'scope_id', 'granularity', 'period_start', unique=True),
+        Index('ix_workload_rollups_period', 'granularity', 'period_start'),
+    )
+    
+    id = SAColumn(Integer, primary_key=True, autoincrement=True)
+    granularity = SAColumn(String, nullable=False)  # day, week, month
+    period_start = SAColumn(DateTime, nullable=False)
+    scope_type = SAColumn(String, nullable=False)  # user, team, project
+    scope_id = SAColumn(String, nullable=False)
+    
+    # TimeEntry
+    hours_logged = SAColumn(Float, default=0.0)
+    entries = SAColumn(Integer, default=0)
+    
+    # WorkloadData (no disponible por proyecto)
+    planned_hours = SAColumn(Float, default=0.0)
+    actual_hours = SAColumn(Float, default=0.0)
+    capacity = SAColumn(Float, default=0.0)
+    utilization = SAColumn(Float, default=0.0)  # actual_hours / capacity
+    overloaded_days = SAColumn(Integer, default=0)
+    
+    updated_at = SAColumn(DateTime, default=func.now(), onupdate=func.now())
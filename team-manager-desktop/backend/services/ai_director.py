@@ -3,15 +3,24 @@
 Comportamiento como director de operaciones ágil senior
 """
 
+import asyncio
 import json
 import os
-from typing import Dict, Any, List, Optional
-from datetime import datetime, timedelta
-import openai
-from anthropic import Anthropic
+from typing import Dict, Any, List, Optional, AsyncIterator, Tuple, Union
 import logging
 
+from sqlalchemy.orm import Session
+
 from models.database import Team, Project, Card, User, Risk, AIInsight
+from services.llm_cache import LLMResponseCache
+from services.ai_providers import ProviderRouter, AIProviderError, build_providers_from_env
+from services.analysis_stream import IncrementalAnalysisParser
+from services.context_builder import ContextBuilder
+from services.dependency_graph import DependencyGraphService
+from services.analysis_executor import AnalysisExecutor
+from services import analysis_tasks
+from services.card_store import CardStore
+from services.profiling import traced, span
 
 logger = logging.getLogger(__name__)
 
@@ -27,12 +36,28 @@ class AIDirectorService:
     - Coordinación entre equipos
     """
     
-    def __init__(self):
+    OPENAI_MODEL = "gpt-4-turbo-preview"
+    ANTHROPIC_MODEL = "claude-3-sonnet-20240229"
+    
+    def __init__(self, response_cache: Optional[LLMResponseCache] = None,
+                 analysis_executor: Optional[AnalysisExecutor] = None,
+                 providers: Optional[ProviderRouter] = None):
         self.system_prompt = self._load_system_prompt()
         self.openai_client = None
         self.anthropic_client = None
+        self.providers: Optional[ProviderRouter] = None
+        self.response_cache = response_cache
+        self.analysis_executor = analysis_executor
+        self.context_builder = ContextBuilder(token_budget=int(os.getenv('AI_CONTEXT_TOKEN_BUDGET', 6000)))
+        
+        # A partir de cuántos equipos se analiza por equipo (map) y se consolida (reduce)
+        self.map_reduce_threshold = int(os.getenv('AI_MAP_REDUCE_THRESHOLD', 8))
+        
+        # Estado del último análisis (para el modo delta), por llamador: el job
+        # programado y la UI no deben pisarse la base del delta
+        self._delta_states: Dict[str, Tuple[Dict[str, str], Optional[str]]] = {}
         
-        self._setup_ai_clients()
+        self._setup_ai_clients(providers)
     
     def _load_system_prompt(self) -> str:
         """Cargar prompt del sistema desde archivo"""
@@ -81,39 +106,280 @@ REGLAS:
 - Considera dependencias entre equipos
 - Respeta principios ágiles sin dogmatismo"""
     
-    def _setup_ai_clients(self):
-        """Configurar clientes de IA"""
-        # OpenAI
-        openai_key = os.getenv('OPENAI_API_KEY')
-        if openai_key:
-            self.openai_client = openai.OpenAI(api_key=openai_key)
-            logger.info("✅ Cliente OpenAI configurado")
-        
-        # Anthropic
-        anthropic_key = os.getenv('ANTHROPIC_API_KEY')
-        if anthropic_key:
-            self.anthropic_client = Anthropic(api_key=anthropic_key)
-            logger.info("✅ Cliente Anthropic configurado")
+    def _setup_ai_clients(self, providers: Optional[ProviderRouter] = None):
+        """
+        Configurar clientes de IA (asíncronos, con conexiones reutilizadas).
+        Sin `providers` se construyen desde las variables de entorno.
+        """
+        self.providers = providers if providers is not None else build_providers_from_env(
+            self.OPENAI_MODEL, self.ANTHROPIC_MODEL
+        )
+        
+        openai_provider = self.providers.get('openai')
+        anthropic_provider = self.providers.get('anthropic')
+        self.openai_client = openai_provider.client if openai_provider else None
+        self.anthropic_client = anthropic_provider.client if anthropic_provider else None
         
         if not self.openai_client and not self.anthropic_client:
             logger.warning("⚠️ No hay clientes de IA configurados. Usando modo simulación.")
     
+    @traced('ai_director.analyze_global_state', root=True)
     async def analyze_global_state(self, 
                                  teams: List[Team], 
                                  projects: List[Project], 
                                  cards: List[Card],
-                                 users: List[User]) -> Dict[str, Any]:
+                                 users: List[User],
+                                 delta: bool = False,
+                                 hierarchical: Optional[bool] = None,
+                                 delta_key: str = 'default') -> Dict[str, Any]:
         """
-        Análisis global del estado de todos los equipos y proyectos
+        Análisis global del estado de todos los equipos y proyectos.
+        Con delta=True solo se envían los cambios desde el último análisis
+        hecho con la misma `delta_key`.
+        Con hierarchical=True (o automáticamente en organizaciones grandes) se
+        analiza cada equipo por separado y se consolida el resultado.
         """
         
-        # Preparar contexto completo
-        context = self._prepare_global_context(teams, projects, cards, users)
+        if hierarchical is None:
+            hierarchical = len(teams) > self.map_reduce_threshold
+        if hierarchical:
+            return await self.analyze_hierarchical(teams, projects, cards, users)
+        
+        # Preparar contexto (priorizado y ajustado al presupuesto de tokens)
+        built = await self._build_context(teams, projects, cards, users, delta, delta_key)
+        context = built['context']
+        prompt = self._build_global_prompt(context, built['delta'])
+        
+        # Procesar con IA (fallback a simulación si no hay proveedores disponibles)
+        if self.providers.providers:
+            response, _ = await self._process_cached(
+                context, self._scopes_for(teams, projects),
+                lambda: self._process_prompt(
+                    prompt, fallback=lambda: self._simulate_global_analysis(teams, projects, cards, users)
+                )
+            )
+        else:
+            response = self._simulate_global_analysis(teams, projects, cards, users)
+        
+        result = self._parse_ai_response(response)
+        self._remember_analysis(delta_key, built['digests'], result)
+        return result
+    
+    @traced('ai_director.stream_global_analysis', root=True)
+    async def stream_global_analysis(self,
+                                     teams: List[Team],
+                                     projects: List[Project],
+                                     cards: List[Card],
+                                     users: List[User],
+                                     delta: bool = False,
+                                     delta_key: str = 'default') -> AsyncIterator[Dict[str, Any]]:
+        """
+        Análisis global en streaming: emite cada insight, riesgo o recomendación
+        en cuanto el LLM termina de generarlo y, al final, el resultado completo
+        """
+        
+        built = await self._build_context(teams, projects, cards, users, delta, delta_key)
+        context = built['context']
+        prompt = self._build_global_prompt(context, built['delta'])
+        parser = IncrementalAnalysisParser()
+        simulate = lambda: self._simulate_global_analysis(teams, projects, cards, users)
+        
+        cache_key = None
+        cached = None
+        if self.providers.providers and self.response_cache:
+            cache_key = self.response_cache.build_key(self.system_prompt, context, self.providers.signature)
+            cached = await asyncio.to_thread(self.response_cache.get, cache_key)
+        
+        if cached is not None:
+            provider = 'cache'
+            for event in parser.feed(cached):
+                yield event
+        elif not self.providers.providers:
+            provider = 'simulation'
+            for event in parser.feed(simulate()):
+                yield event
+        else:
+            provider = None
+            try:
+                async for chunk in self.providers.stream(self.system_prompt, prompt, fallback=simulate):
+                    provider = chunk['provider']
+                    for event in parser.feed(chunk['delta']):
+                        yield event
+            except AIProviderError as e:
+                logger.error(f"Error en análisis en streaming: {e}")
+                provider = 'error'
+                parser = IncrementalAnalysisParser()
+                for event in parser.feed(self._get_error_response(str(e))):
+                    yield event
+        
+        # El texto puede venir en un bloque ```json: se parsea (y cachea) solo el objeto
+        document = parser.document
+        result = self._parse_ai_response(document)
+        
+        # No cachear errores ni respuestas simuladas
+        if cache_key and provider not in ('cache', 'simulation', 'error') and not result.get('error'):
+            await asyncio.to_thread(self.response_cache.set, cache_key, self.providers.signature, document,
+                                    self._scopes_for(teams, projects))
+        
+        self._remember_analysis(delta_key, built['digests'], result)
+        yield {'type': 'complete', 'provider': provider, 'data': result}
+    
+    @traced('ai_director.analyze_hierarchical', root=True)
+    async def analyze_hierarchical(self,
+                                   teams: List[Team],
+                                   projects: List[Project],
+                                   cards: List[Card],
+                                   users: List[User]) -> Dict[str, Any]:
+        """
+        Análisis map-reduce para organizaciones grandes.
+        
+        - Map: un prompt pequeño por equipo, en paralelo. Cada resultado se cachea
+          por el hash de los datos del equipo, así que solo se re-analizan los
+          equipos que cambiaron
+        - Reduce: una llamada final consolida los análisis por equipo en la vista global
+        """
+        
+        cards_by_team: Dict[str, List[Card]] = {}
+        for card in cards:
+            cards_by_team.setdefault(card.team_id, []).append(card)
+        
+        projects_by_team: Dict[str, List[Project]] = {}
+        for project in projects:
+            for team in project.teams:
+                projects_by_team.setdefault(team.id, []).append(project)
+        
+        # Map: análisis por equipo en paralelo (acotado por el semáforo de cada proveedor)
+        team_results = await self.providers.gather([
+            (lambda team=team: self._analyze_team(
+                team,
+                projects_by_team.get(team.id, []),
+                cards_by_team.get(team.id, [])
+            ))
+            for team in teams
+        ])
+        
+        # Reduce: consolidar en la vista global
+        result = await self._reduce_team_analyses(teams, projects, cards, users, team_results)
+        result['map_reduce'] = {
+            'teams': len(team_results),
+            'reanalyzed': len([r for r in team_results if not r['cached']]),
+            'cached': len([r for r in team_results if r['cached']])
+        }
+        return result
+    
+    @traced('ai_director.analyze_team')
+    async def _analyze_team(self, team: Team, team_projects: List[Project],
+                            team_cards: List[Card]) -> Dict[str, Any]:
+        """Fase map: análisis de un solo equipo"""
+        members = list(team.members)
+        context = self.context_builder.build([team], team_projects, team_cards, members)['context']
+        simulate = lambda: self._simulate_global_analysis([team], team_projects, team_cards, members)
+        
+        if self.providers.providers:
+            prompt = f"""
+        ANÁLISIS DE EQUIPO (fase parcial de un análisis global):
+        
+        Analiza únicamente este equipo y sus proyectos. Sé conciso: como máximo
+        3 insights y 3 riesgos, referenciando los IDs del contexto.
+        
+        CONTEXTO DEL EQUIPO:
+        {context}
+        """
+            response, cached = await self._process_cached(
+                context, [team.id],
+                lambda: self._process_prompt(prompt, fallback=simulate),
+                kind='team'
+            )
+        else:
+            response, cached = simulate(), False
+        
+        return {'team_id': team.id, 'team': team.name, 'cached': cached, **self._parse_ai_response(response)}
+    
+    @traced('ai_director.reduce_team_analyses')
+    async def _reduce_team_analyses(self, teams: List[Team], projects: List[Project], cards: List[Card],
+                                    users: List[User], team_results: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Fase reduce: consolidar los análisis por equipo"""
+        if not self.providers.providers:
+            return self._merge_team_analyses(team_results)
+        
+        context = json.dumps({
+            'organization': json.loads(await self._prepare_global_context(teams, projects, cards, users)),
+            'team_analyses': [
+                {
+                    'team_id': r['team_id'],
+                    'team': r['team'],
+                    'analysis': r.get('analysis'),
+                    'insights': [
+                        {k: i.get(k) for k in ('type', 'title', 'severity', 'affected_teams', 'affected_projects')}
+                        for i in r.get('insights', []) if isinstance(i, dict)
+                    ],
+                    'risks': [
+                        {k: rk.get(k) for k in ('title', 'severity', 'category', 'affected_teams', 'affected_projects')}
+                        for rk in r.get('risks', []) if isinstance(rk, dict)
+                    ]
+                }
+                for r in team_results
+            ]
+        }, separators=(',', ':'), ensure_ascii=False, default=str)
         
-        # Prompt específico para análisis global
         prompt = f"""
-        ANÁLISIS GLOBAL REQUERIDO:
+        SÍNTESIS GLOBAL (consolidación de análisis por equipo):
+        
+        Recibes el resumen de la organización y el análisis individual de cada equipo.
+        Consolida una única vista global: elimina duplicados, prioriza lo crítico y
+        detecta riesgos y dependencias entre equipos que los análisis individuales no ven.
+        
+        DATOS:
+        {context}
+        """
+        
+        response, _ = await self._process_cached(
+            context, self._scopes_for(teams, projects),
+            lambda: self._process_prompt(prompt, fallback=lambda: json.dumps(self._merge_team_analyses(team_results))),
+            kind='reduce'
+        )
+        result = self._parse_ai_response(response)
+        result['team_analyses'] = {r['team_id']: r.get('analysis') for r in team_results}
+        return result
+    
+    def _merge_team_analyses(self, team_results: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Consolidación determinista (sin LLM) de los análisis por equipo"""
+        severity_order = {'critical': 0, 'high': 1, 'warning': 1, 'medium': 2, 'info': 3, 'low': 3}
+        
+        insights, risks, recommendations, actions = [], [], [], []
+        for r in team_results:
+            insights.extend(i for i in r.get('insights', []) if isinstance(i, dict))
+            risks.extend(rk for rk in r.get('risks', []) if isinstance(rk, dict))
+            actions.extend(r.get('actions', []))
+            for recommendation in r.get('recommendations', []):
+                if recommendation not in recommendations:
+                    recommendations.append(recommendation)
+        
+        insights.sort(key=lambda i: severity_order.get(i.get('severity'), 4))
+        risks.sort(key=lambda rk: severity_order.get(rk.get('severity'), 4))
+        
+        return {
+            'analysis': f"Análisis consolidado de {len(team_results)} equipos. "
+                        f"{len(risks)} riesgos y {len(insights)} insights detectados.",
+            'insights': insights,
+            'risks': risks,
+            'recommendations': recommendations,
+            'actions': actions,
+            'team_analyses': {r['team_id']: r.get('analysis') for r in team_results}
+        }
+    
+    @traced('ai_director.build_prompt')
+    def _build_global_prompt(self, context: str, delta: bool = False) -> str:
+        """Prompt específico para análisis global"""
+        delta_note = """
+        MODO INCREMENTAL: el contexto solo incluye los equipos y proyectos que cambiaron
+        desde el último análisis; "previous_analysis" resume ese análisis. Actualízalo
+        teniendo en cuenta estos cambios.
+        """ if delta else ""
         
+        return f"""
+        ANÁLISIS GLOBAL REQUERIDO:
+        {delta_note}        
         Analiza el estado completo de la organización y proporciona:
         1. Evaluación del estado general
         2. Identificación de cuellos de botella críticos
@@ -127,75 +393,95 @@ REGLAS:
         
         Proporciona un análisis como director de operaciones experimentado.
         """
+    
+    @traced('ai_director.process_cached')
+    async def _process_cached(self, context: str, scopes: List[str], call, kind: str = 'global'):
+        """
+        Consultar el cache de respuestas antes de llamar al proveedor.
+        Devuelve (respuesta, servida_desde_cache). El cache es SQLite: se lee y
+        escribe en un hilo para no bloquear el event loop.
+        """
+        if not self.response_cache:
+            return (await call())['content'], False
         
-        # Procesar con IA
-        if self.openai_client:
-            response = await self._process_with_openai(prompt)
-        elif self.anthropic_client:
-            response = await self._process_with_anthropic(prompt)
-        else:
-            response = self._simulate_global_analysis(teams, projects, cards, users)
+        model = self.providers.signature if kind == 'global' else f"{self.providers.signature}#{kind}"
+        with span('cache.lookup'):
+            key = self.response_cache.build_key(self.system_prompt, context, model)
+            cached = await asyncio.to_thread(self.response_cache.get, key)
+        if cached is not None:
+            logger.info(f"💾 Respuesta de IA servida desde cache ({model})")
+            return cached, True
+        
+        result = await call()
+        response = result['content']
         
-        return self._parse_ai_response(response)
+        # No cachear errores, respuestas simuladas ni respuestas que no se pueden parsear
+        if result['provider'] != 'simulation' and not self._parse_ai_response(response).get('error'):
+            with span('cache.store'):
+                await asyncio.to_thread(self.response_cache.set, key, model, response, scopes)
+        
+        return response, False
+    
+    def _scopes_for(self, teams: List[Team], projects: List[Project]) -> List[str]:
+        """Equipos y proyectos cubiertos por un análisis (para invalidar el cache)"""
+        return [team.id for team in teams] + [project.id for project in projects]
     
+    @traced('ai_director.detect_bottlenecks', root=True)
     async def detect_bottlenecks(self, 
                                teams: List[Team], 
-                               cards: List[Card]) -> List[Dict[str, Any]]:
+                               cards: Union[List[Card], CardStore],
+                               dependencies: Optional[DependencyGraphService] = None) -> List[Dict[str, Any]]:
         """
-        Detectar cuellos de botella en el flujo de trabajo
+        Detectar cuellos de botella en el flujo de trabajo.
+        Con `dependencies` se añaden las tarjetas bloqueadas que frenan a otras.
         """
         
-        bottlenecks = []
+        # Acumulación excesiva por columnas/estados
+        bottlenecks = await self._offload(
+            analysis_tasks.detect_bottlenecks,
+            [(team.id, team.name) for team in teams],
+            self._card_store(cards)
+        )
         
-        for team in teams:
-            team_cards = [card for card in cards if card.team_id == team.id]
-            
-            # Análisis por columnas/estados
-            status_counts = {}
-            for card in team_cards:
-                status_counts[card.status] = status_counts.get(card.status, 0) + 1
-            
-            # Detectar acumulación excesiva
-            if status_counts.get('review', 0) > 5:
-                bottlenecks.append({
-                    'type': 'review_bottleneck',
-                    'team_id': team.id,
-                    'severity': 'high',
-                    'description': f'Equipo {team.name} tiene {status_counts["review"]} tarjetas en revisión',
-                    'recommendation': 'Aumentar capacidad de revisión o revisar criterios'
-                })
-            
-            if status_counts.get('blocked', 0) > 2:
-                bottlenecks.append({
-                    'type': 'blocked_cards',
-                    'team_id': team.id,
-                    'severity': 'critical',
-                    'description': f'Equipo {team.name} tiene {status_counts["blocked"]} tarjetas bloqueadas',
-                    'recommendation': 'Resolver bloqueos inmediatamente'
-                })
+        if dependencies is not None:
+            await asyncio.to_thread(dependencies.sync)
+            for team in teams:
+                chains = dependencies.blocked_chains(team_id=team.id, limit=5)
+                for chain in chains:
+                    if chain['affected'] < 3:
+                        continue
+                    bottlenecks.append({
+                        'type': 'blocked_dependency_chain',
+                        'team_id': team.id,
+                        'severity': 'critical' if chain['cross_team'] else 'high',
+                        'description': f"La tarjeta {chain['id']} de {team.name} está bloqueada y frena "
+                                       f"{chain['affected']} tarjetas ({chain['affected_hours']}h)",
+                        'card_id': chain['id'],
+                        'affected_teams': chain['affected_teams'],
+                        'recommendation': 'Priorizar el desbloqueo: es un prerrequisito de otras tarjetas'
+                    })
         
         return bottlenecks
     
+    @traced('ai_director.optimize_workload', root=True)
     async def optimize_workload(self, 
                               teams: List[Team], 
                               users: List[User], 
-                              cards: List[Card]) -> Dict[str, Any]:
+                              cards: Union[List[Card], CardStore],
+                              session: Optional[Session] = None) -> Dict[str, Any]:
         """
-        Optimizar distribución de carga de trabajo
+        Optimizar distribución de carga de trabajo.
+        Con `session` se añaden reasignaciones concretas (WorkloadOptimizer).
         """
         
         # Calcular carga actual por usuario
-        user_workload = {}
+        user_workload = await self._offload(
+            analysis_tasks.analyze_workload,
+            analysis_tasks.snapshot_users(users),
+            self._card_store(cards)
+        )
         for user in users:
-            assigned_cards = [card for card in cards if card.assigned_to == user.id and card.status in ['ready', 'in_progress', 'review']]
-            total_hours = sum(card.estimated_hours or 0 for card in assigned_cards)
-            user_workload[user.id] = {
-                'user': user,
-                'current_load': total_hours,
-                'capacity': user.capacity * 5,  # Capacidad semanal
-                'utilization': total_hours / (user.capacity * 5) if user.capacity > 0 else 0,
-                'cards_count': len(assigned_cards)
-            }
+            user_workload[user.id]['user'] = user
         
         # Identificar desequilibrios
         overloaded = [uid for uid, data in user_workload.items() if data['utilization'] > 0.9]
@@ -222,142 +508,187 @@ REGLAS:
                 'action': 'Asignar más trabajo o reasignar a proyectos críticos'
             })
         
-        return {
+        result = {
             'workload_analysis': user_workload,
             'overloaded_users': overloaded,
             'underutilized_users': underutilized,
             'recommendations': recommendations
         }
+        
+        if session is not None:
+            # Import diferido: NumPy/SciPy solo cuando se usa el optimizador
+            from services.workload_optimizer import WorkloadOptimizer
+            
+            team_ids = [team.id for team in teams]
+            if self.analysis_executor:
+                # Lectura en un hilo; la resolución (NumPy/SciPy) en el pool de procesos
+                snapshot = await asyncio.to_thread(WorkloadOptimizer().load, session, team_ids)
+                proposal = await self.analysis_executor.run(analysis_tasks.solve_workload, {}, snapshot)
+            else:
+                proposal = await asyncio.to_thread(WorkloadOptimizer().optimize, session, team_ids)
+            result['proposal'] = proposal
+            if proposal['reassignments']:
+                recommendations.append({
+                    'type': 'reassign_cards',
+                    'priority': 'high',
+                    'description': f"{len(proposal['reassignments'])} reasignaciones propuestas para equilibrar la carga",
+                    'affected_users': sorted({r['from_user'] for r in proposal['reassignments']} |
+                                             {r['to_user'] for r in proposal['reassignments']}),
+                    'action': 'Revisar y aplicar las reasignaciones propuestas'
+                })
+        
+        return result
     
+    @traced('ai_director.coordinate_teams', root=True)
     async def coordinate_teams(self, 
                              teams: List[Team], 
                              projects: List[Project], 
-                             cards: List[Card]) -> Dict[str, Any]:
+                             cards: Union[List[Card], CardStore],
+                             dependencies: Optional[DependencyGraphService] = None) -> Dict[str, Any]:
         """
-        Analizar coordinación entre equipos
+        Analizar coordinación entre equipos.
+        Con `dependencies` se añaden los bloqueos entre equipos y el camino
+        crítico de cada proyecto multi-equipo.
         """
         
         coordination_issues = []
         
-        # Analizar dependencias inter-equipo
+        # Proyectos multi-equipo (entre los equipos analizados)
+        team_ids = {team.id for team in teams}
+        shared_projects = {}
         for project in projects:
-            project_teams = [team for team in teams if team.id in [pt.id for pt in project.teams]]
+            project_team_ids = tuple(team.id for team in project.teams if team.id in team_ids)
+            if len(project_team_ids) > 1:
+                shared_projects[project.id] = (project, project_team_ids)
+        
+        # Progreso de cada equipo por proyecto: un group-by sobre todas las tarjetas
+        progress = await self._offload(
+            analysis_tasks.team_progress,
+            [(project_id, project_team_ids) for project_id, (_, project_team_ids) in shared_projects.items()],
+            self._card_store(cards)
+        ) if shared_projects else {}
+        
+        for project_id, (project, _) in shared_projects.items():
+            team_progress = progress[project_id]
+            
+            # Detectar desequilibrios significativos
+            max_progress = max(team_progress.values())
+            min_progress = min(team_progress.values())
             
-            if len(project_teams) > 1:
-                # Proyecto multi-equipo, analizar coordinación
-                team_progress = {}
-                for team in project_teams:
-                    team_cards = [card for card in cards if card.team_id == team.id and card.project_id == project.id]
-                    completed = len([card for card in team_cards if card.status == 'done'])
-                    total = len(team_cards)
-                    team_progress[team.id] = completed / total if total > 0 else 0
-                
-                # Detectar desequilibrios significativos
-                if team_progress:
-                    max_progress = max(team_progress.values())
-                    min_progress = min(team_progress.values())
-                    
-                    if max_progress - min_progress > 0.3:  # 30% de diferencia
-                        coordination_issues.append({
-                            'type': 'team_sync_issue',
-                            'project_id': project.id,
-                            'severity': 'medium',
-                            'description': f'Desincronización entre equipos en {project.name}',
-                            'team_progress': team_progress,
-                            'recommendation': 'Sincronizar equipos y revisar dependencias'
-                        })
+            if max_progress - min_progress > 0.3:  # 30% de diferencia
+                coordination_issues.append({
+                    'type': 'team_sync_issue',
+                    'project_id': project.id,
+                    'severity': 'medium',
+                    'description': f'Desincronización entre equipos en {project.name}',
+                    'team_progress': team_progress,
+                    'recommendation': 'Sincronizar equipos y revisar dependencias'
+                })
         
-        return {
+        result = {
             'coordination_issues': coordination_issues,
             'multi_team_projects': len([p for p in projects if len(p.teams) > 1])
         }
-    
-    def _prepare_global_context(self, teams: List[Team], projects: List[Project], 
-                               cards: List[Card], users: List[User]) -> str:
-        """Preparar contexto global para la IA"""
-        
-        context = {
-            'timestamp': datetime.now().isoformat(),
-            'summary': {
-                'teams_count': len(teams),
-                'projects_count': len(projects),
-                'active_projects': len([p for p in projects if p.status == 'active']),
-                'users_count': len(users),
-                'total_cards': len(cards),
-                'cards_by_status': {}
-            },
-            'teams': [],
-            'projects': [],
-            'workload_indicators': {}
-        }
         
-        # Resumen de tarjetas por estado
-        for card in cards:
-            status = card.status
-            context['summary']['cards_by_status'][status] = context['summary']['cards_by_status'].get(status, 0) + 1
-        
-        # Información de equipos
-        for team in teams:
-            team_cards = [card for card in cards if card.team_id == team.id]
-            context['teams'].append({
-                'id': team.id,
-                'name': team.name,
-                'members_count': len(team.members),
-                'cards_count': len(team_cards),
-                'wip_limits': team.wip_limits_dict,
-                'active_cards': len([card for card in team_cards if card.status in ['ready', 'in_progress', 'review']])
-            })
-        
-        # Información de proyectos
-        for project in projects:
-            project_cards = [card for card in cards if card.project_id == project.id]
-            completed_cards = len([card for card in project_cards if card.status == 'done'])
+        if dependencies is not None:
+            await asyncio.to_thread(dependencies.sync)
             
-            context['projects'].append({
-                'id': project.id,
-                'name': project.name,
-                'status': project.status,
-                'priority': project.priority,
-                'teams_count': len(project.teams),
-                'progress': project.progress,
-                'cards_completed': completed_cards,
-                'cards_total': len(project_cards)
-            })
+            for chain in dependencies.blocked_chains():
+                if not chain['cross_team'] or not (team_ids & (set(chain['teams']) | set(chain['affected_teams']))):
+                    continue
+                coordination_issues.append({
+                    'type': 'cross_team_blocking',
+                    'project_id': chain['project_id'],
+                    'severity': 'high' if chain['affected_hours'] >= 40 else 'medium',
+                    'description': f"La tarjeta bloqueada {chain['id']} frena trabajo de "
+                                   f"{len(chain['affected_teams'])} equipos ({chain['affected_hours']}h)",
+                    'blocking_teams': chain['teams'],
+                    'blocked_teams': chain['affected_teams'],
+                    'recommendation': 'Coordinar el desbloqueo entre los equipos implicados'
+                })
+            
+            result['critical_paths'] = {
+                project.id: dependencies.card_critical_path(project_id=project.id)
+                for project in projects if len(project.teams) > 1
+            }
         
-        return json.dumps(context, indent=2, default=str)
+        return result
     
-    async def _process_with_openai(self, prompt: str) -> str:
-        """Procesar con OpenAI"""
-        try:
-            response = await self.openai_client.chat.completions.create(
-                model="gpt-4-turbo-preview",
-                messages=[
-                    {"role": "system", "content": self.system_prompt},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.1,
-                max_tokens=3000
+    async def _prepare_global_context(self, teams: List[Team], projects: List[Project], 
+                                      cards: List[Card], users: List[User]) -> str:
+        """Preparar contexto global para la IA"""
+        return (await self._build_context(teams, projects, cards, users))['context']
+    
+    @traced('ai_director.build_context')
+    async def _build_context(self, teams: List[Team], projects: List[Project],
+                             cards: List[Card], users: List[User], delta: bool = False,
+                             delta_key: str = 'default') -> Dict[str, Any]:
+        """
+        Construir contexto completo o delta respecto al último análisis de `delta_key`.
+        Con executor, la serialización se hace en el pool de procesos sobre snapshots.
+        """
+        state = self._delta_states.get(delta_key) if delta else None
+        use_delta = state is not None
+        previous_digests, previous_summary = state if use_delta else (None, None)
+        
+        if self.analysis_executor:
+            # Los snapshots leen relaciones (miembros, equipos): fuera del event loop
+            with span('context.snapshot'):
+                snapshot = await asyncio.to_thread(
+                    lambda: (analysis_tasks.snapshot_teams(teams), analysis_tasks.snapshot_projects(projects),
+                             analysis_tasks.snapshot_cards(cards), analysis_tasks.snapshot_users(users))
+                )
+            with span('context.build_in_pool'):
+                built = await self.analysis_executor.run(
+                    analysis_tasks.build_context, *snapshot, self.context_builder.token_budget,
+                    previous_digests, previous_summary
+                )
+        else:
+            built = self.context_builder.build(
+                teams, projects, cards, users,
+                previous_digests=previous_digests,
+                previous_summary=previous_summary
             )
-            return response.choices[0].message.content
-        except Exception as e:
-            logger.error(f"Error con OpenAI: {e}")
-            return self._get_error_response(str(e))
+        built['delta'] = use_delta
+        return built
+    
+    def _card_store(self, cards: Union[List[Card], CardStore]) -> CardStore:
+        """
+        Tarjetas en columnas para los agregados. Quien encadena varios análisis
+        puede pasar el mismo CardStore (p. ej. OrgSnapshot.card_store) y
+        construirlo una sola vez
+        """
+        if isinstance(cards, CardStore):
+            return cards
+        with span('card_store.build'):
+            return CardStore.from_cards(cards)
     
-    async def _process_with_anthropic(self, prompt: str) -> str:
-        """Procesar con Anthropic"""
+    @traced('ai_director.offload')
+    async def _offload(self, func, *args):
+        """Ejecutar un análisis puro en el pool de procesos (o en un hilo si no hay executor)"""
+        if self.analysis_executor:
+            return await self.analysis_executor.run(func, *args)
+        return await asyncio.to_thread(func, *args)
+    
+    def _remember_analysis(self, delta_key: str, digests: Dict[str, str], result: Dict[str, Any]):
+        """Guardar el estado analizado como base del siguiente análisis delta de `delta_key`"""
+        if result.get('error'):
+            return
+        self._delta_states[delta_key] = (digests, result.get('analysis'))
+    
+    @traced('ai_director.llm_call')
+    async def _process_prompt(self, prompt: str, fallback=None) -> Dict[str, Any]:
+        """Procesar un prompt con la cadena de proveedores (OpenAI → Anthropic → simulación)"""
         try:
-            response = await self.anthropic_client.messages.create(
-                model="claude-3-sonnet-20240229",
-                max_tokens=3000,
-                temperature=0.1,
-                system=self.system_prompt,
-                messages=[{"role": "user", "content": prompt}]
-            )
-            return response.content[0].text
-        except Exception as e:
-            logger.error(f"Error con Anthropic: {e}")
-            return self._get_error_response(str(e))
+            return await self.providers.complete(self.system_prompt, prompt, fallback=fallback)
+        except AIProviderError as e:
+            return {
+                'content': self._get_error_response(str(e)),
+                'provider': 'error',
+                'model': self.providers.signature
+            }
     
+    @traced('ai_director.simulate')
     def _simulate_global_analysis(self, teams: List[Team], projects: List[Project], 
                                 cards: List[Card], users: List[User]) -> str:
         """Simulación de análisis global para desarrollo"""
@@ -412,6 +743,7 @@ REGLAS:
     def _get_error_response(self, error_message: str) -> str:
         """Respuesta de error estructurada"""
         return json.dumps({
+            "error": True,
             "analysis": f"Error en análisis: {error_message}",
             "insights": [],
             "risks": [{
@@ -430,10 +762,13 @@ REGLAS:
             "actions": []
         })
     
+    @traced('json.parse_response')
     def _parse_ai_response(self, response: str) -> Dict[str, Any]:
         """Parsear y validar respuesta de IA"""
         try:
             data = json.loads(response)
+            if not isinstance(data, dict):
+                raise ValueError(f"se esperaba un objeto JSON, no {type(data).__name__}")
             
             # Validar estructura básica
             required_fields = ['analysis', 'insights', 'risks', 'recommendations']
@@ -443,9 +778,11 @@ REGLAS:
             
             return data
             
-        except json.JSONDecodeError as e:
+        except (TypeError, ValueError) as e:
+            # JSONDecodeError es un ValueError; `error` evita cachear la respuesta
             logger.error(f"Error parseando respuesta de IA: {e}")
             return {
+                "error": True,
                 "analysis": "Error parseando respuesta de IA",
                 "insights": [],
                 "risks": [],
@@ -453,6 +790,17 @@ REGLAS:
                 "actions": []
             }
     
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Estadísticas del cache de respuestas de IA"""
+        if not self.response_cache:
+            return {"enabled": False}
+        return {"enabled": True, **self.response_cache.get_stats()}
+    
+    async def close(self):
+        """Cerrar conexiones con los proveedores de IA"""
+        if self.providers:
+            await self.providers.close()
+    
     def get_available_providers(self) -> Dict[str, bool]:
         """Obtener proveedores de IA disponibles"""
         return {
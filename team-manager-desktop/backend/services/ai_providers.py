@@ -0,0 +1,418 @@
+"""
+🔌 Proveedores de IA
+Capa asíncrona sobre OpenAI/Anthropic con límites de concurrencia,
+timeouts, peticiones con cobertura (hedging) y fallback entre proveedores
+"""
+
+import asyncio
+import logging
+import os
+import time
+from typing import Dict, Any, List, Optional, Callable, Awaitable, AsyncIterator
+
+from services.metrics import record_llm_call, record_llm_tokens
+from services.profiling import span, current_profile
+
+logger = logging.getLogger(__name__)
+
+# Estimación de tokens cuando la API no los informa (streaming de OpenAI), como en ContextBuilder
+CHARS_PER_TOKEN = 4.0
+
+class AIProviderError(Exception):
+    """Error al completar una petición con un proveedor de IA"""
+
+async def _close_sdk_stream(stream):
+    """Cerrar la respuesta HTTP de un stream de los SDK (close() en versiones recientes, response antes)"""
+    close = getattr(stream, 'close', None)
+    if close is None:
+        close = getattr(getattr(stream, 'response', None), 'aclose', None)
+    if close is not None:
+        await close()
+
+class AIProvider:
+    """
+    Proveedor de IA asíncrono.
+
+    Cada proveedor mantiene un único cliente (y su pool de conexiones HTTP)
+    durante toda la vida del backend y limita sus peticiones concurrentes.
+    """
+
+    name = "base"
+
+    def __init__(self, model: str, max_concurrency: int = 4, timeout: float = 60.0):
+        self.model = model
+        self.timeout = timeout
+        self.max_concurrency = max_concurrency
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def complete(self,
+                       system_prompt: str,
+                       prompt: str,
+                       max_tokens: int = 3000,
+                       temperature: float = 0.1) -> str:
+        """Completar un prompt respetando el límite de concurrencia y el timeout"""
+        async with self._semaphore:
+            started = time.perf_counter()
+            outcome = 'error'
+            try:
+                with span(f'llm.{self.name}.complete'):
+                    result = await asyncio.wait_for(
+                        self._complete(system_prompt, prompt, max_tokens, temperature),
+                        timeout=self.timeout
+                    )
+                outcome = 'ok'
+                return result
+            except asyncio.TimeoutError as e:
+                outcome = 'timeout'
+                raise AIProviderError(f"{self.name}: timeout tras {self.timeout}s") from e
+            except asyncio.CancelledError:
+                # Petición perdedora de un hedging
+                outcome = 'cancelled'
+                raise
+            except AIProviderError:
+                raise
+            except Exception as e:
+                raise AIProviderError(f"{self.name}: {e}") from e
+            finally:
+                record_llm_call(self.name, 'complete', outcome, time.perf_counter() - started)
+
+    async def stream(self,
+                     system_prompt: str,
+                     prompt: str,
+                     max_tokens: int = 3000,
+                     temperature: float = 0.1) -> AsyncIterator[str]:
+        """Completar un prompt devolviendo los fragmentos de texto según llegan"""
+        loop = asyncio.get_running_loop()
+
+        async with self._semaphore:
+            started = time.perf_counter()
+            outcome = 'cancelled'
+            first_chunk = None
+            deadline = loop.time() + self.timeout
+            chunks = self._stream(system_prompt, prompt, max_tokens, temperature).__aiter__()
+            try:
+                while True:
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        raise asyncio.TimeoutError()
+                    try:
+                        chunk = await asyncio.wait_for(chunks.__anext__(), timeout=remaining)
+                    except StopAsyncIteration:
+                        break
+                    if first_chunk is None:
+                        first_chunk = time.perf_counter()
+                    yield chunk
+                outcome = 'ok'
+            except asyncio.TimeoutError as e:
+                outcome = 'timeout'
+                raise AIProviderError(f"{self.name}: timeout tras {self.timeout}s") from e
+            except AIProviderError:
+                outcome = 'error'
+                raise
+            except Exception as e:
+                outcome = 'error'
+                raise AIProviderError(f"{self.name}: {e}") from e
+            finally:
+                # Si el consumidor para antes (SSE desconectado, perdedor de un hedging), cerrar
+                # el generador del proveedor libera su respuesta HTTP en lugar de dejarla abierta
+                aclose = getattr(chunks, 'aclose', None)
+                if aclose is not None:
+                    try:
+                        await aclose()
+                    except Exception as e:
+                        logger.debug(f"Error cerrando el stream de {self.name}: {e}")
+                record_llm_call(self.name, 'stream', outcome, time.perf_counter() - started)
+                profile = current_profile()
+                if profile is not None:
+                    if first_chunk is not None:
+                        profile.add_span(f'llm.{self.name}.first_chunk', started, first_chunk)
+                    profile.add_span(f'llm.{self.name}.stream', started, time.perf_counter())
+
+    async def _complete(self, system_prompt: str, prompt: str, max_tokens: int, temperature: float) -> str:
+        raise NotImplementedError
+
+    def _stream(self, system_prompt: str, prompt: str, max_tokens: int, temperature: float) -> AsyncIterator[str]:
+        raise NotImplementedError
+
+    async def close(self):
+        """Liberar conexiones del cliente"""
+
+class OpenAIProvider(AIProvider):
+    """Proveedor OpenAI sobre el cliente asíncrono"""
+
+    name = "openai"
+
+    def __init__(self, api_key: str, model: str, base_url: Optional[str] = None, **kwargs):
+        super().__init__(model, **kwargs)
+        import openai
+
+        # Los reintentos y timeouts los gestiona esta capa
+        self.client = openai.AsyncOpenAI(api_key=api_key, base_url=base_url, max_retries=0)
+
+    async def _complete(self, system_prompt: str, prompt: str, max_tokens: int, temperature: float) -> str:
+        response = await self.client.chat.completions.create(
+            model=self.model,
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": prompt}
+            ],
+            temperature=temperature,
+            max_tokens=max_tokens
+        )
+        if response.usage:
+            record_llm_tokens(self.name, response.usage.prompt_tokens, response.usage.completion_tokens)
+        return response.choices[0].message.content
+
+    async def _stream(self, system_prompt: str, prompt: str, max_tokens: int, temperature: float) -> AsyncIterator[str]:
+        stream = await self.client.chat.completions.create(
+            model=self.model,
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": prompt}
+            ],
+            temperature=temperature,
+            max_tokens=max_tokens,
+            stream=True
+        )
+        # El streaming no informa del uso: se estima por caracteres
+        generated = 0
+        try:
+            async for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    generated += len(chunk.choices[0].delta.content)
+                    yield chunk.choices[0].delta.content
+        finally:
+            record_llm_tokens(self.name, int((len(system_prompt) + len(prompt)) / CHARS_PER_TOKEN),
+                              int(generated / CHARS_PER_TOKEN))
+            await _close_sdk_stream(stream)
+
+    async def close(self):
+        await self.client.close()
+
+class AnthropicProvider(AIProvider):
+    """Proveedor Anthropic sobre el cliente asíncrono"""
+
+    name = "anthropic"
+
+    def __init__(self, api_key: str, model: str, base_url: Optional[str] = None, **kwargs):
+        super().__init__(model, **kwargs)
+        from anthropic import AsyncAnthropic
+
+        self.client = AsyncAnthropic(api_key=api_key, base_url=base_url, max_retries=0)
+
+    async def _complete(self, system_prompt: str, prompt: str, max_tokens: int, temperature: float) -> str:
+        response = await self.client.messages.create(
+            model=self.model,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            system=system_prompt,
+            messages=[{"role": "user", "content": prompt}]
+        )
+        record_llm_tokens(self.name, response.usage.input_tokens, response.usage.output_tokens)
+        return response.content[0].text
+
+    async def _stream(self, system_prompt: str, prompt: str, max_tokens: int, temperature: float) -> AsyncIterator[str]:
+        stream = await self.client.messages.create(
+            model=self.model,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            system=system_prompt,
+            messages=[{"role": "user", "content": prompt}],
+            stream=True
+        )
+        # El uso llega en message_start (entrada) y message_delta (salida)
+        input_tokens = output_tokens = 0
+        try:
+            async for event in stream:
+                if event.type == 'content_block_delta' and getattr(event.delta, 'text', None):
+                    yield event.delta.text
+                elif event.type == 'message_start':
+                    input_tokens = event.message.usage.input_tokens
+                elif event.type == 'message_delta' and getattr(event, 'usage', None):
+                    output_tokens = event.usage.output_tokens
+        finally:
+            record_llm_tokens(self.name, input_tokens, output_tokens)
+            await _close_sdk_stream(stream)
+
+    async def close(self):
+        await self.client.close()
+
+class ProviderRouter:
+    """
+    Enrutador de peticiones entre proveedores.
+
+    - Fallback: prueba los proveedores en orden y, si todos fallan, usa la simulación
+    - Hedging: si el primario no responde en `hedge_delay` segundos, lanza la misma
+      petición al siguiente proveedor y se queda con la primera respuesta válida
+    """
+
+    def __init__(self, providers: List[AIProvider], hedge_delay: Optional[float] = None):
+        self.providers = providers
+        self.hedge_delay = hedge_delay
+
+    def get(self, name: str) -> Optional[AIProvider]:
+        return next((p for p in self.providers if p.name == name), None)
+
+    @property
+    def signature(self) -> str:
+        """Identificador de la cadena de proveedores/modelos (para claves de cache)"""
+        return "|".join(f"{p.name}:{p.model}" for p in self.providers) or "simulation"
+
+    async def complete(self,
+                       system_prompt: str,
+                       prompt: str,
+                       fallback: Optional[Callable[[], str]] = None,
+                       **kwargs) -> Dict[str, Any]:
+        """
+        Completar un prompt con el primer proveedor disponible.
+
+        Devuelve {'content', 'provider', 'model', 'latency_ms'}.
+        """
+        start = time.perf_counter()
+        errors = []
+
+        if self.hedge_delay is not None and len(self.providers) > 1:
+            result = await self._complete_hedged(system_prompt, prompt, errors, **kwargs)
+        else:
+            result = await self._complete_sequential(system_prompt, prompt, errors, **kwargs)
+
+        if result is None:
+            for error in errors:
+                logger.error(f"Error con proveedor de IA: {error}")
+
+            if fallback is None:
+                raise AIProviderError("; ".join(str(e) for e in errors) or "No hay proveedores de IA configurados")
+
+            logger.warning("⚠️ Proveedores de IA no disponibles, usando modo simulación")
+            result = {'content': fallback(), 'provider': 'simulation', 'model': 'simulation'}
+
+        result['latency_ms'] = round((time.perf_counter() - start) * 1000, 1)
+        return result
+
+    async def _complete_sequential(self, system_prompt: str, prompt: str,
+                                   errors: List[Exception], **kwargs) -> Optional[Dict[str, Any]]:
+        for provider in self.providers:
+            try:
+                content = await provider.complete(system_prompt, prompt, **kwargs)
+                return {'content': content, 'provider': provider.name, 'model': provider.model}
+            except AIProviderError as e:
+                errors.append(e)
+        return None
+
+    async def _complete_hedged(self, system_prompt: str, prompt: str,
+                               errors: List[Exception], **kwargs) -> Optional[Dict[str, Any]]:
+        pending = {}
+        queue = list(self.providers)
+
+        def launch():
+            provider = queue.pop(0)
+            task = asyncio.ensure_future(provider.complete(system_prompt, prompt, **kwargs))
+            pending[task] = provider
+
+        launch()
+        try:
+            while pending:
+                # Esperar al primero que termine; si tarda, lanzar la cobertura
+                timeout = self.hedge_delay if queue else None
+                done, _ = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+
+                if not done:
+                    launch()
+                    continue
+
+                for task in done:
+                    provider = pending.pop(task)
+                    try:
+                        content = task.result()
+                        return {'content': content, 'provider': provider.name, 'model': provider.model}
+                    except AIProviderError as e:
+                        errors.append(e)
+
+                # Todos los lanzados fallaron: pasar al siguiente sin esperar
+                if not pending and queue:
+                    launch()
+            return None
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def stream(self,
+                     system_prompt: str,
+                     prompt: str,
+                     fallback: Optional[Callable[[], str]] = None,
+                     **kwargs) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Completar un prompt en streaming. Produce {'delta', 'provider', 'model'}.
+
+        El fallback entre proveedores solo es posible antes del primer fragmento;
+        un error a mitad de respuesta se propaga como AIProviderError.
+        """
+        errors = []
+
+        for provider in self.providers:
+            started = False
+            try:
+                async for delta in provider.stream(system_prompt, prompt, **kwargs):
+                    started = True
+                    yield {'delta': delta, 'provider': provider.name, 'model': provider.model}
+                if started:
+                    return
+            except AIProviderError as e:
+                if started:
+                    raise
+                errors.append(e)
+
+        for error in errors:
+            logger.error(f"Error con proveedor de IA: {error}")
+
+        if fallback is None:
+            raise AIProviderError("; ".join(str(e) for e in errors) or "No hay proveedores de IA configurados")
+
+        logger.warning("⚠️ Proveedores de IA no disponibles, usando modo simulación")
+        yield {'delta': fallback(), 'provider': 'simulation', 'model': 'simulation'}
+
+    async def gather(self, calls: List[Callable[[], Awaitable[Any]]]) -> List[Any]:
+        """
+        Ejecutar varias peticiones (p. ej. análisis por equipo) concurrentemente.
+        La concurrencia real la acota el semáforo de cada proveedor.
+        """
+        return await asyncio.gather(*(call() for call in calls))
+
+    async def close(self):
+        for provider in self.providers:
+            try:
+                await provider.close()
+            except Exception as e:
+                logger.warning(f"Error cerrando proveedor {provider.name}: {e}")
+
+def build_providers_from_env(openai_model: str, anthropic_model: str) -> ProviderRouter:
+    """Construir los proveedores configurados por variables de entorno"""
+    timeout = float(os.getenv('AI_PROVIDER_TIMEOUT', 60))
+    hedge_delay = os.getenv('AI_HEDGE_DELAY')
+    providers: List[AIProvider] = []
+
+    # OpenAI
+    openai_key = os.getenv('OPENAI_API_KEY')
+    if openai_key:
+        providers.append(OpenAIProvider(
+            openai_key,
+            openai_model,
+            base_url=os.getenv('OPENAI_BASE_URL'),
+            max_concurrency=int(os.getenv('OPENAI_MAX_CONCURRENCY', 4)),
+            timeout=timeout
+        ))
+        logger.info("✅ Cliente OpenAI configurado")
+
+    # Anthropic
+    anthropic_key = os.getenv('ANTHROPIC_API_KEY')
+    if anthropic_key:
+        providers.append(AnthropicProvider(
+            anthropic_key,
+            anthropic_model,
+            base_url=os.getenv('ANTHROPIC_BASE_URL'),
+            max_concurrency=int(os.getenv('ANTHROPIC_MAX_CONCURRENCY', 4)),
+            timeout=timeout
+        ))
+        logger.info("✅ Cliente Anthropic configurado")
+
+    return ProviderRouter(providers, hedge_delay=float(hedge_delay) if hedge_delay else None)
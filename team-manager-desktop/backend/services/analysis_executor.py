@@ -0,0 +1,128 @@
+"""
+🏭 Ejecutor de Análisis
+Pool de procesos para los análisis pesados en CPU, con límite de concurrencia, timeouts y cancelación
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import os
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Any, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+class AnalysisTimeoutError(TimeoutError):
+    """El análisis superó su tiempo máximo y se ha detenido"""
+
+class AnalysisExecutor:
+    """
+    Ejecuta funciones puras (ver services/analysis_tasks.py) en procesos aparte
+    para que el event loop del único worker de uvicorn siga atendiendo peticiones.
+
+    - Los argumentos y el resultado se serializan con pickle: se pasan
+      snapshots compactos, nunca objetos ORM ni sesiones
+    - Como mucho `max_concurrent` análisis a la vez; el resto espera en el
+      event loop (donde cancelarlos no cuesta nada)
+    - Timeout por análisis. Un análisis en cola se cancela sin más; uno en
+      ejecución solo se puede detener terminando su proceso, así que se
+      recicla el pool y los demás análisis en curso se reintentan una vez
+    - El pool se crea en el primer uso (arranque rápido) con `spawn`, que no
+      hereda conexiones SQLite ni hilos del proceso principal
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, max_concurrent: Optional[int] = None,
+                 default_timeout: float = 120.0):
+        self.max_workers = max_workers or max(1, min(4, (os.cpu_count() or 2) - 1))
+        self.max_concurrent = max_concurrent or self.max_workers
+        self.default_timeout = default_timeout
+
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._semaphore = asyncio.Semaphore(self.max_concurrent)
+        self._running = 0
+        self._stats = {'submitted': 0, 'completed': 0, 'failed': 0, 'timeouts': 0, 'cancelled': 0, 'recycled': 0}
+
+    async def run(self, func: Callable, *args, timeout: Optional[float] = None) -> Any:
+        """Ejecutar func(*args) en el pool; lanza AnalysisTimeoutError si se pasa de tiempo"""
+        timeout = timeout or self.default_timeout
+        async with self._semaphore:
+            self._running += 1
+            try:
+                return await self._submit(func, args, timeout)
+            finally:
+                self._running -= 1
+
+    async def _submit(self, func: Callable, args: tuple, timeout: float) -> Any:
+        for attempt in range(2):
+            pool = self._ensure_pool()
+            future = pool.submit(func, *args)
+            self._stats['submitted'] += 1
+            try:
+                result = await asyncio.wait_for(asyncio.wrap_future(future), timeout)
+            except asyncio.TimeoutError:
+                self._stats['timeouts'] += 1
+                self._abort(future, pool)
+                logger.warning(f"⏱️ Análisis {getattr(func, '__name__', func)} detenido tras {timeout}s")
+                raise AnalysisTimeoutError(f"El análisis superó {timeout}s")
+            except asyncio.CancelledError:
+                self._stats['cancelled'] += 1
+                self._abort(future, pool)
+                raise
+            except BrokenProcessPool:
+                # Pool reciclado por el timeout de otro análisis: reintentar una vez
+                if attempt == 0 and pool is not self._pool:
+                    continue
+                self._stats['failed'] += 1
+                self._recycle(pool)
+                raise
+            except Exception:
+                self._stats['failed'] += 1
+                raise
+
+            self._stats['completed'] += 1
+            return result
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            'max_workers': self.max_workers,
+            'max_concurrent': self.max_concurrent,
+            'running': self._running,
+            'started': self._pool is not None,
+            **self._stats
+        }
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def _ensure_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context('spawn')
+            )
+        return self._pool
+
+    def _abort(self, future: Future, pool: ProcessPoolExecutor):
+        if future.cancel() or future.done():
+            return
+        self._recycle(pool)
+
+    def _recycle(self, pool: ProcessPoolExecutor):
+        """Terminar los procesos del pool; el siguiente análisis crea uno nuevo"""
+        if pool is not self._pool:
+            return
+        self._pool = None
+        self._stats['recycled'] += 1
+
+        # ProcessPoolExecutor no expone cómo parar una tarea en ejecución
+        terminate = getattr(pool, 'terminate_workers', None)
+        if terminate is not None:
+            terminate()
+            return
+        processes = list((getattr(pool, '_processes', None) or {}).values())
+        pool.shutdown(wait=False, cancel_futures=True)
+        for process in processes:
+            process.terminate()
@@ -0,0 +1,151 @@
+"""
+📡 Parser Incremental de Análisis
+Extrae insights, riesgos y recomendaciones de la respuesta JSON del LLM
+a medida que se completa cada elemento, sin esperar al documento entero
+"""
+
+import json
+import logging
+from typing import Dict, Any, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Arrays de primer nivel que se emiten elemento a elemento → tipo de evento
+STREAMED_FIELDS = {
+    'insights': 'insight',
+    'risks': 'risk',
+    'recommendations': 'recommendation',
+    'actions': 'action'
+}
+
+class IncrementalAnalysisParser:
+    """
+    Parser JSON incremental para el formato de respuesta del Director de IA.
+
+    Recorre el texto carácter a carácter una sola vez, manteniendo la pila de
+    contenedores abiertos. Cuando un elemento de `insights`, `risks`,
+    `recommendations` o `actions` se cierra, lo decodifica y lo devuelve como
+    evento. El texto previo al primer '{' (p. ej. un bloque ```json) se ignora.
+    """
+
+    def __init__(self):
+        self.text = ""
+        self._pos = 0
+        self._started = False
+        self._finished = False
+        self._document_start: Optional[int] = None
+        self._document_end: Optional[int] = None
+        self._stack: List[str] = []
+
+        self._in_string = False
+        self._escape = False
+        self._string_start = 0
+
+        self._expect_key = False
+        self._key: Optional[str] = None
+        self._capture_start: Optional[int] = None
+
+    def feed(self, chunk: str) -> List[Dict[str, Any]]:
+        """Añadir un fragmento de texto y devolver los eventos completados"""
+        self.text += chunk
+        events: List[Dict[str, Any]] = []
+
+        text = self.text
+        while self._pos < len(text) and not self._finished:
+            i = self._pos
+            ch = text[i]
+            self._pos += 1
+
+            if not self._started:
+                if ch == '{':
+                    self._started = True
+                    self._document_start = i
+                    self._stack.append('{')
+                    self._expect_key = True
+                continue
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == '\\':
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    self._on_string_end(i, events)
+                continue
+
+            if ch in ' \t\r\n':
+                continue
+
+            depth = len(self._stack)
+
+            if ch == '"':
+                self._in_string = True
+                self._string_start = i
+                if depth == 1 and not self._expect_key and self._key == 'analysis':
+                    self._capture_start = i
+                elif self._in_streamed_array() and self._capture_start is None:
+                    self._capture_start = i
+            elif ch in '{[':
+                if self._in_streamed_array() and self._capture_start is None:
+                    self._capture_start = i
+                self._stack.append(ch)
+            elif ch in '}]':
+                if self._in_streamed_array() and self._capture_start is not None:
+                    # Escalar pendiente al cerrar el array: [1, 2]
+                    self._emit(text[self._capture_start:i], events)
+                self._stack.pop()
+                if not self._stack:
+                    self._finished = True
+                    self._document_end = i + 1
+                elif self._in_streamed_array() and self._capture_start is not None:
+                    self._emit(text[self._capture_start:i + 1], events)
+            elif ch == ',':
+                if depth == 1:
+                    self._expect_key = True
+                elif self._in_streamed_array() and self._capture_start is not None:
+                    self._emit(text[self._capture_start:i], events)
+            elif ch == ':':
+                if depth == 1:
+                    self._expect_key = False
+            elif self._in_streamed_array() and self._capture_start is None:
+                # Inicio de número / true / false / null
+                self._capture_start = i
+
+        return events
+
+    @property
+    def finished(self) -> bool:
+        """True cuando se ha cerrado el objeto raíz"""
+        return self._finished
+
+    @property
+    def document(self) -> str:
+        """El objeto JSON raíz, sin lo que lo rodea (```json ... ```); sin '{', el texto tal cual"""
+        if self._document_start is None:
+            return self.text
+        return self.text[self._document_start:self._document_end]
+
+    def _in_streamed_array(self) -> bool:
+        return len(self._stack) == 2 and self._stack[-1] == '[' and self._key in STREAMED_FIELDS
+
+    def _on_string_end(self, i: int, events: List[Dict[str, Any]]):
+        depth = len(self._stack)
+
+        if depth == 1 and self._expect_key:
+            self._key = json.loads(self.text[self._string_start:i + 1])
+        elif depth == 1 and self._capture_start is not None:
+            value = json.loads(self.text[self._capture_start:i + 1])
+            self._capture_start = None
+            events.append({'type': 'analysis', 'data': value})
+        elif self._in_streamed_array() and self._capture_start is not None:
+            self._emit(self.text[self._capture_start:i + 1], events)
+
+    def _emit(self, raw: str, events: List[Dict[str, Any]]):
+        self._capture_start = None
+        try:
+            value = json.loads(raw)
+        except json.JSONDecodeError as e:
+            logger.warning(f"Elemento de análisis inválido en streaming: {e}")
+            return
+        events.append({'type': STREAMED_FIELDS[self._key], 'data': value})
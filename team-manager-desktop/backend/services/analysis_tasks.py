@@ -0,0 +1,137 @@
+"""
+🧪 Tareas de Análisis Aislables
+Snapshots compactos y serializables de los datos y funciones puras que se ejecutan en el pool de procesos
+"""
+
+import sys
+from collections import namedtuple
+from typing import Dict, Any, List, Optional, Tuple
+
+from services.card_store import CardStore
+from services.context_builder import ContextBuilder, ACTIVE_STATUSES
+
+# Formato de cada fila de snapshot. Viajan como tuplas planas (pickle de una
+# namedtuple es ~3 veces más lento) y se reconstruyen en el proceso hijo
+TeamSnapshot = namedtuple('TeamSnapshot', 'id name members wip_limits_dict')
+ProjectSnapshot = namedtuple('ProjectSnapshot', 'id name status priority teams progress start_date end_date')
+CardSnapshot = namedtuple('CardSnapshot', 'team_id project_id status assigned_to estimated_hours')
+UserSnapshot = namedtuple('UserSnapshot', 'id capacity')
+
+def compact(value: Any) -> Any:
+    """
+    Internar cadenas repetidas (ids de equipo, estados...): al ser el mismo
+    objeto, pickle las escribe una vez y el resto son referencias
+    """
+    return sys.intern(value) if isinstance(value, str) else value
+
+def snapshot_teams(teams) -> List[tuple]:
+    return [
+        (team.id, team.name, tuple(compact(member.id) for member in team.members), team.wip_limits_dict)
+        for team in teams
+    ]
+
+def snapshot_projects(projects) -> List[tuple]:
+    return [
+        (project.id, project.name, compact(project.status), compact(project.priority),
+         tuple(compact(team.id) for team in project.teams), project.progress,
+         project.start_date, project.end_date)
+        for project in projects
+    ]
+
+def snapshot_cards(cards) -> List[tuple]:
+    return [
+        (compact(card.team_id), compact(card.project_id), compact(card.status),
+         compact(card.assigned_to), card.estimated_hours)
+        for card in cards
+    ]
+
+def snapshot_users(users) -> List[tuple]:
+    return [(user.id, user.capacity) for user in users]
+
+def build_context(teams: List[tuple], projects: List[tuple], cards: List[tuple], users: List[tuple],
+                  token_budget: int, previous_digests: Optional[Dict[str, str]] = None,
+                  previous_summary: Optional[str] = None) -> Dict[str, Any]:
+    """ContextBuilder.build sobre snapshots"""
+    return ContextBuilder(token_budget=token_budget).build(
+        list(map(TeamSnapshot._make, teams)),
+        list(map(ProjectSnapshot._make, projects)),
+        list(map(CardSnapshot._make, cards)),
+        users,
+        previous_digests=previous_digests,
+        previous_summary=previous_summary
+    )
+
+def detect_bottlenecks(teams: List[Tuple[str, str]], store: CardStore) -> List[Dict[str, Any]]:
+    """Acumulación de tarjetas en revisión o bloqueadas por equipo (teams: pares id, nombre)"""
+    status_counts = store.count_by('team', 'status')
+    team_codes, status_codes = store.categories['team'], store.categories['status']
+    review, blocked = status_codes.code('review'), status_codes.code('blocked')
+
+    bottlenecks = []
+    for team_id, name in teams:
+        code = team_codes.code(team_id)
+        if code < 0:
+            continue
+        in_review, in_blocked = int(status_counts[code, review]), int(status_counts[code, blocked])
+
+        if in_review > 5:
+            bottlenecks.append({
+                'type': 'review_bottleneck',
+                'team_id': team_id,
+                'severity': 'high',
+                'description': f'Equipo {name} tiene {in_review} tarjetas en revisión',
+                'recommendation': 'Aumentar capacidad de revisión o revisar criterios'
+            })
+
+        if in_blocked > 2:
+            bottlenecks.append({
+                'type': 'blocked_cards',
+                'team_id': team_id,
+                'severity': 'critical',
+                'description': f'Equipo {name} tiene {in_blocked} tarjetas bloqueadas',
+                'recommendation': 'Resolver bloqueos inmediatamente'
+            })
+
+    return bottlenecks
+
+def analyze_workload(users: List[tuple], store: CardStore) -> Dict[str, Dict[str, Any]]:
+    """Carga semanal por usuario según las horas estimadas de sus tarjetas activas"""
+    active = store.mask(status=ACTIVE_STATUSES)
+    hours = store.sum_by('assignee', mask=active)
+    counts = store.count_by('assignee', mask=active)
+    assignee_codes = store.categories['assignee']
+
+    workload = {}
+    for user_id, daily_capacity in users:
+        code = assignee_codes.code(user_id)
+        current_load = float(hours[code]) if code >= 0 else 0.0
+        capacity = (daily_capacity or 0) * 5  # Capacidad semanal
+        workload[user_id] = {
+            'current_load': current_load,
+            'capacity': capacity,
+            'utilization': current_load / capacity if capacity > 0 else 0,
+            'cards_count': int(counts[code]) if code >= 0 else 0
+        }
+    return workload
+
+def team_progress(projects: List[Tuple[str, Tuple[str, ...]]], store: CardStore) -> Dict[str, Dict[str, float]]:
+    """Fracción de tarjetas terminadas de cada equipo en cada proyecto (projects: pares id, equipos)"""
+    totals = store.count_by('project', 'team')
+    done = store.count_by('project', 'team', mask=store.mask(status=('done',)))
+    project_codes, team_codes = store.categories['project'], store.categories['team']
+
+    progress = {}
+    for project_id, team_ids in projects:
+        project_code = project_codes.code(project_id)
+        progress[project_id] = {}
+        for team_id in team_ids:
+            team_code = team_codes.code(team_id)
+            total = int(totals[project_code, team_code]) if project_code >= 0 and team_code >= 0 else 0
+            progress[project_id][team_id] = float(done[project_code, team_code]) / total if total > 0 else 0
+    return progress
+
+def solve_workload(options: Dict[str, Any], snapshot: Dict[str, Any]) -> Dict[str, Any]:
+    """WorkloadOptimizer.solve sobre el snapshot de `load` (NumPy/SciPy solo en el proceso hijo)"""
+    from services.workload_optimizer import WorkloadOptimizer
+
+    return WorkloadOptimizer(**options).solve(snapshot)
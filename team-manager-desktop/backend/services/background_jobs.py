@@ -0,0 +1,221 @@
+"""
+🗓️ Tareas en Segundo Plano
+Análisis de IA, guardado de riesgos, instantáneas de carga y copias de seguridad que ejecuta el planificador
+"""
+
+import asyncio
+import logging
+import sqlite3
+import uuid
+from datetime import date, datetime, time, timedelta
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple
+
+from sqlalchemy import select, func
+from sqlalchemy.orm import Session
+
+from models.database import (
+    Card, User, Risk, AIInsight, TimeEntry, UserAvailability, WorkloadData, team_members
+)
+from services.context_builder import ACTIVE_STATUSES
+from services.org_snapshot import OrgSnapshotCache
+
+logger = logging.getLogger(__name__)
+
+RISK_FIELDS = ('description', 'severity', 'probability', 'impact', 'category', 'mitigation')
+
+async def run_ai_analysis(session_factory, ai_director, snapshots: OrgSnapshotCache) -> Dict[str, int]:
+    """Análisis global incremental (delta) y guardado de insights y riesgos"""
+    snapshot = await snapshots.aget()
+    if not snapshot.teams:
+        return {'insights': 0, 'risks_created': 0, 'risks_updated': 0}
+
+    result = await ai_director.analyze_global_state(
+        snapshot.teams, snapshot.projects, snapshot.open_cards, snapshot.users,
+        delta=True, delta_key='scheduler'
+    )
+    with session_factory() as session:
+        stats = await asyncio.to_thread(save_analysis, session, result)
+
+    logger.info(f"🧠 Análisis programado: {stats}")
+    return stats
+
+def save_analysis(session: Session, result: Dict[str, Any]) -> Dict[str, int]:
+    """
+    Guardar los insights (sin repetir los de las últimas 24 h) y actualizar
+    los riesgos abiertos con el mismo título en lugar de duplicarlos.
+    """
+    since = datetime.now() - timedelta(hours=24)
+    recent = set(session.execute(
+        select(AIInsight.title, AIInsight.description).where(AIInsight.created_at >= since)
+    ).all())
+
+    insights = 0
+    for item in result.get('insights', []):
+        key = (item.get('title'), item.get('description'))
+        if not all(key) or key in recent:
+            continue
+        insight = AIInsight(
+            id=str(uuid.uuid4()),
+            insight_type=item.get('type', 'info'),
+            title=key[0],
+            description=key[1],
+            severity=item.get('severity', 'info'),
+            confidence=float(item.get('confidence', 0.5))
+        )
+        insight.recommendations_list = item.get('recommendations', [])
+        insight.affected_teams_list = item.get('affected_teams', [])
+        insight.affected_projects_list = item.get('affected_projects', [])
+        insight.affected_users_list = item.get('affected_users', [])
+        session.add(insight)
+        recent.add(key)
+        insights += 1
+
+    created, updated = upsert_risks(session, result.get('risks', []))
+    session.commit()
+    return {'insights': insights, 'risks_created': created, 'risks_updated': updated}
+
+def upsert_risks(session: Session, risks: List[Dict[str, Any]]) -> Tuple[int, int]:
+    """Crear riesgos nuevos o actualizar el abierto con el mismo título (sin commit)"""
+    open_risks = {
+        risk.title: risk for risk in session.query(Risk).filter(Risk.status != 'resolved')
+    }
+
+    created = updated = 0
+    for item in risks:
+        title = item.get('title')
+        if not title:
+            continue
+        values = {
+            'description': item.get('description', ''),
+            'severity': item.get('severity', 'medium'),
+            'probability': float(item.get('probability', 0.5)),
+            'impact': float(item.get('impact', 0.5)),
+            'category': item.get('category', 'technical'),
+            'mitigation': item.get('mitigation')
+        }
+
+        risk = open_risks.get(title)
+        if risk is None:
+            risk = Risk(id=str(uuid.uuid4()), title=title, **values)
+            risk.affected_teams_list = item.get('affected_teams', [])
+            risk.affected_projects_list = item.get('affected_projects', [])
+            session.add(risk)
+            open_risks[title] = risk
+            created += 1
+            continue
+
+        changed = False
+        for field in RISK_FIELDS:
+            if values[field] is not None and getattr(risk, field) != values[field]:
+                setattr(risk, field, values[field])
+                changed = True
+        for field in ('affected_teams', 'affected_projects'):
+            value = item.get(field)
+            if value is not None and getattr(risk, f'{field}_list') != value:
+                setattr(risk, f'{field}_list', value)
+                changed = True
+        updated += changed
+
+    return created, updated
+
+def resolve_risks(session: Session, titles: List[str], resolved_at: Optional[datetime] = None) -> int:
+    """Marcar como resueltos los riesgos abiertos con esos títulos (sin commit)"""
+    resolved = 0
+    for start in range(0, len(titles), 500):
+        for risk in session.query(Risk).filter(Risk.title.in_(titles[start:start + 500]), Risk.status != 'resolved'):
+            risk.status = 'resolved'
+            risk.resolved_at = resolved_at or datetime.now()
+            resolved += 1
+    return resolved
+
+def snapshot_workload(session_factory, day: Optional[date] = None) -> int:
+    """
+    Instantánea diaria de carga por miembro y equipo en workload_data.
+
+    Se puede repetir a lo largo del día: actualiza la fila del día. Al pasar
+    por el ORM, los agregados de carga se enteran del día modificado.
+    """
+    day = day or date.today()
+    start = datetime.combine(day, time.min)
+    end = start + timedelta(days=1)
+
+    with session_factory() as session:
+        members = session.execute(
+            select(team_members.c.team_id, team_members.c.user_id, team_members.c.capacity, User.capacity)
+            .join(User, User.id == team_members.c.user_id)
+            .where(team_members.c.is_active == True, User.is_active == True)  # noqa: E712
+        ).all()
+        if not members:
+            return 0
+
+        availability = dict(session.execute(
+            select(UserAvailability.user_id, func.sum(UserAvailability.hours))
+            .where(UserAvailability.date >= start, UserAvailability.date < end)
+            .group_by(UserAvailability.user_id)
+        ).all())
+        logged = {
+            (team_id, user_id): hours for team_id, user_id, hours in session.execute(
+                select(Card.team_id, TimeEntry.user_id, func.sum(TimeEntry.hours))
+                .join(Card, Card.id == TimeEntry.card_id)
+                .where(TimeEntry.date >= start, TimeEntry.date < end)
+                .group_by(Card.team_id, TimeEntry.user_id)
+            )
+        }
+        # Trabajo comprometido: horas estimadas restantes de las tarjetas activas
+        remaining = func.max(func.coalesce(Card.estimated_hours, 0) - func.coalesce(Card.actual_hours, 0), 0)
+        planned = {
+            (team_id, user_id): hours for team_id, user_id, hours in session.execute(
+                select(Card.team_id, Card.assigned_to, func.sum(remaining))
+                .where(Card.status.in_(ACTIVE_STATUSES), Card.assigned_to.isnot(None))
+                .group_by(Card.team_id, Card.assigned_to)
+            )
+        }
+        existing = {
+            (row.team_id, row.user_id): row
+            for row in session.query(WorkloadData).filter(WorkloadData.date == start)
+        }
+
+        for team_id, user_id, team_capacity, user_capacity in members:
+            capacity = team_capacity or user_capacity or 8.0
+            if user_id in availability:
+                capacity = min(capacity, availability[user_id])
+            actual = logged.get((team_id, user_id), 0.0)
+
+            row = existing.get((team_id, user_id))
+            if row is None:
+                row = WorkloadData(id=str(uuid.uuid4()), team_id=team_id, user_id=user_id, date=start)
+                session.add(row)
+            row.capacity = capacity
+            row.actual_hours = actual
+            row.planned_hours = planned.get((team_id, user_id), 0.0)
+            row.utilization = round(actual / capacity, 4) if capacity else 0.0
+            row.overloaded = actual > capacity
+
+        session.commit()
+    return len(members)
+
+def backup_database(db_path: Path, backup_dir: Path, keep: int = 7) -> Dict[str, Any]:
+    """
+    Copia en caliente con la API de backup de SQLite, por bloques para no
+    bloquear a los escritores, conservando las `keep` más recientes.
+    """
+    db_path, backup_dir = Path(db_path), Path(backup_dir)
+    backup_dir.mkdir(parents=True, exist_ok=True)
+    target = backup_dir / f"{db_path.stem}-{datetime.now():%Y%m%d-%H%M%S}.db"
+
+    source = sqlite3.connect(str(db_path))
+    destination = sqlite3.connect(str(target))
+    try:
+        source.backup(destination, pages=1024)
+    finally:
+        destination.close()
+        source.close()
+
+    backups = sorted(backup_dir.glob(f"{db_path.stem}-*.db"))
+    removed = backups[:-keep] if keep > 0 else []
+    for old in removed:
+        old.unlink()
+
+    logger.info(f"💾 Copia de seguridad creada: {target.name}")
+    return {'path': str(target), 'size': target.stat().st_size, 'removed': len(removed)}
@@ -0,0 +1,86 @@
+"""
+🗂️ Lectura de Tableros
+Carga un tablero con sus columnas, tarjetas y responsables en un número
+constante de consultas y lo devuelve como diccionarios planos
+"""
+
+import json
+from typing import Dict, Any, List, Optional
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session, load_only, raiseload, selectinload
+
+from models.database import Board, Column, Card, User
+
+# Consultas de load_board: tablero + columnas + tarjetas + responsables
+BOARD_QUERY_BUDGET = 4
+
+CARD_DTO_FIELDS = ('id', 'title', 'card_type', 'priority', 'status', 'column_id', 'position',
+                   'assigned_to', 'estimated_hours', 'story_points', 'blocked_reason', 'tags')
+
+def _board_query(board_id: str):
+    """
+    Plan de lectura del tablero.
+
+    Cada nivel se carga con selectinload (una consulta IN por nivel, sin
+    importar cuántas columnas o tarjetas haya) y raiseload('*') impide que
+    cualquier otra relación (comments, time_entries, team...) se cargue en
+    diferido al serializar.
+    """
+    return (
+        select(Board)
+        .where(Board.id == board_id)
+        .options(
+            load_only(Board.id, Board.name, Board.team_id, Board.project_id, Board.wip_limits),
+            selectinload(Board.columns)
+            .load_only(Column.id, Column.name, Column.column_type, Column.position, Column.wip_limit),
+            selectinload(Board.columns).selectinload(Column.cards)
+            .load_only(*[getattr(Card, field) for field in CARD_DTO_FIELDS]),
+            selectinload(Board.columns).selectinload(Column.cards).selectinload(Card.assignee)
+            .load_only(User.id, User.name, User.avatar),
+            raiseload('*')
+        )
+    )
+
+def _card_dto(card: Card) -> Dict[str, Any]:
+    dto = {field: getattr(card, field) for field in CARD_DTO_FIELDS if field != 'tags'}
+    dto['tags'] = card.tags_list
+    dto['assignee'] = (
+        {'id': card.assignee.id, 'name': card.assignee.name, 'avatar': card.assignee.avatar}
+        if card.assignee else None
+    )
+    return dto
+
+def _column_dto(column: Column) -> Dict[str, Any]:
+    cards: List[Dict[str, Any]] = [_card_dto(card) for card in column.cards]
+    return {
+        'id': column.id,
+        'name': column.name,
+        'column_type': column.column_type,
+        'position': column.position,
+        'wip_limit': column.wip_limit,
+        'card_count': len(cards),
+        'wip_exceeded': bool(column.wip_limit) and len(cards) > column.wip_limit,
+        'cards': cards
+    }
+
+def load_board(session: Session, board_id: str) -> Optional[Dict[str, Any]]:
+    """
+    Tablero completo listo para renderizar, o None si no existe.
+
+    Ejecuta como máximo BOARD_QUERY_BUDGET consultas. Devuelve diccionarios
+    desacoplados de la sesión (no objetos ORM), con columnas y tarjetas ya
+    ordenadas por posición.
+    """
+    board = session.execute(_board_query(board_id)).scalar_one_or_none()
+    if board is None:
+        return None
+
+    return {
+        'id': board.id,
+        'name': board.name,
+        'team_id': board.team_id,
+        'project_id': board.project_id,
+        'wip_limits': json.loads(board.wip_limits) if board.wip_limits else {},
+        'columns': [_column_dto(column) for column in board.columns]
+    }
@@ -0,0 +1,257 @@
+"""
+📦 Operaciones de Tarjetas por Lotes
+Crear, actualizar, mover y eliminar muchas tarjetas en una sola transacción
+"""
+
+import logging
+import uuid
+from collections import defaultdict
+from typing import Dict, Any, List, Optional, Set
+
+from sqlalchemy import select, func
+from sqlalchemy.orm import Session
+
+from models.database import Column, Card
+from services.ranking import complete_neighbours, rank_between, needs_rebalance
+
+logger = logging.getLogger(__name__)
+
+BATCH_OPERATIONS = ('create', 'update', 'move', 'delete')
+
+# Campos editables (las listas se guardan como JSON mediante sus propiedades). El
+# estado no: es el tipo de la columna y solo cambia con 'move'
+CARD_WRITABLE_FIELDS = {
+    'title', 'description', 'card_type', 'priority', 'team_id', 'project_id',
+    'assigned_to', 'estimated_hours', 'actual_hours', 'story_points', 'blocked_reason',
+    'started_at', 'completed_at'
+}
+CARD_LIST_FIELDS = {'tags': 'tags_list', 'acceptance_criteria': 'acceptance_criteria_list'}
+CARD_REQUIRED_FIELDS = ('title', 'team_id', 'project_id')
+
+class BatchError(Exception):
+    """Operación inválida dentro de un lote"""
+
+class CardBatchService:
+    """
+    Aplica un lote de operaciones sobre tarjetas de forma atómica.
+
+    - Todas las tarjetas y columnas referenciadas se cargan con una consulta
+      cada una; los vecinos de un movimiento se resuelven en memoria, de modo
+      que una operación ve el resultado de las anteriores del mismo lote
+    - Las inserciones y actualizaciones se envían en un único flush, que el
+      ORM agrupa en executemany por tabla (las claves primarias se generan
+      aquí) y que sigue pasando por los hooks de sincronización y del feed
+    - Los límites WIP se validan una vez por columna al final del lote
+    - Si alguna operación falla, no se confirma ninguna
+    """
+
+    def __init__(self, max_operations: int = 1000):
+        self.max_operations = max_operations
+
+    def apply(self, session: Session, operations: List[Dict[str, Any]],
+              enforce_wip: bool = True) -> Dict[str, Any]:
+        """
+        Aplicar el lote. Devuelve {'committed', 'results', 'rebalance_columns'},
+        con un resultado por operación en el mismo orden.
+        """
+        if len(operations) > self.max_operations:
+            raise BatchError(f"Máximo {self.max_operations} operaciones por lote")
+
+        cards, columns = self._preload(session, operations)
+        # Sus claves en la base de datos pueden estar desfasadas durante el lote
+        loaded = set(cards)
+        initial_counts = self._column_counts(session, columns.keys())
+        tails = self._column_tails(session, columns.keys())
+
+        results: List[Dict[str, Any]] = []
+        targets: Dict[str, List[int]] = defaultdict(list)  # columna → operaciones que le añaden tarjetas
+        rebalance: Set[str] = set()
+        failed = False
+
+        with session.no_autoflush:
+            for index, operation in enumerate(operations):
+                op = operation.get('op')
+                try:
+                    if op == 'create':
+                        card = self._create(session, operation, cards, columns, tails, rebalance, loaded)
+                        targets[card.column_id].append(index)
+                    elif op == 'update':
+                        card = self._card(cards, operation)
+                        self._assign(card, operation.get('data') or {})
+                    elif op == 'move':
+                        card = self._card(cards, operation)
+                        self._place(session, card, operation, cards, columns, tails, rebalance, loaded)
+                        targets[card.column_id].append(index)
+                    elif op == 'delete':
+                        card = self._card(cards, operation)
+                        session.delete(card)
+                        del cards[card.id]
+                    else:
+                        raise BatchError(f"Operación desconocida: {op}")
+                    results.append({'index': index, 'op': op, 'id': card.id, 'status': 'ok'})
+                except BatchError as e:
+                    failed = True
+                    results.append({'index': index, 'op': op, 'id': operation.get('id'),
+                                    'status': 'error', 'error': str(e)})
+
+        if not failed and enforce_wip:
+            session.flush()
+            failed = self._check_wip(session, columns, initial_counts, targets, results)
+
+        if failed:
+            session.rollback()
+            for result in results:
+                if result['status'] == 'ok':
+                    result['status'] = 'skipped'
+            return {'committed': False, 'results': results, 'rebalance_columns': []}
+
+        session.commit()
+        logger.info(f"📦 Lote de {len(operations)} operaciones sobre tarjetas confirmado")
+        return {'committed': True, 'results': results, 'rebalance_columns': sorted(rebalance)}
+
+    def _preload(self, session: Session, operations: List[Dict[str, Any]]):
+        """Cargar en bloque las tarjetas y columnas que menciona el lote"""
+        card_ids = set()
+        column_ids = set()
+        for operation in operations:
+            for key in ('id', 'before_id', 'after_id'):
+                if operation.get(key):
+                    card_ids.add(operation[key])
+            if operation.get('column_id'):
+                column_ids.add(operation['column_id'])
+
+        cards = {
+            card.id: card
+            for card in session.execute(select(Card).where(Card.id.in_(card_ids))).scalars()
+        } if card_ids else {}
+
+        # También las columnas de origen, para el recuento WIP
+        column_ids.update(card.column_id for card in cards.values())
+        columns = {
+            column.id: column
+            for column in session.execute(select(Column).where(Column.id.in_(column_ids))).scalars()
+        } if column_ids else {}
+        return cards, columns
+
+    def _column_counts(self, session: Session, column_ids) -> Dict[str, int]:
+        column_ids = list(column_ids)
+        if not column_ids:
+            return {}
+        return dict(session.execute(
+            select(Card.column_id, func.count())
+            .where(Card.column_id.in_(column_ids))
+            .group_by(Card.column_id)
+        ).all())
+
+    def _column_tails(self, session: Session, column_ids) -> Dict[str, Optional[str]]:
+        """Clave de orden de la última tarjeta de cada columna"""
+        column_ids = list(column_ids)
+        if not column_ids:
+            return {}
+        return dict(session.execute(
+            select(Card.column_id, func.max(Card.position))
+            .where(Card.column_id.in_(column_ids))
+            .group_by(Card.column_id)
+        ).all())
+
+    def _card(self, cards: Dict[str, Card], operation: Dict[str, Any]) -> Card:
+        card = cards.get(operation.get('id'))
+        if card is None:
+            raise BatchError(f"Tarjeta {operation.get('id')} no encontrada")
+        return card
+
+    def _assign(self, card: Card, data: Dict[str, Any]):
+        if 'status' in data:
+            raise BatchError("El estado lo determina la columna: usa la operación 'move'")
+        unknown = set(data) - CARD_WRITABLE_FIELDS - set(CARD_LIST_FIELDS)
+        if unknown:
+            raise BatchError(f"Campos no permitidos: {', '.join(sorted(unknown))}")
+        for field, value in data.items():
+            setattr(card, CARD_LIST_FIELDS.get(field, field), value)
+
+    def _create(self, session: Session, operation: Dict[str, Any], cards: Dict[str, Card],
+                columns: Dict[str, Column], tails: Dict[str, Optional[str]], rebalance: Set[str],
+                loaded: Set[str]) -> Card:
+        data = operation.get('data') or {}
+        missing = [field for field in CARD_REQUIRED_FIELDS if not data.get(field)]
+        if missing:
+            raise BatchError(f"Campos obligatorios: {', '.join(missing)}")
+
+        card_id = operation.get('id') or str(uuid.uuid4())
+        if card_id in cards:
+            raise BatchError(f"La tarjeta {card_id} ya existe")
+
+        card = Card(id=card_id)
+        self._assign(card, data)
+        self._place(session, card, operation, cards, columns, tails, rebalance, loaded)
+        session.add(card)
+        cards[card.id] = card
+        return card
+
+    def _place(self, session: Session, card: Card, operation: Dict[str, Any], cards: Dict[str, Card],
+               columns: Dict[str, Column], tails: Dict[str, Optional[str]], rebalance: Set[str],
+               loaded: Set[str]):
+        """
+        Asignar columna, estado y clave de orden. Los vecinos indicados se
+        resuelven en memoria; si solo se indica uno, el otro es el hermano
+        adyacente, buscado en la base de datos sin las tarjetas cargadas en el
+        lote (`loaded`) y entre las claves que el lote aún no ha escrito.
+        """
+        column_id = operation.get('column_id')
+        if column_id not in columns:
+            raise BatchError(f"Columna {column_id} no encontrada")
+
+        def neighbour(key: str) -> Optional[str]:
+            neighbour_id = operation.get(key)
+            if neighbour_id is None:
+                return None
+            other = cards.get(neighbour_id)
+            if other is None or other.column_id != column_id or other.id == card.id:
+                raise BatchError(f"Vecino {neighbour_id} no válido en la columna {column_id}")
+            return other.position
+
+        before, after = neighbour('before_id'), neighbour('after_id')
+        if operation.get('before_id') is None and operation.get('after_id') is None:
+            before = tails.get(column_id)
+        else:
+            before, after = complete_neighbours(
+                session, Card, Card.column_id, column_id, before, after, exclude_ids=loaded,
+                pending=[other.position for other in cards.values()
+                         if other.column_id == column_id and other.id != card.id]
+            )
+
+        try:
+            position = rank_between(before, after)
+        except ValueError:
+            position = rank_between(before, None)
+            rebalance.add(column_id)
+
+        card.column_id = column_id
+        card.status = columns[column_id].column_type
+        card.position = position
+        if after is None and (tails.get(column_id) is None or position > tails[column_id]):
+            tails[column_id] = position
+        if needs_rebalance(position):
+            rebalance.add(column_id)
+
+    def _check_wip(self, session: Session, columns: Dict[str, Column], initial_counts: Dict[str, int],
+                   targets: Dict[str, List[int]], results: List[Dict[str, Any]]) -> bool:
+        """Una consulta de recuento para todas las columnas que reciben tarjetas"""
+        limited = [column_id for column_id in targets if columns[column_id].wip_limit]
+        if not limited:
+            return False
+
+        final_counts = self._column_counts(session, limited)
+        failed = False
+        for column_id in limited:
+            limit = columns[column_id].wip_limit
+            count = final_counts.get(column_id, 0)
+            # Solo se rechaza si el lote empeora la columna
+            if count > limit and count > initial_counts.get(column_id, 0):
+                failed = True
+                for index in targets[column_id]:
+                    results[index]['status'] = 'error'
+                    results[index]['error'] = (
+                        f"Límite WIP de '{columns[column_id].name}' excedido ({count}/{limit})"
+                    )
+        return failed
@@ -0,0 +1,392 @@
+"""
+⏱️ Historial de Estados de Tarjetas
+Transiciones de columna y estado en card_status_history, con el tiempo por columna, el envejecimiento
+del WIP y los tiempos de ciclo calculados al escribir y servidos desde consultas indexadas
+"""
+
+import logging
+import threading
+from collections import namedtuple
+from datetime import datetime, timedelta
+from typing import Dict, Any, List, Optional, Sequence
+
+from sqlalchemy import event, select, insert, update, delete, func, case, exists, inspect
+from sqlalchemy.orm import Session
+
+from models.database import Card, Column, CardStatusHistory, SyncSequence
+
+logger = logging.getLogger(__name__)
+
+# Estados con trabajo empezado: el primero marca started_at y el inicio del tiempo de ciclo
+STARTED_STATUSES = ('in_progress', 'review', 'blocked')
+PERCENTILES = (50, 85, 95)
+DAY_SECONDS = 86400.0
+
+# Cambio de columna o estado de una tarjeta (origen vacío = alta)
+Transition = namedtuple('Transition', 'card_id team_id project_id column_id status from_column_id from_status')
+
+def _percentiles(values: Sequence[Any]) -> Dict[str, Any]:
+    """Percentiles por rango más cercano de una lista ya ordenada"""
+    count = len(values)
+    return {f'p{p}': values[-(-p * count // 100) - 1] if count else None for p in PERCENTILES}
+
+def _days(seconds: Optional[float]) -> Optional[float]:
+    return round(seconds / DAY_SECONDS, 2) if seconds is not None else None
+
+def _stamp_dates(card: Card, now: datetime):
+    """started_at al empezar el trabajo; completed_at al terminar (y vacío si se reabre)"""
+    if card.status in STARTED_STATUSES and card.started_at is None:
+        card.started_at = now
+    if card.status == 'done':
+        if card.completed_at is None:
+            card.completed_at = now
+    elif card.completed_at is not None:
+        card.completed_at = None
+
+def record_transitions(connection, transitions: Sequence[Transition], at: datetime, chunk_size: int = 500) -> int:
+    """
+    Cerrar el tramo abierto de cada tarjeta y abrir el de su nueva columna/estado.
+
+    Se escribe con la conexión de la transacción que cambia las tarjetas, así
+    el historial se confirma o se deshace con ellas. El origen sale del tramo
+    abierto (el ORM no conoce el valor anterior de un atributo expirado) y las
+    transiciones que no cambian nada se descartan. La duración del tramo que
+    se cierra y el tiempo de ciclo de los que entran en done se calculan aquí,
+    una sola vez, y las lecturas solo los agregan.
+    """
+    history = CardStatusHistory.__table__
+    started = history.alias('started')
+    earliest = history.alias('earliest')
+    recorded = 0
+
+    for offset in range(0, len(transitions), chunk_size):
+        batch = transitions[offset:offset + chunk_size]
+        current = {
+            card_id: (column_id, status)
+            for card_id, column_id, status in connection.execute(
+                select(history.c.card_id, history.c.column_id, history.c.status)
+                .where(history.c.card_id.in_([transition.card_id for transition in batch]),
+                       history.c.exited_at.is_(None))
+            )
+        }
+        chunk = []
+        for transition in batch:
+            source = current.get(transition.card_id)
+            if source is not None:
+                if source == (transition.column_id, transition.status):
+                    continue
+                transition = transition._replace(from_column_id=source[0], from_status=source[1])
+            chunk.append(transition)
+        if not chunk:
+            continue
+        card_ids = [transition.card_id for transition in chunk]
+        recorded += len(chunk)
+
+        connection.execute(
+            update(history)
+            .where(history.c.card_id.in_(card_ids), history.c.exited_at.is_(None))
+            .values(exited_at=at,
+                    duration_seconds=(func.julianday(at) - func.julianday(history.c.entered_at)) * DAY_SECONDS)
+        )
+        connection.execute(insert(history), [{**transition._asdict(), 'entered_at': at} for transition in chunk])
+
+        # Ciclo: desde la primera entrada en un estado de trabajo (o, sin ella, desde la primera transición)
+        done = [transition.card_id for transition in chunk if transition.status == 'done']
+        if done:
+            first_start = (
+                select(func.min(started.c.entered_at))
+                .where(started.c.card_id == history.c.card_id, started.c.status.in_(STARTED_STATUSES))
+                .scalar_subquery()
+            )
+            first_entry = (
+                select(func.min(earliest.c.entered_at)).where(earliest.c.card_id == history.c.card_id)
+                .scalar_subquery()
+            )
+            connection.execute(
+                update(history)
+                .where(history.c.card_id.in_(done), history.c.status == 'done', history.c.exited_at.is_(None))
+                .values(cycle_seconds=(func.julianday(history.c.entered_at)
+                                       - func.julianday(func.coalesce(first_start, first_entry))) * DAY_SECONDS)
+            )
+    return recorded
+
+def remove_history(connection, card_ids: Sequence[str], chunk_size: int = 500):
+    """Borrar el historial de tarjetas eliminadas"""
+    history = CardStatusHistory.__table__
+    for offset in range(0, len(card_ids), chunk_size):
+        connection.execute(delete(history).where(history.c.card_id.in_(card_ids[offset:offset + chunk_size])))
+
+class CardHistoryService:
+    """
+    Historial de transiciones de las tarjetas y métricas de flujo.
+
+    Cada cambio de columna o estado cierra el tramo abierto de la tarjeta
+    (guardando su duración) y abre uno nuevo; las escrituras del ORM pasan por
+    install_hooks() y las masivas (importación markdown) por
+    record_transitions(). Las lecturas usan los índices de la tabla: el
+    historial de una tarjeta por card_id, el WIP de una columna por sus tramos
+    abiertos y los tiempos de ciclo por los tramos en done. El envejecimiento
+    se cachea por versión de cambios: entre dos cambios solo avanza el reloj.
+    """
+
+    def __init__(self, session_factory, chunk_size: int = 500):
+        self.session_factory = session_factory
+        self.chunk_size = chunk_size
+        self._aging: Dict[Any, Any] = {}
+        self._lock = threading.Lock()
+        self._stats = {'transitions': 0, 'backfilled': 0, 'aging_hits': 0, 'aging_loads': 0}
+
+    def install_hooks(self, target=Session):
+        """
+        Registrar las transiciones de las tarjetas en la misma transacción que
+        las cambia (en todas las sesiones, o solo en las de `target`)
+        """
+
+        @event.listens_for(target, 'before_flush')
+        def stamp_card_dates(session, flush_context, instances):
+            now = datetime.now()
+            for obj in session.new:
+                if isinstance(obj, Card):
+                    _stamp_dates(obj, now)
+            for obj in session.dirty:
+                if isinstance(obj, Card) and inspect(obj).attrs.status.history.has_changes():
+                    _stamp_dates(obj, now)
+
+            deleted = [obj.id for obj in session.deleted if isinstance(obj, Card)]
+            if deleted:
+                # Antes que la tarjeta, por la clave foránea
+                remove_history(session.connection(), deleted, self.chunk_size)
+
+        @event.listens_for(target, 'after_flush')
+        def record_card_transitions(session, flush_context):
+            transitions = [
+                Transition(obj.id, obj.team_id, obj.project_id, obj.column_id, obj.status, None, None)
+                for obj in session.new if isinstance(obj, Card)
+            ]
+            for obj in session.dirty:
+                if not isinstance(obj, Card):
+                    continue
+                state = inspect(obj).attrs
+                if state.status.history.has_changes() or state.column_id.history.has_changes():
+                    transitions.append(Transition(obj.id, obj.team_id, obj.project_id, obj.column_id, obj.status,
+                                                  None, None))
+
+            if transitions:
+                self.record(session, transitions)
+
+    def record(self, session: Session, transitions: Sequence[Transition], at: Optional[datetime] = None) -> int:
+        """Registrar transiciones en la transacción de `session` (sin autoflush)"""
+        count = record_transitions(session.connection(), transitions, at or datetime.now(), self.chunk_size)
+        self._stats['transitions'] += count
+        return count
+
+    def backfill(self, session: Optional[Session] = None) -> int:
+        """
+        Abrir un tramo para las tarjetas sin historial (anteriores a la tabla o
+        escritas por fuera del ORM). La entrada se estima con completed_at,
+        started_at o updated_at; el ciclo de las terminadas, con sus fechas.
+        """
+        if session is None:
+            with self.session_factory() as own_session:
+                return self.backfill(own_session)
+
+        history = CardStatusHistory.__table__
+        entered_at = case(
+            (Card.status == 'done', func.coalesce(Card.completed_at, Card.updated_at, Card.created_at)),
+            else_=func.coalesce(Card.started_at, Card.updated_at, Card.created_at)
+        )
+        cycle_seconds = case(
+            (Card.status == 'done',
+             (func.julianday(Card.completed_at) - func.julianday(func.coalesce(Card.started_at, Card.created_at)))
+             * DAY_SECONDS)
+        )
+        missing = (
+            select(Card.id, Card.team_id, Card.project_id, Card.column_id, Card.status, entered_at, cycle_seconds)
+            .where(~exists().where(history.c.card_id == Card.id))
+        )
+        result = session.execute(insert(history).from_select(
+            ['card_id', 'team_id', 'project_id', 'column_id', 'status', 'entered_at', 'cycle_seconds'], missing
+        ))
+        session.commit()
+
+        count = result.rowcount or 0
+        if count:
+            self._stats['backfilled'] += count
+            with self._lock:
+                self._aging.clear()
+            logger.info(f"⏱️ Historial iniciado para {count} tarjetas")
+        return count
+
+    def card_history(self, session: Session, card_id: str) -> Dict[str, Any]:
+        """Transiciones de una tarjeta y tiempo total en cada columna (el tramo abierto cuenta hasta ahora)"""
+        history = CardStatusHistory
+        rows = session.execute(
+            select(history.column_id, Column.name, history.status, history.from_column_id, history.from_status,
+                   history.entered_at, history.exited_at, history.duration_seconds, history.cycle_seconds)
+            .outerjoin(Column, Column.id == history.column_id)
+            .where(history.card_id == card_id)
+            .order_by(history.entered_at, history.id)
+        ).all()
+
+        now = datetime.now()
+        columns: Dict[Any, Dict[str, Any]] = {}
+        for row in rows:
+            seconds = row.duration_seconds
+            if row.exited_at is None:
+                seconds = max(0.0, (now - row.entered_at).total_seconds())
+            column = columns.setdefault(row.column_id, {
+                'column_id': row.column_id, 'name': row.name, 'seconds': 0.0, 'visits': 0, 'current': False
+            })
+            column['seconds'] += seconds or 0.0
+            column['visits'] += 1
+            column['current'] = row.exited_at is None
+
+        done = [row.cycle_seconds for row in rows if row.status == 'done' and row.cycle_seconds is not None]
+        return {
+            'card_id': card_id,
+            'transitions': [
+                {
+                    'column_id': row.column_id,
+                    'column': row.name,
+                    'status': row.status,
+                    'from_column_id': row.from_column_id,
+                    'from_status': row.from_status,
+                    'entered_at': row.entered_at.isoformat(),
+                    'exited_at': row.exited_at.isoformat() if row.exited_at else None,
+                    'duration_days': _days(row.duration_seconds)
+                }
+                for row in rows
+            ],
+            'columns': [
+                {'column_id': column['column_id'], 'name': column['name'], 'days': _days(column['seconds']),
+                 'visits': column['visits'], 'current': column['current']}
+                for column in columns.values()
+            ],
+            'cycle_days': _days(done[-1]) if done else None
+        }
+
+    def aging(self, session: Session, board_id: str, days: int = 90) -> Dict[str, Any]:
+        """
+        Envejecimiento del WIP por columna de un tablero: percentiles de la edad
+        de las tarjetas abiertas y, como referencia, de lo que duraron en la
+        columna las que salieron en los últimos `days` días.
+        """
+        version = session.execute(select(SyncSequence.value).where(SyncSequence.id == 1)).scalar() or 0
+        key = (board_id, days)
+        cached = self._aging.get(key)
+        if cached is not None and cached[0] == version:
+            self._stats['aging_hits'] += 1
+            columns = cached[1]
+        else:
+            columns = self._load_aging(session, board_id, days)
+            with self._lock:
+                self._aging[key] = (version, columns)
+            self._stats['aging_loads'] += 1
+
+        # Lo cacheado son fechas de entrada: la edad se calcula con la hora actual
+        now = datetime.now()
+
+        def age(entered_at: Optional[datetime]) -> Optional[float]:
+            return _days(max(0.0, (now - entered_at).total_seconds())) if entered_at else None
+
+        return {
+            'board_id': board_id,
+            'days': days,
+            'version': version,
+            'columns': [
+                {
+                    **{name: value for name, value in column.items() if name not in ('entered', 'oldest')},
+                    'age_days': {name: age(entered_at) for name, entered_at in column['entered'].items()},
+                    'oldest': [{'card_id': card_id, 'age_days': age(entered_at)}
+                               for card_id, entered_at in column['oldest']]
+                }
+                for column in columns
+            ]
+        }
+
+    def _load_aging(self, session: Session, board_id: str, days: int) -> List[Dict[str, Any]]:
+        history = CardStatusHistory
+        columns = session.execute(
+            select(Column.id, Column.name, Column.column_type, Column.wip_limit)
+            .where(Column.board_id == board_id)
+            .order_by(Column.position)
+        ).all()
+        column_ids = [column.id for column in columns]
+
+        # Tramos abiertos: rango (column_id, exited_at IS NULL) del índice, ya ordenado por entrada
+        open_cards: Dict[str, List[Any]] = {column_id: [] for column_id in column_ids}
+        for column_id, card_id, entered_at in session.execute(
+            select(history.column_id, history.card_id, history.entered_at)
+            .where(history.column_id.in_(column_ids), history.exited_at.is_(None))
+            .order_by(history.column_id, history.entered_at)
+        ):
+            open_cards[column_id].append((card_id, entered_at))
+
+        durations: Dict[str, List[float]] = {column_id: [] for column_id in column_ids}
+        for column_id, seconds in session.execute(
+            select(history.column_id, history.duration_seconds)
+            .where(history.column_id.in_(column_ids),
+                   history.exited_at >= datetime.now() - timedelta(days=days))
+        ):
+            if seconds is not None:
+                durations[column_id].append(seconds)
+
+        loaded = []
+        for column in columns:
+            cards = open_cards[column.id]
+            # De más reciente a más antigua: la edad queda en orden ascendente
+            entered = [entered_at for _, entered_at in reversed(cards)]
+            spent = sorted(durations[column.id])
+            loaded.append({
+                'column_id': column.id,
+                'name': column.name,
+                'column_type': column.column_type,
+                'wip': len(cards),
+                'wip_limit': column.wip_limit,
+                'entered': _percentiles(entered),
+                'oldest': cards[:5],
+                'exited': len(spent),
+                'duration_days': {name: _days(seconds) for name, seconds in _percentiles(spent).items()}
+            })
+        return loaded
+
+    def cycle_times(self, session: Session, team_id: Optional[str] = None, project_id: Optional[str] = None,
+                    days: int = 90) -> Dict[str, Any]:
+        """Diagrama de dispersión de tiempos de ciclo: tarjetas terminadas en los últimos `days` días"""
+        history = CardStatusHistory
+        query = (
+            select(history.card_id, Card.title, Card.card_type, history.entered_at, history.cycle_seconds)
+            .join(Card, Card.id == history.card_id)
+            .where(history.status == 'done', history.exited_at.is_(None), history.cycle_seconds.isnot(None),
+                   history.entered_at >= datetime.now() - timedelta(days=days))
+            .order_by(history.entered_at)
+        )
+        if team_id:
+            query = query.where(history.team_id == team_id)
+        if project_id:
+            query = query.where(history.project_id == project_id)
+        rows = session.execute(query).all()
+
+        return {
+            'team_id': team_id,
+            'project_id': project_id,
+            'days': days,
+            'count': len(rows),
+            'percentiles': {
+                name: _days(seconds)
+                for name, seconds in _percentiles(sorted(row.cycle_seconds for row in rows)).items()
+            },
+            'points': [
+                {
+                    'card_id': row.card_id,
+                    'title': row.title,
+                    'card_type': row.card_type,
+                    'completed_at': row.entered_at.isoformat(),
+                    'cycle_days': _days(row.cycle_seconds)
+                }
+                for row in rows
+            ]
+        }
+
+    def status(self) -> Dict[str, Any]:
+        return {**self._stats, 'aging_cached': len(self._aging)}
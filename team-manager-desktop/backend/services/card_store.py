@@ -0,0 +1,156 @@
+"""
+📊 Almacén Columnar de Tarjetas
+Tarjetas como arrays NumPy (struct-of-arrays) con códigos categóricos, para agregados vectorizados
+"""
+
+from typing import Dict, Any, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from models.database import Card
+
+# Vocabularios conocidos primero, para que los códigos sean estables entre cargas
+STATUS_LABELS = ('backlog', 'ready', 'in_progress', 'review', 'blocked', 'done')
+PRIORITY_LABELS = ('critical', 'high', 'medium', 'low')
+
+# Columnas de cada fila de entrada, en orden
+ROW_FIELDS = ('id', 'status', 'priority', 'team_id', 'project_id', 'assigned_to', 'estimated_hours', 'actual_hours')
+DIMENSIONS = ('status', 'priority', 'team', 'project', 'assignee')
+
+class Categories:
+    """Vocabulario de una dimensión: etiqueta ↔ código entero (None = -1)"""
+
+    __slots__ = ('labels', 'index')
+
+    def __init__(self, labels: Iterable[str] = ()):
+        self.labels: List[str] = list(labels)
+        self.index: Dict[str, int] = {label: code for code, label in enumerate(self.labels)}
+
+    def __len__(self) -> int:
+        return len(self.labels)
+
+    def code(self, label: Optional[str]) -> int:
+        """Código de una etiqueta (-1 si no aparece en ninguna tarjeta)"""
+        return self.index.get(label, -1)
+
+    def codes(self, labels: Iterable[str]) -> np.ndarray:
+        return np.array([self.index[label] for label in labels if label in self.index], dtype=np.int32)
+
+    def encode(self, values: Sequence[Optional[str]]) -> np.ndarray:
+        """Codificar una columna, ampliando el vocabulario con las etiquetas nuevas"""
+        index, labels = self.index, self.labels
+
+        def code(value):
+            if value is None:
+                return -1
+            found = index.get(value)
+            if found is None:
+                found = index[value] = len(labels)
+                labels.append(value)
+            return found
+
+        return np.fromiter(map(code, values), dtype=np.int32, count=len(values))
+
+class CardStore:
+    """
+    Tarjetas en columnas: un array por campo en lugar de una lista de objetos.
+
+    Estado, prioridad, equipo, proyecto y responsable se guardan como códigos
+    enteros (ver `categories`); las horas como float64 (sin estimar = 0). Los
+    agregados (`count_by`, `sum_by`) son un único np.bincount sobre el índice
+    combinado de las dimensiones, sin recorrer tarjetas en Python. Es
+    inmutable y se serializa barato (arrays contiguos) para el pool de procesos.
+    """
+
+    __slots__ = ('ids', 'status', 'priority', 'team', 'project', 'assignee',
+                 'estimated_hours', 'actual_hours', 'categories')
+
+    def __init__(self, ids: Tuple[str, ...], columns: Dict[str, np.ndarray], categories: Dict[str, Categories]):
+        self.ids = ids
+        for name, values in columns.items():
+            values.flags.writeable = False
+            setattr(self, name, values)
+        self.categories = categories
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Sequence[Any]]) -> 'CardStore':
+        """Construir desde filas con el orden de ROW_FIELDS"""
+        rows = list(rows)
+        ids, status, priority, team, project, assignee, estimated, actual = (
+            zip(*rows) if rows else ((),) * len(ROW_FIELDS)
+        )
+        categories = {
+            'status': Categories(STATUS_LABELS),
+            'priority': Categories(PRIORITY_LABELS),
+            'team': Categories(),
+            'project': Categories(),
+            'assignee': Categories()
+        }
+        columns = {
+            'status': categories['status'].encode(status),
+            'priority': categories['priority'].encode(priority),
+            'team': categories['team'].encode(team),
+            'project': categories['project'].encode(project),
+            'assignee': categories['assignee'].encode(assignee),
+            # None → NaN → 0
+            'estimated_hours': np.nan_to_num(np.array(estimated, dtype=np.float64)),
+            'actual_hours': np.nan_to_num(np.array(actual, dtype=np.float64))
+        }
+        return cls(tuple(ids), columns, categories)
+
+    @classmethod
+    def load(cls, session: Session, *criteria) -> 'CardStore':
+        """Leer las tarjetas (filtradas por `criteria`) con una sola consulta de columnas"""
+        query = select(Card.id, Card.status, Card.priority, Card.team_id, Card.project_id,
+                       Card.assigned_to, Card.estimated_hours, Card.actual_hours)
+        if criteria:
+            query = query.where(*criteria)
+        return cls.from_rows(session.execute(query).tuples())
+
+    @classmethod
+    def from_cards(cls, cards: Iterable[Any]) -> 'CardStore':
+        """Desde objetos con los atributos de Card (modelos ORM o registros del snapshot)"""
+        return cls.from_rows(
+            (card.id, card.status, card.priority, card.team_id, card.project_id,
+             card.assigned_to, card.estimated_hours, card.actual_hours)
+            for card in cards
+        )
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def mask(self, **labels: Iterable[str]) -> np.ndarray:
+        """Máscara de las tarjetas cuyas dimensiones tienen alguna de las etiquetas: mask(status=('review',))"""
+        selected = np.ones(len(self), dtype=bool)
+        for dimension, values in labels.items():
+            selected &= np.isin(getattr(self, dimension), self.categories[dimension].codes(values))
+        return selected
+
+    def count_by(self, *dimensions: str, mask: Optional[np.ndarray] = None) -> np.ndarray:
+        """Tarjetas por combinación de dimensiones: array de forma (len(vocabulario), ...)"""
+        return self._group(dimensions, None, mask)
+
+    def sum_by(self, *dimensions: str, values: str = 'estimated_hours',
+               mask: Optional[np.ndarray] = None) -> np.ndarray:
+        """Suma de una columna numérica por combinación de dimensiones"""
+        return self._group(dimensions, getattr(self, values), mask)
+
+    def _group(self, dimensions: Sequence[str], weights: Optional[np.ndarray],
+               mask: Optional[np.ndarray]) -> np.ndarray:
+        shape = tuple(len(self.categories[dimension]) for dimension in dimensions)
+        codes = [getattr(self, dimension) for dimension in dimensions]
+
+        # Sin responsable (-1) no cuenta en los grupos por responsable
+        valid = np.ones(len(self), dtype=bool) if mask is None else mask.copy()
+        for column in codes:
+            valid &= column >= 0
+
+        size = int(np.prod(shape, dtype=np.int64))
+        if size == 0:
+            return np.zeros(shape, dtype=np.float64 if weights is not None else np.int64)
+
+        key = np.ravel_multi_index([column[valid] for column in codes], shape)
+        grouped = np.bincount(key, weights=weights[valid] if weights is not None else None, minlength=size)
+        return grouped.reshape(shape)
@@ -0,0 +1,249 @@
+"""
+📣 Feed de Cambios en Tiempo Real
+Publica movimientos de tarjetas, cambios de WIP y nuevos insights/riesgos
+como pequeños diffs a los clientes suscritos (WebSocket / SSE)
+"""
+
+import asyncio
+import logging
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Iterable, Set, Tuple
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from models.database import Board, Column, Card, Risk, AIInsight
+
+logger = logging.getLogger(__name__)
+
+# Atributos que se publican al cambiar
+CARD_FIELDS = ('title', 'column_id', 'status', 'position', 'priority', 'assigned_to',
+               'blocked_reason', 'estimated_hours')
+COLUMN_FIELDS = ('name', 'position', 'wip_limit')
+RISK_FIELDS = ('title', 'description', 'severity', 'probability', 'impact', 'category', 'mitigation', 'status')
+INSIGHT_FIELDS = ('insight_type', 'title', 'description', 'severity', 'confidence')
+
+class Subscription:
+    """
+    Suscripción de un cliente, filtrada por equipos y/o tableros.
+
+    Los cambios pendientes se agrupan por entidad: si una tarjeta se mueve
+    varias veces antes de enviarse, el cliente recibe un único diff. Si el
+    cliente es lento y se acumulan más de `max_pending` entidades, se descartan
+    y se le pide una resincronización completa.
+    """
+
+    def __init__(self, teams: Optional[Iterable[str]] = None, boards: Optional[Iterable[str]] = None,
+                 max_pending: int = 500):
+        self.teams: Set[str] = set(teams or [])
+        self.boards: Set[str] = set(boards or [])
+        self.max_pending = max_pending
+        self.resync = False
+        self.dropped = 0
+
+        self._pending: "OrderedDict[Tuple[str, str], Dict[str, Any]]" = OrderedDict()
+        self._ready = asyncio.Event()
+
+    def update(self, teams: Optional[Iterable[str]] = None, boards: Optional[Iterable[str]] = None):
+        """Cambiar los filtros de la suscripción"""
+        self.teams = set(teams or [])
+        self.boards = set(boards or [])
+
+    def matches(self, change: Dict[str, Any]) -> bool:
+        if not self.teams and not self.boards:
+            return True
+        if self.teams & set(change.get('teams', [])):
+            return True
+        return change.get('board_id') in self.boards
+
+    def push(self, change: Dict[str, Any]):
+        """Encolar un cambio, fusionándolo con el pendiente de la misma entidad"""
+        key = (change['entity'], change['id'])
+        previous = self._pending.pop(key, None)
+
+        if previous is not None:
+            if change['op'] == 'delete' and previous['op'] == 'create':
+                # Creada y eliminada antes de enviarse: el cliente no necesita saberlo
+                self._ready.set()
+                return
+            if change['op'] == 'update':
+                change = {
+                    **previous,
+                    **{k: v for k, v in change.items() if k != 'changes'},
+                    'op': previous['op'],
+                    'changes': {**previous.get('changes', {}), **change.get('changes', {})}
+                }
+
+        self._pending[key] = change
+
+        if len(self._pending) > self.max_pending:
+            self.dropped += len(self._pending)
+            self._pending.clear()
+            self.resync = True
+
+        self._ready.set()
+
+    async def next_batch(self, coalesce_seconds: float = 0.1) -> Dict[str, Any]:
+        """Esperar cambios y devolverlos agrupados en un solo mensaje"""
+        await self._ready.wait()
+
+        # Pequeña ventana para agrupar ráfagas (p. ej. un drag & drop)
+        if coalesce_seconds > 0:
+            await asyncio.sleep(coalesce_seconds)
+        self._ready.clear()
+
+        if self.resync:
+            self.resync = False
+            self._pending.clear()
+            return {'type': 'resync'}
+
+        changes = list(self._pending.values())
+        self._pending.clear()
+        return {'type': 'changes', 'changes': changes}
+
+class ChangeFeed:
+    """
+    Bus de cambios en proceso.
+
+    Los cambios se recogen de las sesiones SQLAlchemy al hacer flush y se
+    publican al confirmar la transacción (nunca cambios de un rollback).
+    La publicación es segura desde hilos del threadpool de FastAPI.
+    """
+
+    def __init__(self, coalesce_ms: int = 100, max_pending: int = 500, send_timeout: float = 10.0):
+        self.coalesce_seconds = coalesce_ms / 1000
+        self.max_pending = max_pending
+        self.send_timeout = send_timeout
+
+        self._subscriptions: Set[Subscription] = set()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def bind_loop(self, loop: asyncio.AbstractEventLoop):
+        """Asociar el event loop del backend (llamar en el lifespan)"""
+        self._loop = loop
+
+    def subscribe(self, teams: Optional[Iterable[str]] = None,
+                  boards: Optional[Iterable[str]] = None) -> Subscription:
+        subscription = Subscription(teams, boards, max_pending=self.max_pending)
+        self._subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        self._subscriptions.discard(subscription)
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscriptions)
+
+    def publish(self, changes: List[Dict[str, Any]]):
+        """Publicar cambios a los suscriptores (desde cualquier hilo)"""
+        if not changes or self._loop is None or self._loop.is_closed():
+            return
+        self._loop.call_soon_threadsafe(self._dispatch, changes)
+
+    def _dispatch(self, changes: List[Dict[str, Any]]):
+        for subscription in list(self._subscriptions):
+            for change in changes:
+                if subscription.matches(change):
+                    subscription.push(change)
+
+    def install_hooks(self, target=Session):
+        """
+        Publicar automáticamente los cambios confirmados en la base de datos
+        (de todas las sesiones, o solo las de `target`: un sessionmaker o una sesión)
+        """
+
+        @event.listens_for(target, 'after_flush')
+        def collect_changes(session, flush_context):
+            with session.no_autoflush:
+                queue_changes(session, [
+                    change
+                    for op, objects in (('create', session.new), ('update', session.dirty), ('delete', session.deleted))
+                    for change in (_describe_change(session, obj, op) for obj in objects)
+                    if change
+                ])
+
+        @event.listens_for(target, 'after_commit')
+        def publish_changes(session):
+            self.publish(session.info.pop('change_feed', None))
+
+        @event.listens_for(target, 'after_rollback')
+        def discard_changes(session):
+            session.info.pop('change_feed', None)
+
+def queue_changes(session: Session, changes: Iterable[Dict[str, Any]]):
+    """
+    Encolar cambios para publicarlos cuando `session` confirme. Lo usan también
+    las escrituras en bloque, que no pasan por los eventos del ORM.
+    """
+    session.info.setdefault('change_feed', []).extend(changes)
+
+def _changed_fields(obj: Any, fields: Iterable[str]) -> Dict[str, Any]:
+    state = inspect(obj)
+    return {field: getattr(obj, field) for field in fields if state.attrs[field].history.has_changes()}
+
+def _board_for_column(session: Session, column_id: Optional[str]) -> Optional[Board]:
+    column = session.get(Column, column_id) if column_id else None
+    return session.get(Board, column.board_id) if column else None
+
+def _describe_change(session: Session, obj: Any, op: str) -> Optional[Dict[str, Any]]:
+    """Convertir una fila modificada en un diff publicable"""
+    if isinstance(obj, Card):
+        if op == 'update':
+            changes = _changed_fields(obj, CARD_FIELDS)
+            if not changes:
+                return None
+            if 'column_id' in changes:
+                previous = inspect(obj).attrs.column_id.history.deleted
+                changes['from_column_id'] = previous[0] if previous else None
+        else:
+            changes = {field: getattr(obj, field) for field in CARD_FIELDS}
+        board = _board_for_column(session, obj.column_id)
+        return {
+            'entity': 'card', 'op': op, 'id': obj.id,
+            'board_id': board.id if board else None,
+            'teams': [obj.team_id],
+            'changes': changes
+        }
+
+    if isinstance(obj, Column):
+        changes = _changed_fields(obj, COLUMN_FIELDS) if op == 'update' else \
+            {field: getattr(obj, field) for field in COLUMN_FIELDS}
+        if not changes:
+            return None
+        board = session.get(Board, obj.board_id)
+        return {
+            'entity': 'column', 'op': op, 'id': obj.id,
+            'board_id': obj.board_id,
+            'teams': [board.team_id] if board else [],
+            'changes': changes
+        }
+
+    if isinstance(obj, AIInsight) and op == 'create':
+        return {
+            'entity': 'insight', 'op': op, 'id': obj.id,
+            'teams': obj.affected_teams_list,
+            'changes': {
+                **{field: getattr(obj, field) for field in INSIGHT_FIELDS},
+                'recommendations': obj.recommendations_list,
+                'affected_teams': obj.affected_teams_list,
+                'affected_projects': obj.affected_projects_list,
+                'affected_users': obj.affected_users_list
+            }
+        }
+
+    if isinstance(obj, Risk):
+        changes = _changed_fields(obj, RISK_FIELDS) if op == 'update' else \
+            {field: getattr(obj, field) for field in RISK_FIELDS}
+        if not changes:
+            return None
+        if op == 'create':
+            changes['affected_teams'] = obj.affected_teams_list
+            changes['affected_projects'] = obj.affected_projects_list
+        return {
+            'entity': 'risk', 'op': op, 'id': obj.id,
+            'teams': obj.affected_teams_list,
+            'changes': changes
+        }
+
+    return None
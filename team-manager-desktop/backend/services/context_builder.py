@@ -0,0 +1,205 @@
+"""
+🧮 Constructor de Contexto para el Director de IA
+Prioriza equipos y proyectos por relevancia y los ajusta a un presupuesto de tokens
+"""
+
+import hashlib
+import json
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, Any, List, Optional
+
+from models.database import Team, Project, Card, User
+from services.profiling import span
+
+ACTIVE_STATUSES = ('ready', 'in_progress', 'review')
+PRIORITY_WEIGHT = {'critical': 3, 'high': 2, 'medium': 1, 'low': 0}
+
+def compact_json(value: Any) -> str:
+    """Serialización JSON sin espacios (los espacios también son tokens)"""
+    return json.dumps(value, separators=(',', ':'), ensure_ascii=False, default=str)
+
+def _without_empty(record: Dict[str, Any]) -> Dict[str, Any]:
+    return {k: v for k, v in record.items() if v not in (None, [], {}, 0, False) or k == 'id'}
+
+class ContextBuilder:
+    """
+    Construye el contexto organizacional que se envía al LLM.
+
+    - Puntúa equipos (bloqueos, sobrecarga, WIP excedido) y proyectos (en riesgo,
+      bloqueos, prioridad) y los incluye de mayor a menor relevancia
+    - Se detiene al agotar el presupuesto de tokens e indica cuántos se omitieron
+    - En modo delta solo envía las entidades que cambiaron desde el último análisis,
+      junto con el resumen de ese análisis
+    """
+
+    def __init__(self, token_budget: int = 6000, chars_per_token: float = 4.0):
+        self.token_budget = token_budget
+        self.chars_per_token = chars_per_token
+
+    def estimate_tokens(self, text: str) -> int:
+        """Estimación aproximada de tokens (sin depender del tokenizer del proveedor)"""
+        return int(len(text) / self.chars_per_token) + 1
+
+    def build(self,
+              teams: List[Team],
+              projects: List[Project],
+              cards: List[Card],
+              users: List[User],
+              previous_digests: Optional[Dict[str, str]] = None,
+              previous_summary: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Construir el contexto.
+
+        Devuelve {'context': str, 'digests': {...}, 'tokens': int}. Los digests
+        se pasan como `previous_digests` en la siguiente llamada para el modo delta;
+        solo cubren lo que el LLM ha visto (lo enviado ahora y, en delta, lo que no
+        cambió), así que lo omitido por el presupuesto se vuelve a enviar después.
+        """
+        delta = previous_digests is not None
+
+        # Agrupar tarjetas una sola vez
+        cards_by_team: Dict[str, List[Card]] = defaultdict(list)
+        cards_by_project: Dict[str, List[Card]] = defaultdict(list)
+        cards_by_status: Dict[str, int] = defaultdict(int)
+        for card in cards:
+            cards_by_team[card.team_id].append(card)
+            cards_by_project[card.project_id].append(card)
+            cards_by_status[card.status] += 1
+
+        now = datetime.now()
+        entities = []
+        with span('context.records'):
+            for team in teams:
+                record, score = self._team_record(team, cards_by_team.get(team.id, []))
+                entities.append(('teams', f"team:{team.id}", record, score))
+            for project in projects:
+                record, score = self._project_record(project, cards_by_project.get(project.id, []), now)
+                entities.append(('projects', f"project:{project.id}", record, score))
+
+        with span('context.digests'):
+            digests = {key: hashlib.sha1(compact_json(record).encode('utf-8')).hexdigest()
+                       for _, key, record, _ in entities}
+
+        context: Dict[str, Any] = {
+            'timestamp': now.isoformat(),
+            'mode': 'delta' if delta else 'full',
+            'summary': {
+                'teams_count': len(teams),
+                'projects_count': len(projects),
+                'active_projects': len([p for p in projects if p.status == 'active']),
+                'users_count': len(users),
+                'total_cards': len(cards),
+                'cards_by_status': dict(cards_by_status)
+            },
+            'teams': [],
+            'projects': []
+        }
+
+        seen: Dict[str, str] = {}
+        if delta:
+            context['previous_analysis'] = previous_summary or ''
+            context['removed'] = sorted(key for key in previous_digests if key not in digests)
+            unchanged = [key for key in digests if previous_digests.get(key) == digests[key]]
+            context['unchanged_count'] = len(unchanged)
+            seen.update((key, digests[key]) for key in unchanged)
+            entities = [e for e in entities if previous_digests.get(e[1]) != digests[e[1]]]
+
+        # Más relevantes primero; se omiten los que no caben en el presupuesto
+        entities.sort(key=lambda e: e[3], reverse=True)
+        used = self.estimate_tokens(compact_json(context))
+        omitted = defaultdict(int)
+
+        with span('context.fit_budget'):
+            for section, key, record, _ in entities:
+                cost = self.estimate_tokens(compact_json(record))
+                if used + cost > self.token_budget:
+                    omitted[section] += 1
+                    continue
+                context[section].append(record)
+                seen[key] = digests[key]
+                used += cost
+
+        if omitted:
+            context['omitted'] = dict(omitted)
+
+        with span('context.serialize'):
+            serialized = compact_json(context)
+        return {
+            'context': serialized,
+            'digests': seen,
+            'tokens': self.estimate_tokens(serialized)
+        }
+
+    def _team_record(self, team: Team, team_cards: List[Card]):
+        """Resumen del equipo y su puntuación de relevancia"""
+        status_counts: Dict[str, int] = defaultdict(int)
+        for card in team_cards:
+            status_counts[card.status] += 1
+
+        members = len(team.members)
+        active = sum(status_counts[s] for s in ACTIVE_STATUSES)
+        blocked = status_counts['blocked']
+        review = status_counts['review']
+        wip_limits = team.wip_limits_dict
+        wip_exceeded = sorted(
+            status for status, limit in wip_limits.items()
+            if isinstance(limit, (int, float)) and limit > 0 and status_counts[status] > limit
+        )
+        load = active / members if members else float(active)
+        overloaded = load > 3 or bool(wip_exceeded)
+
+        score = blocked * 3 + len(wip_exceeded) * 2 + (3 if overloaded else 0) + (1 if review > 5 else 0)
+
+        record = _without_empty({
+            'id': team.id,
+            'name': team.name,
+            'members': members,
+            'cards': len(team_cards),
+            'active': active,
+            'blocked': blocked,
+            'review': review,
+            'wip_limits': wip_limits,
+            'wip_exceeded': wip_exceeded,
+            'overloaded': overloaded
+        })
+        return record, score
+
+    def _project_record(self, project: Project, project_cards: List[Card], now: datetime):
+        """Resumen del proyecto y su puntuación de relevancia"""
+        total = len(project_cards)
+        done = len([card for card in project_cards if card.status == 'done'])
+        blocked = len([card for card in project_cards if card.status == 'blocked'])
+        progress = project.progress or 0.0
+
+        # En riesgo: el tiempo transcurrido supera claramente al progreso
+        at_risk = False
+        days_left = None
+        if project.end_date:
+            days_left = (project.end_date - now).days
+            if project.start_date and project.end_date > project.start_date:
+                elapsed = (now - project.start_date) / (project.end_date - project.start_date)
+                at_risk = elapsed - progress / 100 > 0.2
+            at_risk = at_risk or (days_left < 0 and progress < 100)
+
+        score = (
+            (4 if at_risk else 0)
+            + blocked * 2
+            + PRIORITY_WEIGHT.get(project.priority, 1)
+            + (1 if project.status == 'active' else 0)
+        )
+
+        record = _without_empty({
+            'id': project.id,
+            'name': project.name,
+            'status': project.status,
+            'priority': project.priority,
+            'teams': len(project.teams),
+            'progress': progress,
+            'cards_done': done,
+            'cards_total': total,
+            'blocked': blocked,
+            'days_left': days_left,
+            'at_risk': at_risk
+        })
+        return record, score
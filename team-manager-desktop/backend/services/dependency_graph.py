@@ -0,0 +1,728 @@
+"""
+🕸️ Grafo de Dependencias
+DAG en memoria de dependencias entre tarjetas y entre proyectos, actualizado de forma incremental
+"""
+
+import json
+import logging
+import threading
+from array import array
+from collections import deque
+from typing import Dict, Any, List, Optional, Iterable, Tuple, Set
+
+from sqlalchemy import event, select, inspect
+from sqlalchemy.orm import Session
+
+from models.database import Card, Project, SyncSequence, SyncTombstone, card_dependencies, project_teams
+
+logger = logging.getLogger(__name__)
+
+# Estado de un nodo
+OPEN, BLOCKED, DONE = 0, 1, 2
+
+CARD_STATES = {'blocked': BLOCKED, 'done': DONE}
+PROJECT_STATES = {'on_hold': BLOCKED, 'completed': DONE, 'cancelled': DONE}
+
+Edge = Tuple[str, str]  # (prerrequisito, dependiente)
+
+class DependencyCycleError(ValueError):
+    """La dependencia cerraría un ciclo; `cycle` es el camino que lo forma"""
+
+    def __init__(self, cycle: List[str]):
+        self.cycle = cycle
+        super().__init__(f"Dependencia circular: {' → '.join(cycle)}")
+
+class DependencyGraph:
+    """
+    DAG con listas de adyacencia en arrays compactos.
+
+    Las aristas van del prerrequisito al dependiente. Además de la adyacencia
+    se mantiene un orden topológico incremental (Pearce-Kelly): al añadir
+    u → v solo se recorre la región del orden entre v y u, así que la
+    detección de ciclos no explora el grafo completo en cada inserción y el
+    orden topológico está siempre disponible sin recalcularlo.
+
+    No es seguro entre hilos por sí mismo; DependencyGraphService lo protege.
+    """
+
+    def __init__(self):
+        self._ids: List[str] = []
+        self._index: Dict[str, int] = {}
+        self._succ: List[array] = []
+        self._pred: List[array] = []
+        self._ord = array('l')    # nodo → posición en el orden topológico
+        self._at: List[int] = []  # posición → nodo
+        self._alive = bytearray()
+
+        self.weight = array('d')
+        self.state = bytearray()
+        self.teams: List[Tuple[str, ...]] = []
+        self.project: List[Optional[str]] = []
+        self.edge_count = 0
+
+    def __len__(self) -> int:
+        return sum(self._alive)
+
+    def __contains__(self, node_id: str) -> bool:
+        index = self._index.get(node_id)
+        return index is not None and self._alive[index] == 1
+
+    # --- Construcción y cambios ---
+
+    def upsert_node(self, node_id: str, weight: float = 0.0, state: int = OPEN,
+                    teams: Iterable[str] = (), project: Optional[str] = None) -> int:
+        """Crear o actualizar un nodo (los nuevos van al final del orden)"""
+        index = self._index.get(node_id)
+        if index is None:
+            index = len(self._ids)
+            self._index[node_id] = index
+            self._ids.append(node_id)
+            self._succ.append(array('l'))
+            self._pred.append(array('l'))
+            self._ord.append(index)
+            self._at.append(index)
+            self._alive.append(1)
+            self.weight.append(0.0)
+            self.state.append(OPEN)
+            self.teams.append(())
+            self.project.append(None)
+
+        self._alive[index] = 1
+        self.weight[index] = weight
+        self.state[index] = state
+        self.teams[index] = tuple(teams)
+        self.project[index] = project
+        return index
+
+    def remove_node(self, node_id: str):
+        """Quitar un nodo y sus aristas (conserva su hueco en el orden)"""
+        index = self._index.get(node_id)
+        if index is None or not self._alive[index]:
+            return
+        for successor in self._succ[index]:
+            self._pred[successor].remove(index)
+        for predecessor in self._pred[index]:
+            self._succ[predecessor].remove(index)
+        self.edge_count -= len(self._succ[index]) + len(self._pred[index])
+        self._succ[index] = array('l')
+        self._pred[index] = array('l')
+        self._alive[index] = 0
+
+    def has_edge(self, before_id: str, after_id: str) -> bool:
+        u, v = self._index.get(before_id), self._index.get(after_id)
+        return u is not None and v is not None and v in self._succ[u]
+
+    def predecessors(self, node_id: str) -> List[str]:
+        index = self._index.get(node_id)
+        return [self._ids[p] for p in self._pred[index]] if index is not None else []
+
+    def add_edge(self, before_id: str, after_id: str) -> bool:
+        """
+        Añadir before → after. Lanza DependencyCycleError si cerraría un ciclo.
+        Los nodos desconocidos se crean con valores por defecto.
+        """
+        u = self._index.get(before_id)
+        if u is None or not self._alive[u]:
+            u = self.upsert_node(before_id)
+        v = self._index.get(after_id)
+        if v is None or not self._alive[v]:
+            v = self.upsert_node(after_id)
+        return self._link(u, v)
+
+    def remove_edge(self, before_id: str, after_id: str) -> bool:
+        u, v = self._index.get(before_id), self._index.get(after_id)
+        if u is None or v is None or v not in self._succ[u]:
+            return False
+        self._succ[u].remove(v)
+        self._pred[v].remove(u)
+        self.edge_count -= 1
+        return True
+
+    def set_predecessors(self, node_id: str, before_ids: Iterable[str]) -> List[Edge]:
+        """Sustituir los prerrequisitos de un nodo; devuelve las aristas rechazadas por ciclo"""
+        wanted = set(before_ids) - {node_id}
+        current = set(self.predecessors(node_id))
+        for before_id in current - wanted:
+            self.remove_edge(before_id, node_id)
+
+        rejected = []
+        for before_id in sorted(wanted - current):
+            try:
+                self.add_edge(before_id, node_id)
+            except DependencyCycleError:
+                rejected.append((before_id, node_id))
+        return rejected
+
+    def validate(self, added: Iterable[Edge], removed: Iterable[Edge] = ()):
+        """
+        Comprobar que aplicar los cambios dejaría un DAG, sin modificar el grafo.
+        Lanza DependencyCycleError con el primer ciclo encontrado.
+        """
+        created = [node_id for edge in added for node_id in edge if node_id not in self]
+        dropped = [edge for edge in removed if self.remove_edge(*edge)]
+        linked = []
+        try:
+            for edge in added:
+                if self.add_edge(*edge):
+                    linked.append(edge)
+        finally:
+            for edge in linked:
+                self.remove_edge(*edge)
+            for edge in dropped:
+                self.add_edge(*edge)
+            for node_id in created:
+                self.remove_node(node_id)
+
+    def build(self, nodes: Iterable[Tuple[str, float, int, Tuple[str, ...], Optional[str]]],
+              edges: Iterable[Edge]) -> List[Edge]:
+        """
+        Carga masiva: orden topológico inicial con Kahn en O(V + E).
+        Las aristas que cierran ciclos en los datos existentes se descartan y se devuelven.
+        """
+        for node_id, weight, state, teams, project in nodes:
+            self.upsert_node(node_id, weight, state, teams, project)
+
+        for before_id, after_id in edges:
+            u = self._index.get(before_id)
+            if u is None:
+                u = self.upsert_node(before_id)
+            v = self._index.get(after_id)
+            if v is None:
+                v = self.upsert_node(after_id)
+            if u != v:
+                self._succ[u].append(v)
+                self._pred[v].append(u)
+        # Aristas duplicadas en los datos de origen
+        for index, successors in enumerate(self._succ):
+            if len(set(successors)) != len(successors):
+                self._succ[index] = array('l', dict.fromkeys(successors))
+        for index, predecessors in enumerate(self._pred):
+            if len(set(predecessors)) != len(predecessors):
+                self._pred[index] = array('l', dict.fromkeys(predecessors))
+        self.edge_count = sum(len(successors) for successors in self._succ)
+
+        count = len(self._ids)
+        indegree = array('l', (len(predecessors) for predecessors in self._pred))
+        queue = deque(n for n in range(count) if indegree[n] == 0)
+        order = []
+        while queue:
+            node = queue.popleft()
+            order.append(node)
+            for successor in self._succ[node]:
+                indegree[successor] -= 1
+                if indegree[successor] == 0:
+                    queue.append(successor)
+
+        rejected: List[Edge] = []
+        pending: List[Tuple[int, int]] = []
+        if len(order) < count:
+            # Nodos en ciclos o aguas abajo de uno: se ordenan sin sus aristas
+            # internas y estas se reinsertan una a una con detección de ciclos
+            remaining = [n for n in range(count) if indegree[n] > 0]
+            remaining_set = set(remaining)
+            for node in remaining:
+                pending.extend((node, s) for s in self._succ[node] if s in remaining_set)
+                self._succ[node] = array('l', (s for s in self._succ[node] if s not in remaining_set))
+                self._pred[node] = array('l', (p for p in self._pred[node] if p not in remaining_set))
+            self.edge_count -= len(pending)
+            order.extend(remaining)
+
+        for position, node in enumerate(order):
+            self._ord[node] = position
+            self._at[position] = node
+
+        for u, v in pending:
+            try:
+                self._link(u, v)
+            except DependencyCycleError:
+                rejected.append((self._ids[u], self._ids[v]))
+        return rejected
+
+    def _link(self, u: int, v: int) -> bool:
+        if u == v:
+            raise DependencyCycleError([self._ids[u], self._ids[u]])
+        if v in self._succ[u]:
+            return False
+
+        lower, upper = self._ord[v], self._ord[u]
+        if lower < upper:
+            forward = self._forward(v, upper, u)
+            backward = self._backward(u, lower)
+            self._reorder(backward, forward)
+
+        self._succ[u].append(v)
+        self._pred[v].append(u)
+        self.edge_count += 1
+        return True
+
+    def _forward(self, start: int, upper: int, target: int) -> List[int]:
+        """Nodos alcanzables desde start dentro de la región; ciclo si se llega a target"""
+        ord_ = self._ord
+        parent = {start: -1}
+        stack = [start]
+        while stack:
+            node = stack.pop()
+            for successor in self._succ[node]:
+                if successor == target:
+                    path = [node]
+                    while parent[path[-1]] != -1:
+                        path.append(parent[path[-1]])
+                    path.reverse()
+                    raise DependencyCycleError([self._ids[n] for n in [target] + path + [target]])
+                if successor not in parent and ord_[successor] < upper:
+                    parent[successor] = node
+                    stack.append(successor)
+        return list(parent)
+
+    def _backward(self, start: int, lower: int) -> List[int]:
+        """Nodos que alcanzan start dentro de la región"""
+        ord_ = self._ord
+        seen = {start}
+        stack = [start]
+        while stack:
+            node = stack.pop()
+            for predecessor in self._pred[node]:
+                if predecessor not in seen and ord_[predecessor] > lower:
+                    seen.add(predecessor)
+                    stack.append(predecessor)
+        return list(seen)
+
+    def _reorder(self, backward: List[int], forward: List[int]):
+        """Colocar los ancestros antes que los descendientes reutilizando sus posiciones"""
+        key = self._ord.__getitem__
+        nodes = sorted(backward, key=key) + sorted(forward, key=key)
+        slots = sorted(self._ord[n] for n in nodes)
+        for node, slot in zip(nodes, slots):
+            self._ord[node] = slot
+            self._at[slot] = node
+
+    # --- Consultas ---
+
+    def _scope(self, project: Optional[str], team: Optional[str]) -> List[int]:
+        """Nodos vivos del ámbito, en orden topológico"""
+        alive = self._alive
+        return [
+            n for n in self._at
+            if alive[n]
+            and (project is None or self.project[n] == project)
+            and (team is None or team in self.teams[n])
+        ]
+
+    def topological_order(self, project: Optional[str] = None, team: Optional[str] = None) -> List[str]:
+        return [self._ids[n] for n in self._scope(project, team)]
+
+    def critical_path(self, project: Optional[str] = None, team: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Cadena de trabajo pendiente más larga (suma de pesos) dentro del ámbito.
+        Los nodos terminados no cuentan ni encadenan.
+        """
+        count = len(self._ids)
+        distance = array('d', bytes(8 * count))
+        previous = array('l', [-1]) * count
+        best, best_node = 0.0, -1
+
+        for node in self._scope(project, team):
+            if self.state[node] == DONE:
+                continue
+            start, via = 0.0, -1
+            for predecessor in self._pred[node]:
+                if distance[predecessor] > start:
+                    start, via = distance[predecessor], predecessor
+            distance[node] = start + self.weight[node]
+            previous[node] = via
+            if distance[node] > best or best_node == -1:
+                best, best_node = distance[node], node
+
+        path = []
+        while best_node != -1:
+            path.append(best_node)
+            best_node = previous[best_node]
+        path.reverse()
+
+        return {
+            'hours': round(best, 2),
+            'length': len(path),
+            'nodes': [self._ids[n] for n in path],
+            'blocked': [self._ids[n] for n in path if self.state[n] == BLOCKED]
+        }
+
+    def blocked_chains(self, project: Optional[str] = None, team: Optional[str] = None,
+                       sample: int = 20) -> List[Dict[str, Any]]:
+        """
+        Para cada nodo bloqueado del ámbito, todo el trabajo pendiente que
+        depende de él (transitivamente), aunque sea de otros equipos.
+        Ordenado por horas afectadas.
+        """
+        chains = []
+        for root in self._scope(project, team):
+            if self.state[root] != BLOCKED:
+                continue
+            seen = {root}
+            queue = deque([root])
+            affected = []
+            while queue:
+                node = queue.popleft()
+                for successor in self._succ[node]:
+                    if successor not in seen and self.state[successor] != DONE:
+                        seen.add(successor)
+                        affected.append(successor)
+                        queue.append(successor)
+            if not affected:
+                continue
+
+            affected_teams = sorted({t for n in affected for t in self.teams[n]})
+            chains.append({
+                'id': self._ids[root],
+                'teams': list(self.teams[root]),
+                'project_id': self.project[root],
+                'affected': len(affected),
+                'affected_hours': round(sum(self.weight[n] for n in affected), 2),
+                'affected_teams': affected_teams,
+                'affected_projects': sorted({self.project[n] for n in affected if self.project[n]}),
+                'cross_team': bool(set(affected_teams) - set(self.teams[root])),
+                'sample': [self._ids[n] for n in affected[:sample]]
+            })
+
+        chains.sort(key=lambda chain: (-chain['affected_hours'], -chain['affected']))
+        return chains
+
+    def blockers(self, node_id: str) -> List[str]:
+        """Nodos bloqueados de los que depende (transitivamente) un nodo"""
+        index = self._index.get(node_id)
+        if index is None:
+            return []
+        seen = {index}
+        stack = [index]
+        blocked = []
+        while stack:
+            node = stack.pop()
+            for predecessor in self._pred[node]:
+                if predecessor in seen or self.state[predecessor] == DONE:
+                    continue
+                seen.add(predecessor)
+                stack.append(predecessor)
+                if self.state[predecessor] == BLOCKED:
+                    blocked.append(self._ids[predecessor])
+        return blocked
+
+class DependencyGraphService:
+    """
+    Grafos de tarjetas y de proyectos compartidos por la aplicación.
+
+    - Las dependencias entre tarjetas se validan antes de cada flush (un ciclo
+      aborta la transacción con DependencyCycleError) y se aplican al grafo
+      al confirmar
+    - Estado, horas, equipo y dependencias de proyectos se ponen al día con el
+      cursor de change_version, que también cubre las escrituras masivas que
+      no pasan por los eventos del ORM
+    - La carga inicial se hace una vez; después todo es incremental
+    """
+
+    def __init__(self, session_factory):
+        self.session_factory = session_factory
+        self.cards = DependencyGraph()
+        self.projects = DependencyGraph()
+        self.version = 0
+        self.rejected: List[Edge] = []
+        self._loaded = False
+        self._lock = threading.RLock()
+
+    # --- Carga y sincronización ---
+
+    def ensure_loaded(self):
+        with self._lock:
+            if not self._loaded:
+                with self.session_factory() as session:
+                    self.load(session)
+
+    def load(self, session: Session):
+        """Construir ambos grafos desde la base de datos"""
+        with self._lock:
+            version = _current_version(session)
+
+            cards = DependencyGraph()
+            card_rows = session.execute(
+                select(Card.id, Card.team_id, Card.project_id, Card.status, Card.estimated_hours)
+            ).all()
+            edges = session.execute(
+                select(card_dependencies.c.depends_on_id, card_dependencies.c.card_id)
+            ).all()
+            rejected = cards.build((_card_node(row) for row in card_rows), edges)
+
+            projects = DependencyGraph()
+            project_rows = session.execute(
+                select(Project.id, Project.status, Project.is_active, Project.estimated_hours,
+                       Project.progress, Project.dependencies)
+            ).all()
+            teams = _project_teams(session)
+            project_edges = [
+                (before_id, row.id)
+                for row in project_rows
+                for before_id in _project_dependencies(row.dependencies)
+            ]
+            rejected += projects.build(
+                (_project_node(row, teams.get(row.id, ())) for row in project_rows), project_edges
+            )
+
+            self.cards, self.projects = cards, projects
+            self.rejected = rejected
+            self.version = version
+            self._loaded = True
+
+        if rejected:
+            logger.warning(f"⚠️ {len(rejected)} dependencias circulares ignoradas: {rejected[:5]}")
+        logger.info(f"🕸️ Grafo de dependencias cargado: {len(cards)} tarjetas, {cards.edge_count} "
+                    f"dependencias, {len(projects)} proyectos")
+
+    def sync(self, session: Optional[Session] = None) -> int:
+        """Aplicar los cambios de nodos posteriores al cursor; devuelve cuántos"""
+        if session is None:
+            with self.session_factory() as own_session:
+                return self.sync(own_session)
+
+        self.ensure_loaded()
+        with self._lock:
+            current = _current_version(session)
+            if current <= self.version:
+                return 0
+
+            since = self.version
+            card_rows = session.execute(
+                select(Card.id, Card.team_id, Card.project_id, Card.status, Card.estimated_hours)
+                .where(Card.change_version > since)
+            ).all()
+            project_rows = session.execute(
+                select(Project.id, Project.status, Project.is_active, Project.estimated_hours,
+                       Project.progress, Project.dependencies)
+                .where(Project.change_version > since)
+            ).all()
+            deleted = session.execute(
+                select(SyncTombstone.entity, SyncTombstone.entity_id)
+                .where(SyncTombstone.change_version > since,
+                       SyncTombstone.entity.in_(('cards', 'projects')))
+            ).all()
+
+            for row in card_rows:
+                self.cards.upsert_node(*_card_node(row))
+            teams = _project_teams(session, [row.id for row in project_rows]) if project_rows else {}
+            for row in project_rows:
+                self.projects.upsert_node(*_project_node(row, teams.get(row.id, ())))
+                self.rejected += self.projects.set_predecessors(row.id, _project_dependencies(row.dependencies))
+            for entity, entity_id in deleted:
+                (self.cards if entity == 'cards' else self.projects).remove_node(entity_id)
+
+            self.version = current
+            return len(card_rows) + len(project_rows) + len(deleted)
+
+    def install_hooks(self, target=Session):
+        """
+        Validar las dependencias nuevas antes del flush y aplicarlas al confirmar
+        (en todas las sesiones, o solo en las de `target`)
+        """
+
+        @event.listens_for(target, 'before_flush')
+        def validate_dependencies(session, flush_context, instances):
+            card_added, card_removed, removed_cards = _card_edge_changes(session)
+            project_changes = _project_edge_changes(session)
+            if not (card_added or card_removed or removed_cards or project_changes):
+                return
+
+            self.ensure_loaded()
+            with self._lock:
+                if card_added:
+                    self.cards.validate(card_added, card_removed)
+                if project_changes:
+                    added, removed = self._project_edge_delta(project_changes)
+                    self.projects.validate(added, removed)
+
+            session.info.setdefault('dependency_changes', []).append(
+                (card_added, card_removed, removed_cards, project_changes)
+            )
+
+        @event.listens_for(target, 'after_commit')
+        def apply_dependencies(session):
+            pending = session.info.pop('dependency_changes', None)
+            if pending and self._loaded:
+                self._apply(pending)
+
+        @event.listens_for(target, 'after_rollback')
+        def discard_dependencies(session):
+            session.info.pop('dependency_changes', None)
+
+    def _project_edge_delta(self, changes: Dict[str, List[str]]) -> Tuple[List[Edge], List[Edge]]:
+        added, removed = [], []
+        for project_id, dependencies in changes.items():
+            wanted = set(dependencies) - {project_id}
+            current = set(self.projects.predecessors(project_id))
+            added += [(before_id, project_id) for before_id in sorted(wanted - current)]
+            removed += [(before_id, project_id) for before_id in current - wanted]
+        return added, removed
+
+    def _apply(self, pending):
+        with self._lock:
+            for card_added, card_removed, removed_cards, project_changes in pending:
+                for edge in card_removed:
+                    self.cards.remove_edge(*edge)
+                for card_id in removed_cards:
+                    self.cards.remove_node(card_id)
+                for edge in card_added:
+                    try:
+                        self.cards.add_edge(*edge)
+                    except DependencyCycleError as e:
+                        # Dos transacciones concurrentes que cierran un ciclo entre ambas
+                        logger.error(f"❌ Dependencia confirmada que forma un ciclo: {e}")
+                        self.rejected.append(edge)
+                for project_id, dependencies in project_changes.items():
+                    self.rejected += self.projects.set_predecessors(project_id, dependencies)
+
+    # --- Consultas ---
+
+    def card_order(self, project_id: Optional[str] = None, team_id: Optional[str] = None) -> List[str]:
+        with self._lock:
+            return self.cards.topological_order(project_id, team_id)
+
+    def card_critical_path(self, project_id: Optional[str] = None,
+                           team_id: Optional[str] = None) -> Dict[str, Any]:
+        with self._lock:
+            return self.cards.critical_path(project_id, team_id)
+
+    def blocked_chains(self, project_id: Optional[str] = None, team_id: Optional[str] = None,
+                       limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        with self._lock:
+            chains = self.cards.blocked_chains(project_id, team_id)
+        return chains[:limit] if limit else chains
+
+    def blockers(self, card_id: str) -> List[str]:
+        with self._lock:
+            return self.cards.blockers(card_id)
+
+    def project_order(self) -> List[str]:
+        with self._lock:
+            return self.projects.topological_order()
+
+    def project_critical_path(self) -> Dict[str, Any]:
+        with self._lock:
+            return self.projects.critical_path()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'cards': len(self.cards),
+                'card_dependencies': self.cards.edge_count,
+                'projects': len(self.projects),
+                'project_dependencies': self.projects.edge_count,
+                'rejected': [list(edge) for edge in self.rejected],
+                'version': self.version
+            }
+
+    def risks(self, min_affected: int = 3) -> List[Dict[str, Any]]:
+        """
+        Riesgos de dependencias con la forma del modelo Risk:
+        tarjetas bloqueadas que frenan mucho trabajo (o el de otros equipos),
+        proyectos en pausa con dependientes y dependencias circulares ignoradas.
+        """
+        risks = []
+        for chain in self.blocked_chains():
+            if chain['affected'] < min_affected and not chain['cross_team']:
+                continue
+            severity = 'critical' if chain['cross_team'] and chain['affected_hours'] >= 40 else \
+                'high' if chain['cross_team'] or chain['affected_hours'] >= 40 else 'medium'
+            risks.append({
+                'title': f"Bloqueo en {chain['id']} frena trabajo dependiente",
+                'description': f"La tarjeta {chain['id']} está bloqueada y {chain['affected']} tarjetas "
+                               f"({chain['affected_hours']}h) dependen de ella",
+                'severity': severity,
+                'probability': 0.9,
+                'impact': min(1.0, 0.3 + chain['affected_hours'] / 100),
+                'category': 'timeline',
+                'affected_teams': sorted(set(chain['teams']) | set(chain['affected_teams'])),
+                'affected_projects': sorted(({chain['project_id']} | set(chain['affected_projects'])) - {None}),
+                'mitigation': 'Resolver el bloqueo o reordenar el trabajo dependiente',
+                'source': {'type': 'blocked_chain', 'card_id': chain['id'], 'sample': chain['sample']}
+            })
+
+        with self._lock:
+            project_chains = self.projects.blocked_chains()
+        for chain in project_chains:
+            risks.append({
+                'title': f"Proyecto {chain['id']} en pausa con dependientes",
+                'description': f"El proyecto {chain['id']} está en pausa y bloquea "
+                               f"{', '.join(chain['sample'])}",
+                'severity': 'high',
+                'probability': 0.8,
+                'impact': min(1.0, 0.4 + 0.1 * chain['affected']),
+                'category': 'timeline',
+                'affected_teams': sorted(set(chain['teams']) | set(chain['affected_teams'])),
+                'affected_projects': [chain['id']] + chain['sample'],
+                'mitigation': 'Reactivar el proyecto o replanificar los dependientes',
+                'source': {'type': 'blocked_project', 'project_id': chain['id']}
+            })
+
+        if self.rejected:
+            risks.append({
+                'title': 'Dependencias circulares',
+                'description': f"{len(self.rejected)} dependencias forman ciclos y se ignoran en la planificación",
+                'severity': 'medium',
+                'probability': 1.0,
+                'impact': 0.4,
+                'category': 'technical',
+                'affected_teams': [],
+                'affected_projects': [],
+                'mitigation': 'Eliminar una de las dependencias de cada ciclo',
+                'source': {'type': 'cycle', 'edges': [list(edge) for edge in self.rejected[:20]]}
+            })
+
+        return risks
+
+def queue_removed_cards(session: Session, card_ids: Iterable[str]):
+    """Quitar del grafo, cuando `session` confirme, tarjetas eliminadas en bloque (sin eventos del ORM)"""
+    session.info.setdefault('dependency_changes', []).append(([], [], list(card_ids), {}))
+
+def _current_version(session: Session) -> int:
+    return session.execute(select(SyncSequence.value).where(SyncSequence.id == 1)).scalar() or 0
+
+def _card_node(row) -> Tuple[str, float, int, Tuple[str, ...], Optional[str]]:
+    return row.id, row.estimated_hours or 0.0, CARD_STATES.get(row.status, OPEN), (row.team_id,), row.project_id
+
+def _project_node(row, teams: Tuple[str, ...]) -> Tuple[str, float, int, Tuple[str, ...], Optional[str]]:
+    remaining = (row.estimated_hours or 0.0) * (1 - min(row.progress or 0.0, 100.0) / 100)
+    state = PROJECT_STATES.get(row.status, OPEN) if row.is_active is not False else DONE
+    return row.id, remaining, state, teams, row.id
+
+def _project_teams(session: Session, project_ids: Optional[List[str]] = None) -> Dict[str, Tuple[str, ...]]:
+    query = select(project_teams.c.project_id, project_teams.c.team_id)
+    if project_ids is not None:
+        query = query.where(project_teams.c.project_id.in_(project_ids))
+    teams: Dict[str, List[str]] = {}
+    for project_id, team_id in session.execute(query):
+        teams.setdefault(project_id, []).append(team_id)
+    return {project_id: tuple(team_ids) for project_id, team_ids in teams.items()}
+
+def _project_dependencies(value: Optional[str]) -> List[str]:
+    return json.loads(value) if value else []
+
+def _card_edge_changes(session: Session) -> Tuple[List[Edge], List[Edge], List[str]]:
+    """Aristas añadidas/quitadas por colecciones dependencies/dependents pendientes de flush"""
+    added: Set[Edge] = set()
+    removed: Set[Edge] = set()
+    for obj in list(session.new) + list(session.dirty):
+        if not isinstance(obj, Card):
+            continue
+        attrs = inspect(obj).attrs
+        history = attrs.dependencies.history
+        added.update((dependency.id, obj.id) for dependency in history.added)
+        removed.update((dependency.id, obj.id) for dependency in history.deleted)
+        history = attrs.dependents.history
+        added.update((obj.id, dependent.id) for dependent in history.added)
+        removed.update((obj.id, dependent.id) for dependent in history.deleted)
+
+    removed_cards = [obj.id for obj in session.deleted if isinstance(obj, Card)]
+    return sorted(added - removed), sorted(removed - added), removed_cards
+
+def _project_edge_changes(session: Session) -> Dict[str, List[str]]:
+    """Lista de dependencias nueva de cada proyecto cuyo campo dependencies cambia"""
+    return {
+        obj.id: obj.dependencies_list
+        for obj in list(session.new) + list(session.dirty)
+        if isinstance(obj, Project) and inspect(obj).attrs.dependencies.history.has_changes()
+    }
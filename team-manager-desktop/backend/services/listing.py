@@ -0,0 +1,83 @@
+"""
+📄 Listados Paginados
+Paginación por clave (updated_at, id), proyección de campos (fields=) y
+carga de relaciones elegida por endpoint para evitar consultas N+1
+"""
+
+import base64
+import json
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Iterable, Tuple
+
+from sqlalchemy import and_, or_, select
+from sqlalchemy.orm import Session, load_only, raiseload
+
+def encode_cursor(updated_at: Optional[datetime], row_id: str) -> str:
+    """Cursor opaco con la última clave devuelta"""
+    raw = json.dumps([updated_at.isoformat() if updated_at else None, row_id], separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii')
+
+def decode_cursor(cursor: str) -> Tuple[Optional[datetime], str]:
+    try:
+        updated_at, row_id = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        return (datetime.fromisoformat(updated_at) if updated_at else None), row_id
+    except (ValueError, TypeError) as e:
+        raise ValueError("Cursor inválido") from e
+
+def parse_fields(fields: Optional[str], allowed: Iterable[str], default: Iterable[str]) -> List[str]:
+    """Validar el parámetro fields=a,b,c contra los campos permitidos"""
+    if not fields:
+        return list(default)
+
+    requested = [field.strip() for field in fields.split(',') if field.strip()]
+    unknown = [field for field in requested if field not in allowed]
+    if unknown:
+        raise ValueError(f"Campos no permitidos: {', '.join(unknown)}")
+
+    # id y updated_at forman la clave de paginación
+    return list(dict.fromkeys(['id', 'updated_at'] + requested))
+
+def paginate_keyset(session: Session,
+                    model,
+                    fields: List[str],
+                    filters: Optional[List[Any]] = None,
+                    options: Optional[List[Any]] = None,
+                    limit: int = 50,
+                    cursor: Optional[str] = None,
+                    descending: bool = True) -> Tuple[List[Any], Optional[str]]:
+    """
+    Página de objetos ordenados por (updated_at, id).
+
+    Solo se cargan las columnas pedidas (load_only) y cualquier relación no
+    incluida explícitamente en `options` lanza error en vez de cargarse en
+    diferido, de modo que un listado nunca degenera en N+1.
+    Devuelve (objetos, siguiente_cursor).
+    """
+    updated_at, row_id = model.updated_at, model.id
+
+    stmt = (
+        select(model)
+        .options(load_only(*[getattr(model, field) for field in fields]), *(options or []), raiseload('*'))
+        .where(*(filters or []))
+    )
+
+    if cursor:
+        last_updated, last_id = decode_cursor(cursor)
+        if descending:
+            stmt = stmt.where(or_(updated_at < last_updated, and_(updated_at == last_updated, row_id < last_id)))
+        else:
+            stmt = stmt.where(or_(updated_at > last_updated, and_(updated_at == last_updated, row_id > last_id)))
+
+    order = (updated_at.desc(), row_id.desc()) if descending else (updated_at.asc(), row_id.asc())
+    rows = session.execute(stmt.order_by(*order).limit(limit + 1)).scalars().all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].updated_at, rows[-1].id)
+
+    return rows, next_cursor
+
+def project(obj: Any, fields: List[str]) -> Dict[str, Any]:
+    """Serializar solo los campos solicitados"""
+    return {field: getattr(obj, field) for field in fields}
@@ -0,0 +1,228 @@
+"""
+🗃️ Cache de Respuestas de IA
+Cache persistente (SQLite) direccionado por contenido para las llamadas al LLM
+"""
+
+import hashlib
+import json
+import logging
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, Any, Optional, Callable, Iterable, Set
+
+from sqlalchemy import event, or_
+from sqlalchemy.orm import Session
+
+from models.database import AIResponseCache, Team, Project, Board, Column, Card
+
+logger = logging.getLogger(__name__)
+
+# Campos del contexto que cambian en cada llamada sin que cambien los datos
+VOLATILE_CONTEXT_KEYS = {'timestamp'}
+
+class LLMResponseCache:
+    """
+    Cache de respuestas del LLM almacenado en la base de datos local.
+
+    - Clave: hash del prompt del sistema + contexto normalizado + modelo
+    - Expiración por TTL y desalojo LRU por número máximo de entradas
+    - Invalidación por equipos/proyectos cuando cambian sus datos
+    - Estadísticas de aciertos y fallos
+    """
+
+    def __init__(self,
+                 session_factory: Callable[[], Session],
+                 ttl_seconds: int = 3600,
+                 max_entries: int = 500):
+        self.session_factory = session_factory
+        self.ttl = timedelta(seconds=ttl_seconds)
+        self.max_entries = max_entries
+
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0, 'expired': 0, 'evictions': 0, 'invalidations': 0}
+
+    @staticmethod
+    def normalize_context(context: Any) -> str:
+        """Serializar el contexto de forma canónica, sin campos volátiles"""
+        if isinstance(context, str):
+            try:
+                context = json.loads(context)
+            except json.JSONDecodeError:
+                return context.strip()
+
+        def strip_volatile(value: Any) -> Any:
+            if isinstance(value, dict):
+                return {k: strip_volatile(v) for k, v in value.items() if k not in VOLATILE_CONTEXT_KEYS}
+            if isinstance(value, list):
+                return [strip_volatile(v) for v in value]
+            return value
+
+        return json.dumps(strip_volatile(context), sort_keys=True, separators=(',', ':'), default=str)
+
+    @classmethod
+    def build_key(cls, system_prompt: str, context: Any, model: str) -> str:
+        """Calcular la clave de cache para una llamada al LLM"""
+        digest = hashlib.sha256()
+        for part in (system_prompt, cls.normalize_context(context), model):
+            digest.update(part.encode('utf-8'))
+            digest.update(b'\x00')
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """Obtener respuesta cacheada o None si no existe o expiró"""
+        now = datetime.utcnow()
+
+        with self.session_factory() as session:
+            entry = session.get(AIResponseCache, key)
+
+            if entry is None:
+                self._record('misses')
+                return None
+
+            if entry.expires_at <= now:
+                session.delete(entry)
+                session.commit()
+                self._record('misses')
+                self._record('expired')
+                return None
+
+            entry.last_accessed_at = now
+            entry.hit_count = (entry.hit_count or 0) + 1
+            response = entry.response
+            session.commit()
+
+        self._record('hits')
+        return response
+
+    def set(self, key: str, model: str, response: str, scopes: Optional[Iterable[str]] = None):
+        """Guardar respuesta y aplicar desalojo LRU"""
+        now = datetime.utcnow()
+
+        with self.session_factory() as session:
+            entry = AIResponseCache(
+                cache_key=key,
+                model=model,
+                response=response,
+                hit_count=0,
+                created_at=now,
+                last_accessed_at=now,
+                expires_at=now + self.ttl
+            )
+            entry.scopes_list = sorted(set(scopes or []))
+            session.merge(entry)
+            session.flush()
+
+            evicted = self._evict(session)
+            session.commit()
+
+        if evicted:
+            self._record('evictions', evicted)
+
+    def _evict(self, session: Session) -> int:
+        """Eliminar entradas expiradas y las menos usadas recientemente por encima del límite"""
+        now = datetime.utcnow()
+        session.query(AIResponseCache).filter(AIResponseCache.expires_at <= now).delete(synchronize_session=False)
+
+        overflow = session.query(AIResponseCache).count() - self.max_entries
+        if overflow <= 0:
+            return 0
+
+        oldest_keys = [
+            row.cache_key for row in
+            session.query(AIResponseCache.cache_key)
+            .order_by(AIResponseCache.last_accessed_at.asc())
+            .limit(overflow)
+        ]
+        session.query(AIResponseCache).filter(
+            AIResponseCache.cache_key.in_(oldest_keys)
+        ).delete(synchronize_session=False)
+
+        return len(oldest_keys)
+
+    def invalidate(self, scopes: Optional[Iterable[str]] = None) -> int:
+        """
+        Invalidar entradas que cubren alguno de los equipos/proyectos indicados.
+        Sin scopes se vacía el cache completo.
+        """
+        with self.session_factory() as session:
+            query = session.query(AIResponseCache)
+
+            if scopes is not None:
+                scopes = set(scopes)
+                if not scopes:
+                    return 0
+                # El scope entre comillas (elemento JSON completo): 'team:1' no
+                # coincide con 'team:10'; % y _ del id se escapan
+                query = query.filter(or_(*[
+                    AIResponseCache.scopes.like(f'%{_escape_like(json.dumps(scope))}%', escape='\\')
+                    for scope in scopes
+                ]))
+
+            removed = query.delete(synchronize_session=False)
+            session.commit()
+
+        if removed:
+            self._record('invalidations', removed)
+            logger.debug(f"Cache de IA: {removed} entradas invalidadas")
+
+        return removed
+
+    def install_invalidation_hooks(self):
+        """
+        Invalidar automáticamente al confirmar cambios en tableros, columnas,
+        tarjetas, equipos o proyectos.
+        """
+
+        @event.listens_for(Session, 'after_flush')
+        def collect_changed_scopes(session, flush_context):
+            for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+                queue_invalidation(session, _scopes_for(obj))
+
+        @event.listens_for(Session, 'after_commit')
+        def invalidate_changed_scopes(session):
+            scopes = session.info.pop('ai_cache_scopes', None)
+            if scopes:
+                self.invalidate(scopes)
+
+        @event.listens_for(Session, 'after_rollback')
+        def discard_changed_scopes(session):
+            session.info.pop('ai_cache_scopes', None)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Estadísticas de aciertos/fallos del cache"""
+        with self._lock:
+            stats = dict(self._stats)
+
+        with self.session_factory() as session:
+            stats['entries'] = session.query(AIResponseCache).count()
+
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = round(stats['hits'] / lookups, 3) if lookups else 0.0
+        stats['max_entries'] = self.max_entries
+        stats['ttl_seconds'] = int(self.ttl.total_seconds())
+        return stats
+
+    def _record(self, counter: str, amount: int = 1):
+        with self._lock:
+            self._stats[counter] += amount
+
+def queue_invalidation(session: Session, scopes: Iterable[str]):
+    """Invalidar equipos/proyectos cuando `session` confirme (también tras escrituras en bloque)"""
+    session.info.setdefault('ai_cache_scopes', set()).update(scope for scope in scopes if scope)
+
+def _escape_like(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+def _scopes_for(obj: Any) -> Set[str]:
+    """Equipos/proyectos afectados por un cambio en una entidad"""
+    if isinstance(obj, (Team, Project)):
+        return {obj.id}
+    if isinstance(obj, Card):
+        return {scope for scope in (obj.team_id, obj.project_id) if scope}
+    if isinstance(obj, Board):
+        return {scope for scope in (obj.team_id, obj.project_id) if scope}
+    if isinstance(obj, Column):
+        # Solo si el tablero ya está cargado: no lanzar consultas durante el flush
+        board = obj.__dict__.get('board')
+        return {scope for scope in (board.team_id, board.project_id) if scope} if board else set()
+    return set()
@@ -0,0 +1,449 @@
+"""
+📝 Sincronización con el Tablero Markdown
+Importa kanban/board.md (y el mismo formato) a Board/Column/Card y exporta un tablero de vuelta
+"""
+
+import hashlib
+import json
+import logging
+import re
+import uuid
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Iterable, Iterator, Tuple
+
+from sqlalchemy import select, insert, update, delete, func, or_
+from sqlalchemy.orm import Session
+
+from models.database import Board, Column, Card, Comment, TimeEntry, SyncTombstone, card_dependencies
+from services.card_history import STARTED_STATUSES, Transition, record_transitions, remove_history
+from services.change_feed import CARD_FIELDS, queue_changes
+from services.dependency_graph import queue_removed_cards
+from services.llm_cache import queue_invalidation
+from services.ranking import RankingService, needs_rebalance, rank_at
+from services.sync import next_change_version
+from services.workload_rollups import queue_dirty_days
+
+logger = logging.getLogger(__name__)
+
+# Secciones del tablero markdown en orden: palabra clave → (column_type, encabezado al exportar)
+SECTION_COLUMNS = [
+    ('BACKLOG', 'backlog', '📋 BACKLOG (∞)'),
+    ('READY', 'ready', '✅ READY / REFINADO'),
+    ('EN PROGRESO', 'in_progress', '🔄 EN PROGRESO'),
+    ('REVISIÓN', 'review', '👀 EN REVISIÓN / QA'),
+    ('BLOQUEADO', 'blocked', '🚫 BLOQUEADO'),
+    ('HECHO', 'done', '✅ HECHO')
+]
+
+# Subsecciones del backlog → prioridad
+BACKLOG_PRIORITIES = [
+    ('CRÍTICO', 'critical', '🔴 CRÍTICO'),
+    ('ALTA', 'high', '🟡 ALTA PRIORIDAD'),
+    ('MEDIA', 'medium', '🟢 MEDIA/BAJA PRIORIDAD')
+]
+EXPORT_BACKLOG_SECTION = {'critical': 0, 'high': 1, 'medium': 2, 'low': 2}
+
+PRIORITY_WORDS = {'crítica': 'critical', 'crítico': 'critical', 'alta': 'high', 'media': 'medium', 'baja': 'low'}
+PRIORITY_LABELS = {'critical': 'Crítica', 'high': 'Alta', 'medium': 'Media', 'low': 'Baja'}
+
+# Etiquetas de tipo ([ÉPICA], [HISTORIA]...) y prefijos de ID (tools/kanban-cli.py)
+TYPE_TAGS = {'ÉPICA': 'epic', 'EPICA': 'epic', 'HISTORIA': 'story', 'TAREA': 'task', 'MEJORA': 'improvement', 'BUG': 'bug'}
+TYPE_LABELS = {'epic': 'ÉPICA', 'story': 'HISTORIA', 'task': 'TAREA', 'improvement': 'MEJORA', 'bug': 'BUG'}
+ID_PREFIX_TYPES = {'EP': 'epic', 'US': 'story', 'T': 'task'}
+
+ITEM_PATTERN = re.compile(r'^- \[(?P<check>[ xX])\] (?P<text>.+)$')
+DETAIL_PATTERN = re.compile(r'^\s+- (?P<text>.+)$')
+KEY_PATTERN = re.compile(r'^\*\*\[(?P<key>[^\]]+)\]\*\*\s*(?P<title>.*)$')
+PRIORITY_DETAIL = re.compile(r'^\*\*Prioridad\*\*:\s*(?P<value>.+)$', re.IGNORECASE)
+
+TITLE_KEY_PREFIX = 'title:'
+
+def _normalize_title(title: str) -> str:
+    return ' '.join(title.lower().split())
+
+def _card_id_for(board_id: str, key: str) -> str:
+    """ID estable de la tarjeta importada (mismo tablero y clave → misma tarjeta)"""
+    return 'md-' + hashlib.sha1(f'{board_id}:{key}'.encode('utf-8')).hexdigest()[:20]
+
+def _card_change(op: str, board: Board, values: Dict[str, Any]) -> Dict[str, Any]:
+    """Diff del feed de cambios para una fila escrita en bloque (mismo formato que los hooks del ORM)"""
+    return {
+        'entity': 'card', 'op': op, 'id': values['id'], 'board_id': board.id, 'teams': [board.team_id],
+        'changes': {field: values[field] for field in (*CARD_FIELDS, 'from_column_id') if field in values}
+    }
+
+def content_hash(item: Dict[str, Any]) -> str:
+    """Hash del contenido de un elemento (para no reescribir los que no cambian)"""
+    fields = {k: item[k] for k in ('title', 'description', 'column_type', 'priority', 'card_type')}
+    return hashlib.sha1(json.dumps(fields, sort_keys=True, ensure_ascii=False).encode('utf-8')).hexdigest()
+
+class MarkdownBoardSync:
+    """
+    Importador/exportador entre el tablero markdown y la base de datos.
+
+    - El parser procesa el fichero línea a línea (no lo carga entero)
+    - La importación agrupa inserciones y actualizaciones en lotes de
+      `chunk_size` (executemany) y solo reescribe los elementos cuyo hash de
+      contenido cambió, así que reimportar el mismo fichero no escribe nada
+    - Las secciones se mapean a Column.column_type, las subsecciones del
+      backlog (y **Prioridad**: ...) a Card.priority y [ID]/[ÉPICA]... a Card.card_type
+    """
+
+    def __init__(self, chunk_size: int = 2000):
+        self.chunk_size = chunk_size
+
+    def parse(self, lines: Iterable[str]) -> Iterator[Dict[str, Any]]:
+        """Elementos del tablero en orden de aparición"""
+        column_type: Optional[str] = None
+        section_priority: Optional[str] = None
+        current: Optional[Dict[str, Any]] = None
+
+        for raw in lines:
+            line = raw.rstrip('\r\n')
+
+            if line.startswith('#'):
+                if current:
+                    yield self._finish(current)
+                    current = None
+                if line.startswith('## '):
+                    column_type = next((ct for keyword, ct, _ in SECTION_COLUMNS if keyword in line.upper()), None)
+                    section_priority = None
+                elif line.startswith('### ') and column_type == 'backlog':
+                    section_priority = next((p for keyword, p, _ in BACKLOG_PRIORITIES if keyword in line.upper()), None)
+                continue
+
+            if column_type is None:
+                continue
+
+            match = ITEM_PATTERN.match(line)
+            if match:
+                if current:
+                    yield self._finish(current)
+                current = self._start_item(match.group('text').strip(), column_type, section_priority)
+                continue
+
+            detail = DETAIL_PATTERN.match(line)
+            if detail and current is not None:
+                text = detail.group('text').strip()
+                priority = PRIORITY_DETAIL.match(text)
+                if priority:
+                    current['priority'] = PRIORITY_WORDS.get(priority.group('value').strip().lower(), current['priority'])
+                else:
+                    current['details'].append(text)
+            elif line.strip() == '---' and current:
+                yield self._finish(current)
+                current = None
+
+        if current:
+            yield self._finish(current)
+
+    def _start_item(self, text: str, column_type: str, section_priority: Optional[str]) -> Dict[str, Any]:
+        card_type = None
+        key = None
+        title = text
+
+        match = KEY_PATTERN.match(text)
+        if match:
+            tag = match.group('key').strip()
+            title = match.group('title').strip()
+            if tag.upper() in TYPE_TAGS:
+                card_type = TYPE_TAGS[tag.upper()]
+            else:
+                key = tag
+                card_type = ID_PREFIX_TYPES.get(tag.split('-')[0].upper())
+
+        # Sin etiqueta se importa como tarea, que es como se exporta después
+        if key is None and card_type is None:
+            card_type = 'task'
+
+        return {
+            'key': key or TITLE_KEY_PREFIX + _normalize_title(title),
+            'title': title,
+            'column_type': column_type,
+            'priority': section_priority,
+            'card_type': card_type,
+            'details': [],
+            # Marcadores de la plantilla: *Pendiente de definir*
+            'placeholder': title.startswith('*') and title.endswith('*')
+        }
+
+    def _finish(self, item: Dict[str, Any]) -> Dict[str, Any]:
+        item['description'] = '\n'.join(item.pop('details')) or None
+        # La exportación omite la prioridad media: sin línea **Prioridad** es media
+        item['priority'] = item['priority'] or 'medium'
+        return item
+
+    def import_board(self, session: Session, board: Board, lines: Iterable[str],
+                     prune: bool = False) -> Dict[str, int]:
+        """
+        Importar un tablero markdown en `board` (idempotente).
+
+        Las tarjetas nuevas se añaden al final de su columna; las existentes
+        solo se actualizan si su hash cambió. Con `prune` se eliminan las
+        tarjetas importadas que ya no aparecen en el fichero. Las columnas
+        cuyas claves de orden crecen demasiado se reequilibran al final.
+
+        Las escrituras son sentencias en bloque, así que los cambios se anotan
+        en la sesión para que los hooks del feed, del cache de IA, del grafo de
+        dependencias y de los agregados de carga los publiquen al confirmar.
+        """
+        if not board.project_id:
+            raise ValueError("El tablero debe pertenecer a un proyecto para importar tarjetas")
+
+        columns = self._ensure_columns(session, board)
+        column_ids = [column.id for column in columns.values()]
+
+        # Estado actual en una consulta: clave → (id, hash, columna, estado)
+        existing: Dict[str, Tuple[str, Optional[str], str, str]] = {}
+        for card_id, key, digest, column_id, status in session.execute(
+            select(Card.id, Card.import_key, Card.import_hash, Card.column_id, Card.status)
+            .where(Card.column_id.in_(column_ids))
+        ):
+            existing[key or card_id] = (card_id, digest, column_id, status)
+
+        tails = dict(session.execute(
+            select(Card.column_id, func.max(Card.position))
+            .where(Card.column_id.in_(column_ids))
+            .group_by(Card.column_id)
+        ).all())
+        appended: Dict[str, int] = {}
+        last_positions: Dict[str, str] = {}
+
+        version = next_change_version(session)
+        now = datetime.now()
+        stats = {'created': 0, 'updated': 0, 'unchanged': 0, 'skipped': 0, 'deleted': 0}
+        seen = set()
+        inserts: List[Dict[str, Any]] = []
+        updates: List[Dict[str, Any]] = []
+        transitions: List[Transition] = []
+        feed: List[Dict[str, Any]] = []
+
+        def next_position(column_id: str) -> str:
+            # Tras la última clave existente; rank_at mantiene el ancho fijo
+            index = appended.get(column_id, 0)
+            appended[column_id] = index + 1
+            last_positions[column_id] = (tails.get(column_id) or '') + rank_at(index)
+            return last_positions[column_id]
+
+        for item in self.parse(lines):
+            if item['placeholder'] or item['key'] in seen:
+                stats['skipped'] += 1
+                continue
+            seen.add(item['key'])
+
+            column = columns[item['column_type']]
+            digest = content_hash(item)
+            current = existing.get(item['key'])
+
+            if current is None:
+                card_id = _card_id_for(board.id, item['key'])
+                inserts.append({
+                    'id': card_id,
+                    'title': item['title'],
+                    'description': item['description'],
+                    'card_type': item['card_type'] or 'task',
+                    'priority': item['priority'],
+                    'status': item['column_type'],
+                    'team_id': board.team_id,
+                    'project_id': board.project_id,
+                    'column_id': column.id,
+                    'position': next_position(column.id),
+                    'import_key': item['key'],
+                    'import_hash': digest,
+                    'change_version': version,
+                    'created_at': now,
+                    'updated_at': now,
+                    'started_at': now if item['column_type'] in STARTED_STATUSES else None,
+                    'completed_at': now if item['column_type'] == 'done' else None
+                })
+                feed.append(_card_change('create', board, inserts[-1]))
+                transitions.append(Transition(card_id, board.team_id, board.project_id, column.id,
+                                              item['column_type'], None, None))
+                stats['created'] += 1
+            elif current[1] != digest:
+                card_id, _, column_id, status = current
+                changes = {
+                    'id': card_id,
+                    'title': item['title'],
+                    'description': item['description'],
+                    'status': item['column_type'],
+                    'import_key': item['key'],
+                    'import_hash': digest,
+                    'change_version': version,
+                    'priority': item['priority'],
+                    'updated_at': now
+                }
+                # Sin tipo en el markdown no se pisa el valor de la base de datos
+                if item['card_type']:
+                    changes['card_type'] = item['card_type']
+                if column_id != column.id:
+                    changes['column_id'] = column.id
+                    changes['position'] = next_position(column.id)
+                if (column_id, status) != (column.id, item['column_type']):
+                    transitions.append(Transition(card_id, board.team_id, board.project_id, column.id,
+                                                  item['column_type'], column_id, status))
+                updates.append(changes)
+                feed.append(_card_change('update', board, {
+                    **changes, **({'from_column_id': column_id} if 'column_id' in changes else {})
+                }))
+                stats['updated'] += 1
+            else:
+                stats['unchanged'] += 1
+
+            if len(inserts) + len(updates) >= self.chunk_size:
+                self._write(session, inserts, updates, transitions, now)
+
+        self._write(session, inserts, updates, transitions, now)
+
+        if prune:
+            removed = [card_id for key, (card_id, digest, _, _) in existing.items()
+                       if digest is not None and key not in seen]
+            stats['deleted'] = self._delete(session, removed, version)
+            feed += [_card_change('delete', board, {'id': card_id}) for card_id in removed]
+            queue_removed_cards(session, removed)
+
+        if feed:
+            queue_changes(session, feed)
+            queue_invalidation(session, [board.team_id, board.project_id])
+        session.commit()
+
+        # Cada importación añade tras la última clave: reequilibrar si ya es larga
+        ranking = RankingService()
+        for column_id, position in last_positions.items():
+            if needs_rebalance(position):
+                ranking.rebalance_column(session, column_id)
+
+        logger.info(f"📝 Tablero markdown importado en {board.id}: {stats}")
+        return stats
+
+    def _ensure_columns(self, session: Session, board: Board) -> Dict[str, Column]:
+        """Columnas del tablero por column_type, creando las que falten"""
+        columns = {
+            column.column_type: column
+            for column in session.execute(select(Column).where(Column.board_id == board.id)).scalars()
+        }
+        for index, (_, column_type, heading) in enumerate(SECTION_COLUMNS):
+            if column_type not in columns:
+                column = Column(
+                    id=str(uuid.uuid4()),
+                    name=heading.split(' ', 1)[1].split(' (')[0].title(),
+                    board_id=board.id,
+                    column_type=column_type,
+                    position=rank_at(index)
+                )
+                session.add(column)
+                columns[column_type] = column
+        session.flush()
+        return columns
+
+    def _write(self, session: Session, inserts: List[Dict[str, Any]], updates: List[Dict[str, Any]],
+               transitions: List[Transition], now: datetime):
+        # Sentencias en bloque fuera de la unidad de trabajo: la versión de
+        # sincronización ya va en cada fila y el historial de estados y las
+        # fechas de inicio/fin (como _stamp_dates) se escriben aquí, porque
+        # los hooks del ORM no ven estas filas
+        if inserts:
+            session.execute(insert(Card), inserts)
+            inserts.clear()
+        if updates:
+            session.execute(update(Card), updates)
+            updates.clear()
+        if transitions:
+            record_transitions(session.connection(), transitions, now, self.chunk_size)
+            # Las altas ya llevan sus fechas en el INSERT
+            moved = [t for t in transitions if t.from_status is not None]
+            started = [t.card_id for t in moved if t.status in STARTED_STATUSES]
+            done = [t.card_id for t in moved if t.status == 'done']
+            reopened = [t.card_id for t in moved if t.status != 'done']
+            for card_ids, condition, values in (
+                (started, Card.started_at.is_(None), {'started_at': now}),
+                (done, Card.completed_at.is_(None), {'completed_at': now}),
+                (reopened, Card.completed_at.isnot(None), {'completed_at': None})
+            ):
+                if card_ids:
+                    session.execute(
+                        update(Card).where(Card.id.in_(card_ids), condition).values(values)
+                        .execution_options(synchronize_session=False)
+                    )
+            transitions.clear()
+
+    def _delete(self, session: Session, card_ids: List[str], version: int) -> int:
+        """
+        Eliminar tarjetas con sus filas dependientes (SQLite no aplica las
+        claves foráneas, así que nada impediría dejarlas huérfanas)
+        """
+        for start in range(0, len(card_ids), self.chunk_size):
+            chunk = card_ids[start:start + self.chunk_size]
+            remove_history(session.connection(), chunk, self.chunk_size)
+            queue_dirty_days(session, session.execute(
+                select(TimeEntry.date).where(TimeEntry.card_id.in_(chunk)).distinct()
+            ).scalars())
+            session.execute(delete(TimeEntry).where(TimeEntry.card_id.in_(chunk)))
+            session.execute(delete(Comment).where(Comment.card_id.in_(chunk)))
+            session.execute(delete(card_dependencies).where(or_(
+                card_dependencies.c.card_id.in_(chunk), card_dependencies.c.depends_on_id.in_(chunk)
+            )))
+            session.execute(delete(Card).where(Card.id.in_(chunk)))
+            session.execute(insert(SyncTombstone), [
+                {'entity': 'cards', 'entity_id': card_id, 'change_version': version} for card_id in chunk
+            ])
+        return len(card_ids)
+
+    def export_board(self, session: Session, board: Board) -> Iterator[str]:
+        """Líneas markdown del tablero, en el formato de kanban/board.md"""
+        columns = {
+            column.column_type: column
+            for column in session.execute(select(Column).where(Column.board_id == board.id)).scalars()
+        }
+
+        yield f"# 📊 {board.name.upper()}\n\n"
+        yield f"*Exportado: {datetime.now():%Y-%m-%d %H:%M}*\n\n---\n\n"
+
+        for _, column_type, heading in SECTION_COLUMNS:
+            column = columns.get(column_type)
+            rows = self._column_rows(session, column) if column else []
+
+            if column and column.wip_limit and column_type != 'backlog':
+                heading = f"{heading} (WIP: {len(rows)}/{column.wip_limit})"
+            yield f"## {heading}\n\n"
+
+            if column_type == 'backlog':
+                groups: List[List[Any]] = [[] for _ in BACKLOG_PRIORITIES]
+                for row in rows:
+                    groups[EXPORT_BACKLOG_SECTION.get(row.priority, 2)].append(row)
+                for (_, _, subheading), group in zip(BACKLOG_PRIORITIES, groups):
+                    yield f"### {subheading}\n"
+                    for row in group:
+                        yield self._format_card(row, column_type, with_priority=row.priority == 'low')
+                    yield "\n"
+            else:
+                for row in rows:
+                    yield self._format_card(row, column_type, with_priority=row.priority != 'medium')
+                if not rows:
+                    yield "*Columna vacía*\n"
+                yield "\n"
+
+            yield "---\n\n"
+
+    def _column_rows(self, session: Session, column: Column) -> List[Any]:
+        return session.execute(
+            select(Card.id, Card.import_key, Card.title, Card.description, Card.card_type, Card.priority)
+            .where(Card.column_id == column.id)
+            .order_by(Card.position, Card.id)
+        ).all()
+
+    def _format_card(self, row: Any, column_type: str, with_priority: bool) -> str:
+        check = 'x' if column_type == 'done' else ' '
+        key = row.import_key or row.id
+        if key.startswith(TITLE_KEY_PREFIX):
+            label = TYPE_LABELS.get(row.card_type, 'TAREA')
+        else:
+            label = key
+
+        lines = [f"- [{check}] **[{label}]** {row.title}"]
+        if with_priority:
+            lines.append(f"  - **Prioridad**: {PRIORITY_LABELS.get(row.priority, 'Media')}")
+        for detail in (row.description or '').splitlines():
+            if detail.strip():
+                lines.append(f"  - {detail.strip()}")
+        return '\n'.join(lines) + '\n'
@@ -0,0 +1,292 @@
+"""
+📈 Métricas del Backend
+Contadores e histogramas en memoria con salida en formato de texto de Prometheus
+"""
+
+import bisect
+import contextvars
+import logging
+import math
+import threading
+from typing import Dict, Any, List, Optional, Callable, Iterable, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from services.query_counter import QueryCounter
+
+logger = logging.getLogger(__name__)
+
+# Latencias en segundos: de peticiones de pocos ms a llamadas al LLM de un minuto
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200)
+
+LabelValues = Tuple[str, ...]
+# (nombre, tipo, ayuda, [(etiquetas, valor)]) que devuelven los collectors
+Family = Tuple[str, str, str, List[Tuple[Dict[str, str], float]]]
+
+def _escape(value: Any) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+def _format_labels(names: Iterable[str], values: Iterable[Any]) -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return '+Inf'
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+class Counter:
+    """Contador monotónico con etiquetas"""
+
+    type = 'counter'
+
+    def __init__(self, name: str, description: str, labels: Iterable[str] = ()):
+        self.name = name
+        self.description = description
+        self.labels = tuple(labels)
+        self._values: Dict[LabelValues, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels: str, amount: float = 1.0):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def value(self, *labels: str) -> float:
+        return self._values.get(labels, 0.0)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            values = dict(self._values)
+        return [f'{self.name}{_format_labels(self.labels, key)} {_format_value(value)}'
+                for key, value in sorted(values.items())]
+
+class Histogram:
+    """Histograma de buckets acumulados (como prometheus_client, sin la dependencia)"""
+
+    type = 'histogram'
+
+    def __init__(self, name: str, description: str, labels: Iterable[str] = (), buckets: Iterable[float] = LATENCY_BUCKETS):
+        self.name = name
+        self.description = description
+        self.labels = tuple(labels)
+        self.buckets = tuple(sorted(buckets))
+        # etiquetas -> [cuentas por bucket..., suma, total]
+        self._values: Dict[LabelValues, List[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels: str):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(labels)
+            if state is None:
+                state = self._values[labels] = [0.0] * (len(self.buckets) + 2)
+            if index < len(self.buckets):
+                state[index] += 1
+            state[-2] += value
+            state[-1] += 1
+
+    def count(self, *labels: str) -> float:
+        state = self._values.get(labels)
+        return state[-1] if state else 0.0
+
+    def render(self) -> List[str]:
+        with self._lock:
+            values = {key: list(state) for key, state in self._values.items()}
+
+        lines = []
+        for key, state in sorted(values.items()):
+            cumulative = 0.0
+            for bound, count in zip(self.buckets, state):
+                cumulative += count
+                labels = _format_labels(self.labels + ('le',), key + (_format_value(bound),))
+                lines.append(f'{self.name}_bucket{labels} {_format_value(cumulative)}')
+            labels = _format_labels(self.labels + ('le',), key + ('+Inf',))
+            lines.append(f'{self.name}_bucket{labels} {_format_value(state[-1])}')
+            lines.append(f'{self.name}_sum{_format_labels(self.labels, key)} {_format_value(round(state[-2], 6))}')
+            lines.append(f'{self.name}_count{_format_labels(self.labels, key)} {_format_value(state[-1])}')
+        return lines
+
+class MetricsRegistry:
+    """
+    Métricas propias (contadores e histogramas actualizados al vuelo) más
+    collectors: funciones que leen en el momento del scrape las estadísticas
+    que ya llevan los servicios (cache de IA, planificador, pool de análisis).
+    """
+
+    def __init__(self):
+        self._metrics: Dict[str, Any] = {}
+        self._collectors: Dict[str, Callable[[], Iterable[Family]]] = {}
+
+    def counter(self, name: str, description: str, labels: Iterable[str] = ()) -> Counter:
+        return self._register(Counter(name, description, labels))
+
+    def histogram(self, name: str, description: str, labels: Iterable[str] = (),
+                  buckets: Iterable[float] = LATENCY_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, description, labels, buckets))
+
+    def register_collector(self, name: str, collector: Callable[[], Iterable[Family]]):
+        """Registrar (o reemplazar, p. ej. tras un reinicio del lifespan) un collector"""
+        self._collectors[name] = collector
+
+    def render(self) -> str:
+        """Exposición en formato de texto de Prometheus 0.0.4"""
+        lines = []
+        for metric in self._metrics.values():
+            lines.append(f'# HELP {metric.name} {metric.description}')
+            lines.append(f'# TYPE {metric.name} {metric.type}')
+            lines.extend(metric.render())
+
+        for name, collector in list(self._collectors.items()):
+            try:
+                families = list(collector())
+            except Exception as e:
+                logger.warning(f"⚠️ Collector de métricas {name} falló: {e}")
+                continue
+            for family, kind, description, samples in families:
+                lines.append(f'# HELP {family} {description}')
+                lines.append(f'# TYPE {family} {kind}')
+                for labels, value in samples:
+                    lines.append(f'{family}{_format_labels(labels.keys(), labels.values())} {_format_value(value)}')
+        return '\n'.join(lines) + '\n'
+
+    def _register(self, metric):
+        if metric.name in self._metrics:
+            return self._metrics[metric.name]
+        self._metrics[metric.name] = metric
+        return metric
+
+REGISTRY = MetricsRegistry()
+
+HTTP_REQUESTS = REGISTRY.counter(
+    'http_requests_total', 'Peticiones HTTP atendidas', ('method', 'route', 'status'))
+HTTP_LATENCY = REGISTRY.histogram(
+    'http_request_duration_seconds', 'Latencia de las peticiones HTTP', ('method', 'route'))
+HTTP_SQL_QUERIES = REGISTRY.histogram(
+    'http_request_sql_queries', 'Sentencias SQL por petición', ('method', 'route'), COUNT_BUCKETS)
+HTTP_SQL_TIME = REGISTRY.histogram(
+    'http_request_sql_duration_seconds', 'Tiempo en SQL por petición', ('method', 'route'))
+LLM_LATENCY = REGISTRY.histogram(
+    'llm_request_duration_seconds', 'Latencia de las llamadas al LLM', ('provider', 'mode', 'outcome'))
+LLM_TOKENS = REGISTRY.counter(
+    'llm_tokens_total', 'Tokens consumidos por proveedor (input/output)', ('provider', 'type'))
+
+# Sentencias SQL de la petición en curso (None fuera de una petición)
+_request_queries: contextvars.ContextVar[Optional[QueryCounter]] = contextvars.ContextVar(
+    'request_queries', default=None)
+
+def start_request_queries() -> Tuple[QueryCounter, contextvars.Token]:
+    """Empezar a registrar las sentencias de esta petición (y de los hilos que lance)"""
+    counter = QueryCounter(None)
+    return counter, _request_queries.set(counter)
+
+def end_request_queries(token: contextvars.Token):
+    _request_queries.reset(token)
+
+def install_sql_hooks(target=Engine):
+    """
+    Listeners de SQLAlchemy que alimentan el QueryCounter de la petición en
+    curso (de todos los engines, o solo de `target`)
+    """
+
+    @event.listens_for(target, 'before_cursor_execute')
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        counter = _request_queries.get()
+        if counter is not None:
+            counter.before_cursor_execute(conn, cursor, statement, parameters, context, executemany)
+
+    @event.listens_for(target, 'after_cursor_execute')
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        counter = _request_queries.get()
+        if counter is not None:
+            counter.after_cursor_execute(conn, cursor, statement, parameters, context, executemany)
+
+def record_llm_call(provider: str, mode: str, outcome: str, seconds: float):
+    LLM_LATENCY.observe(seconds, provider, mode, outcome)
+
+def record_llm_tokens(provider: str, input_tokens: Optional[int], output_tokens: Optional[int]):
+    if input_tokens:
+        LLM_TOKENS.inc(provider, 'input', amount=input_tokens)
+    if output_tokens:
+        LLM_TOKENS.inc(provider, 'output', amount=output_tokens)
+
+def llm_cache_metrics(cache) -> List[Family]:
+    """Collector del cache de respuestas de IA (LLMResponseCache.get_stats)"""
+    stats = cache.get_stats()
+    return [
+        ('ai_cache_lookups_total', 'counter', 'Búsquedas en el cache de IA por resultado',
+         [({'result': 'hit'}, stats['hits']), ({'result': 'miss'}, stats['misses'])]),
+        ('ai_cache_hit_ratio', 'gauge', 'Proporción de aciertos del cache de IA desde el arranque',
+         [({}, stats['hit_rate'])]),
+        ('ai_cache_evictions_total', 'counter', 'Entradas desalojadas o caducadas del cache de IA',
+         [({'reason': 'lru'}, stats['evictions']), ({'reason': 'expired'}, stats['expired']),
+          ({'reason': 'invalidated'}, stats['invalidations'])]),
+        ('ai_cache_entries', 'gauge', 'Entradas en el cache de IA', [({}, stats['entries'])]),
+    ]
+
+def org_snapshot_metrics(snapshots) -> List[Family]:
+    """Collector del snapshot de la organización (OrgSnapshotCache.status)"""
+    status = snapshots.status()
+    families = [
+        ('org_snapshot_requests_total', 'counter', 'Peticiones del snapshot de la organización por resultado',
+         [({'result': 'hit'}, status['hits']), ({'result': 'load'}, status['loads'])]),
+    ]
+    if status['load_ms'] is not None:
+        families.append(('org_snapshot_load_seconds', 'gauge', 'Duración de la última carga del snapshot',
+                         [({}, status['load_ms'] / 1000)]))
+    return families
+
+def risk_detector_metrics(detector) -> List[Family]:
+    """Collector del motor de reglas de riesgo (RiskDetector.status)"""
+    status = detector.status()
+    families = [
+        ('risk_detector_active_risks', 'gauge', 'Riesgos que se cumplen ahora por regla',
+         [({'rule': rule}, count) for rule, count in status['active'].items()]),
+        ('risk_detector_card_changes_total', 'counter', 'Cambios de tarjetas aplicados de forma incremental',
+         [({}, status['card_changes'])]),
+        ('risk_detector_reloads_total', 'counter', 'Recargas completas por exceso de cambios desde la pasada anterior',
+         [({}, status['reloads'])]),
+        ('risk_detector_evaluations_total', 'counter', 'Evaluaciones de reglas (una por sujeto afectado)',
+         [({}, status['evaluations'])]),
+        ('risk_detector_writes_total', 'counter', 'Riesgos escritos por operación',
+         [({'op': op}, status[op]) for op in ('created', 'updated', 'resolved')]),
+    ]
+    if status['last_duration_ms'] is not None:
+        families.append(('risk_detector_last_run_seconds', 'gauge', 'Duración de la última pasada del detector',
+                         [({}, status['last_duration_ms'] / 1000)]))
+    return families
+
+def card_history_metrics(history) -> List[Family]:
+    """Collector del historial de estados de tarjetas (CardHistoryService.status)"""
+    status = history.status()
+    return [
+        ('card_history_transitions_total', 'counter', 'Transiciones de columna/estado registradas',
+         [({}, status['transitions'])]),
+        ('card_history_backfilled_total', 'counter', 'Tarjetas sin historial a las que se abrió un tramo',
+         [({}, status['backfilled'])]),
+        ('card_history_aging_requests_total', 'counter', 'Consultas de envejecimiento del WIP por resultado',
+         [({'result': 'hit'}, status['aging_hits']), ({'result': 'load'}, status['aging_loads'])]),
+    ]
+
+def scheduler_metrics(scheduler) -> List[Family]:
+    """Collector de las tareas del planificador (JobScheduler.status)"""
+    jobs = scheduler.status()
+    return [
+        ('scheduler_job_runs_total', 'counter', 'Ejecuciones de cada tarea programada',
+         [({'job': job['name']}, job['runs']) for job in jobs]),
+        ('scheduler_job_failures_total', 'counter', 'Ejecuciones fallidas de cada tarea programada',
+         [({'job': job['name']}, job['failures']) for job in jobs]),
+        ('scheduler_job_last_duration_seconds', 'gauge', 'Duración de la última ejecución',
+         [({'job': job['name']}, job['last_duration_ms'] / 1000) for job in jobs if job['last_duration_ms'] is not None]),
+    ]
+
+def analysis_executor_metrics(executor) -> List[Family]:
+    """Collector del pool de procesos de análisis (AnalysisExecutor.status)"""
+    status = executor.status()
+    return [
+        ('analysis_tasks_total', 'counter', 'Análisis enviados al pool por resultado',
+         [({'result': result}, status[result]) for result in ('completed', 'failed', 'timeouts', 'cancelled')]),
+        ('analysis_tasks_running', 'gauge', 'Análisis en ejecución', [({}, status['running'])]),
+        ('analysis_pool_recycles_total', 'counter', 'Veces que se recreó el pool', [({}, status['recycled'])]),
+    ]
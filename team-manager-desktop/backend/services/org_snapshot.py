@@ -0,0 +1,228 @@
+"""
+📸 Snapshot de la Organización
+Vista inmutable de equipos, proyectos, tarjetas y usuarios para los análisis, cargada con unas pocas
+consultas masivas y cacheada por versión de cambios de la base de datos
+"""
+
+import asyncio
+import json
+import logging
+import threading
+import time
+from collections import namedtuple
+from datetime import datetime
+from typing import Dict, Any, Optional, Tuple
+
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+
+from models.database import Team, Project, Card, User, SyncSequence, team_members, project_teams
+
+logger = logging.getLogger(__name__)
+
+# Registros de solo lectura con los mismos atributos que leen los análisis en
+# los modelos ORM (team.members, project.teams, card.status...): el director de
+# IA, ContextBuilder y analysis_tasks los aceptan sin cambios. Las relaciones
+# ya vienen resueltas, así que iterarlas no lanza consultas
+UserView = namedtuple('UserView', 'id name role capacity skills_list')
+TeamView = namedtuple('TeamView', 'id name color members wip_limits_dict')
+ProjectView = namedtuple(
+    'ProjectView', 'id name status priority teams progress start_date end_date estimated_hours actual_hours'
+)
+CardView = namedtuple(
+    'CardView',
+    'id title card_type priority status team_id project_id column_id assigned_to estimated_hours '
+    'actual_hours story_points created_at updated_at started_at completed_at'
+)
+
+# Modelos cuyos cambios (incluidas altas y bajas en relaciones como team.members)
+# invalidan el snapshot aunque no muevan el cursor de change_version
+WATCHED_MODELS = (Team, Project, Card, User)
+
+def _json(value: Optional[str], default):
+    if not value:
+        return default
+    try:
+        return json.loads(value)
+    except (TypeError, ValueError):
+        return default
+
+class OrgSnapshot:
+    """
+    Estado de la organización en una versión concreta.
+
+    `teams`, `projects` y `users` son los activos (lo que analiza el director);
+    `cards` son todas las tarjetas y `open_cards` las que no están terminadas.
+    Todo son tuplas de registros inmutables: varios análisis pueden leer el
+    mismo snapshot a la vez, en hilos distintos.
+    """
+
+    __slots__ = ('key', 'teams', 'projects', 'cards', 'open_cards', 'users', 'loaded_at', 'load_ms', '_card_store')
+
+    def __init__(self, key: Tuple[int, int], teams: Tuple[TeamView, ...], projects: Tuple[ProjectView, ...],
+                 cards: Tuple[CardView, ...], users: Tuple[UserView, ...], load_ms: float):
+        set_attribute = super().__setattr__
+        set_attribute('key', key)
+        set_attribute('teams', teams)
+        set_attribute('projects', projects)
+        set_attribute('cards', cards)
+        set_attribute('open_cards', tuple(card for card in cards if card.status != 'done'))
+        set_attribute('users', users)
+        set_attribute('loaded_at', datetime.now())
+        set_attribute('load_ms', load_ms)
+        set_attribute('_card_store', None)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("OrgSnapshot es inmutable")
+
+    @property
+    def card_store(self):
+        """Todas las tarjetas en columnas (CardStore), construidas la primera vez que se piden"""
+        store = self._card_store
+        if store is None:
+            # Import diferido: NumPy solo cuando algún análisis agrega tarjetas
+            from services.card_store import CardStore
+
+            # Si dos hilos llegan a la vez se construye dos veces, con el mismo resultado
+            store = CardStore.from_cards(self.cards)
+            super().__setattr__('_card_store', store)
+        return store
+
+    def __repr__(self) -> str:
+        return (f"<OrgSnapshot v{self.key[0]}.{self.key[1]}: {len(self.teams)} equipos, "
+                f"{len(self.projects)} proyectos, {len(self.cards)} tarjetas, {len(self.users)} usuarios>")
+
+def load_snapshot(session: Session, key: Tuple[int, int] = (0, 0)) -> OrgSnapshot:
+    """Leer la organización con seis consultas, sin importar su tamaño"""
+    started = time.perf_counter()
+
+    all_users = {
+        row.id: UserView(row.id, row.name, row.role, row.capacity, tuple(_json(row.skills, [])))
+        for row in session.execute(
+            select(User.id, User.name, User.role, User.capacity, User.skills).where(User.is_active == True)  # noqa: E712
+        )
+    }
+
+    members: Dict[str, list] = {}
+    for team_id, user_id in session.execute(select(team_members.c.team_id, team_members.c.user_id)):
+        user = all_users.get(user_id)
+        if user is not None:
+            members.setdefault(team_id, []).append(user)
+
+    all_teams = {
+        row.id: TeamView(row.id, row.name, row.color, tuple(members.get(row.id, ())), _json(row.wip_limits, {}))
+        for row in session.execute(
+            select(Team.id, Team.name, Team.color, Team.wip_limits).where(Team.is_active == True)  # noqa: E712
+        )
+    }
+
+    owners: Dict[str, list] = {}
+    for project_id, team_id in session.execute(select(project_teams.c.project_id, project_teams.c.team_id)):
+        team = all_teams.get(team_id)
+        if team is not None:
+            owners.setdefault(project_id, []).append(team)
+
+    projects = tuple(
+        ProjectView(row.id, row.name, row.status, row.priority, tuple(owners.get(row.id, ())), row.progress,
+                    row.start_date, row.end_date, row.estimated_hours, row.actual_hours)
+        for row in session.execute(
+            select(Project.id, Project.name, Project.status, Project.priority, Project.progress,
+                   Project.start_date, Project.end_date, Project.estimated_hours, Project.actual_hours)
+            .where(Project.is_active == True)  # noqa: E712
+        )
+    )
+
+    cards = tuple(
+        CardView._make(row)
+        for row in session.execute(select(
+            Card.id, Card.title, Card.card_type, Card.priority, Card.status, Card.team_id, Card.project_id,
+            Card.column_id, Card.assigned_to, Card.estimated_hours, Card.actual_hours, Card.story_points,
+            Card.created_at, Card.updated_at, Card.started_at, Card.completed_at
+        ))
+    )
+
+    return OrgSnapshot(key, tuple(all_teams.values()), projects, cards, tuple(all_users.values()),
+                       round((time.perf_counter() - started) * 1000, 1))
+
+class OrgSnapshotCache:
+    """
+    Snapshot compartido por todos los análisis.
+
+    La clave es (cursor de change_version, generación local). El cursor cubre
+    las escrituras de tarjetas, proyectos y equipos, también las masivas que
+    no pasan por el ORM; la generación sube al confirmar cambios que el cursor
+    no ve (usuarios, miembros de equipos, equipos de proyectos). Pedir el
+    snapshot cuesta una consulta de una fila mientras nada cambie, así que
+    varios análisis seguidos comparten una sola carga.
+    """
+
+    def __init__(self, session_factory):
+        self.session_factory = session_factory
+        self._snapshot: Optional[OrgSnapshot] = None
+        self._generation = 0
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'loads': 0}
+
+    def get(self, session: Optional[Session] = None) -> OrgSnapshot:
+        """Snapshot de la versión actual (recargado solo si la base de datos cambió)"""
+        if session is None:
+            with self.session_factory() as own_session:
+                return self.get(own_session)
+
+        generation = self._generation
+        key = (self._current_version(session), generation)
+        snapshot = self._snapshot
+        if snapshot is not None and snapshot.key == key:
+            self._stats['hits'] += 1
+            return snapshot
+
+        with self._lock:
+            # Otro hilo pudo cargarlo mientras se esperaba el cerrojo
+            if self._snapshot is not None and self._snapshot.key == key:
+                self._stats['hits'] += 1
+                return self._snapshot
+            snapshot = load_snapshot(session, key)
+            self._snapshot = snapshot
+            self._stats['loads'] += 1
+
+        logger.debug(f"📸 Snapshot cargado en {snapshot.load_ms} ms: {snapshot!r}")
+        return snapshot
+
+    async def aget(self) -> OrgSnapshot:
+        """Como get(), con la lectura en un hilo para no bloquear el event loop"""
+        return await asyncio.to_thread(self.get)
+
+    def invalidate(self):
+        """Forzar la recarga en el siguiente get()"""
+        self._generation += 1
+
+    def install_hooks(self):
+        """Subir la generación al confirmar cambios en equipos, proyectos, tarjetas o usuarios"""
+
+        @event.listens_for(Session, 'after_flush')
+        def collect_snapshot_changes(session, flush_context):
+            if not session.info.get('org_snapshot_stale'):
+                changed = (*session.new, *session.dirty, *session.deleted)
+                if any(isinstance(obj, WATCHED_MODELS) for obj in changed):
+                    session.info['org_snapshot_stale'] = True
+
+        @event.listens_for(Session, 'after_commit')
+        def invalidate_snapshot(session):
+            if session.info.pop('org_snapshot_stale', None):
+                self.invalidate()
+
+        @event.listens_for(Session, 'after_rollback')
+        def discard_snapshot_changes(session):
+            session.info.pop('org_snapshot_stale', None)
+
+    def status(self) -> Dict[str, Any]:
+        snapshot = self._snapshot
+        return {
+            **self._stats,
+            'version': list(snapshot.key) if snapshot else None,
+            'load_ms': snapshot.load_ms if snapshot else None,
+            'loaded_at': snapshot.loaded_at.isoformat() if snapshot else None
+        }
+
+    def _current_version(self, session: Session) -> int:
+        return session.execute(select(SyncSequence.value).where(SyncSequence.id == 1)).scalar() or 0
@@ -0,0 +1,342 @@
+"""
+🔬 Perfilado Bajo Demanda
+Spans de tiempo (director de IA, tareas programadas, SQL) y volcado por ejecución a data/profiles
+en formato speedscope y, opcionalmente, cProfile/pstats
+"""
+
+import asyncio
+import contextvars
+import cProfile
+import functools
+import inspect
+import json
+import logging
+import os
+import re
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Callable, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+SPANS = 'speedscope'
+CPROFILE = 'cprofile'
+
+# Valores aceptados en PROFILING y en ?profile=
+MODE_ALIASES = {'1': SPANS, 'true': SPANS, 'spans': SPANS, SPANS: SPANS, CPROFILE: CPROFILE, 'pstats': CPROFILE}
+
+SQL_TARGET = re.compile(r'\b(?:FROM|INTO|UPDATE|JOIN)\s+"?(\w+)', re.IGNORECASE)
+
+def parse_mode(value: Optional[str]) -> Optional[str]:
+    """Modo de perfilado a partir de la variable de entorno o del parámetro (None = desactivado)"""
+    if not value:
+        return None
+    return MODE_ALIASES.get(value.strip().lower())
+
+class ProfilerSettings:
+    """Configuración global: dónde se guardan los perfiles y qué se perfila sin pedirlo"""
+
+    def __init__(self):
+        self.directory = Path(__file__).resolve().parent.parent / 'data' / 'profiles'
+        self.default_mode: Optional[str] = parse_mode(os.getenv('PROFILING'))
+        self.keep = int(os.getenv('PROFILES_KEEP', 50))
+
+settings = ProfilerSettings()
+
+def configure(directory: Optional[Path] = None, default_mode: Optional[str] = None, keep: Optional[int] = None):
+    """Ajustar la configuración (main.py la llama con DATA_DIR / 'profiles')"""
+    if directory is not None:
+        settings.directory = Path(directory)
+    if default_mode is not None:
+        settings.default_mode = parse_mode(default_mode)
+    if keep is not None:
+        settings.keep = keep
+
+class Profile:
+    """
+    Una ejecución perfilada: spans (nombre, carril, inicio, fin) y, en modo
+    cprofile, el cProfile del hilo que la abrió.
+
+    Los spans de tareas asyncio concurrentes (gather del map-reduce) o de
+    hilos van a carriles distintos, que speedscope muestra por separado.
+    """
+
+    def __init__(self, name: str, mode: str):
+        self.name = name
+        self.mode = mode
+        self.started = time.perf_counter()
+        self.ended: Optional[float] = None
+        self.spans: List[Tuple[str, str, float, float]] = []
+        self.stem = f"{datetime.now().strftime('%Y%m%d-%H%M%S-%f')}-{_slug(name)}"
+        self._lock = threading.Lock()
+        self._profiler: Optional[cProfile.Profile] = None
+
+    def add_span(self, name: str, start: float, end: float):
+        with self._lock:
+            self.spans.append((name, _lane(), start, end))
+
+    def start(self):
+        if self.mode == CPROFILE:
+            self._profiler = cProfile.Profile()
+            try:
+                self._profiler.enable()
+            except ValueError:
+                # Ya hay otro cProfile activo en este hilo (perfiles anidados)
+                self._profiler = None
+
+    def stop(self):
+        self.ended = time.perf_counter()
+        if self._profiler is not None:
+            self._profiler.disable()
+
+    def files(self) -> List[Path]:
+        """Ficheros que escribe la ejecución (speedscope siempre, pstats en modo cprofile)"""
+        suffixes = ['.speedscope.json'] + (['.pstats'] if self.mode == CPROFILE else [])
+        return [settings.directory / f'{self.stem}{suffix}' for suffix in suffixes]
+
+    def save(self):
+        """Escribir los ficheros de la ejecución y borrar los más antiguos"""
+        settings.directory.mkdir(parents=True, exist_ok=True)
+        with open(settings.directory / f'{self.stem}.speedscope.json', 'w', encoding='utf-8') as f:
+            json.dump(self.to_speedscope(), f)
+        if self._profiler is not None:
+            self._profiler.dump_stats(str(settings.directory / f'{self.stem}.pstats'))
+        _prune(settings.directory, settings.keep)
+
+    def summary(self, top: int = 8) -> List[Tuple[str, float, int]]:
+        """Spans agregados por nombre: (nombre, ms totales, llamadas), de más a menos tiempo"""
+        totals: Dict[str, List[float]] = defaultdict(lambda: [0.0, 0])
+        for name, _, start, end in self.spans:
+            totals[name][0] += (end - start) * 1000
+            totals[name][1] += 1
+        ranked = sorted(totals.items(), key=lambda item: item[1][0], reverse=True)[:top]
+        return [(name, round(ms, 1), int(count)) for name, (ms, count) in ranked]
+
+    def to_speedscope(self) -> Dict[str, Any]:
+        """Formato 'evented' de speedscope (https://www.speedscope.app), un perfil por carril"""
+        frames: List[Dict[str, str]] = []
+        frame_index: Dict[str, int] = {}
+
+        def frame(name: str) -> int:
+            if name not in frame_index:
+                frame_index[name] = len(frames)
+                frames.append({'name': name})
+            return frame_index[name]
+
+        end_value = ((self.ended or time.perf_counter()) - self.started) * 1000
+        by_lane: Dict[str, List[Tuple[str, float, float]]] = defaultdict(list)
+        for name, lane, start, end in self.spans:
+            # Duración mínima para que la apertura siempre preceda al cierre
+            start_ms = (start - self.started) * 1000
+            by_lane[lane].append((name, start_ms, max((end - self.started) * 1000, start_ms + 0.001)))
+
+        profiles = []
+        for lane, spans in by_lane.items():
+            # Repartir en sub-carriles donde los spans anidan bien (un generador async puede solaparse)
+            sublanes: List[List[Tuple[str, float, float]]] = []
+            stacks: List[List[float]] = []
+            for item in sorted(spans, key=lambda s: (s[1], -s[2])):
+                for sublane, stack in zip(sublanes, stacks):
+                    while stack and stack[-1] <= item[1]:
+                        stack.pop()
+                    if not stack or stack[-1] >= item[2]:
+                        sublane.append(item)
+                        stack.append(item[2])
+                        break
+                else:
+                    sublanes.append([item])
+                    stacks.append([item[2]])
+
+            for number, sublane in enumerate(sublanes):
+                events = []
+                for name, start, end in sublane:
+                    events.append((start, 1, -end, {'type': 'O', 'frame': frame(name), 'at': start}))
+                    events.append((end, 0, -start, {'type': 'C', 'frame': frame(name), 'at': end}))
+                events.sort(key=lambda e: e[:3])
+                profiles.append({
+                    'type': 'evented',
+                    'name': lane if number == 0 else f'{lane} ({number + 1})',
+                    'unit': 'milliseconds',
+                    'startValue': 0,
+                    'endValue': end_value,
+                    'events': [e[3] for e in events]
+                })
+
+        return {
+            '$schema': 'https://www.speedscope.app/file-format-schema.json',
+            'name': self.name,
+            'exporter': 'team-manager-backend',
+            'shared': {'frames': frames},
+            'profiles': profiles
+        }
+
+# Ejecución perfilada en curso (por contexto: petición, tarea o hilo)
+_active: contextvars.ContextVar[Optional[Profile]] = contextvars.ContextVar('active_profile', default=None)
+
+def current_profile() -> Optional[Profile]:
+    return _active.get()
+
+class profile_run:
+    """
+    Abrir una ejecución perfilada (con `with` o `async with`). Si ya hay una
+    en curso, o no hay modo (ni explícito ni por PROFILING), no hace nada.
+
+        async with profile_run('ai_director.analyze_global_state'):
+            ...
+    """
+
+    def __init__(self, name: str, mode: Optional[str] = None):
+        self.name = name
+        self.mode = mode
+        self.profile: Optional[Profile] = None
+        self._token = None
+
+    def __enter__(self) -> Optional[Profile]:
+        mode = self.mode or settings.default_mode
+        if mode is None or _active.get() is not None:
+            return None
+        self.profile = Profile(self.name, mode)
+        self._token = _active.set(self.profile)
+        self.profile.start()
+        return self.profile
+
+    def __exit__(self, exc_type, exc, tb):
+        if self.profile is None:
+            return
+        self.profile.stop()
+        self.profile.add_span(self.name, self.profile.started, self.profile.ended)
+        _active.reset(self._token)
+        _finish(self.profile)
+
+    async def __aenter__(self) -> Optional[Profile]:
+        return self.__enter__()
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self.__exit__(exc_type, exc, tb)
+
+class span:
+    """Medir un bloque dentro de la ejecución perfilada en curso (sin coste apreciable si no hay)"""
+
+    __slots__ = ('name', 'profile', 'start')
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self):
+        self.profile = _active.get()
+        if self.profile is not None:
+            self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self.profile is not None:
+            self.profile.add_span(self.name, self.start, time.perf_counter())
+
+def traced(name: Optional[str] = None, root: bool = False):
+    """
+    Decorador de spans para funciones, corrutinas y generadores async.
+    Con root=True, fuera de una ejecución perfilada abre una si PROFILING está activo.
+    Desactivado cuesta una lectura de contextvar por llamada.
+    """
+
+    def decorator(func: Callable):
+        span_name = name or func.__qualname__
+
+        def opener():
+            if _active.get() is not None:
+                return span(span_name)
+            if root and settings.default_mode:
+                return profile_run(span_name)
+            return None
+
+        if inspect.isasyncgenfunction(func):
+            @functools.wraps(func)
+            async def asyncgen_wrapper(*args, **kwargs):
+                context = opener()
+                if context is None:
+                    async for item in func(*args, **kwargs):
+                        yield item
+                    return
+                with context:
+                    async for item in func(*args, **kwargs):
+                        yield item
+            return asyncgen_wrapper
+
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                context = opener()
+                if context is None:
+                    return await func(*args, **kwargs)
+                with context:
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            context = opener()
+            if context is None:
+                return func(*args, **kwargs)
+            with context:
+                return func(*args, **kwargs)
+        return wrapper
+
+    return decorator
+
+def install_sql_hooks():
+    """Spans por sentencia SQL ('sql SELECT cards') dentro de las ejecuciones perfiladas"""
+
+    @event.listens_for(Engine, 'before_cursor_execute')
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if _active.get() is not None:
+            conn.info.setdefault('profile_sql_started', []).append(time.perf_counter())
+
+    @event.listens_for(Engine, 'after_cursor_execute')
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        profile = _active.get()
+        started = conn.info.get('profile_sql_started')
+        if profile is not None and started:
+            target = SQL_TARGET.search(statement)
+            verb = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else 'SQL'
+            profile.add_span(f"sql {verb} {target.group(1) if target else ''}".rstrip(), started.pop(), time.perf_counter())
+
+def _finish(profile: Profile):
+    try:
+        profile.save()
+    except OSError as e:
+        logger.warning(f"⚠️ No se pudo guardar el perfil {profile.name}: {e}")
+        return
+    total = round((profile.ended - profile.started) * 1000, 1)
+    summary = ', '.join(f"{name} {ms} ms ×{count}" for name, ms, count in profile.summary())
+    logger.info(f"🔬 Perfil {profile.name} ({total} ms) → {profile.stem}: {summary}")
+
+def _lane() -> str:
+    try:
+        task = asyncio.current_task()
+    except RuntimeError:
+        task = None
+    if task is not None:
+        return task.get_name()
+    return threading.current_thread().name
+
+def _slug(name: str) -> str:
+    return re.sub(r'[^A-Za-z0-9_-]+', '_', name).strip('_')[:80] or 'run'
+
+def _prune(directory: Path, keep: int):
+    """Conservar solo los perfiles de las `keep` ejecuciones más recientes"""
+    runs: Dict[str, List[Path]] = defaultdict(list)
+    for path in directory.iterdir():
+        if path.suffix in ('.json', '.pstats'):
+            runs[path.name.split('.', 1)[0]].append(path)
+    for stem in sorted(runs)[:-keep] if keep > 0 else []:
+        for path in runs[stem]:
+            try:
+                path.unlink()
+            except OSError:
+                pass
@@ -0,0 +1,52 @@
+"""
+🔢 Contador de Consultas SQL
+Registra las sentencias ejecutadas en un bloque (regresiones N+1, perfiles)
+"""
+
+import time
+from typing import List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+class QueryCounter:
+    """
+    Context manager que cuenta las sentencias SQL ejecutadas en un engine.
+
+        with QueryCounter(engine) as counter:
+            load_board(session, board_id)
+        assert counter.count <= 4
+
+    Sin engine no escucha por sí mismo: lo alimentan los hooks globales de
+    services/metrics.py con las sentencias de una petición.
+    """
+
+    def __init__(self, engine: Optional[Engine]):
+        self.engine = engine
+        self.statements: List[Tuple[str, float]] = []
+        self._started = {}
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    @property
+    def total_ms(self) -> float:
+        return round(sum(duration for _, duration in self.statements), 2)
+
+    def before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        self._started[id(cursor)] = time.perf_counter()
+
+    def after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        start = self._started.pop(id(cursor), None)
+        duration = (time.perf_counter() - start) * 1000 if start else 0.0
+        self.statements.append((statement, duration))
+
+    def __enter__(self) -> "QueryCounter":
+        event.listen(self.engine, 'before_cursor_execute', self.before_cursor_execute)
+        event.listen(self.engine, 'after_cursor_execute', self.after_cursor_execute)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        event.remove(self.engine, 'before_cursor_execute', self.before_cursor_execute)
+        event.remove(self.engine, 'after_cursor_execute', self.after_cursor_execute)
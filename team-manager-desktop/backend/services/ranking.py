@@ -0,0 +1,304 @@
+"""
+🔢 Orden Fraccionario de Tarjetas y Columnas
+Claves de orden lexicográficas (base 62): mover un elemento escribe una sola fila
+"""
+
+import logging
+from typing import Iterable, List, Optional, Tuple
+
+from sqlalchemy import Integer, cast, inspect, select, update
+from sqlalchemy.orm import Session
+from sqlalchemy.schema import CreateTable
+
+from models.database import Column, Card
+from services.sync import next_change_version
+
+logger = logging.getLogger(__name__)
+
+# Orden ASCII == orden numérico de los dígitos
+RANK_ALPHABET = '0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz'
+RANK_BASE = len(RANK_ALPHABET)
+RANK_DIGITS = {ch: i for i, ch in enumerate(RANK_ALPHABET)}
+
+# Por encima de esta longitud se reequilibra el contenedor
+MAX_RANK_LENGTH = 24
+
+def _midpoint(low: str, high: Optional[str]) -> str:
+    """
+    Clave estrictamente entre `low` y `high` ('' = inicio, None = final).
+
+    Ninguna clave generada termina en '0', lo que garantiza que siempre
+    existe una clave intermedia sin renumerar a los vecinos.
+    """
+    if high is not None:
+        # Prefijo común (low se completa con '0')
+        n = 0
+        while n < len(high) and (low[n] if n < len(low) else '0') == high[n]:
+            n += 1
+        if n > 0:
+            return high[:n] + _midpoint(low[n:], high[n:])
+
+    digit_low = RANK_DIGITS[low[0]] if low else 0
+    digit_high = RANK_DIGITS[high[0]] if high else RANK_BASE
+
+    if digit_high - digit_low > 1:
+        return RANK_ALPHABET[(digit_low + digit_high) // 2]
+
+    # Dígitos consecutivos
+    if high is not None and len(high) > 1:
+        return high[0]
+    return RANK_ALPHABET[digit_low] + _midpoint(low[1:], None)
+
+def _increment(low: str) -> str:
+    """
+    Clave para añadir al final: sube en uno el primer dígito que no es el
+    máximo. Con el punto medio la clave crecería un carácter cada ~6 altas;
+    así crece uno cada ~61.
+    """
+    for i, ch in enumerate(low):
+        if RANK_DIGITS[ch] < RANK_BASE - 1:
+            return low[:i] + RANK_ALPHABET[RANK_DIGITS[ch] + 1]
+    return low + RANK_ALPHABET[1]
+
+def rank_between(before: Optional[str], after: Optional[str]) -> str:
+    """Clave de orden para un elemento entre `before` y `after` (None = extremo)"""
+    if before is not None and after is not None and before >= after:
+        raise ValueError(f"Claves de orden desordenadas: {before!r} >= {after!r}")
+    if before and after is None:
+        return _increment(before)
+    return _midpoint(before or '', after)
+
+def spread_ranks(count: int) -> List[str]:
+    """`count` claves cortas y equiespaciadas (para reequilibrar o importar)"""
+    if count <= 0:
+        return []
+
+    width = 1
+    while RANK_BASE ** width <= count:
+        width += 1
+    step = RANK_BASE ** width / (count + 1)
+
+    ranks = []
+    for i in range(1, count + 1):
+        value = int(step * i)
+        digits = []
+        for _ in range(width):
+            value, digit = divmod(value, RANK_BASE)
+            digits.append(RANK_ALPHABET[digit])
+        ranks.append(''.join(reversed(digits)).rstrip('0'))
+    return ranks
+
+def rank_at(index: int, width: int = 4) -> str:
+    """
+    Clave de ancho fijo para la posición `index` de una secuencia (importaciones
+    en streaming, donde no se conoce el total). Deja hueco entre claves
+    consecutivas para movimientos posteriores.
+    """
+    value = index + 1
+    digits = []
+    for _ in range(width):
+        value, digit = divmod(value, RANK_BASE)
+        digits.append(RANK_ALPHABET[digit])
+    if value:
+        raise ValueError(f"Índice {index} fuera de rango para claves de {width} dígitos")
+    return ''.join(reversed(digits)).rstrip('0')
+
+def needs_rebalance(rank: Optional[str]) -> bool:
+    return rank is not None and len(rank) > MAX_RANK_LENGTH
+
+def complete_neighbours(session: Session, model, parent_column, parent_id: str,
+                        before: Optional[str], after: Optional[str],
+                        exclude_ids: Iterable[str] = (), pending: Iterable[Optional[str]] = ()
+                        ) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Completar el vecino que falta cuando solo se indica uno.
+
+    Con solo `before` el otro extremo es el hermano inmediatamente posterior
+    (no el final del contenedor), y con solo `after` el inmediatamente anterior.
+    Las filas de `exclude_ids` se ignoran en la base de datos y `pending` son
+    claves de hermanos aún sin escribir (movimientos de un lote sin flush).
+    """
+    if (before is None) == (after is None):
+        return before, after
+
+    siblings = select(model.position).where(parent_column == parent_id, model.id.notin_(list(exclude_ids)))
+    if after is None:
+        found = session.execute(
+            siblings.where(model.position > before).order_by(model.position).limit(1)
+        ).scalar_one_or_none()
+        return before, min((r for r in (found, *pending) if r is not None and r > before), default=None)
+
+    found = session.execute(
+        siblings.where(model.position < after).order_by(model.position.desc()).limit(1)
+    ).scalar_one_or_none()
+    return max((r for r in (found, *pending) if r is not None and r < after), default=None), after
+
+def _rebuild_table(connection, table):
+    """
+    Recrear `table` con el esquema actual conservando sus filas (SQLite no
+    permite cambiar el tipo de una columna). Requiere foreign_keys=OFF.
+    """
+    staging = f'{table.name}_rebuild'
+    existing = {column['name'] for column in inspect(connection).get_columns(table.name)}
+    columns = ', '.join(column.name for column in table.columns if column.name in existing)
+
+    ddl = str(CreateTable(table).compile(connection)).replace(
+        f'CREATE TABLE {table.name} (', f'CREATE TABLE {staging} (', 1
+    )
+    connection.exec_driver_sql(f'DROP TABLE IF EXISTS {staging}')
+    connection.exec_driver_sql(ddl)
+    connection.exec_driver_sql(f'INSERT INTO {staging} ({columns}) SELECT {columns} FROM {table.name}')
+    connection.exec_driver_sql(f'DROP TABLE {table.name}')
+    connection.exec_driver_sql(f'ALTER TABLE {staging} RENAME TO {table.name}')
+    for index in table.indexes:
+        index.create(connection)
+
+def migrate_legacy_positions(session_factory) -> int:
+    """
+    Convertir las posiciones enteras de bases de datos anteriores a las claves
+    de orden (se llama al arrancar).
+
+    Las tablas cuya columna position sigue declarada INTEGER se recrean con
+    position de texto (con afinidad entera, una clave como '1' volvería como
+    número y se ordenaría antes que cualquier texto) y cada columna/tablero se
+    reequilibra conservando el orden numérico anterior. Devuelve las filas
+    reescritas.
+    """
+    containers = ((Card, Card.column_id), (Column, Column.board_id))
+    with session_factory() as session:
+        engine = session.get_bind()
+
+    legacy = []
+    with engine.connect() as connection:
+        inspector = inspect(connection)
+        for model, parent_column in containers:
+            types = {column['name']: column['type'] for column in inspector.get_columns(model.__tablename__)}
+            if isinstance(types.get('position'), Integer):
+                legacy.append((model, parent_column))
+        if not legacy:
+            return 0
+
+        foreign_keys = connection.exec_driver_sql('PRAGMA foreign_keys').scalar()
+        connection.exec_driver_sql('PRAGMA foreign_keys=OFF')
+        connection.commit()
+        try:
+            with connection.begin():
+                for model, _ in legacy:
+                    logger.info(f"🔢 Convirtiendo {model.__tablename__}.position en clave de orden")
+                    _rebuild_table(connection, model.__table__)
+        finally:
+            connection.exec_driver_sql(f'PRAGMA foreign_keys={int(bool(foreign_keys))}')
+
+    rewritten = 0
+    service = RankingService()
+    with session_factory() as session:
+        for model, parent_column in legacy:
+            parents = session.execute(select(parent_column).distinct()).scalars().all()
+            for parent_id in parents:
+                ids = session.execute(
+                    select(model.id).where(parent_column == parent_id)
+                    .order_by(cast(model.position, Integer), model.id)
+                ).scalars().all()
+                rewritten += service._rewrite(session, model, ids)
+    return rewritten
+
+class RankingService:
+    """
+    Posicionamiento de tarjetas dentro de columnas y de columnas dentro de tableros.
+
+    Cada movimiento lee como mucho las claves de los dos vecinos (por el índice
+    (column_id, position)) y actualiza únicamente la fila movida. Cuando las
+    claves crecen demasiado, `rebalance_column` / `rebalance_board` reasignan
+    claves cortas en segundo plano.
+    """
+
+    def _neighbour_ranks(self, session: Session, model, parent_column, parent_id: str,
+                         before_id: Optional[str], after_id: Optional[str], exclude_id: str):
+        """Claves de los vecinos; sin vecinos explícitos se añade al final"""
+        def rank_of(row_id: Optional[str]) -> Optional[str]:
+            if row_id is None:
+                return None
+            rank = session.execute(
+                select(model.position).where(model.id == row_id, parent_column == parent_id)
+            ).scalar_one_or_none()
+            if rank is None:
+                raise ValueError(f"Vecino {row_id} no encontrado en {parent_id}")
+            return rank
+
+        if before_id is None and after_id is None:
+            last = session.execute(
+                select(model.position)
+                .where(parent_column == parent_id, model.id != exclude_id)
+                .order_by(model.position.desc())
+                .limit(1)
+            ).scalar_one_or_none()
+            return last, None
+
+        return complete_neighbours(session, model, parent_column, parent_id,
+                                   rank_of(before_id), rank_of(after_id), exclude_ids=[exclude_id])
+
+    def move_card(self, session: Session, card: Card, column_id: str,
+                  before_id: Optional[str] = None, after_id: Optional[str] = None) -> bool:
+        """
+        Mover una tarjeta a `column_id`, entre `before_id` y `after_id`. El
+        estado de la tarjeta pasa a ser el tipo de la columna.
+
+        Devuelve True si la columna necesita reequilibrarse.
+        """
+        column = session.get(Column, column_id)
+        if column is None:
+            raise ValueError(f"Columna {column_id} no encontrada")
+        before, after = self._neighbour_ranks(session, Card, Card.column_id, column_id,
+                                              before_id, after_id, card.id)
+        card.column_id = column_id
+        card.status = column.column_type
+        try:
+            card.position = rank_between(before, after)
+        except ValueError:
+            # Claves repetidas (movimientos concurrentes): colocar tras `before`
+            logger.warning(f"⚠️ Claves de orden repetidas en la columna {column_id}")
+            card.position = rank_between(before, None)
+            return True
+        return needs_rebalance(card.position)
+
+    def move_column(self, session: Session, column: Column,
+                    before_id: Optional[str] = None, after_id: Optional[str] = None) -> bool:
+        """Mover una columna dentro de su tablero. Devuelve True si hay que reequilibrar"""
+        before, after = self._neighbour_ranks(session, Column, Column.board_id, column.board_id,
+                                              before_id, after_id, column.id)
+        try:
+            column.position = rank_between(before, after)
+        except ValueError:
+            logger.warning(f"⚠️ Claves de orden repetidas en el tablero {column.board_id}")
+            column.position = rank_between(before, None)
+            return True
+        return needs_rebalance(column.position)
+
+    def rebalance_column(self, session: Session, column_id: str) -> int:
+        """Reasignar claves cortas a las tarjetas de una columna conservando su orden"""
+        card_ids = session.execute(
+            select(Card.id).where(Card.column_id == column_id).order_by(Card.position, Card.id)
+        ).scalars().all()
+        return self._rewrite(session, Card, card_ids)
+
+    def rebalance_board(self, session: Session, board_id: str) -> int:
+        """Reasignar claves cortas a las columnas de un tablero conservando su orden"""
+        column_ids = session.execute(
+            select(Column.id).where(Column.board_id == board_id).order_by(Column.position, Column.id)
+        ).scalars().all()
+        return self._rewrite(session, Column, column_ids)
+
+    def _rewrite(self, session: Session, model, ids: List[str]) -> int:
+        if not ids:
+            return 0
+        # Un único executemany; no pasa por la unidad de trabajo del ORM, así
+        # que la versión de sincronización se asigna aquí
+        version = next_change_version(session)
+        session.execute(
+            update(model),
+            [{'id': row_id, 'position': rank, 'change_version': version}
+             for row_id, rank in zip(ids, spread_ranks(len(ids)))]
+        )
+        session.commit()
+        logger.info(f"🔢 Reequilibradas {len(ids)} claves de {model.__tablename__}")
+        return len(ids)
@@ -0,0 +1,650 @@
+"""
+🚨 Detector de Riesgos
+Reglas declarativas (WIP, tarjetas estancadas, bloqueos en cadena, sobrecarga y fechas de fin)
+evaluadas de forma incremental sobre el cursor de change_version, con los riesgos
+deduplicados por título en la tabla risks y resueltos solos cuando dejan de cumplirse
+"""
+
+import heapq
+import json
+import logging
+import threading
+import time
+from collections import defaultdict, namedtuple
+from datetime import datetime, timedelta
+from itertools import islice
+from typing import Dict, Any, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import event, select, func
+from sqlalchemy.orm import Session
+
+from models.database import (
+    Team, Project, Board, Column, Card, User, Risk, SyncSequence, SyncTombstone, project_teams
+)
+from services.background_jobs import upsert_risks, resolve_risks
+from services.context_builder import ACTIVE_STATUSES
+from services.dependency_graph import DependencyGraphService
+
+logger = logging.getLogger(__name__)
+
+# Estados en los que una tarjeta está empezada y puede quedarse estancada
+STARTED_STATUSES = ('in_progress', 'review', 'blocked')
+# Proyectos cuya fecha de fin ya no se vigila (los pausados los cubre el grafo de dependencias)
+CLOSED_PROJECT_STATUSES = ('completed', 'cancelled', 'on_hold')
+
+# Estado mínimo de cada tarjeta para las reglas; `since` es el inicio del trabajo
+# (started_at, o la última modificación si no se registró)
+CardState = namedtuple('CardState', 'team_id project_id column_id status assigned_to estimated_hours since')
+ColumnInfo = namedtuple('ColumnInfo', 'name board_id column_type wip_limit')
+BoardInfo = namedtuple('BoardInfo', 'name team_id')
+TeamInfo = namedtuple('TeamInfo', 'name wip_limits')
+UserInfo = namedtuple('UserInfo', 'name capacity')
+ProjectInfo = namedtuple('ProjectInfo', 'name status start_date end_date progress')
+
+# Una regla: qué ámbito vigila (column, team, user, project o graph), la
+# plantilla del título (que identifica el riesgo: mismo título = mismo riesgo)
+# y la comprobación, que devuelve los riesgos del sujeto con la forma del modelo Risk
+Rule = namedtuple('Rule', 'name scope title check')
+
+# Títulos de DependencyGraphService.risks(), para reconocer los riesgos de bloqueos ya guardados
+DEPENDENCY_TITLES = ('Bloqueo en {id} frena trabajo dependiente', 'Proyecto {id} en pausa con dependientes')
+CYCLE_TITLE = 'Dependencias circulares'
+
+def _json(value: Optional[str], default):
+    if not value:
+        return default
+    try:
+        return json.loads(value)
+    except (TypeError, ValueError):
+        return default
+
+def check_wip(detector: 'RiskDetector', column_id: str, now: datetime) -> List[Dict[str, Any]]:
+    """Columna con más tarjetas que su límite (el de la columna o el del equipo para su tipo)"""
+    column = detector.columns.get(column_id)
+    board = detector.boards.get(column.board_id) if column else None
+    if board is None:
+        return []
+    team = detector.teams.get(board.team_id)
+    limit = column.wip_limit or (team.wip_limits.get(column.column_type) if team else None)
+    count = detector.column_cards.get(column_id, 0)
+    if not limit or count <= limit:
+        return []
+
+    return [{
+        'title': detector.title(RULES_BY_NAME['wip_limit'], column_id),
+        'description': f"La columna {column.name} de {board.name} tiene {count} tarjetas con un límite de {limit}",
+        'severity': 'high' if count >= limit * 1.5 else 'medium',
+        'probability': 0.9,
+        'impact': min(1.0, 0.3 + 0.1 * (count - limit)),
+        'category': 'resource',
+        'affected_teams': [board.team_id],
+        'affected_projects': [],
+        'mitigation': 'Terminar el trabajo en curso antes de empezar tarjetas nuevas'
+    }]
+
+def check_aging(detector: 'RiskDetector', team_id: str, now: datetime) -> List[Dict[str, Any]]:
+    """Tarjetas empezadas hace más de `aging_days` que siguen sin terminar"""
+    aged = detector.aged.get(team_id)
+    team = detector.teams.get(team_id)
+    if not aged or team is None:
+        return []
+
+    oldest = sorted(aged, key=aged.get)
+    days = detector.aging.days
+    return [{
+        'title': detector.title(RULES_BY_NAME['aging_cards'], team_id),
+        'description': f"{len(aged)} tarjetas de {team.name} llevan más de {days} días empezadas sin terminar "
+                       f"(las más antiguas: {', '.join(oldest[:3])})",
+        'severity': 'high' if len(aged) >= 5 else 'medium',
+        'probability': 0.7,
+        'impact': min(1.0, 0.2 + 0.05 * len(aged)),
+        'category': 'timeline',
+        'affected_teams': [team_id],
+        'affected_projects': sorted({detector.cards[card_id].project_id for card_id in aged}),
+        'mitigation': 'Revisar las tarjetas estancadas: dividirlas, desbloquearlas o devolverlas al backlog'
+    }]
+
+def check_overload(detector: 'RiskDetector', user_id: str, now: datetime) -> List[Dict[str, Any]]:
+    """Horas estimadas de las tarjetas activas por encima de la capacidad semanal"""
+    user = detector.users.get(user_id)
+    if user is None:
+        return []
+    capacity = (user.capacity or 0) * 5  # Capacidad semanal
+    hours = detector.user_hours.get(user_id, 0.0)
+    if capacity <= 0 or hours <= capacity * detector.overload:
+        return []
+
+    utilization = hours / capacity
+    return [{
+        'title': detector.title(RULES_BY_NAME['overload'], user_id),
+        'description': f"{user.name} tiene {hours:.0f}h estimadas en tarjetas activas para una capacidad "
+                       f"semanal de {capacity:.0f}h ({utilization:.0%})",
+        'severity': 'critical' if utilization >= 1.5 else 'high',
+        'probability': 0.8,
+        'impact': min(1.0, 0.3 + (utilization - 1) / 2),
+        'category': 'resource',
+        'affected_teams': [],
+        'affected_projects': [],
+        'mitigation': 'Reasignar tarjetas (GET /api/workload/optimize) o ajustar las estimaciones'
+    }]
+
+def check_end_date(detector: 'RiskDetector', project_id: str, now: datetime) -> List[Dict[str, Any]]:
+    """Proyecto cuyo avance va por detrás del plazo consumido, o que ya superó su fecha de fin"""
+    project = detector.projects.get(project_id)
+    if project is None or project.end_date is None or project.status in CLOSED_PROJECT_STATUSES:
+        return []
+
+    total = detector.project_cards.get(project_id, 0)
+    completion = detector.project_done.get(project_id, 0) / total if total else (project.progress or 0) / 100
+    if completion >= 1:
+        return []
+
+    end = f"{project.end_date:%Y-%m-%d}"
+    if now >= project.end_date:
+        severity, elapsed = 'critical', 1.0
+        description = f"{project.name} superó su fecha de fin ({end}) con el {completion:.0%} completado"
+    else:
+        if project.start_date is None or project.start_date >= project.end_date:
+            return []
+        elapsed = max(0.0, (now - project.start_date) / (project.end_date - project.start_date))
+        gap = elapsed - completion
+        if gap <= detector.slip_margin:
+            return []
+        severity = 'high' if gap > 2 * detector.slip_margin else 'medium'
+        description = (f"{project.name} ha consumido el {elapsed:.0%} del plazo y lleva el {completion:.0%} "
+                       f"del trabajo; fin previsto el {end}")
+
+    return [{
+        'title': detector.title(RULES_BY_NAME['end_date'], project_id),
+        'description': description,
+        'severity': severity,
+        'probability': round(min(1.0, 0.5 + elapsed - completion), 2),
+        'impact': 0.8,
+        'category': 'timeline',
+        'affected_teams': list(detector.project_teams.get(project_id, ())),
+        'affected_projects': [project_id],
+        'mitigation': 'Replanificar el alcance o la fecha de fin, o reforzar los equipos del proyecto'
+    }]
+
+def check_dependencies(detector: 'RiskDetector', subject: None, now: datetime) -> List[Dict[str, Any]]:
+    """Bloqueos en cadena, proyectos en pausa con dependientes y ciclos (grafo de dependencias)"""
+    if detector.dependency_graph is None:
+        return []
+    return [
+        {key: value for key, value in risk.items() if key != 'source'}
+        for risk in detector.dependency_graph.risks()
+    ]
+
+RULES: Tuple[Rule, ...] = (
+    Rule('wip_limit', 'column', 'WIP superado en {board} / {name}', check_wip),
+    Rule('aging_cards', 'team', 'Tarjetas estancadas en {name}', check_aging),
+    Rule('overload', 'user', 'Sobrecarga de {name}', check_overload),
+    Rule('end_date', 'project', 'Retraso previsto en el proyecto {name}', check_end_date),
+    Rule('blocked_chains', 'graph', None, check_dependencies),
+)
+RULES_BY_NAME = {rule.name: rule for rule in RULES}
+
+class RiskDetector:
+    """
+    Motor de reglas de riesgo con evaluación incremental.
+
+    - Mantiene en memoria el estado mínimo de tarjetas, columnas, equipos,
+      usuarios y proyectos y sus agregados (tarjetas por columna, horas activas
+      por usuario, avance por proyecto, tarjetas estancadas por equipo)
+    - Cada pasada lee solo las filas con change_version posterior al cursor
+      (y los usuarios modificados, que no tienen versión), ajusta los agregados
+      y reevalúa únicamente los sujetos afectados: el coste depende de lo que
+      cambió, no del tamaño de la organización
+    - Lo que depende del reloj no necesita cambios: las tarjetas entran en
+      "estancadas" desde una cola ordenada por fecha límite y los proyectos se
+      revisan cada `time_check_seconds`
+    - Los riesgos se escriben con upsert_risks (mismo título = mismo riesgo) y
+      se resuelven cuando su regla deja de cumplirse; solo se escriben los
+      que cambian
+    - Si desde la última pasada cambió más de `reload_ratio` de las tarjetas,
+      se recarga todo: aplicar cada cambio (restar el estado anterior y sumar
+      el nuevo) cuesta más que volver a leerlas
+    """
+
+    def __init__(self, session_factory, dependency_graph: Optional[DependencyGraphService] = None,
+                 aging_days: int = 14, overload: float = 1.0, slip_margin: float = 0.2,
+                 time_check_seconds: float = 3600, reload_ratio: float = 0.5):
+        self.session_factory = session_factory
+        self.dependency_graph = dependency_graph
+        self.aging = timedelta(days=aging_days)
+        self.overload = overload
+        self.slip_margin = slip_margin
+        self.time_check_seconds = time_check_seconds
+        self.reload_ratio = reload_ratio
+
+        self.cards: Dict[str, CardState] = {}
+        self.columns: Dict[str, ColumnInfo] = {}
+        self.boards: Dict[str, BoardInfo] = {}
+        self.teams: Dict[str, TeamInfo] = {}
+        self.users: Dict[str, UserInfo] = {}
+        self.projects: Dict[str, ProjectInfo] = {}
+        self.project_teams: Dict[str, Tuple[str, ...]] = {}
+
+        self.column_cards: Dict[str, int] = defaultdict(int)
+        self.user_hours: Dict[str, float] = defaultdict(float)
+        self.project_cards: Dict[str, int] = defaultdict(int)
+        self.project_done: Dict[str, int] = defaultdict(int)
+        self.aged: Dict[str, Dict[str, datetime]] = defaultdict(dict)
+        self._aging_queue: List[Tuple[datetime, str]] = []
+
+        self.version = 0
+        self._loaded = False
+        self._dirty: Dict[str, Set[Any]] = defaultdict(set)
+        self._changed_users: Set[str] = set()
+        self._graph_state: Optional[Tuple] = None
+        self._last_time_check = 0.0
+
+        self._findings: Dict[Tuple[str, Any], Dict[str, Dict[str, Any]]] = {}
+        self._current: Dict[str, Dict[str, Any]] = {}
+        self._published: Dict[str, Optional[Dict[str, Any]]] = {}
+        self._pending: Set[str] = set()
+
+        self._lock = threading.RLock()
+        self._stats = {'runs': 0, 'reloads': 0, 'card_changes': 0, 'evaluations': 0,
+                       'created': 0, 'updated': 0, 'resolved': 0}
+        self._last_duration_ms: Optional[float] = None
+
+    # --- Pasada ---
+
+    def detect(self, session: Optional[Session] = None) -> Dict[str, int]:
+        """Aplicar los cambios desde la última pasada, reevaluar lo afectado y guardar los riesgos"""
+        if session is None:
+            with self.session_factory() as own_session:
+                return self.detect(own_session)
+
+        started = time.perf_counter()
+        with self._lock:
+            now = datetime.now()
+            if not self._loaded:
+                self.load(session)
+            elif self._changed_cards(session) > self.reload_ratio * max(1, len(self.cards)):
+                self.load(session)
+                self._stats['reloads'] += 1
+            else:
+                changes = self._sync(session)
+                self._stats['card_changes'] += changes
+
+            self._expire_aging(now)
+            if time.time() - self._last_time_check >= self.time_check_seconds:
+                self._dirty['project'].update(self.projects)
+                self._last_time_check = time.time()
+            self._check_graph(session)
+
+            evaluated = self._evaluate(now)
+            created, updated, resolved = self._persist(session, now)
+
+            self._stats['runs'] += 1
+            self._stats['evaluations'] += evaluated
+            self._last_duration_ms = round((time.perf_counter() - started) * 1000, 1)
+
+        if created or updated or resolved:
+            logger.info(f"🚨 Riesgos: {created} nuevos, {updated} actualizados, {resolved} resueltos "
+                        f"({evaluated} evaluaciones, {self._last_duration_ms} ms)")
+        return {'evaluated': evaluated, 'risks_created': created, 'risks_updated': updated,
+                'risks_resolved': resolved}
+
+    def load(self, session: Session):
+        """Carga completa del estado; todos los sujetos quedan pendientes de evaluar"""
+        with self._lock:
+            self.version = _current_version(session)
+
+            self.teams = {
+                row.id: TeamInfo(row.name, _json(row.wip_limits, {}))
+                for row in session.execute(select(Team.id, Team.name, Team.wip_limits)
+                                           .where(Team.is_active == True))  # noqa: E712
+            }
+            self.boards = {
+                row.id: BoardInfo(row.name, row.team_id)
+                for row in session.execute(select(Board.id, Board.name, Board.team_id)
+                                           .where(Board.is_active == True))  # noqa: E712
+            }
+            self.columns = {
+                row.id: ColumnInfo(row.name, row.board_id, row.column_type, row.wip_limit)
+                for row in session.execute(select(Column.id, Column.name, Column.board_id,
+                                                  Column.column_type, Column.wip_limit))
+            }
+            self.users = {}
+            self._load_users(session)
+            self.projects = {}
+            self._load_projects(session, select(*PROJECT_COLUMNS))
+
+            self.cards = {}
+            for aggregate in (self.column_cards, self.user_hours, self.project_cards, self.project_done, self.aged):
+                aggregate.clear()
+            self._aging_queue = []
+            now = datetime.now()
+            for row in session.execute(select(*CARD_COLUMNS)):
+                self._apply_card(row[0], _card_state(row), now)
+
+            self._findings, self._current = {}, {}
+            self._dirty = defaultdict(set, {
+                'column': set(self.columns), 'team': set(self.teams), 'user': set(self.users),
+                'project': set(self.projects), 'graph': {None}
+            })
+            self._last_time_check = time.time()
+            self._loaded = True
+
+            # Riesgos abiertos de estas reglas guardados antes: se actualizan o se resuelven
+            owned = self._owned_titles()
+            self._published = {
+                title: None for title in session.execute(select(Risk.title).where(Risk.status != 'resolved')).scalars()
+                if title in owned
+            }
+            self._pending |= set(self._published)
+
+        logger.info(f"🚨 Detector de riesgos cargado: {len(self.cards)} tarjetas, {len(self.columns)} columnas, "
+                    f"{len(self._published)} riesgos abiertos")
+
+    def install_hooks(self, target=Session):
+        """
+        Anotar los usuarios modificados (no tienen change_version) en cada
+        transacción confirmada (de todas las sesiones, o solo las de `target`)
+        """
+
+        @event.listens_for(target, 'after_flush')
+        def collect_risk_users(session, flush_context):
+            users = [obj.id for obj in (*session.new, *session.dirty, *session.deleted) if isinstance(obj, User)]
+            if users:
+                session.info.setdefault('risk_users', set()).update(users)
+
+        @event.listens_for(target, 'after_commit')
+        def mark_risk_users(session):
+            users = session.info.pop('risk_users', None)
+            if users:
+                with self._lock:
+                    self._changed_users.update(users)
+
+        @event.listens_for(target, 'after_rollback')
+        def discard_risk_users(session):
+            session.info.pop('risk_users', None)
+
+    # --- Cambios incrementales ---
+
+    def _changed_cards(self, session: Session) -> int:
+        """Tarjetas modificadas o eliminadas desde el cursor (por los índices de change_version)"""
+        modified = session.execute(
+            select(func.count()).select_from(Card).where(Card.change_version > self.version)
+        ).scalar_one()
+        deleted = session.execute(
+            select(func.count()).select_from(SyncTombstone)
+            .where(SyncTombstone.entity == 'cards', SyncTombstone.change_version > self.version)
+        ).scalar_one()
+        return modified + deleted
+
+    def _sync(self, session: Session) -> int:
+        """Aplicar las filas posteriores al cursor; devuelve cuántas tarjetas cambiaron"""
+        users, self._changed_users = self._changed_users, set()
+        if users:
+            self._load_users(session, users)
+
+        current = _current_version(session)
+        if current <= self.version:
+            return 0
+        since = self.version
+
+        for row in session.execute(select(Team.id, Team.name, Team.wip_limits, Team.is_active)
+                                   .where(Team.change_version > since)):
+            self._replace(self.teams, row.id, TeamInfo(row.name, _json(row.wip_limits, {})) if row.is_active else None)
+            self._dirty['team'].add(row.id)
+            self._dirty['column'].update(self._columns_of(team_id=row.id))
+        for row in session.execute(select(Board.id, Board.name, Board.team_id, Board.is_active)
+                                   .where(Board.change_version > since)):
+            self._replace(self.boards, row.id, BoardInfo(row.name, row.team_id) if row.is_active else None)
+            self._dirty['column'].update(self._columns_of(board_id=row.id))
+        for row in session.execute(select(Column.id, Column.name, Column.board_id, Column.column_type,
+                                          Column.wip_limit).where(Column.change_version > since)):
+            self.columns[row.id] = ColumnInfo(row.name, row.board_id, row.column_type, row.wip_limit)
+            self._dirty['column'].add(row.id)
+        self._load_projects(session, select(*PROJECT_COLUMNS).where(Project.change_version > since))
+
+        now = datetime.now()
+        changes = 0
+        for row in session.execute(select(*CARD_COLUMNS).where(Card.change_version > since)):
+            self._apply_card(row[0], _card_state(row), now)
+            changes += 1
+
+        for entity, entity_id in session.execute(
+            select(SyncTombstone.entity, SyncTombstone.entity_id).where(SyncTombstone.change_version > since)
+        ):
+            if entity == 'cards':
+                self._apply_card(entity_id, None, now)
+                changes += 1
+            elif entity == 'columns':
+                self.columns.pop(entity_id, None)
+                self._dirty['column'].add(entity_id)
+            elif entity == 'boards':
+                self.boards.pop(entity_id, None)
+                self._dirty['column'].update(self._columns_of(board_id=entity_id))
+            elif entity == 'teams':
+                self.teams.pop(entity_id, None)
+                self._dirty['team'].add(entity_id)
+            elif entity == 'projects':
+                self.projects.pop(entity_id, None)
+                self._dirty['project'].add(entity_id)
+
+        self.version = current
+        return changes
+
+    def _apply_card(self, card_id: str, new: Optional[CardState], now: datetime):
+        """Sustituir el estado de una tarjeta ajustando los agregados (None = eliminada)"""
+        old = self.cards.pop(card_id, None)
+        if new is not None:
+            self.cards[card_id] = new
+        if old == new:
+            return
+
+        for state, sign in ((old, -1), (new, 1)):
+            if state is None:
+                continue
+            self.column_cards[state.column_id] += sign
+            self._dirty['column'].add(state.column_id)
+            self.project_cards[state.project_id] += sign
+            if state.status == 'done':
+                self.project_done[state.project_id] += sign
+            self._dirty['project'].add(state.project_id)
+            if state.assigned_to and state.status in ACTIVE_STATUSES:
+                self.user_hours[state.assigned_to] += sign * (state.estimated_hours or 0.0)
+                self._dirty['user'].add(state.assigned_to)
+
+        # Tarjetas estancadas: fuera al cambiar de equipo o dejar de estar empezada
+        if old is not None and self.aged.get(old.team_id, {}).pop(card_id, None) is not None:
+            self._dirty['team'].add(old.team_id)
+        if new is None or new.status not in STARTED_STATUSES or new.since is None:
+            return
+        deadline = new.since + self.aging
+        if deadline <= now:
+            self.aged[new.team_id][card_id] = new.since
+            self._dirty['team'].add(new.team_id)
+        elif old is None or old.status not in STARTED_STATUSES or old.since != new.since:
+            heapq.heappush(self._aging_queue, (deadline, card_id))
+
+    def _expire_aging(self, now: datetime):
+        """Pasar a estancadas las tarjetas cuya fecha límite ya llegó"""
+        queue = self._aging_queue
+        while queue and queue[0][0] <= now:
+            _, card_id = heapq.heappop(queue)
+            state = self.cards.get(card_id)
+            # Entradas obsoletas: la tarjeta terminó, se eliminó o volvió a empezar
+            if state is None or state.status not in STARTED_STATUSES or state.since is None \
+                    or state.since + self.aging > now:
+                continue
+            self.aged[state.team_id][card_id] = state.since
+            self._dirty['team'].add(state.team_id)
+
+    def _check_graph(self, session: Session):
+        """Reevaluar los bloqueos en cadena solo si el grafo de dependencias cambió"""
+        if self.dependency_graph is None:
+            return
+        self.dependency_graph.sync(session)
+        stats = self.dependency_graph.stats()
+        state = (stats['version'], stats['card_dependencies'], stats['project_dependencies'], len(stats['rejected']))
+        if state != self._graph_state:
+            self._graph_state = state
+            self._dirty['graph'].add(None)
+
+    def _load_users(self, session: Session, user_ids: Optional[Iterable[str]] = None):
+        query = select(User.id, User.name, User.capacity, User.is_active)
+        if user_ids is not None:
+            user_ids = list(user_ids)
+            query = query.where(User.id.in_(user_ids))
+            for user_id in user_ids:
+                self.users.pop(user_id, None)
+                self._dirty['user'].add(user_id)
+        for row in session.execute(query):
+            if row.is_active:
+                self.users[row.id] = UserInfo(row.name, row.capacity)
+
+    def _load_projects(self, session: Session, query):
+        rows = session.execute(query).all()
+        if not rows:
+            return
+        for row in rows:
+            self._replace(self.projects, row.id, ProjectInfo(
+                row.name, row.status, row.start_date, row.end_date, row.progress
+            ) if row.is_active else None)
+            self._dirty['project'].add(row.id)
+
+        owners: Dict[str, list] = defaultdict(list)
+        ids = [row.id for row in rows]
+        for start in range(0, len(ids), 500):
+            for project_id, team_id in session.execute(
+                select(project_teams.c.project_id, project_teams.c.team_id)
+                .where(project_teams.c.project_id.in_(ids[start:start + 500]))
+            ):
+                owners[project_id].append(team_id)
+        for project_id in ids:
+            self.project_teams[project_id] = tuple(sorted(owners.get(project_id, ())))
+
+    def _columns_of(self, team_id: Optional[str] = None, board_id: Optional[str] = None) -> List[str]:
+        """Columnas de un tablero o de todos los tableros de un equipo"""
+        boards = {board_id} if board_id else {key for key, board in self.boards.items() if board.team_id == team_id}
+        return [column_id for column_id, column in self.columns.items() if column.board_id in boards]
+
+    @staticmethod
+    def _replace(mapping: Dict[str, Any], key: str, value: Any):
+        if value is None:
+            mapping.pop(key, None)
+        else:
+            mapping[key] = value
+
+    # --- Reglas y persistencia ---
+
+    def title(self, rule: Rule, subject: str) -> str:
+        """Título (identidad) del riesgo de una regla para un sujeto"""
+        if rule.scope == 'column':
+            column = self.columns[subject]
+            board = self.boards.get(column.board_id)
+            return rule.title.format(name=column.name, board=board.name if board else column.board_id)
+        labels = {'team': self.teams, 'user': self.users, 'project': self.projects}[rule.scope]
+        info = labels.get(subject)
+        return rule.title.format(name=info.name if info else subject)
+
+    def _owned_titles(self) -> Set[str]:
+        """Todos los títulos que pueden producir las reglas con los sujetos actuales"""
+        subjects = {'column': self.columns, 'team': self.teams, 'user': self.users, 'project': self.projects}
+        owned = {
+            self.title(rule, subject)
+            for rule in RULES if rule.title
+            for subject in subjects[rule.scope]
+        }
+        if self.dependency_graph is not None:
+            owned.update(DEPENDENCY_TITLES[0].format(id=card_id) for card_id in self.cards)
+            owned.update(DEPENDENCY_TITLES[1].format(id=project_id) for project_id in self.projects)
+            owned.add(CYCLE_TITLE)
+        return owned
+
+    def _evaluate(self, now: datetime) -> int:
+        """Reevaluar las reglas de los sujetos afectados; anota los títulos que cambian"""
+        dirty, self._dirty = self._dirty, defaultdict(set)
+        evaluated = 0
+        for rule in RULES:
+            for subject in dirty.get(rule.scope, ()):
+                findings = {finding['title']: finding for finding in rule.check(self, subject, now)}
+                previous = self._findings.pop((rule.name, subject), {})
+                if findings:
+                    self._findings[(rule.name, subject)] = findings
+                for title in previous:
+                    self._current.pop(title, None)
+                self._current.update(findings)
+                self._pending.update(previous)
+                self._pending.update(findings)
+                evaluated += 1
+        return evaluated
+
+    def _persist(self, session: Session, now: datetime) -> Tuple[int, int, int]:
+        """Escribir los riesgos nuevos o modificados y resolver los que ya no se cumplen"""
+        pending, self._pending = self._pending, set()
+        upserts = [
+            self._current[title] for title in pending
+            if title in self._current and self._published.get(title) != self._current[title]
+        ]
+        resolved = [title for title in pending if title not in self._current and title in self._published]
+        if not upserts and not resolved:
+            return 0, 0, 0
+
+        try:
+            created, updated = upsert_risks(session, upserts)
+            closed = resolve_risks(session, resolved, now)
+            session.commit()
+        except Exception:
+            # Reintentar en la siguiente pasada
+            session.rollback()
+            self._pending |= pending
+            raise
+
+        for finding in upserts:
+            self._published[finding['title']] = finding
+        for title in resolved:
+            self._published.pop(title, None)
+        self._stats['created'] += created
+        self._stats['updated'] += updated
+        self._stats['resolved'] += closed
+        return created, updated, closed
+
+    # --- Consultas ---
+
+    def active_risks(self, rule: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Riesgos que se cumplen ahora mismo, por severidad"""
+        order = {'critical': 0, 'high': 1, 'medium': 2, 'low': 3}
+        with self._lock:
+            items = [
+                {**finding, 'rule': rule_name}
+                for (rule_name, _), findings in self._findings.items() if rule in (None, rule_name)
+                for finding in findings.values()
+            ]
+        return sorted(items, key=lambda item: (order.get(item['severity'], 9), item['title']))
+
+    def status(self) -> Dict[str, Any]:
+        with self._lock:
+            by_rule: Dict[str, int] = defaultdict(int)
+            for (rule_name, _), findings in self._findings.items():
+                by_rule[rule_name] += len(findings)
+            return {
+                **self._stats,
+                'loaded': self._loaded,
+                'version': self.version,
+                'cards': len(self.cards),
+                'aging_queue': len(self._aging_queue),
+                'active': {rule.name: by_rule.get(rule.name, 0) for rule in RULES},
+                'last_duration_ms': self._last_duration_ms
+            }
+
+CARD_COLUMNS = (
+    Card.id, Card.team_id, Card.project_id, Card.column_id, Card.status, Card.assigned_to, Card.estimated_hours,
+    func.coalesce(Card.started_at, Card.updated_at, Card.created_at)
+)
+PROJECT_COLUMNS = (
+    Project.id, Project.name, Project.status, Project.is_active, Project.start_date, Project.end_date,
+    Project.progress
+)
+
+def _card_state(row) -> CardState:
+    return CardState._make(islice(row, 1, None))
+
+def _current_version(session: Session) -> int:
+    return session.execute(select(SyncSequence.value).where(SyncSequence.id == 1)).scalar() or 0
@@ -0,0 +1,267 @@
+"""
+⏰ Planificador de Tareas
+Tareas periódicas en segundo plano dentro del backend (análisis, agregados, copias) sin cron
+"""
+
+import asyncio
+import contextvars
+import functools
+import json
+import logging
+import os
+import random
+import time
+from concurrent.futures import Executor, ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Callable, Iterable
+
+from services.profiling import profile_run, settings as profiling_settings, SPANS
+
+logger = logging.getLogger(__name__)
+
+# Campos que se conservan entre reinicios
+PERSISTED_FIELDS = ('last_run', 'last_success', 'last_error', 'last_duration_ms', 'runs', 'failures')
+
+class ScheduledJob:
+    """Tarea periódica y su estado de ejecución"""
+
+    def __init__(self, name: str, func: Callable, interval_seconds: float, jitter: float = 0.1,
+                 cpu_bound: bool = False, run_on_start: bool = False, timeout: Optional[float] = None):
+        self.name = name
+        self.func = func
+        self.interval_seconds = interval_seconds
+        self.jitter = jitter
+        self.cpu_bound = cpu_bound
+        self.run_on_start = run_on_start
+        self.timeout = timeout
+
+        self.next_run = 0.0
+        self.running = False
+        self.task: Optional[asyncio.Task] = None
+        # Modo de perfilado para la próxima ejecución (trigger con ?profile=)
+        self.profile_next: Optional[str] = None
+
+        self.last_run: Optional[float] = None
+        self.last_success: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self.last_duration_ms: Optional[float] = None
+        self.runs = 0
+        self.failures = 0
+        self.skipped = 0
+
+    def schedule_next(self, now: float):
+        """Siguiente ejecución con jitter para no alinear tareas ni reinicios"""
+        spread = self.interval_seconds * self.jitter
+        self.next_run = now + self.interval_seconds + random.uniform(-spread, spread)
+
+    def restore(self, state: Dict[str, Any]):
+        for field in PERSISTED_FIELDS:
+            if field in state:
+                setattr(self, field, state[field])
+
+    def to_state(self) -> Dict[str, Any]:
+        return {field: getattr(self, field) for field in PERSISTED_FIELDS}
+
+    def to_dict(self) -> Dict[str, Any]:
+        def iso(timestamp: Optional[float]) -> Optional[str]:
+            return datetime.fromtimestamp(timestamp).isoformat() if timestamp else None
+
+        return {
+            'name': self.name,
+            'interval_seconds': self.interval_seconds,
+            'cpu_bound': self.cpu_bound,
+            'running': self.running,
+            'next_run': None if self.running else iso(self.next_run),
+            'last_run': iso(self.last_run),
+            'last_success': iso(self.last_success),
+            'last_error': self.last_error,
+            'last_duration_ms': self.last_duration_ms,
+            'runs': self.runs,
+            'failures': self.failures,
+            'skipped': self.skipped
+        }
+
+class JobScheduler:
+    """
+    Planificador asyncio para el lifespan de FastAPI.
+
+    - Una tarea nunca se solapa consigo misma: la siguiente ejecución se
+      programa al terminar la actual y las peticiones manuales mientras está
+      en marcha se descartan
+    - Jitter sobre el intervalo para repartir la carga
+    - El estado (última ejecución, errores) se guarda en JSON, de modo que un
+      reinicio no repite las tareas que ya tocaron (p. ej. la copia diaria)
+    - Las funciones síncronas van al threadpool por defecto; las marcadas
+      cpu_bound a un pool propio y acotado, para no ocupar los hilos que
+      atienden peticiones
+    - Con `timeout` las corrutinas se cancelan; un hilo no se puede
+      interrumpir, así que la tarea cuenta como fallida pero sigue en marcha
+      (y no se vuelve a lanzar) hasta que termine
+    """
+
+    def __init__(self, state_path: Path, max_workers: int = 2, executor: Optional[Executor] = None,
+                 profile_jobs: Iterable[str] = ()):
+        self.state_path = Path(state_path)
+        self.jobs: Dict[str, ScheduledJob] = {}
+        # Tareas que se perfilan siempre ('*' = todas); los ficheros van a data/profiles
+        self.profile_jobs = {name.strip() for name in profile_jobs if name.strip()}
+        self._executor = executor or ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='scheduler')
+        self._saved = self._load_state()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._loop_task: Optional[asyncio.Task] = None
+
+    def add_job(self, name: str, func: Callable, interval_seconds: float, jitter: float = 0.1,
+                cpu_bound: bool = False, run_on_start: bool = False,
+                timeout: Optional[float] = None) -> ScheduledJob:
+        """
+        Registrar una tarea (función síncrona o corrutina sin argumentos).
+        Si no hay estado previo o run_on_start=True se ejecuta al arrancar;
+        si no, cuando toque según su última ejecución.
+        """
+        if name in self.jobs:
+            raise ValueError(f"Tarea duplicada: {name}")
+
+        job = ScheduledJob(name, func, interval_seconds, jitter, cpu_bound, run_on_start, timeout)
+        job.restore(self._saved.get(name, {}))
+
+        now = time.time()
+        if run_on_start or job.last_run is None:
+            # Pequeño desfase para no lanzar todas las tareas a la vez al arrancar
+            job.next_run = now + random.uniform(0, min(interval_seconds * jitter, 5.0))
+        else:
+            job.next_run = max(now, job.last_run + interval_seconds)
+
+        self.jobs[name] = job
+        return job
+
+    def start(self):
+        """Arrancar el bucle (llamar en el lifespan, con el event loop en marcha)"""
+        self._wakeup = asyncio.Event()
+        self._loop_task = asyncio.create_task(self._run())
+        logger.info(f"⏰ Planificador iniciado con {len(self.jobs)} tareas")
+
+    async def stop(self):
+        """Cancelar el bucle y las tareas en curso y guardar el estado"""
+        tasks = [job.task for job in self.jobs.values() if job.task and not job.task.done()]
+        if self._loop_task:
+            tasks.append(self._loop_task)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self._save_state()
+
+    def trigger(self, name: str, profile: Optional[str] = None) -> bool:
+        """Ejecutar una tarea cuanto antes (perfilada si se indica modo); False si ya está en marcha"""
+        job = self.jobs[name]
+        if job.running:
+            job.skipped += 1
+            return False
+        job.profile_next = profile
+        job.next_run = time.time()
+        if self._wakeup:
+            self._wakeup.set()
+        return True
+
+    def status(self) -> List[Dict[str, Any]]:
+        return [job.to_dict() for job in self.jobs.values()]
+
+    async def _run(self):
+        while True:
+            now = time.time()
+            for job in self.jobs.values():
+                if not job.running and job.next_run <= now:
+                    job.running = True
+                    job.task = asyncio.create_task(self._execute(job))
+
+            pending = [job.next_run for job in self.jobs.values() if not job.running]
+            delay = min(pending) - time.time() if pending else 60.0
+
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=max(delay, 0.05))
+            except asyncio.TimeoutError:
+                pass
+
+    async def _execute(self, job: ScheduledJob):
+        started = time.time()
+        work = asyncio.ensure_future(self._call(job))
+        try:
+            done, _ = await asyncio.wait({work}, timeout=job.timeout)
+            if not done:
+                logger.warning(f"⏱️ Tarea {job.name} sin terminar tras {job.timeout:g}s")
+                if asyncio.iscoroutinefunction(job.func):
+                    work.cancel()
+                # Las funciones en hilos no se interrumpen: la tarea sigue en marcha
+                # (sin volver a lanzarse) hasta que el hilo termine de verdad
+                await asyncio.wait({work})
+                if not work.cancelled() and work.exception():
+                    logger.error(f"❌ Tarea {job.name} falló tras el tiempo límite: {work.exception()}")
+                raise TimeoutError(f"Sin terminar tras {job.timeout:g}s")
+            work.result()
+            job.last_success = started
+            job.last_error = None
+        except asyncio.CancelledError:
+            work.cancel()
+            raise
+        except Exception as e:
+            job.failures += 1
+            job.last_error = str(e) or type(e).__name__
+            logger.error(f"❌ Tarea {job.name} falló: {job.last_error}")
+        finally:
+            finished = time.time()
+            job.running = False
+            job.last_run = started
+            job.last_duration_ms = round((finished - started) * 1000, 1)
+            job.runs += 1
+            job.schedule_next(finished)
+            self._save_state()
+            if self._wakeup:
+                self._wakeup.set()
+
+    async def _call(self, job: ScheduledJob):
+        mode = job.profile_next
+        job.profile_next = None
+        if mode is None and (job.name in self.profile_jobs or '*' in self.profile_jobs):
+            mode = profiling_settings.default_mode or SPANS
+
+        if asyncio.iscoroutinefunction(job.func):
+            if mode is None:
+                return await job.func()
+            async with profile_run(f'job.{job.name}', mode):
+                return await job.func()
+
+        # Las funciones síncronas se perfilan en su propio hilo (cProfile es por hilo)
+        func = functools.partial(_run_profiled, f'job.{job.name}', mode, job.func) if mode else job.func
+        if job.cpu_bound:
+            # run_in_executor no propaga el contexto (ejecución perfilada en curso): se copia
+            context = contextvars.copy_context()
+            return await asyncio.get_running_loop().run_in_executor(self._executor, context.run, func)
+        return await asyncio.to_thread(func)
+
+    def _load_state(self) -> Dict[str, Dict[str, Any]]:
+        try:
+            with open(self.state_path, encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            logger.warning(f"⚠️ Estado del planificador ilegible, se ignora: {e}")
+            return {}
+
+    def _save_state(self):
+        """Escritura atómica (archivo temporal + rename)"""
+        state = {**self._saved, **{name: job.to_state() for name, job in self.jobs.items()}}
+        temporary = self.state_path.with_suffix('.tmp')
+        try:
+            with open(temporary, 'w', encoding='utf-8') as f:
+                json.dump(state, f, indent=2)
+            os.replace(temporary, self.state_path)
+        except OSError as e:
+            logger.warning(f"⚠️ No se pudo guardar el estado del planificador: {e}")
+
+def _run_profiled(name: str, mode: str, func: Callable):
+    with profile_run(name, mode):
+        return func()
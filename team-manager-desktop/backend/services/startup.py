@@ -0,0 +1,134 @@
+"""
+🚦 Arranque del Backend
+Servicios construidos en su primer uso y etapas de arranque que expone /api/health
+"""
+
+import asyncio
+import importlib
+import logging
+import threading
+import time
+from typing import Dict, Any, List, Optional
+
+logger = logging.getLogger(__name__)
+
+class LazyService:
+    """
+    Servicio que se importa y construye la primera vez que se usa.
+
+    `target` es "modulo:Clase"; el módulo (y lo que arrastre: SDKs de IA,
+    NumPy, pandas...) no se importa hasta entonces, así que no retrasa el
+    arranque. La construcción es única aunque la pidan varios hilos a la vez.
+    """
+
+    def __init__(self, name: str, target: str, *args, **kwargs):
+        self.name = name
+        self.target = target
+        self._args = args
+        self._kwargs = kwargs
+        self._instance = None
+        self._lock = threading.Lock()
+        self.load_ms: Optional[float] = None
+        self.error: Optional[str] = None
+
+    @property
+    def loaded(self) -> bool:
+        return self._instance is not None
+
+    @property
+    def instance(self):
+        """Instancia ya construida o None (sin provocar la carga)"""
+        return self._instance
+
+    def get(self):
+        """Instancia del servicio; la primera llamada importa y construye (bloqueante)"""
+        if self._instance is not None:
+            return self._instance
+
+        with self._lock:
+            if self._instance is None:
+                started = time.perf_counter()
+                try:
+                    module_name, _, attribute = self.target.partition(':')
+                    factory = getattr(importlib.import_module(module_name), attribute)
+                    self._instance = factory(*self._args, **self._kwargs)
+                except Exception as e:
+                    self.error = str(e) or type(e).__name__
+                    logger.error(f"❌ No se pudo cargar {self.name}: {self.error}")
+                    raise
+                self.error = None
+                self.load_ms = round((time.perf_counter() - started) * 1000, 1)
+                logger.info(f"💤 {self.name} cargado en {self.load_ms} ms")
+        return self._instance
+
+    async def aget(self):
+        """Como get(), pero la primera carga va a un hilo para no bloquear el event loop"""
+        if self._instance is not None:
+            return self._instance
+        return await asyncio.to_thread(self.get)
+
+    def status(self) -> Dict[str, Any]:
+        return {'loaded': self.loaded, 'load_ms': self.load_ms, 'error': self.error}
+
+class StartupState:
+    """
+    Etapas del arranque. La API responde desde el primer momento: mientras
+    el estado no es 'ready', /api/health informa del progreso y el resto de
+    rutas contestan 503 para que el cliente reintente.
+    """
+
+    def __init__(self, import_ms: Optional[float] = None):
+        self.started_at = time.time()
+        self.import_ms = import_ms
+        self.stage = 'starting'
+        self.error: Optional[str] = None
+        self.ready_at: Optional[float] = None
+        self.stages: List[Dict[str, Any]] = []
+        self.services: Dict[str, LazyService] = {}
+        self._current: Optional[str] = None
+        self._current_started = 0.0
+
+    @property
+    def ready(self) -> bool:
+        return self.stage == 'ready'
+
+    def begin(self, stage: str):
+        """Pasar a la siguiente etapa, cerrando la anterior"""
+        self._finish_current()
+        self.stage = self._current = stage
+        self._current_started = time.perf_counter()
+
+    def mark_ready(self):
+        self._finish_current()
+        self.stage = 'ready'
+        self.ready_at = time.time()
+        logger.info(f"✅ Backend listo en {round((self.ready_at - self.started_at) * 1000)} ms")
+
+    def mark_failed(self, error: Exception):
+        self._finish_current()
+        self.stage = 'failed'
+        self.error = str(error) or type(error).__name__
+
+    def register(self, service: LazyService) -> LazyService:
+        self.services[service.name] = service
+        return service
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'stage': self.stage,
+            'ready': self.ready,
+            'error': self.error,
+            'uptime_seconds': round(time.time() - self.started_at, 1),
+            'import_ms': self.import_ms,
+            'ready_ms': round((self.ready_at - self.started_at) * 1000, 1) if self.ready_at else None,
+            'stages': self.stages,
+            'services': {name: service.status() for name, service in self.services.items()}
+        }
+
+    def _finish_current(self):
+        if self._current is not None:
+            self.stages.append({
+                'name': self._current,
+                'ms': round((time.perf_counter() - self._current_started) * 1000, 1)
+            })
+            self._current = None
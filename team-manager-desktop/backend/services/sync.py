@@ -0,0 +1,207 @@
+"""
+🔄 Sincronización Delta
+Versionado monótono de filas mutables y consulta de cambios desde un cursor
+"""
+
+import logging
+from typing import Dict, Any, List, Optional
+
+from sqlalchemy import event, select, update, insert, func, union_all, inspect, text
+from sqlalchemy.orm import Session
+
+from models.database import Team, Project, Board, Column, Card, SyncSequence, SyncTombstone
+
+logger = logging.getLogger(__name__)
+
+# Entidades sincronizables: nombre en la API → modelo
+SYNCED_MODELS = {
+    'teams': Team,
+    'projects': Project,
+    'boards': Board,
+    'columns': Column,
+    'cards': Card
+}
+ENTITY_BY_MODEL = {model: name for name, model in SYNCED_MODELS.items()}
+
+def next_change_version(session: Session) -> int:
+    """
+    Reservar la siguiente versión global.
+
+    Se usa la conexión directamente para no disparar un autoflush. En SQLite el
+    UPDATE toma el bloqueo de escritura hasta el commit, así que el orden de
+    versiones coincide con el orden de confirmación.
+    """
+    connection = session.connection()
+    sequence = SyncSequence.__table__
+
+    result = connection.execute(
+        update(sequence).where(sequence.c.id == 1).values(value=sequence.c.value + 1)
+    )
+    if result.rowcount == 0:
+        connection.execute(insert(sequence).values(id=1, value=1))
+
+    return connection.execute(select(sequence.c.value).where(sequence.c.id == 1)).scalar_one()
+
+def install_version_hooks(target=Session):
+    """
+    Asignar change_version a cada fila creada/modificada y registrar las
+    eliminadas (en todas las sesiones, o solo en las de `target`)
+    """
+
+    @event.listens_for(target, 'before_flush')
+    def stamp_change_versions(session, flush_context, instances):
+        changed = [
+            obj for obj in session.new
+            if type(obj) in ENTITY_BY_MODEL
+        ] + [
+            obj for obj in session.dirty
+            if type(obj) in ENTITY_BY_MODEL and session.is_modified(obj, include_collections=False)
+        ]
+        deleted = [obj for obj in session.deleted if type(obj) in ENTITY_BY_MODEL]
+
+        if not changed and not deleted:
+            return
+
+        version = next_change_version(session)
+        for obj in changed:
+            obj.change_version = version
+        for obj in deleted:
+            session.add(SyncTombstone(
+                entity=ENTITY_BY_MODEL[type(obj)],
+                entity_id=obj.id,
+                change_version=version
+            ))
+
+def migrate_sync_state(session_factory) -> int:
+    """
+    Preparar una base de datos anterior al versionado (se llama al arrancar).
+
+    Añade change_version (con su índice) a las tablas que no la tienen y asigna
+    una versión real a las filas que siguen en 0: `changes_since` filtra por
+    `change_version > since`, así que sin esto since=0 no las devolvería nunca.
+    Devuelve el número de filas actualizadas.
+    """
+    with session_factory() as session:
+        connection = session.connection()
+        for table in (SyncSequence.__table__, SyncTombstone.__table__):
+            table.create(connection, checkfirst=True)
+
+        inspector = inspect(connection)
+        for model in SYNCED_MODELS.values():
+            table = model.__table__
+            if 'change_version' in {c['name'] for c in inspector.get_columns(table.name)}:
+                continue
+            logger.info(f"🔄 Añadiendo change_version a {table.name}")
+            connection.execute(text(
+                f"ALTER TABLE {table.name} ADD COLUMN change_version INTEGER NOT NULL DEFAULT 0"
+            ))
+            for index in table.indexes:
+                if 'change_version' in index.columns:
+                    index.create(connection, checkfirst=True)
+
+        pending = {
+            model: session.execute(
+                select(func.count()).select_from(model).where(model.change_version == 0)
+            ).scalar_one()
+            for model in SYNCED_MODELS.values()
+        }
+        backfilled = sum(pending.values())
+        if backfilled:
+            # Una sola versión para todo el estado previo: el primer sync lo trae entero
+            version = next_change_version(session)
+            for model, count in pending.items():
+                if count:
+                    session.execute(
+                        update(model.__table__)
+                        .where(model.__table__.c.change_version == 0)
+                        .values(change_version=version)
+                    )
+            logger.info(f"🔄 {backfilled} filas previas al versionado con change_version={version}")
+        session.commit()
+        return backfilled
+
+class SyncService:
+    """Consulta de cambios desde un cursor de versión"""
+
+    def __init__(self, default_limit: int = 1000):
+        self.default_limit = default_limit
+
+    def current_version(self, session: Session) -> int:
+        value = session.execute(select(SyncSequence.value).where(SyncSequence.id == 1)).scalar()
+        return value or 0
+
+    def changes_since(self, session: Session, since: int = 0, limit: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Filas cambiadas y eliminadas con versión en (since, cursor].
+
+        Si hay más de `limit` filas se corta en un límite de versión completo
+        (nunca a mitad de un flush) y se indica has_more=True; el cliente repite
+        la llamada con el cursor devuelto.
+        """
+        limit = limit or self.default_limit
+        upper = self.current_version(session)
+
+        if upper <= since:
+            return {'cursor': since, 'has_more': False, 'changes': {}, 'deleted': []}
+
+        cursor = self._cursor_within_limit(session, since, upper, limit)
+
+        changes: Dict[str, List[Dict[str, Any]]] = {}
+        for name, model in SYNCED_MODELS.items():
+            table = model.__table__
+            rows = session.execute(
+                select(table)
+                .where(table.c.change_version > since, table.c.change_version <= cursor)
+                .order_by(table.c.change_version, table.c.id)
+            ).mappings().all()
+            if rows:
+                changes[name] = [dict(row) for row in rows]
+
+        tombstones = session.execute(
+            select(SyncTombstone.entity, SyncTombstone.entity_id, SyncTombstone.change_version)
+            .where(SyncTombstone.change_version > since, SyncTombstone.change_version <= cursor)
+            .order_by(SyncTombstone.change_version)
+        ).all()
+
+        return {
+            'cursor': cursor,
+            'has_more': cursor < upper,
+            'changes': changes,
+            'deleted': [
+                {'entity': entity, 'id': entity_id, 'version': version}
+                for entity, entity_id, version in tombstones
+            ]
+        }
+
+    def _cursor_within_limit(self, session: Session, since: int, upper: int, limit: int) -> int:
+        """Mayor versión ≤ upper cuyo total acumulado de filas cabe en el límite"""
+        versions = [
+            select(table.c.change_version.label('version'))
+            .where(table.c.change_version > since, table.c.change_version <= upper)
+            for table in [model.__table__ for model in SYNCED_MODELS.values()] + [SyncTombstone.__table__]
+        ]
+        counts = union_all(*versions).subquery()
+        per_version = session.execute(
+            select(counts.c.version, func.count().label('rows'))
+            .group_by(counts.c.version)
+            .order_by(counts.c.version)
+        ).all()
+
+        total = 0
+        cursor = since
+        for version, rows in per_version:
+            if total + rows > limit and cursor > since:
+                break
+            total += rows
+            cursor = version
+
+        # Sin filas en el rango (p. ej. versiones de flushes sin entidades sincronizables)
+        return cursor if per_version and cursor < per_version[-1][0] else upper
+
+    def purge_tombstones(self, session: Session, older_than_version: int) -> int:
+        """Eliminar tombstones que todos los clientes ya han sincronizado"""
+        removed = session.query(SyncTombstone).filter(
+            SyncTombstone.change_version <= older_than_version
+        ).delete(synchronize_session=False)
+        session.commit()
+        return removed
@@ -0,0 +1,327 @@
+"""
+⚖️ Optimizador de Carga de Trabajo
+Propone reasignaciones concretas de tarjetas resolviendo un problema de
+asignación de coste mínimo por equipo (capacidad, disponibilidad, skills,
+dependencias y WIP)
+"""
+
+import json
+import logging
+import time
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from typing import Dict, Any, List, Optional, Iterable
+
+from sqlalchemy import select, or_
+from sqlalchemy.orm import Session
+
+from models.database import Team, User, Card, UserAvailability, team_members, card_dependencies
+
+logger = logging.getLogger(__name__)
+
+ACTIVE_STATUSES = ('ready', 'in_progress', 'review')
+PRIORITY_RANK = {'low': 0, 'medium': 1, 'high': 2, 'critical': 3}
+
+# Coste de una asignación imposible (otro equipo, mismo usuario)
+INFEASIBLE = 1e6
+
+class WorkloadOptimizer:
+    """
+    Reequilibrado de carga por miembro de equipo.
+
+    - Capacidad: `team_members.capacity` (horas/día en ese equipo) en los días
+      laborables del horizonte, escalada por `UserAvailability` cuando hay registro
+    - Carga: horas restantes (estimated_hours - actual_hours) de las tarjetas activas
+    - Los miembros por encima de `max_utilization` ceden tarjetas (primero las de
+      menor prioridad y no empezadas); el reparto entre miembros con holgura del
+      mismo equipo se resuelve con linear_sum_assignment sobre una matriz de costes
+      construida con NumPy (equilibrio de carga, skills vs tags, afinidad por
+      dependencias), con la holgura de cada receptor dividida en huecos
+    - Se respeta el límite WIP por persona (`wip_limits['per_user']` del equipo)
+    """
+
+    def __init__(self,
+                 horizon_days: int = 5,
+                 max_utilization: float = 0.9,
+                 default_card_hours: float = 4.0,
+                 hours_per_point: float = 4.0,
+                 move_in_progress: bool = False,
+                 skill_weight: float = 2.0,
+                 affinity_weight: float = 0.5):
+        self.horizon_days = horizon_days
+        self.max_utilization = max_utilization
+        self.default_card_hours = default_card_hours
+        self.hours_per_point = hours_per_point
+        self.move_in_progress = move_in_progress
+        self.skill_weight = skill_weight
+        self.affinity_weight = affinity_weight
+
+    def optimize(self, session: Session, team_ids: Optional[Iterable[str]] = None,
+                 start: Optional[date] = None) -> Dict[str, Any]:
+        """Cargar el estado de la base de datos y proponer reasignaciones"""
+        snapshot = self.load(session, team_ids, start)
+        return self.solve(snapshot)
+
+    def load(self, session: Session, team_ids: Optional[Iterable[str]] = None,
+             start: Optional[date] = None) -> Dict[str, Any]:
+        """Leer miembros, disponibilidad, tarjetas activas y dependencias (consultas Core)"""
+        start = start or date.today()
+        days = [start + timedelta(days=i) for i in range(self.horizon_days * 2)]
+        days = [day for day in days if day.weekday() < 5][:self.horizon_days]
+
+        team_filter = [team_members.c.team_id.in_(list(team_ids))] if team_ids is not None else []
+        memberships = session.execute(
+            select(team_members.c.team_id, team_members.c.user_id, team_members.c.capacity)
+            .join(User, User.id == team_members.c.user_id)
+            .where(team_members.c.is_active == True, User.is_active == True, *team_filter)  # noqa: E712
+        ).all()
+        user_ids = sorted({row.user_id for row in memberships})
+        team_list = sorted({row.team_id for row in memberships})
+
+        users = {
+            row.id: row for row in session.execute(
+                select(User.id, User.name, User.capacity, User.skills).where(User.id.in_(user_ids))
+            )
+        }
+        availability = defaultdict(dict)
+        if days:
+            for user_id, day, hours in session.execute(
+                select(UserAvailability.user_id, UserAvailability.date, UserAvailability.hours)
+                .where(UserAvailability.user_id.in_(user_ids),
+                       UserAvailability.date >= datetime.combine(days[0], datetime.min.time()),
+                       UserAvailability.date < datetime.combine(days[-1] + timedelta(days=1), datetime.min.time()))
+            ):
+                availability[user_id][day.date()] = hours
+
+        wip_per_user = {}
+        for team_id, wip_limits in session.execute(select(Team.id, Team.wip_limits).where(Team.id.in_(team_list))):
+            limits = json.loads(wip_limits) if wip_limits else {}
+            if isinstance(limits.get('per_user'), (int, float)) and limits['per_user'] > 0:
+                wip_per_user[team_id] = int(limits['per_user'])
+
+        cards = session.execute(
+            select(Card.id, Card.title, Card.team_id, Card.assigned_to, Card.status, Card.priority,
+                   Card.estimated_hours, Card.actual_hours, Card.story_points, Card.tags)
+            .where(Card.team_id.in_(team_list), Card.status.in_(ACTIVE_STATUSES), Card.assigned_to.isnot(None))
+        ).all()
+
+        # Responsables de las tarjetas relacionadas por dependencias
+        card_ids = [card.id for card in cards]
+        related = defaultdict(set)
+        if card_ids:
+            other = Card.__table__.alias('other')
+            for card_id, depends_on_id, card_owner, dependency_owner in session.execute(
+                select(card_dependencies.c.card_id, card_dependencies.c.depends_on_id,
+                       Card.assigned_to, other.c.assigned_to)
+                .join(Card, Card.id == card_dependencies.c.card_id)
+                .join(other, other.c.id == card_dependencies.c.depends_on_id)
+                .where(or_(card_dependencies.c.card_id.in_(card_ids), card_dependencies.c.depends_on_id.in_(card_ids)))
+            ):
+                if dependency_owner:
+                    related[card_id].add(dependency_owner)
+                if card_owner:
+                    related[depends_on_id].add(card_owner)
+
+        return {
+            'days': days,
+            'memberships': memberships,
+            'users': users,
+            'availability': availability,
+            'wip_per_user': wip_per_user,
+            'cards': cards,
+            'related_owners': related
+        }
+
+    def _card_hours(self, card) -> float:
+        if card.estimated_hours is not None:
+            total = card.estimated_hours
+        elif card.story_points:
+            total = card.story_points * self.hours_per_point
+        else:
+            total = self.default_card_hours
+        return max(total - (card.actual_hours or 0.0), 0.5)
+
+    def solve(self, snapshot: Dict[str, Any]) -> Dict[str, Any]:
+        """Resolver la asignación a partir de un snapshot de `load`"""
+        import numpy as np  # Diferido: el router se importa al arrancar y NumPy/SciPy no hacen falta hasta aquí
+
+        started = time.perf_counter()
+        days = snapshot['days']
+        users = snapshot['users']
+
+        # Índices de miembros (usuario, equipo)
+        members = snapshot['memberships']
+        member_index = {(row.user_id, row.team_id): i for i, row in enumerate(members)}
+        member_user = np.array([row.user_id for row in members], dtype=object)
+        member_team = np.array([row.team_id for row in members], dtype=object)
+
+        # Capacidad del horizonte: horas/día en el equipo × fracción disponible de cada día
+        capacity = np.zeros(len(members))
+        for i, row in enumerate(members):
+            user = users.get(row.user_id)
+            daily = row.capacity if row.capacity is not None else (user.capacity if user else 8.0)
+            available = snapshot['availability'].get(row.user_id, {})
+            full_day = (user.capacity if user and user.capacity else 8.0)
+            capacity[i] = sum(daily * min(available.get(day, full_day) / full_day, 1.0) for day in days)
+
+        # Carga actual por miembro
+        cards = [card for card in snapshot['cards'] if (card.assigned_to, card.team_id) in member_index]
+        hours = np.array([self._card_hours(card) for card in cards], dtype=float)
+        owner = np.array([member_index[(card.assigned_to, card.team_id)] for card in cards], dtype=np.int64)
+        started_mask = np.array([card.status == 'in_progress' for card in cards], dtype=bool)
+        load = np.bincount(owner, weights=hours, minlength=len(members)).astype(float)
+        in_progress = np.bincount(owner[started_mask], minlength=len(members))
+
+        limit = capacity * self.max_utilization
+        utilization_before = np.divide(load, capacity, out=np.zeros(len(members)), where=capacity > 0)
+
+        # Tarjetas a ceder por miembro sobrecargado
+        excess = load - limit
+        candidates: List[int] = []
+        by_owner = defaultdict(list)
+        for index, card in enumerate(cards):
+            if card.status == 'ready' or (self.move_in_progress and card.status == 'in_progress'):
+                by_owner[owner[index]].append(index)
+        for member in np.flatnonzero(excess > 0):
+            movable = sorted(
+                by_owner.get(member, []),
+                key=lambda i: (cards[i].status == 'in_progress', PRIORITY_RANK.get(cards[i].priority, 1), hours[i])
+            )
+            shed = 0.0
+            for index in movable:
+                if shed >= excess[member]:
+                    break
+                candidates.append(index)
+                shed += hours[index]
+
+        reassignments: List[Dict[str, Any]] = []
+        new_load = load.copy()
+        new_in_progress = in_progress.copy()
+        unassigned = set(candidates)
+
+        # Un subproblema por equipo: las tarjetas solo pasan a miembros del mismo equipo
+        candidates_by_team = defaultdict(list)
+        for index in candidates:
+            candidates_by_team[cards[index].team_id].append(index)
+
+        for team_id, team_candidates in candidates_by_team.items():
+            receivers = np.flatnonzero((member_team == team_id) & (limit - load > 0))
+            if not len(receivers):
+                continue
+            self._solve_team(team_id, team_candidates, receivers, cards, hours, owner, member_user,
+                             users, snapshot, limit, new_load, new_in_progress, reassignments, unassigned)
+
+        utilization_after = np.divide(new_load, capacity, out=np.zeros(len(members)), where=capacity > 0)
+
+        def per_member(values) -> List[Dict[str, Any]]:
+            return [
+                {'user_id': member_user[i], 'team_id': member_team[i], 'value': round(float(values[i]), 3)}
+                for i in range(len(members))
+            ]
+
+        unresolved = [
+            {'user_id': member_user[i], 'team_id': member_team[i],
+             'excess_hours': round(float(new_load[i] - limit[i]), 1)}
+            for i in np.flatnonzero(new_load - limit > 0)
+        ]
+
+        return {
+            'horizon_days': len(days),
+            'reassignments': reassignments,
+            'unresolved': unresolved,
+            'unassigned_cards': sorted(cards[i].id for i in unassigned),
+            'capacity': per_member(capacity),
+            'utilization_before': per_member(utilization_before),
+            'utilization_after': per_member(utilization_after),
+            'solve_ms': round((time.perf_counter() - started) * 1000, 1)
+        }
+
+    def _solve_team(self, team_id, team_candidates, receivers, cards, hours, owner, member_user,
+                    users, snapshot, limit, new_load, new_in_progress, reassignments, unassigned):
+        """Asignación de coste mínimo tarjetas × huecos de holgura de un equipo"""
+        import numpy as np
+        from scipy.optimize import linear_sum_assignment
+
+        candidate_hours = hours[team_candidates]
+        slot_hours = max(float(np.median(candidate_hours)), 0.5)
+
+        # Huecos por receptor (como mucho uno por tarjeta candidata)
+        spare = limit[receivers] - new_load[receivers]
+        slots_per_receiver = np.minimum(np.ceil(spare / slot_hours).astype(np.int64), len(team_candidates))
+        slot_receiver = np.repeat(receivers, slots_per_receiver)
+        if not len(slot_receiver):
+            return
+        slot_rank = np.concatenate([np.arange(n) for n in slots_per_receiver])
+
+        # Equilibrio: cada hueco adicional de un receptor cuesta más (utilización tras ocuparlo)
+        balance = (new_load[slot_receiver] + (slot_rank + 1) * slot_hours) / (limit[slot_receiver] / self.max_utilization)
+
+        # Skills del receptor frente a tags de la tarjeta (matriz de incidencia)
+        receiver_users = member_user[slot_receiver]
+        card_tags = [set(json.loads(cards[i].tags)) if cards[i].tags else set() for i in team_candidates]
+        vocabulary = {tag: k for k, tag in enumerate(sorted(set().union(*card_tags)))} if card_tags else {}
+        skill_penalty = np.zeros((len(team_candidates), len(slot_receiver)))
+        if vocabulary:
+            tag_matrix = np.zeros((len(team_candidates), len(vocabulary)))
+            for row, tags in enumerate(card_tags):
+                tag_matrix[row, [vocabulary[tag] for tag in tags]] = 1.0
+            unique_users = sorted(set(receiver_users))
+            skill_matrix = np.zeros((len(unique_users), len(vocabulary)))
+            for row, user_id in enumerate(unique_users):
+                user = users.get(user_id)
+                skills = json.loads(user.skills) if user and user.skills else []
+                skill_matrix[row, [vocabulary[s] for s in skills if s in vocabulary]] = 1.0
+            user_position = {user_id: row for row, user_id in enumerate(unique_users)}
+            user_row = np.array([user_position[user_id] for user_id in receiver_users], dtype=np.int64)
+            tag_counts = tag_matrix.sum(axis=1, keepdims=True)
+            match = np.divide(tag_matrix @ skill_matrix.T, tag_counts, out=np.ones((len(team_candidates), len(unique_users))),
+                              where=tag_counts > 0)
+            skill_penalty = 1.0 - match[:, user_row]
+
+        # Afinidad: el receptor ya lleva tarjetas relacionadas por dependencias
+        related = snapshot['related_owners']
+        affinity = np.zeros_like(skill_penalty)
+        if related:
+            columns_by_user = defaultdict(list)
+            for column, user_id in enumerate(receiver_users):
+                columns_by_user[user_id].append(column)
+            for row, index in enumerate(team_candidates):
+                for user_id in related.get(cards[index].id, ()):
+                    affinity[row, columns_by_user.get(user_id, [])] = 1.0
+
+        cost = balance[None, :] + self.skill_weight * skill_penalty - self.affinity_weight * affinity
+        # No reasignar al mismo miembro
+        cost[owner[team_candidates][:, None] == slot_receiver[None, :]] = INFEASIBLE
+
+        rows, cols = linear_sum_assignment(cost)
+
+        # Validar con las horas reales (los huecos son aproximados) y el WIP por persona
+        wip_limit = snapshot['wip_per_user'].get(team_id)
+        for row, col in sorted(zip(rows, cols), key=lambda rc: cost[rc[0], rc[1]]):
+            if cost[row, col] >= INFEASIBLE:
+                continue
+            index = team_candidates[row]
+            card = cards[index]
+            source, target = owner[index], slot_receiver[col]
+            if new_load[target] + hours[index] > limit[target]:
+                continue
+            if card.status == 'in_progress' and wip_limit and new_in_progress[target] >= wip_limit:
+                continue
+
+            new_load[source] -= hours[index]
+            new_load[target] += hours[index]
+            if card.status == 'in_progress':
+                new_in_progress[source] -= 1
+                new_in_progress[target] += 1
+            unassigned.discard(index)
+
+            reassignments.append({
+                'card_id': card.id,
+                'title': card.title,
+                'team_id': team_id,
+                'from_user': card.assigned_to,
+                'to_user': member_user[target],
+                'hours': round(float(hours[index]), 1),
+                'skill_match': round(1.0 - float(skill_penalty[row, col]), 2),
+                'cost': round(float(cost[row, col]), 3)
+            })
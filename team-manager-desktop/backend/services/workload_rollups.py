@@ -0,0 +1,326 @@
+"""
+📈 Agregados de Carga de Trabajo
+Rollups diarios, semanales y mensuales de TimeEntry/WorkloadData por usuario,
+equipo y proyecto, mantenidos en segundo plano, con reducción de datos antiguos
+"""
+
+import logging
+import threading
+from datetime import datetime, date, timedelta
+from typing import Dict, Any, List, Optional, Iterable, Set, Tuple
+
+from sqlalchemy import event, inspect, select, insert, delete, func, case
+from sqlalchemy.orm import Session
+
+from models.database import Card, TimeEntry, WorkloadData, WorkloadRollup
+
+logger = logging.getLogger(__name__)
+
+GRANULARITIES = ('day', 'week', 'month')
+SCOPE_TYPES = ('user', 'team', 'project')
+
+def period_start(value: date, granularity: str) -> date:
+    """Inicio del periodo que contiene `value` (semanas de lunes a domingo)"""
+    if granularity == 'day':
+        return value
+    if granularity == 'week':
+        return value - timedelta(days=value.weekday())
+    return value.replace(day=1)
+
+def next_period(value: date, granularity: str) -> date:
+    """Inicio del periodo siguiente al que empieza en `value`"""
+    if granularity == 'day':
+        return value + timedelta(days=1)
+    if granularity == 'week':
+        return value + timedelta(days=7)
+    return (value.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+def _period_expression(column, granularity: str):
+    """Inicio del periodo calculado en SQLite (texto YYYY-MM-DD)"""
+    if granularity == 'day':
+        return func.date(column)
+    if granularity == 'week':
+        return func.date(column, 'weekday 0', '-6 days')
+    return func.date(column, 'start of month')
+
+def _as_datetime(value: date) -> datetime:
+    return datetime(value.year, value.month, value.day)
+
+def queue_dirty_days(session: Session, values: Iterable[Optional[datetime]]):
+    """Días a recalcular cuando `session` confirme (también tras escrituras en bloque)"""
+    session.info.setdefault('rollup_days', set()).update(value.date() for value in values if value)
+
+class WorkloadRollupService:
+    """
+    Mantiene la tabla workload_rollups.
+
+    - Los hooks de sesión anotan los días afectados por cada TimeEntry o
+      WorkloadData confirmado; el bucle en segundo plano recalcula solo los
+      periodos que contienen esos días (agregando en SQL, no en Python)
+    - `downsample` compacta los registros de tiempo más antiguos que
+      `raw_retention_days` (uno por tarjeta, usuario y día), elimina los
+      WorkloadData de esos días y los rollups diarios más antiguos que
+      `daily_retention_days`; semanas y meses se conservan
+    - Los periodos ya reducidos no se recalculan, para no perder los datos eliminados
+    """
+
+    def __init__(self, session_factory, raw_retention_days: int = 180, daily_retention_days: int = 730):
+        self.session_factory = session_factory
+        self.raw_retention_days = raw_retention_days
+        self.daily_retention_days = daily_retention_days
+
+        self._dirty: Set[date] = set()
+        self._lock = threading.Lock()
+        self._last_downsample: Optional[date] = None
+        self._caught_up = False
+
+    @property
+    def frozen_before(self) -> date:
+        """Primer día con datos originales completos (inicio de mes)"""
+        return (date.today() - timedelta(days=self.raw_retention_days)).replace(day=1)
+
+    def install_hooks(self):
+        """Anotar los días modificados en cada transacción confirmada"""
+
+        @event.listens_for(Session, 'after_flush')
+        def collect_dirty_days(session, flush_context):
+            for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+                if not isinstance(obj, (TimeEntry, WorkloadData)):
+                    continue
+                # Un cambio de fecha afecta también al día anterior
+                previous = inspect(obj).attrs.date.history.deleted
+                queue_dirty_days(session, [obj.date, *previous])
+
+        @event.listens_for(Session, 'after_commit')
+        def mark_dirty_days(session):
+            days = session.info.pop('rollup_days', None)
+            if days:
+                with self._lock:
+                    self._dirty.update(days)
+
+        @event.listens_for(Session, 'after_rollback')
+        def discard_dirty_days(session):
+            session.info.pop('rollup_days', None)
+
+    def refresh_dirty(self) -> int:
+        """Recalcular los periodos con cambios pendientes"""
+        with self._lock:
+            days, self._dirty = self._dirty, set()
+        if not days:
+            return 0
+
+        try:
+            with self.session_factory() as session:
+                return self.refresh(session, min(days), max(days))
+        except Exception:
+            # Reintentar en la siguiente pasada
+            with self._lock:
+                self._dirty.update(days)
+            raise
+
+    def catch_up(self) -> int:
+        """Al arrancar: recalcular desde el último día agregado (o construir todo el histórico)"""
+        with self.session_factory() as session:
+            last = session.execute(
+                select(func.max(WorkloadRollup.period_start)).where(WorkloadRollup.granularity == 'day')
+            ).scalar()
+            if last is not None:
+                return self.refresh(session, last.date(), date.today())
+
+            firsts = [
+                session.execute(select(func.min(TimeEntry.date))).scalar(),
+                session.execute(select(func.min(WorkloadData.date))).scalar()
+            ]
+            firsts = [value for value in firsts if value is not None]
+            if not firsts:
+                return 0
+            # Primera construcción: aún no se ha reducido nada
+            return self.refresh(session, min(firsts).date(), date.today(), respect_frozen=False)
+
+    def refresh(self, session: Session, start: date, end: date, respect_frozen: bool = True) -> int:
+        """Recalcular todos los periodos que solapan [start, end]; devuelve filas escritas"""
+        written = 0
+        for granularity in GRANULARITIES:
+            low = period_start(start, granularity)
+            high = next_period(period_start(end, granularity), granularity)
+
+            if respect_frozen:
+                frozen = self.frozen_before
+                while low < frozen:
+                    low = next_period(low, granularity)
+            if low >= high:
+                continue
+
+            rows = self._aggregate(session, granularity, _as_datetime(low), _as_datetime(high))
+            session.execute(delete(WorkloadRollup).where(
+                WorkloadRollup.granularity == granularity,
+                WorkloadRollup.period_start >= _as_datetime(low),
+                WorkloadRollup.period_start < _as_datetime(high)
+            ))
+            if rows:
+                session.execute(insert(WorkloadRollup), rows)
+            written += len(rows)
+
+        session.commit()
+        logger.debug(f"📈 Rollups recalculados ({start} → {end}): {written} filas")
+        return written
+
+    def _aggregate(self, session: Session, granularity: str, low: datetime, high: datetime) -> List[Dict[str, Any]]:
+        """Agregar TimeEntry y WorkloadData de [low, high) con GROUP BY"""
+        rollups: Dict[Tuple[str, str, str], Dict[str, Any]] = {}
+
+        def row_for(scope_type: str, scope_id: str, period: str) -> Dict[str, Any]:
+            key = (scope_type, scope_id, period)
+            if key not in rollups:
+                rollups[key] = {
+                    'granularity': granularity,
+                    'period_start': datetime.strptime(period, '%Y-%m-%d'),
+                    'scope_type': scope_type,
+                    'scope_id': scope_id,
+                    'hours_logged': 0.0, 'entries': 0,
+                    'planned_hours': 0.0, 'actual_hours': 0.0, 'capacity': 0.0,
+                    'utilization': 0.0, 'overloaded_days': 0
+                }
+            return rollups[key]
+
+        # Horas registradas
+        entry_period = _period_expression(TimeEntry.date, granularity).label('period')
+        in_range = (TimeEntry.date >= low, TimeEntry.date < high)
+        for scope_type, scope_column, joined in (('user', TimeEntry.user_id, False),
+                                                 ('team', Card.team_id, True),
+                                                 ('project', Card.project_id, True)):
+            stmt = select(entry_period, scope_column, func.sum(TimeEntry.hours), func.count()).where(*in_range)
+            if joined:
+                stmt = stmt.join(Card, Card.id == TimeEntry.card_id)
+            for period, scope_id, hours, entries in session.execute(stmt.group_by(entry_period, scope_column)):
+                row = row_for(scope_type, scope_id, period)
+                row['hours_logged'] = hours or 0.0
+                row['entries'] = entries
+
+        # Planificación y capacidad
+        workload_period = _period_expression(WorkloadData.date, granularity).label('period')
+        for scope_type, scope_column in (('user', WorkloadData.user_id), ('team', WorkloadData.team_id)):
+            stmt = (
+                select(
+                    workload_period, scope_column,
+                    func.sum(WorkloadData.planned_hours),
+                    func.sum(WorkloadData.actual_hours),
+                    func.sum(WorkloadData.capacity),
+                    func.sum(case((WorkloadData.overloaded == True, 1), else_=0))  # noqa: E712
+                )
+                .where(WorkloadData.date >= low, WorkloadData.date < high)
+                .group_by(workload_period, scope_column)
+            )
+            for period, scope_id, planned, actual, capacity, overloaded in session.execute(stmt):
+                row = row_for(scope_type, scope_id, period)
+                row['planned_hours'] = planned or 0.0
+                row['actual_hours'] = actual or 0.0
+                row['capacity'] = capacity or 0.0
+                row['utilization'] = round((actual or 0.0) / capacity, 4) if capacity else 0.0
+                row['overloaded_days'] = overloaded or 0
+
+        return list(rollups.values())
+
+    def downsample(self) -> Dict[str, int]:
+        """Reducir los datos originales anteriores a `frozen_before`"""
+        frozen = self.frozen_before
+        cutoff = _as_datetime(frozen)
+        daily_cutoff = _as_datetime(date.today() - timedelta(days=self.daily_retention_days))
+        stats = {'time_entries_compacted': 0, 'workload_deleted': 0, 'daily_rollups_deleted': 0}
+
+        with self.session_factory() as session:
+            # Los WorkloadData se eliminan al reducir: el más antiguo marca lo pendiente
+            oldest = session.execute(select(func.min(WorkloadData.date))).scalar()
+            if oldest is not None and oldest < cutoff:
+                # Fijar los rollups de esos periodos antes de borrar sus datos
+                self.refresh(session, oldest.date(), frozen - timedelta(days=1), respect_frozen=False)
+                stats['workload_deleted'] = session.execute(
+                    delete(WorkloadData).where(WorkloadData.date < cutoff)
+                ).rowcount
+
+            # Compactar no cambia las horas por día, así que los rollups siguen siendo válidos
+            stats['time_entries_compacted'] = self._compact_time_entries(session, cutoff)
+
+            stats['daily_rollups_deleted'] = session.execute(delete(WorkloadRollup).where(
+                WorkloadRollup.granularity == 'day', WorkloadRollup.period_start < daily_cutoff
+            )).rowcount
+            session.commit()
+
+        self._last_downsample = date.today()
+        if any(stats.values()):
+            logger.info(f"📉 Datos de carga reducidos: {stats}")
+        return stats
+
+    def _compact_time_entries(self, session: Session, cutoff: datetime) -> int:
+        """Un registro por tarjeta, usuario y día para los anteriores a `cutoff`"""
+        day = func.date(TimeEntry.date).label('day')
+        groups = session.execute(
+            select(TimeEntry.card_id, TimeEntry.user_id, day, func.sum(TimeEntry.hours), func.count(),
+                   func.min(TimeEntry.id))
+            .where(TimeEntry.date < cutoff)
+            .group_by(TimeEntry.card_id, TimeEntry.user_id, day)
+            .having(func.count() > 1)
+        ).all()
+        if not groups:
+            return 0
+
+        compacted = 0
+        for card_id, user_id, day_value, hours, count, keep_id in groups:
+            day_start = datetime.strptime(day_value, '%Y-%m-%d')
+            session.execute(delete(TimeEntry).where(
+                TimeEntry.card_id == card_id, TimeEntry.user_id == user_id,
+                TimeEntry.date >= day_start, TimeEntry.date < day_start + timedelta(days=1),
+                TimeEntry.id != keep_id
+            ))
+            kept = session.get(TimeEntry, keep_id)
+            kept.hours = hours
+            kept.date = day_start
+            kept.description = None
+            compacted += count - 1
+        return compacted
+
+    def series(self, session: Session, scope_type: str, granularity: str,
+               start: datetime, end: datetime, scope_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Serie temporal de rollups (una consulta sobre el índice de búsqueda)"""
+        stmt = (
+            select(WorkloadRollup)
+            .where(
+                WorkloadRollup.scope_type == scope_type,
+                WorkloadRollup.granularity == granularity,
+                WorkloadRollup.period_start >= start,
+                WorkloadRollup.period_start < end
+            )
+            .order_by(WorkloadRollup.scope_id, WorkloadRollup.period_start)
+        )
+        if scope_id is not None:
+            stmt = stmt.where(WorkloadRollup.scope_id == scope_id)
+
+        return [
+            {
+                'scope_id': rollup.scope_id,
+                'period_start': rollup.period_start.date().isoformat(),
+                'hours_logged': rollup.hours_logged,
+                'entries': rollup.entries,
+                'planned_hours': rollup.planned_hours,
+                'actual_hours': rollup.actual_hours,
+                'capacity': rollup.capacity,
+                'utilization': rollup.utilization,
+                'overloaded_days': rollup.overloaded_days
+            }
+            for rollup in session.execute(stmt).scalars()
+        ]
+
+    def tick(self) -> int:
+        """
+        Una pasada del planificador: la primera vez recupera lo pendiente
+        desde el arranque; después recalcula los días modificados y reduce
+        los datos antiguos una vez al día.
+        """
+        if not self._caught_up:
+            written = self.catch_up()
+            self._caught_up = True
+        else:
+            written = self.refresh_dirty()
+        if self._last_downsample != date.today():
+            self.downsample()
+        return written
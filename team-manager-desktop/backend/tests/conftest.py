@@ -0,0 +1,76 @@
+"""
+🧪 Fixtures comunes
+Base de datos SQLite en memoria con el esquema de models/database.py y un
+proveedor de IA de prueba (sin red ni SDKs)
+"""
+
+import json
+from typing import AsyncIterator, List, Optional
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.orm import sessionmaker
+
+from benchmarks.synthetic import OrganizationSpec, create_database, generate_organization
+from models.database import Team, Project, Card, User
+from services.ai_providers import AIProvider, AIProviderError
+
+VALID_ANALYSIS = json.dumps({
+    'analysis': 'Todo en orden',
+    'insights': [{'title': 'Flujo estable', 'description': 'Sin bloqueos'}],
+    'risks': [],
+    'recommendations': ['Seguir así']
+})
+
+class StubProvider(AIProvider):
+    """Proveedor con respuestas fijas; cuenta las llamadas y puede fallar"""
+
+    name = "stub"
+
+    def __init__(self, response: str = VALID_ANALYSIS, chunks: Optional[List[str]] = None,
+                 fail: bool = False, **kwargs):
+        super().__init__("stub-model", **kwargs)
+        self.response = response
+        self.chunks = chunks
+        self.fail = fail
+        self.calls = 0
+
+    async def _complete(self, system_prompt: str, prompt: str, max_tokens: int, temperature: float) -> str:
+        self.calls += 1
+        if self.fail:
+            raise AIProviderError("stub: fallo simulado")
+        return self.response
+
+    async def _stream(self, system_prompt: str, prompt: str, max_tokens: int, temperature: float) -> AsyncIterator[str]:
+        self.calls += 1
+        if self.fail:
+            raise AIProviderError("stub: fallo simulado")
+        for chunk in self.chunks or [self.response]:
+            yield chunk
+
+@pytest.fixture
+def engine():
+    engine = create_database()
+    yield engine
+    engine.dispose()
+
+@pytest.fixture
+def session_factory(engine):
+    return sessionmaker(bind=engine)
+
+@pytest.fixture
+def session(session_factory):
+    with session_factory() as session:
+        yield session
+
+@pytest.fixture
+def org(engine):
+    """Organización sintética pequeña (misma semilla en cada test)"""
+    return generate_organization(engine, OrganizationSpec(
+        teams=3, users=12, projects=4, cards=600, dependencies=100, time_entries=200
+    ))
+
+@pytest.fixture
+def org_objects(session, org):
+    """(teams, projects, cards, users) como objetos ORM, la entrada del director de IA"""
+    return tuple(session.execute(select(model)).scalars().all() for model in (Team, Project, Card, User))
@@ -0,0 +1,139 @@
+"""
+🛰️ Servidor LLM local para tests
+Imita /v1/chat/completions de OpenAI (JSON y SSE) en un hilo, sin red externa.
+El primer segmento de la ruta elige el escenario: /ok, /error, /slow o /stream
+"""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import AsyncIterator, List
+
+import httpx
+
+from services.ai_providers import AIProvider
+
+STREAM_CHUNKS = 200
+
+def _completion(content: str) -> dict:
+    return {
+        'id': 'chatcmpl-mock', 'object': 'chat.completion', 'created': int(time.time()), 'model': 'mock-model',
+        'choices': [{'index': 0, 'message': {'role': 'assistant', 'content': content}, 'finish_reason': 'stop'}],
+        'usage': {'prompt_tokens': 10, 'completion_tokens': 5, 'total_tokens': 15}
+    }
+
+def _chunk(content: str) -> bytes:
+    payload = {
+        'id': 'chatcmpl-mock', 'object': 'chat.completion.chunk', 'created': int(time.time()), 'model': 'mock-model',
+        'choices': [{'index': 0, 'delta': {'content': content}, 'finish_reason': None}]
+    }
+    return f'data: {json.dumps(payload)}\n\n'.encode()
+
+class MockLLMServer:
+    """Servidor HTTP en un hilo; registra los escenarios pedidos y las desconexiones"""
+
+    def __init__(self, slow_seconds: float = 2.0):
+        self.slow_seconds = slow_seconds
+        self.requests: List[str] = []
+        self.stream_closed = threading.Event()
+        self.stream_finished = threading.Event()
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), self._handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, kwargs={'poll_interval': 0.05}, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def start(self) -> 'MockLLMServer':
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+                scenario = self.path.strip('/').split('/')[0]
+                server.requests.append(scenario)
+
+                if scenario == 'error':
+                    self._send_json(500, {'error': {'message': 'fallo simulado', 'type': 'server_error'}})
+                elif scenario == 'slow':
+                    time.sleep(server.slow_seconds)
+                    self._send_json(200, _completion('respuesta lenta'))
+                elif scenario == 'stream' and body.get('stream'):
+                    self._send_stream()
+                else:
+                    self._send_json(200, _completion('respuesta rápida'))
+
+            def _send_json(self, status: int, payload: dict):
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _send_stream(self):
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/event-stream')
+                self.end_headers()
+                try:
+                    for i in range(STREAM_CHUNKS):
+                        self.wfile.write(_chunk(f'parte {i} '))
+                        self.wfile.flush()
+                        time.sleep(0.01)
+                    self.wfile.write(b'data: [DONE]\n\n')
+                    self.wfile.flush()
+                    server.stream_finished.set()
+                except (BrokenPipeError, ConnectionResetError):
+                    server.stream_closed.set()
+
+        return Handler
+
+class HTTPProvider(AIProvider):
+    """Proveedor mínimo sobre httpx con el protocolo de chat completions de OpenAI"""
+
+    def __init__(self, name: str, base_url: str, **kwargs):
+        super().__init__("mock-model", **kwargs)
+        self.name = name
+        self.client = httpx.AsyncClient(base_url=base_url)
+
+    def _payload(self, system_prompt: str, prompt: str, max_tokens: int, temperature: float, **extra) -> dict:
+        return {
+            'model': self.model,
+            'messages': [{'role': 'system', 'content': system_prompt}, {'role': 'user', 'content': prompt}],
+            'max_tokens': max_tokens, 'temperature': temperature, **extra
+        }
+
+    async def _complete(self, system_prompt: str, prompt: str, max_tokens: int, temperature: float) -> str:
+        response = await self.client.post(
+            '/v1/chat/completions', json=self._payload(system_prompt, prompt, max_tokens, temperature)
+        )
+        response.raise_for_status()
+        return response.json()['choices'][0]['message']['content']
+
+    async def _stream(self, system_prompt: str, prompt: str, max_tokens: int, temperature: float) -> AsyncIterator[str]:
+        payload = self._payload(system_prompt, prompt, max_tokens, temperature, stream=True)
+        async with self.client.stream('POST', '/v1/chat/completions', json=payload) as response:
+            response.raise_for_status()
+            async for line in response.aiter_lines():
+                if not line.startswith('data: ') or line == 'data: [DONE]':
+                    continue
+                content = json.loads(line[6:])['choices'][0]['delta'].get('content')
+                if content:
+                    yield content
+
+    async def close(self):
+        await self.client.aclose()
@@ -0,0 +1,72 @@
+"""
+🧠 Tests del cache de respuestas del director de IA
+Con un proveedor de prueba: aciertos, y qué respuestas no se cachean
+"""
+
+import pytest
+
+from benchmarks.synthetic import create_database
+from services.ai_director import AIDirectorService
+from services.ai_providers import ProviderRouter
+from services.llm_cache import LLMResponseCache
+from tests.conftest import StubProvider
+
+@pytest.fixture
+def engine(tmp_path):
+    """En fichero: el cache se consulta desde hilos (asyncio.to_thread)"""
+    engine = create_database(str(tmp_path / 'kanban.db'))
+    yield engine
+    engine.dispose()
+
+def _director(session_factory, provider):
+    return AIDirectorService(response_cache=LLMResponseCache(session_factory),
+                             providers=ProviderRouter([provider]))
+
+@pytest.mark.asyncio
+async def test_second_analysis_is_served_from_cache(session_factory, org_objects):
+    provider = StubProvider()
+    director = _director(session_factory, provider)
+
+    first = await director.analyze_global_state(*org_objects, hierarchical=False)
+    second = await director.analyze_global_state(*org_objects, hierarchical=False)
+
+    assert provider.calls == 1
+    assert second == first
+    assert director.get_cache_stats()['hits'] == 1
+
+@pytest.mark.asyncio
+async def test_unparseable_response_is_not_cached(session_factory, org_objects):
+    provider = StubProvider(response='Lo siento, no puedo responder en JSON')
+    director = _director(session_factory, provider)
+
+    result = await director.analyze_global_state(*org_objects, hierarchical=False)
+    await director.analyze_global_state(*org_objects, hierarchical=False)
+
+    assert result['error'] is True
+    assert provider.calls == 2
+
+@pytest.mark.asyncio
+async def test_simulated_response_is_not_cached(session_factory, org_objects):
+    provider = StubProvider(fail=True)
+    director = _director(session_factory, provider)
+
+    result = await director.analyze_global_state(*org_objects, hierarchical=False)
+    await director.analyze_global_state(*org_objects, hierarchical=False)
+
+    assert not result.get('error')
+    assert provider.calls == 2
+    assert director.get_cache_stats()['hits'] == 0
+
+@pytest.mark.asyncio
+async def test_streamed_document_is_cached_without_fence(session_factory, org_objects):
+    provider = StubProvider(chunks=['```json\n{"analysis": "Todo en ', 'orden", "insights": [], '
+                                    '"risks": [], "recommendations": []}\n```'])
+    director = _director(session_factory, provider)
+
+    events = [event async for event in director.stream_global_analysis(*org_objects)]
+    cached = await director.analyze_global_state(*org_objects, hierarchical=False)
+
+    assert events[-1]['type'] == 'complete'
+    assert events[-1]['data']['analysis'] == 'Todo en orden'
+    assert cached['analysis'] == 'Todo en orden'
+    assert provider.calls == 1
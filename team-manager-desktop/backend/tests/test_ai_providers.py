@@ -0,0 +1,95 @@
+"""
+🔌 Tests del enrutador de proveedores contra un servidor LLM local
+Fallback ante errores HTTP, hedging con un primario lento y cierre del stream
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from services.ai_providers import AIProviderError, ProviderRouter
+from tests.mock_llm import MockLLMServer, HTTPProvider
+
+@pytest.fixture
+def llm_server():
+    server = MockLLMServer().start()
+    yield server
+    server.stop()
+
+def _router(llm_server, scenarios, **kwargs):
+    return ProviderRouter(
+        [HTTPProvider(scenario, f'{llm_server.url}/{scenario}', timeout=5.0) for scenario in scenarios], **kwargs
+    )
+
+@pytest.mark.asyncio
+async def test_falls_back_to_next_provider_on_server_error(llm_server):
+    router = _router(llm_server, ['error', 'ok'])
+    try:
+        result = await router.complete('sistema', 'prompt')
+    finally:
+        await router.close()
+
+    assert result['provider'] == 'ok'
+    assert result['content'] == 'respuesta rápida'
+    assert llm_server.requests == ['error', 'ok']
+
+@pytest.mark.asyncio
+async def test_all_providers_failing_uses_fallback(llm_server):
+    router = _router(llm_server, ['error'])
+    try:
+        result = await router.complete('sistema', 'prompt', fallback=lambda: '{}')
+        with pytest.raises(AIProviderError):
+            await router.complete('sistema', 'prompt')
+    finally:
+        await router.close()
+
+    assert result['provider'] == 'simulation'
+
+@pytest.mark.asyncio
+async def test_hedged_request_answers_from_second_provider(llm_server):
+    router = _router(llm_server, ['slow', 'ok'], hedge_delay=0.05)
+    started = time.perf_counter()
+    try:
+        result = await router.complete('sistema', 'prompt')
+    finally:
+        await router.close()
+
+    assert result['provider'] == 'ok'
+    assert time.perf_counter() - started < llm_server.slow_seconds / 2
+    assert llm_server.requests == ['slow', 'ok']
+
+@pytest.mark.asyncio
+async def test_stopping_a_stream_early_closes_the_response(llm_server):
+    router = _router(llm_server, ['stream'])
+    try:
+        stream = router.stream('sistema', 'prompt')
+        first = await stream.__anext__()
+        await stream.aclose()
+
+        closed = await asyncio.to_thread(llm_server.stream_closed.wait, 5.0)
+    finally:
+        await router.close()
+
+    assert first['delta'] == 'parte 0 '
+    assert closed
+    assert not llm_server.stream_finished.is_set()
+
+@pytest.mark.asyncio
+async def test_openai_provider_against_local_server(llm_server):
+    pytest.importorskip('openai')
+    from services.ai_providers import OpenAIProvider
+
+    provider = OpenAIProvider('test-key', 'mock-model', base_url=f'{llm_server.url}/stream/v1', timeout=5.0)
+    try:
+        content = await provider.complete('sistema', 'prompt')
+        stream = provider.stream('sistema', 'prompt')
+        first = await stream.__anext__()
+        await stream.aclose()
+        closed = await asyncio.to_thread(llm_server.stream_closed.wait, 5.0)
+    finally:
+        await provider.close()
+
+    assert content == 'respuesta rápida'
+    assert first == 'parte 0 '
+    assert closed
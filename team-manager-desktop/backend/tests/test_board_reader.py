@@ -0,0 +1,43 @@
+"""
+🗂️ Tests de lectura de tableros
+Regresión N+1: load_board ejecuta un número fijo de consultas
+"""
+
+from sqlalchemy import delete
+
+from models.database import Card
+from services.board_reader import load_board, BOARD_QUERY_BUDGET
+from services.query_counter import QueryCounter
+
+def _count_queries(session, board_id):
+    with QueryCounter(session.get_bind()) as counter:
+        board = load_board(session, board_id)
+    return board, counter.count
+
+def test_load_board_within_query_budget(session, org):
+    board, count = _count_queries(session, org['largest_board'])
+
+    assert board is not None
+    assert sum(column['card_count'] for column in board['columns']) > 0
+    assert count <= BOARD_QUERY_BUDGET
+
+def test_query_count_does_not_grow_with_board_size(session, org):
+    # board-1 se queda solo con las tarjetas en curso
+    session.execute(delete(Card).where(Card.column_id.like('board-1-%'),
+                                       Card.column_id != 'board-1-in_progress'))
+    session.commit()
+
+    large, large_count = _count_queries(session, 'board-0')
+    session.expunge_all()
+    small, small_count = _count_queries(session, 'board-1')
+
+    large_cards = sum(column['card_count'] for column in large['columns'])
+    small_cards = sum(column['card_count'] for column in small['columns'])
+    assert 0 < small_cards < large_cards / 2
+    assert large_count == small_count
+
+def test_load_board_missing(session):
+    board, count = _count_queries(session, 'missing')
+
+    assert board is None
+    assert count == 1
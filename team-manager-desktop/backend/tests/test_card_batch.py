@@ -0,0 +1,61 @@
+"""
+📦 Tests de operaciones por lotes
+Colocación con un solo vecino, también sobre movimientos anteriores del mismo lote
+"""
+
+from sqlalchemy import select
+
+from models.database import Card
+from services.card_batch import CardBatchService
+
+def _column_order(session, column_id):
+    return session.execute(
+        select(Card.id).where(Card.column_id == column_id).order_by(Card.position, Card.id)
+    ).scalars().all()
+
+def test_batch_moves_with_only_before_id(session, org):
+    column_id = 'board-0-ready'
+    order = _column_order(session, column_id)
+    first, second = _column_order(session, 'board-0-review')[:2]
+
+    result = CardBatchService().apply(session, [
+        {'op': 'move', 'id': first, 'column_id': column_id, 'before_id': order[0]},
+        {'op': 'move', 'id': second, 'column_id': column_id, 'before_id': order[0]},
+    ], enforce_wip=False)
+
+    assert result['committed']
+    assert _column_order(session, column_id) == [order[0], second, first] + order[1:]
+    assert session.get(Card, first).status == 'ready'
+
+def test_batch_moves_with_only_after_id(session, org):
+    column_id = 'board-0-ready'
+    order = _column_order(session, column_id)
+    moved = _column_order(session, 'board-0-review')[0]
+
+    result = CardBatchService().apply(session, [
+        {'op': 'move', 'id': moved, 'column_id': column_id, 'after_id': order[-1]},
+    ], enforce_wip=False)
+
+    assert result['committed']
+    assert _column_order(session, column_id) == order[:-1] + [moved, order[-1]]
+
+def test_status_follows_the_column_and_cannot_be_updated(session, org):
+    card_id = _column_order(session, 'board-0-in_progress')[0]
+
+    result = CardBatchService().apply(session, [
+        {'op': 'update', 'id': card_id, 'data': {'title': 'Renombrada', 'status': 'done'}},
+        {'op': 'create', 'column_id': 'board-0-review',
+         'data': {'title': 'Nueva', 'team_id': 'team-0', 'project_id': 'project-0', 'status': 'done'}},
+    ], enforce_wip=False)
+
+    assert not result['committed']
+    assert [item['status'] for item in result['results']] == ['error', 'error']
+    assert "'move'" in result['results'][0]['error']
+    card = session.get(Card, card_id)
+    assert (card.title, card.status) != ('Renombrada', 'done')
+
+    result = CardBatchService().apply(session, [
+        {'op': 'create', 'column_id': 'board-0-review',
+         'data': {'title': 'Nueva', 'team_id': 'team-0', 'project_id': 'project-0'}},
+    ], enforce_wip=False)
+    assert session.get(Card, result['results'][0]['id']).status == 'review'
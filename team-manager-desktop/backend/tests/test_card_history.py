@@ -0,0 +1,170 @@
+"""
+⏱️ Tests del historial de estados
+Tramos, duraciones y tiempos de ciclo escritos por record_transitions, por los
+hooks del ORM y por la importación markdown, y los percentiles de las lecturas
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import select, update
+
+from models.database import Board, Card, CardStatusHistory, SyncSequence, TimeEntry
+from services.card_history import CardHistoryService, Transition, _percentiles, record_transitions
+from services.markdown_board import MarkdownBoardSync, _card_id_for
+
+HOUR = 3600.0
+DAY = 86400.0
+
+def _cards(session, column_id, count):
+    """Tarjetas de una columna sin horas registradas (se pueden eliminar por el ORM)"""
+    return session.execute(
+        select(Card).where(Card.column_id == column_id, Card.id.notin_(select(TimeEntry.card_id)))
+        .order_by(Card.id).limit(count)
+    ).scalars().all()
+
+def _move(session, card, column_type, at):
+    transition = Transition(card.id, card.team_id, card.project_id, f'board-0-{column_type}', column_type, None, None)
+    return record_transitions(session.connection(), [transition], at)
+
+def _spans(session, card_id):
+    return session.execute(
+        select(CardStatusHistory).where(CardStatusHistory.card_id == card_id)
+        .order_by(CardStatusHistory.entered_at, CardStatusHistory.id)
+    ).scalars().all()
+
+def _rewind(session, card_id, delta):
+    """Simular que el tramo abierto empezó `delta` antes"""
+    span = session.execute(select(CardStatusHistory).where(
+        CardStatusHistory.card_id == card_id, CardStatusHistory.exited_at.is_(None)
+    )).scalar_one()
+    session.execute(update(CardStatusHistory).where(CardStatusHistory.id == span.id)
+                    .values(entered_at=span.entered_at - delta))
+    session.commit()
+
+def test_percentiles_are_nearest_rank():
+    assert _percentiles([]) == {'p50': None, 'p85': None, 'p95': None}
+    assert _percentiles([7]) == {'p50': 7, 'p85': 7, 'p95': 7}
+    assert _percentiles([1, 2, 3, 4]) == {'p50': 2, 'p85': 4, 'p95': 4}
+    assert _percentiles(list(range(1, 21))) == {'p50': 10, 'p85': 17, 'p95': 19}
+    assert _percentiles(list(range(1, 101))) == {'p50': 50, 'p85': 85, 'p95': 95}
+
+def test_record_transitions_closes_spans_and_measures_cycle(session, org):
+    card = _cards(session, 'board-0-backlog', 1)[0]
+    base = datetime.now() - timedelta(days=10)
+
+    assert _move(session, card, 'backlog', base) == 1
+    assert _move(session, card, 'in_progress', base + timedelta(hours=1)) == 1
+    # Sin cambio de columna ni estado no se abre tramo
+    assert _move(session, card, 'in_progress', base + timedelta(hours=2)) == 0
+    _move(session, card, 'review', base + timedelta(hours=3))
+    _move(session, card, 'done', base + timedelta(days=1, hours=3))
+    # Reabrir y volver a terminar: el ciclo sigue contando desde el primer inicio
+    _move(session, card, 'in_progress', base + timedelta(days=2))
+    _move(session, card, 'done', base + timedelta(days=3))
+    session.commit()
+
+    spans = _spans(session, card.id)
+    assert [(span.from_status, span.status) for span in spans] == [
+        (None, 'backlog'), ('backlog', 'in_progress'), ('in_progress', 'review'), ('review', 'done'),
+        ('done', 'in_progress'), ('in_progress', 'done')
+    ]
+    assert spans[1].from_column_id == 'board-0-backlog'
+    durations = [span.duration_seconds for span in spans]
+    assert durations[:5] == pytest.approx([HOUR, 2 * HOUR, DAY, DAY - 3 * HOUR, DAY], abs=0.01)
+    assert durations[5] is None and spans[5].exited_at is None
+    assert spans[3].cycle_seconds == pytest.approx(DAY + 2 * HOUR, abs=0.01)
+    assert spans[5].cycle_seconds == pytest.approx(3 * DAY - HOUR, abs=0.01)
+
+    history = CardHistoryService(None).card_history(session, card.id)
+    assert history['cycle_days'] == round((3 * DAY - HOUR) / DAY, 2)
+    in_progress = next(column for column in history['columns'] if column['column_id'] == 'board-0-in_progress')
+    assert (in_progress['visits'], in_progress['current']) == (2, False)
+    assert in_progress['days'] == round((2 * HOUR + DAY) / DAY, 2)
+
+def test_cycle_times_and_aging_percentiles(session, org):
+    service = CardHistoryService(None)
+    base = datetime.now() - timedelta(days=20)
+    finished = _cards(session, 'board-0-ready', 10)
+    for days, card in enumerate(finished, start=1):
+        _move(session, card, 'in_progress', base)
+        _move(session, card, 'done', base + timedelta(days=days))
+    waiting = _cards(session, 'board-0-backlog', 3)
+    for days, card in enumerate(waiting, start=1):
+        _move(session, card, 'review', datetime.now() - timedelta(days=days))
+    session.commit()
+
+    cycles = service.cycle_times(session, team_id='team-0')
+    assert cycles['count'] == 10
+    assert cycles['percentiles'] == {'p50': 5.0, 'p85': 9.0, 'p95': 10.0}
+    assert [point['cycle_days'] for point in cycles['points']] == [float(days) for days in range(1, 11)]
+    assert service.cycle_times(session, team_id='team-1')['count'] == 0
+
+    aging = service.aging(session, 'board-0')
+    columns = {column['column_id']: column for column in aging['columns']}
+    review = columns['board-0-review']
+    assert review['wip'] == 3
+    assert review['age_days'] == {'p50': 2.0, 'p85': 3.0, 'p95': 3.0}
+    assert [item['card_id'] for item in review['oldest']] == [card.id for card in reversed(waiting)]
+    in_progress = columns['board-0-in_progress']
+    assert (in_progress['wip'], in_progress['exited']) == (0, 10)
+    assert in_progress['duration_days'] == {'p50': 5.0, 'p85': 9.0, 'p95': 10.0}
+
+    # Misma versión: desde la cache; otra versión: se vuelve a leer
+    service.aging(session, 'board-0')
+    assert (service.status()['aging_hits'], service.status()['aging_loads']) == (1, 1)
+    session.execute(update(SyncSequence).where(SyncSequence.id == 1).values(value=SyncSequence.value + 1))
+    session.commit()
+    service.aging(session, 'board-0')
+    assert service.status()['aging_loads'] == 2
+
+def test_orm_hooks_record_transitions(session_factory, session, org):
+    service = CardHistoryService(session_factory)
+    service.install_hooks(session_factory)
+    assert service.backfill(session) == 600
+
+    card, removed = _cards(session, 'board-0-backlog', 2)
+    card.column_id, card.status = 'board-0-in_progress', 'in_progress'
+    session.commit()
+    assert card.started_at is not None and card.completed_at is None
+
+    _rewind(session, card.id, timedelta(hours=2))
+    card.column_id, card.status = 'board-0-done', 'done'
+    session.commit()
+    assert card.completed_at is not None
+
+    spans = _spans(session, card.id)
+    assert [(span.from_column_id, span.column_id) for span in spans] == [
+        (None, 'board-0-backlog'), ('board-0-backlog', 'board-0-in_progress'),
+        ('board-0-in_progress', 'board-0-done')
+    ]
+    assert spans[1].duration_seconds == pytest.approx(2 * HOUR, abs=5)
+    assert spans[2].cycle_seconds == pytest.approx(2 * HOUR, abs=5)
+
+    # Cambiar otros campos no abre tramos; eliminar la tarjeta borra su historial
+    card.title = 'Renombrada'
+    session.delete(removed)
+    session.commit()
+    assert len(_spans(session, card.id)) == 3
+    assert _spans(session, removed.id) == []
+
+def test_markdown_import_records_transitions(session, org):
+    sync = MarkdownBoardSync()
+    board = session.get(Board, 'board-0')
+    card_id = _card_id_for('board-0', 'T-1')
+
+    sync.import_board(session, board, ['## 📋 BACKLOG\n', '- [ ] **[T-1]** Tarea\n'])
+    _rewind(session, card_id, timedelta(days=1))
+    sync.import_board(session, board, ['## 🔄 EN PROGRESO\n', '- [ ] **[T-1]** Tarea\n'])
+    _rewind(session, card_id, timedelta(hours=2))
+    sync.import_board(session, board, ['## ✅ HECHO\n', '- [x] **[T-1]** Tarea\n'])
+    # Reimportar lo mismo no registra nada
+    sync.import_board(session, board, ['## ✅ HECHO\n', '- [x] **[T-1]** Tarea\n'])
+
+    spans = _spans(session, card_id)
+    assert [(span.from_status, span.status) for span in spans] == [
+        (None, 'backlog'), ('backlog', 'in_progress'), ('in_progress', 'done')
+    ]
+    assert spans[0].duration_seconds == pytest.approx(DAY, abs=5)
+    assert spans[1].duration_seconds == pytest.approx(2 * HOUR, abs=5)
+    assert spans[2].cycle_seconds == pytest.approx(2 * HOUR, abs=5)
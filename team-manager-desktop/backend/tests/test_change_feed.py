@@ -0,0 +1,98 @@
+"""
+📣 Tests del feed de cambios
+Fusión de cambios pendientes, resincronización de clientes lentos, filtros
+y publicación desde los hooks de sesión
+"""
+
+import asyncio
+
+import pytest
+
+from models.database import Card
+from services.change_feed import ChangeFeed, Subscription
+
+def _change(op, entity_id, changes=None, entity='card', teams=('team-0',), board_id='board-0'):
+    return {'entity': entity, 'op': op, 'id': entity_id, 'board_id': board_id,
+            'teams': list(teams), 'changes': changes or {}}
+
+async def _drain(subscription):
+    return await subscription.next_batch(coalesce_seconds=0)
+
+@pytest.mark.asyncio
+async def test_updates_to_the_same_entity_are_merged():
+    subscription = Subscription()
+    subscription.push(_change('update', 'card-1', {'column_id': 'a', 'position': 'V'}))
+    subscription.push(_change('update', 'card-2', {'title': 'Otra'}))
+    subscription.push(_change('update', 'card-1', {'column_id': 'b'}))
+
+    batch = await _drain(subscription)
+
+    assert batch['type'] == 'changes'
+    assert [change['id'] for change in batch['changes']] == ['card-2', 'card-1']
+    assert batch['changes'][1]['changes'] == {'column_id': 'b', 'position': 'V'}
+
+@pytest.mark.asyncio
+async def test_create_absorbs_updates_and_vanishes_on_delete():
+    subscription = Subscription()
+    subscription.push(_change('create', 'card-1', {'title': 'Nueva', 'column_id': 'a'}))
+    subscription.push(_change('update', 'card-1', {'column_id': 'b'}))
+    subscription.push(_change('create', 'card-2', {'title': 'Efímera'}))
+    subscription.push(_change('delete', 'card-2'))
+
+    batch = await _drain(subscription)
+
+    assert batch['changes'] == [_change('create', 'card-1', {'title': 'Nueva', 'column_id': 'b'})]
+
+@pytest.mark.asyncio
+async def test_overflow_asks_for_resync_then_resumes():
+    subscription = Subscription(max_pending=3)
+    for i in range(4):
+        subscription.push(_change('update', f'card-{i}', {'title': str(i)}))
+    assert subscription.dropped == 4
+
+    assert await _drain(subscription) == {'type': 'resync'}
+    subscription.push(_change('update', 'card-9', {'title': '9'}))
+    batch = await _drain(subscription)
+    assert [change['id'] for change in batch['changes']] == ['card-9']
+
+def test_filters_by_team_or_board():
+    everything = Subscription()
+    by_team = Subscription(teams=['team-1'])
+    by_board = Subscription(boards=['board-0'])
+    change = _change('update', 'card-1', teams=['team-0'], board_id='board-0')
+
+    assert everything.matches(change)
+    assert not by_team.matches(change)
+    assert by_board.matches(change)
+
+    by_team.update(teams=['team-0', 'team-1'])
+    assert by_team.matches(change)
+    assert not by_board.matches(_change('update', 'risk-1', entity='risk', teams=[], board_id=None))
+
+@pytest.mark.asyncio
+async def test_committed_card_move_reaches_matching_subscribers(session_factory, org):
+    feed = ChangeFeed()
+    feed.bind_loop(asyncio.get_running_loop())
+    feed.install_hooks(session_factory)
+    watching = feed.subscribe(boards=['board-0'])
+    elsewhere = feed.subscribe(boards=['board-1'])
+
+    with session_factory() as session:
+        # Lo que se deshace no se publica
+        session.query(Card).filter_by(column_id='board-0-review').first().title = 'Descartado'
+        session.flush()
+        session.rollback()
+
+    with session_factory() as session:
+        card = session.query(Card).filter_by(column_id='board-0-backlog').first()
+        card.column_id = 'board-0-ready'
+        session.commit()
+        card_id = card.id
+
+    batch = await asyncio.wait_for(watching.next_batch(0), timeout=1)
+
+    assert len(batch['changes']) == 1
+    change = batch['changes'][0]
+    assert (change['op'], change['id'], change['board_id']) == ('update', card_id, 'board-0')
+    assert change['changes'] == {'column_id': 'board-0-ready', 'from_column_id': 'board-0-backlog'}
+    assert not elsewhere._ready.is_set()
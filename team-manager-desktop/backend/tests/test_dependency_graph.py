@@ -0,0 +1,185 @@
+"""
+🕸️ Tests del grafo de dependencias
+Ciclos rechazados al insertar (también con 409 en la API), camino crítico,
+cadenas de bloqueo y un oráculo de alcanzabilidad por fuerza bruta
+"""
+
+import random
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import select
+
+from api.dependencies import DependencyCreate, add_card_dependency
+from models.database import Card, card_dependencies
+from services.dependency_graph import (
+    BLOCKED, DONE, DependencyCycleError, DependencyGraph, DependencyGraphService
+)
+
+@pytest.fixture
+def graph_service(session_factory, org):
+    service = DependencyGraphService(session_factory)
+    service.install_hooks(session_factory)
+    service.ensure_loaded()
+    return service
+
+def _free_cards(session, count):
+    """Tarjetas sin dependencias en ningún sentido"""
+    linked = select(card_dependencies.c.card_id).union(select(card_dependencies.c.depends_on_id))
+    return session.execute(
+        select(Card).where(Card.id.not_in(linked)).order_by(Card.id).limit(count)
+    ).scalars().all()
+
+def _chain(graph, *node_ids):
+    for before_id, after_id in zip(node_ids, node_ids[1:]):
+        graph.add_edge(before_id, after_id)
+
+def test_add_edge_rejects_cycle_and_reports_it():
+    graph = DependencyGraph()
+    _chain(graph, 'a', 'b', 'c', 'd')
+
+    with pytest.raises(DependencyCycleError) as error:
+        graph.add_edge('d', 'b')
+    assert error.value.cycle == ['d', 'b', 'c', 'd']
+    with pytest.raises(DependencyCycleError):
+        graph.add_edge('a', 'a')
+
+    assert not graph.has_edge('d', 'b')
+    assert graph.edge_count == 3
+    assert graph.topological_order() == ['a', 'b', 'c', 'd']
+
+def test_validate_leaves_graph_unchanged():
+    graph = DependencyGraph()
+    _chain(graph, 'a', 'b', 'c')
+
+    # Quitar b → c en el mismo cambio permite c → a
+    graph.validate([('c', 'a'), ('c', 'x')], removed=[('b', 'c')])
+    with pytest.raises(DependencyCycleError):
+        graph.validate([('c', 'a')])
+
+    assert graph.has_edge('b', 'c') and not graph.has_edge('c', 'a')
+    assert 'x' not in graph
+    assert graph.edge_count == 2
+
+def test_hooks_reject_cycle_on_insert(session, graph_service):
+    first, second, third = _free_cards(session, 3)
+    second.dependencies.append(first)
+    third.dependencies.append(second)
+    session.commit()
+    assert graph_service.cards.has_edge(first.id, second.id)
+    assert graph_service.cards.has_edge(second.id, third.id)
+
+    first.dependencies.append(third)
+    with pytest.raises(DependencyCycleError) as error:
+        session.commit()
+    session.rollback()
+    assert error.value.cycle == [third.id, first.id, second.id, third.id]
+
+    stored = session.execute(
+        select(card_dependencies.c.depends_on_id).where(card_dependencies.c.card_id == first.id)
+    ).scalars().all()
+    assert stored == []
+    assert not graph_service.cards.has_edge(third.id, first.id)
+
+def test_api_returns_409_with_cycle(session, graph_service):
+    first, second = _free_cards(session, 2)
+    request = SimpleNamespace(app=SimpleNamespace(state=SimpleNamespace(dependency_graph=graph_service)))
+
+    response = add_card_dependency(second.id, DependencyCreate(depends_on_id=first.id), request, session)
+    assert response['depends_on_id'] == first.id
+
+    with pytest.raises(HTTPException) as error:
+        add_card_dependency(first.id, DependencyCreate(depends_on_id=second.id), request, session)
+    assert error.value.status_code == 409
+    assert error.value.detail['cycle'] == [second.id, first.id, second.id]
+    assert session.get(Card, first.id).dependencies == []
+
+def test_critical_path_skips_done_work():
+    graph = DependencyGraph()
+    for node_id, weight, state in (('a', 5, 0), ('b', 3, BLOCKED), ('c', 4, 0), ('d', 2, 0),
+                                   ('e', 20, DONE), ('f', 1, 0)):
+        graph.upsert_node(node_id, weight, state, teams=('team-0',), project='p')
+    _chain(graph, 'a', 'b', 'c')
+    _chain(graph, 'd', 'c')
+    # El terminado no cuenta ni encadena: f empieza de cero
+    _chain(graph, 'e', 'f')
+
+    path = graph.critical_path()
+    assert path == {'hours': 12.0, 'length': 3, 'nodes': ['a', 'b', 'c'], 'blocked': ['b']}
+    assert graph.critical_path(project='otro')['length'] == 0
+
+def test_blocked_chains_follow_transitive_dependents():
+    graph = DependencyGraph()
+    for node_id, weight, state, team in (('root', 1, BLOCKED, 't1'), ('a', 2, 0, 't1'), ('b', 3, 0, 't2'),
+                                         ('done', 8, DONE, 't2'), ('after-done', 5, 0, 't2'),
+                                         ('small', 1, BLOCKED, 't1'), ('s1', 1, 0, 't1')):
+        graph.upsert_node(node_id, weight, state, teams=(team,), project='p')
+    _chain(graph, 'root', 'a', 'b')
+    _chain(graph, 'root', 'done', 'after-done')
+    _chain(graph, 'small', 's1')
+
+    chains = graph.blocked_chains()
+    assert [chain['id'] for chain in chains] == ['root', 'small']
+    root = chains[0]
+    assert (root['affected'], root['affected_hours']) == (2, 5.0)
+    assert sorted(root['sample']) == ['a', 'b']
+    assert root['cross_team'] and root['affected_teams'] == ['t1', 't2']
+    assert not chains[1]['cross_team']
+    assert graph.blockers('b') == ['root']
+    assert graph.blockers('after-done') == []
+
+def _reaches(edges, start, goal):
+    """Oráculo: búsqueda en anchura sobre el conjunto de aristas"""
+    seen, frontier = {start}, [start]
+    while frontier:
+        node = frontier.pop()
+        if node == goal:
+            return True
+        for before_id, after_id in edges:
+            if before_id == node and after_id not in seen:
+                seen.add(after_id)
+                frontier.append(after_id)
+    return False
+
+@pytest.mark.parametrize('seed', range(5))
+def test_random_insertions_match_reachability_oracle(seed):
+    rng = random.Random(seed)
+    nodes = [f'n{i}' for i in range(25)]
+    graph = DependencyGraph()
+    for node_id in nodes:
+        graph.upsert_node(node_id)
+    edges = set()
+
+    for _ in range(400):
+        before_id, after_id = rng.sample(nodes, 2)
+        if edges and rng.random() < 0.2:
+            edge = rng.choice(sorted(edges))
+            assert graph.remove_edge(*edge)
+            edges.discard(edge)
+            continue
+
+        closes_cycle = _reaches(edges, after_id, before_id)
+        if closes_cycle:
+            with pytest.raises(DependencyCycleError) as error:
+                graph.add_edge(before_id, after_id)
+            cycle = error.value.cycle
+            assert cycle[0] == cycle[-1]
+            assert all(pair in edges | {(before_id, after_id)} for pair in zip(cycle, cycle[1:]))
+        else:
+            graph.add_edge(before_id, after_id)
+            edges.add((before_id, after_id))
+
+        position = {node_id: i for i, node_id in enumerate(graph.topological_order())}
+        assert all(position[u] < position[v] for u, v in edges)
+        assert graph.edge_count == len(edges)
+
+    # La carga masiva descarta exactamente las aristas que cierran ciclos
+    bulk = DependencyGraph()
+    extra = [tuple(rng.sample(nodes, 2)) for _ in range(30)]
+    rejected = bulk.build(((node_id, 1.0, 0, (), None) for node_id in nodes), sorted(edges) + extra)
+    kept = set(sorted(edges) + extra) - set(rejected)
+    position = {node_id: i for i, node_id in enumerate(bulk.topological_order())}
+    assert all(position[u] < position[v] for u, v in kept)
+    for before_id, after_id in rejected:
+        assert _reaches(kept, after_id, before_id)
@@ -0,0 +1,81 @@
+"""
+📄 Tests de los listados paginados
+Consultas fijas por página (sin N+1) y recorrido completo por cursor
+"""
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import func, select
+from sqlalchemy.exc import InvalidRequestError
+
+from api.cards import list_cards
+from api.users import list_users
+from models.database import Card, Team
+from services.listing import paginate_keyset
+from services.query_counter import QueryCounter
+
+def _cards_page(session, cursor=None, expand=None, fields=None, limit=50, **filters):
+    with QueryCounter(session.get_bind()) as counter:
+        page = list_cards(**{'team_id': None, 'project_id': None, 'column_id': None, 'status': None,
+                             'assigned_to': None, **filters},
+                          fields=fields, expand=expand, limit=limit, cursor=cursor, order='desc', session=session)
+    return page, counter.count
+
+def test_card_pages_cover_every_card_once(session, org):
+    seen, counts, cursor = [], [], None
+    while True:
+        page, count = _cards_page(session, cursor=cursor, limit=70)
+        seen.extend(item['id'] for item in page['items'])
+        counts.append(count)
+        cursor = page['next_cursor']
+        if cursor is None:
+            break
+
+    assert len(seen) == len(set(seen)) == session.scalar(select(func.count(Card.id)))
+    assert set(counts) == {1}
+
+def test_assignee_expansion_adds_a_single_query(session, org):
+    plain, plain_count = _cards_page(session, limit=200)
+    session.expunge_all()
+    expanded, expanded_count = _cards_page(session, expand='assignee', limit=200)
+
+    assert plain_count == 1
+    assert expanded_count == 2
+    assert [item['id'] for item in expanded['items']] == [item['id'] for item in plain['items']]
+    assert any(item['assignee'] for item in expanded['items'])
+
+def test_query_count_does_not_grow_with_page_size(session, org):
+    _, small = _cards_page(session, expand='assignee', limit=5)
+    session.expunge_all()
+    _, large = _cards_page(session, expand='assignee', limit=500)
+
+    assert small == large
+
+def test_unrequested_relations_raise_instead_of_lazy_loading(session, org):
+    cards, _ = paginate_keyset(session, Card, ['id', 'updated_at', 'assigned_to'], limit=10)
+
+    with pytest.raises(InvalidRequestError):
+        cards[0].assignee
+
+def test_sparse_fieldset_only_returns_requested_fields(session, org):
+    page, count = _cards_page(session, fields='title', limit=10, status='in_progress')
+
+    assert count == 1
+    assert set(page['items'][0]) == {'id', 'updated_at', 'title'}
+
+def test_unknown_field_and_bad_cursor_are_rejected(session, org):
+    with pytest.raises(HTTPException) as unknown:
+        _cards_page(session, fields='title,secret')
+    with pytest.raises(HTTPException) as bad_cursor:
+        _cards_page(session, cursor='no-es-un-cursor')
+
+    assert unknown.value.status_code == bad_cursor.value.status_code == 400
+
+def test_team_users_page_is_a_single_query(session, org):
+    with QueryCounter(session.get_bind()) as counter:
+        page = list_users(team_id='team-0', active=True, fields=None, limit=50, cursor=None,
+                          order='desc', session=session)
+
+    members = session.get(Team, 'team-0').members
+    assert {item['id'] for item in page['items']} == {user.id for user in members if user.is_active}
+    assert counter.count == 1
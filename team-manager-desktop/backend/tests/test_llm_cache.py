@@ -0,0 +1,66 @@
+"""
+🗃️ Tests del cache de respuestas de IA
+Expiración por TTL, desalojo LRU e invalidación por equipos/proyectos
+"""
+
+from datetime import datetime, timedelta
+
+from models.database import AIResponseCache
+from services.llm_cache import LLMResponseCache
+
+def _touch(session_factory, key, minutes_ago):
+    """Fijar el último acceso de una entrada (el reloj real no distingue llamadas seguidas)"""
+    with session_factory() as session:
+        session.get(AIResponseCache, key).last_accessed_at = datetime.utcnow() - timedelta(minutes=minutes_ago)
+        session.commit()
+
+def test_expired_entry_is_a_miss_and_removed(session_factory):
+    cache = LLMResponseCache(session_factory, ttl_seconds=60)
+    cache.set('key', 'model', 'respuesta')
+    with session_factory() as session:
+        session.get(AIResponseCache, 'key').expires_at = datetime.utcnow() - timedelta(seconds=1)
+        session.commit()
+
+    assert cache.get('key') is None
+    stats = cache.get_stats()
+    assert (stats['expired'], stats['misses'], stats['entries']) == (1, 1, 0)
+
+def test_build_key_ignores_volatile_fields_and_key_order():
+    first = LLMResponseCache.build_key('sistema', {'a': 1, 'b': [2], 'timestamp': 'hoy'}, 'model')
+    second = LLMResponseCache.build_key('sistema', '{"b": [2], "a": 1, "timestamp": "mañana"}', 'model')
+
+    assert first == second
+    assert first != LLMResponseCache.build_key('sistema', {'a': 1, 'b': [2]}, 'otro-model')
+
+def test_least_recently_accessed_entry_is_evicted(session_factory):
+    cache = LLMResponseCache(session_factory, max_entries=2)
+    cache.set('old', 'model', 'a')
+    cache.set('recent', 'model', 'b')
+    _touch(session_factory, 'old', 10)
+    _touch(session_factory, 'recent', 5)
+    # Leer 'old' lo convierte en el más reciente
+    assert cache.get('old') == 'a'
+
+    cache.set('new', 'model', 'c')
+
+    assert cache.get('recent') is None
+    assert cache.get('old') == 'a'
+    assert cache.get('new') == 'c'
+    assert cache.get_stats()['evictions'] == 1
+
+def test_invalidate_matches_whole_scopes_only(session_factory):
+    cache = LLMResponseCache(session_factory)
+    cache.set('team-1', 'model', 'a', scopes=['team:1'])
+    cache.set('team-10', 'model', 'b', scopes=['team:10', 'project:7'])
+    cache.set('underscore', 'model', 'c', scopes=['teamX1'])
+
+    assert cache.invalidate(['team:1']) == 1
+    assert cache.invalidate(['team_1']) == 0
+    assert cache.get('team-1') is None
+    assert cache.get('team-10') == 'b'
+    assert cache.get('underscore') == 'c'
+
+    assert cache.invalidate(['project:7', 'missing']) == 1
+    assert cache.invalidate([]) == 0
+    assert cache.invalidate() == 1
+    assert cache.get_stats()['entries'] == 0
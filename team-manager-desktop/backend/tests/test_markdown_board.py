@@ -0,0 +1,129 @@
+"""
+📝 Tests del tablero markdown
+Ida y vuelta sin cambios, mismo fichero en dos tableros, reequilibrado de claves,
+fechas de inicio/fin, borrado de filas dependientes y publicación de cambios
+"""
+
+import asyncio
+from datetime import datetime
+
+import pytest
+from sqlalchemy import delete, func, insert, select, update
+
+from benchmarks.synthetic import markdown_board
+from models.database import Board, Card, Comment, TimeEntry, card_dependencies
+from services.change_feed import ChangeFeed
+from services.markdown_board import MarkdownBoardSync, _card_id_for
+from services.ranking import MAX_RANK_LENGTH
+
+def _board(sections):
+    """Tablero markdown mínimo: {encabezado: [clave, ...]}"""
+    lines = []
+    for heading, keys in sections.items():
+        lines.append(f"## {heading}\n")
+        lines += [f"- [ ] **[{key}]** Tarea {key}\n" for key in keys]
+    return lines
+
+def test_export_then_import_is_a_no_op(session, org):
+    # Solo tarjetas importadas (las demás se reclamarían en la primera vuelta)
+    session.execute(delete(Card).where(Card.column_id.like('board-0-%')))
+    session.commit()
+    sync = MarkdownBoardSync()
+    board = session.get(Board, 'board-0')
+    first = sync.import_board(session, board, markdown_board(300))
+
+    exported = ''.join(sync.export_board(session, board)).splitlines(keepends=True)
+    again = sync.import_board(session, board, exported)
+
+    assert first['created'] == 300
+    assert again['created'] == again['updated'] == 0
+
+def test_same_file_into_two_boards(session, org):
+    sync = MarkdownBoardSync()
+    for board_id in ('board-0', 'board-1'):
+        stats = sync.import_board(session, session.get(Board, board_id), markdown_board(50))
+        assert stats['created'] == 50
+
+    imported = session.execute(select(func.count()).where(Card.import_key.is_not(None))).scalar()
+    assert imported == 100
+
+def test_import_rebalances_long_keys(session, org):
+    sync = MarkdownBoardSync()
+    board = session.get(Board, 'board-0')
+    sync.import_board(session, board, markdown_board(50))
+
+    # Claves ya al límite: la siguiente importación las alarga por encima de él
+    session.execute(update(Card).where(Card.column_id.like('board-0-%')).values(
+        position=func.substr(Card.position + 'zzzzzzzzzzzzzzzzzzzzzzzz', 1, MAX_RANK_LENGTH)
+    ))
+    session.commit()
+    sync.import_board(session, board, markdown_board(80, seed=7))
+
+    longest = session.execute(
+        select(func.max(func.length(Card.position))).where(Card.column_id.like('board-0-%'))
+    ).scalar()
+    assert longest <= MAX_RANK_LENGTH
+
+def test_moves_stamp_started_and_completed_dates(session, org):
+    sync = MarkdownBoardSync()
+    board = session.get(Board, 'board-0')
+    sync.import_board(session, board, _board({'📋 BACKLOG': ['T-1'], '🔄 EN PROGRESO': ['T-2']}))
+    first, second = (session.get(Card, _card_id_for('board-0', key)) for key in ('T-1', 'T-2'))
+    assert first.started_at is None and second.started_at is not None
+
+    sync.import_board(session, board, _board({'🔄 EN PROGRESO': ['T-1'], '✅ HECHO': ['T-2']}))
+    session.expire_all()
+    assert first.started_at is not None and first.completed_at is None
+    assert second.status == 'done' and second.completed_at is not None
+    started = second.started_at
+
+    sync.import_board(session, board, _board({'🔄 EN PROGRESO': ['T-1'], '👀 EN REVISIÓN': ['T-2']}))
+    session.expire_all()
+    assert second.completed_at is None
+    assert second.started_at == started
+
+def test_prune_removes_dependent_rows(session, org):
+    sync = MarkdownBoardSync()
+    board = session.get(Board, 'board-0')
+    sync.import_board(session, board, _board({'📋 BACKLOG': ['T-1', 'T-2']}))
+    kept, removed = _card_id_for('board-0', 'T-1'), _card_id_for('board-0', 'T-2')
+    user_id = session.scalar(select(Card.assigned_to).where(Card.assigned_to.isnot(None)).limit(1))
+    session.add(Comment(id='comment-x', content='Hola', card_id=removed, author_id=user_id))
+    session.add(TimeEntry(id='time-x', card_id=removed, user_id=user_id, hours=2, date=datetime.now()))
+    session.execute(insert(card_dependencies), [{'card_id': kept, 'depends_on_id': removed},
+                                                {'card_id': removed, 'depends_on_id': kept}])
+    session.commit()
+
+    stats = sync.import_board(session, board, _board({'📋 BACKLOG': ['T-1']}), prune=True)
+
+    assert stats['deleted'] == 1
+    assert session.get(Card, removed) is None
+    assert session.get(Comment, 'comment-x') is None
+    assert session.get(TimeEntry, 'time-x') is None
+    assert session.scalar(select(func.count()).select_from(card_dependencies).where(
+        (card_dependencies.c.card_id == removed) | (card_dependencies.c.depends_on_id == removed)
+    )) == 0
+
+@pytest.mark.asyncio
+async def test_bulk_import_publishes_card_changes(session_factory, org):
+    feed = ChangeFeed()
+    feed.bind_loop(asyncio.get_running_loop())
+    feed.install_hooks(session_factory)
+    subscription = feed.subscribe(boards=['board-0'])
+    sync = MarkdownBoardSync()
+
+    with session_factory() as session:
+        board = session.get(Board, 'board-0')
+        sync.import_board(session, board, _board({'📋 BACKLOG': ['T-1', 'T-2']}))
+        created = await asyncio.wait_for(subscription.next_batch(0), timeout=1)
+
+        sync.import_board(session, board, _board({'✅ HECHO': ['T-1']}), prune=True)
+        changed = await asyncio.wait_for(subscription.next_batch(0), timeout=1)
+
+    assert {(change['op'], change['changes']['title']) for change in created['changes']} == \
+        {('create', 'Tarea T-1'), ('create', 'Tarea T-2')}
+    update_change, delete_change = changed['changes']
+    assert update_change['id'] == _card_id_for('board-0', 'T-1')
+    assert update_change['changes']['status'] == 'done'
+    assert update_change['changes']['from_column_id'] == 'board-0-backlog'
+    assert (delete_change['op'], delete_change['id']) == ('delete', _card_id_for('board-0', 'T-2'))
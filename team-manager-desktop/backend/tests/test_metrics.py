@@ -0,0 +1,116 @@
+"""
+📈 Tests de métricas
+Formato de texto de Prometheus, cuentas de los buckets y consultas SQL por
+petición que llegan al threadpool de los endpoints síncronos
+"""
+
+import re
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from sqlalchemy import create_engine, text
+
+from api.metrics import MetricsMiddleware, router as metrics_router
+from services.metrics import COUNT_BUCKETS, MetricsRegistry, install_sql_hooks
+
+SAMPLE = re.compile(r'^([a-zA-Z_:][a-zA-Z0-9_:]*)(\{([a-zA-Z_][a-zA-Z0-9_]*="(?:[^"\\]|\\.)*",?)*\})? (\S+)$')
+
+def _parse(body):
+    """Familias con su tipo y muestras (nombre, etiquetas, valor); falla si una línea no es válida"""
+    types, samples = {}, []
+    for line in body.splitlines():
+        if line.startswith('# HELP '):
+            continue
+        if line.startswith('# TYPE '):
+            _, _, name, kind = line.split(' ')
+            assert kind in ('counter', 'gauge', 'histogram'), line
+            types[name] = kind
+            continue
+        match = SAMPLE.match(line)
+        assert match, f"Línea no válida: {line!r}"
+        name, labels, value = match.group(1), match.group(2) or '', match.group(4)
+        family = re.sub(r'_(bucket|sum|count)$', '', name) if name not in types else name
+        assert family in types, f"Muestra sin # TYPE: {line!r}"
+        samples.append((name, dict(re.findall(r'([a-zA-Z_][a-zA-Z0-9_]*)="((?:[^"\\]|\\.)*)"', labels)),
+                        float(value)))
+    assert body.endswith('\n')
+    return types, samples
+
+def _buckets(samples, name, **labels):
+    return {
+        sample_labels['le']: value for sample_name, sample_labels, value in samples
+        if sample_name == f'{name}_bucket'
+        and all(sample_labels.get(key) == wanted for key, wanted in labels.items())
+    }
+
+def test_render_is_valid_text_format():
+    registry = MetricsRegistry()
+    counter = registry.counter('jobs_total', 'Tareas', ('name',))
+    counter.inc('copia "diaria"\nnoche')
+    counter.inc('simple', amount=2.5)
+    histogram = registry.histogram('job_seconds', 'Duración', ('name',), buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        histogram.observe(value, 'simple')
+    registry.register_collector('ok', lambda: [('pool_size', 'gauge', 'Tamaño', [({'pool': 'a'}, 4)])])
+    registry.register_collector('broken', lambda: 1 / 0)
+
+    body = registry.render()
+    types, samples = _parse(body)
+
+    assert types == {'jobs_total': 'counter', 'job_seconds': 'histogram', 'pool_size': 'gauge'}
+    assert 'jobs_total{name="copia \\"diaria\\"\\nnoche"} 1' in body
+    assert ('jobs_total', {'name': 'simple'}, 2.5) in samples
+    # Buckets acumulados: 0.1 incluye el valor igual al límite
+    assert _buckets(samples, 'job_seconds') == {'0.1': 2, '1': 3, '+Inf': 4}
+    assert ('job_seconds_count', {'name': 'simple'}, 4) in samples
+    assert ('job_seconds_sum', {'name': 'simple'}, 3.65) in samples
+    assert ('pool_size', {'pool': 'a'}, 4) in samples
+
+@pytest.fixture
+def app():
+    engine = create_engine('sqlite://')
+    install_sql_hooks(engine)
+
+    app = FastAPI()
+    app.add_middleware(MetricsMiddleware)
+    app.include_router(metrics_router, prefix='/api/metrics')
+
+    @app.get('/api/probe/{kind}')
+    def probe(kind: str, queries: int = 0):
+        # Endpoint síncrono: se ejecuta en el threadpool, fuera de la tarea del middleware
+        with engine.connect() as connection:
+            for _ in range(queries):
+                connection.execute(text('SELECT 1'))
+        return {'kind': kind}
+
+    yield app
+    engine.dispose()
+
+@pytest.mark.asyncio
+async def test_metrics_endpoint_counts_sql_per_request(app):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url='http://test') as client:
+        for queries in (0, 3, 3, 7):
+            response = await client.get(f'/api/probe/sql-{queries}', params={'queries': queries})
+            assert response.status_code == 200
+        await client.get('/api/probe/sql', params={'queries': 'x'})
+        response = await client.get('/api/metrics')
+
+    assert response.headers['content-type'].startswith('text/plain; version=0.0.4')
+    types, samples = _parse(response.text)
+    assert types['http_request_sql_queries'] == 'histogram'
+
+    route = {'method': 'GET', 'route': '/api/probe/{kind}'}
+    buckets = _buckets(samples, 'http_request_sql_queries', **route)
+    # Las plantillas de ruta agrupan los ids: 4 peticiones válidas + 1 rechazada (422)
+    assert buckets['0'] == 2 and buckets['2'] == buckets['1'] == buckets['0']
+    assert buckets['5'] - buckets['2'] == 2
+    assert buckets['10'] - buckets['5'] == 1
+    assert list(buckets) == [str(bound) for bound in COUNT_BUCKETS] + ['+Inf']
+    counts = [value for _, value in sorted(buckets.items(), key=lambda item: float(item[0]))]
+    assert counts == sorted(counts)
+
+    assert ('http_request_sql_queries_sum', route, 13) in samples
+    assert ('http_requests_total', {**route, 'status': '200'}, 4) in samples
+    assert ('http_requests_total', {**route, 'status': '422'}, 1) in samples
@@ -0,0 +1,163 @@
+"""
+🔬 Tests de perfilado
+Desactivado, `traced` no abre nada ni escribe ficheros; activado, cada
+ejecución deja un speedscope válido (y un pstats en modo cprofile), también
+en tools/metrics-collector.py
+"""
+
+import asyncio
+import json
+import os
+import pstats
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from services import profiling
+from services.profiling import CPROFILE, SPANS, current_profile, profile_run, span, traced
+
+REPO_ROOT = Path(__file__).resolve().parents[3]
+
+@pytest.fixture
+def profiles(tmp_path, monkeypatch):
+    directory = tmp_path / 'profiles'
+    monkeypatch.setattr(profiling.settings, 'directory', directory)
+    monkeypatch.setattr(profiling.settings, 'default_mode', None)
+    return directory
+
+def _check_speedscope(path):
+    """Esquema evented: cada apertura se cierra en orden y dentro del rango del perfil"""
+    document = json.loads(path.read_text(encoding='utf-8'))
+    assert document['$schema'] == 'https://www.speedscope.app/file-format-schema.json'
+    frames = [frame['name'] for frame in document['shared']['frames']]
+    for profile in document['profiles']:
+        assert profile['type'] == 'evented' and profile['unit'] == 'milliseconds'
+        stack, last = [], profile['startValue']
+        for event in profile['events']:
+            assert last <= event['at'] <= profile['endValue']
+            last = event['at']
+            if event['type'] == 'O':
+                stack.append(event['frame'])
+            else:
+                assert stack.pop() == event['frame']
+        assert stack == []
+    return document, frames
+
+@traced('helper.work')
+def _work(value):
+    return value * 2
+
+@traced('helper.async_work')
+async def _async_work(value):
+    await asyncio.sleep(0)
+    return value + 1
+
+@traced('helper.stream')
+async def _stream(count):
+    for index in range(count):
+        yield index
+
+@traced('helper.fails')
+def _fails():
+    raise ValueError("fallo")
+
+@traced('helper.root', root=True)
+def _root():
+    return _work(3)
+
+def test_default_directory_is_data_profiles():
+    directory = profiling.ProfilerSettings().directory
+    assert directory.parts[-2:] == ('data', 'profiles')
+
+@pytest.mark.asyncio
+async def test_disabled_traced_is_a_no_op(profiles):
+    assert _work(2) == 4
+    assert await _async_work(2) == 3
+    assert [item async for item in _stream(3)] == [0, 1, 2]
+    assert _root() == 6
+    with pytest.raises(ValueError):
+        _fails()
+    with span('fuera') as block:
+        assert block.profile is None
+    with profile_run('sin.modo') as profile:
+        assert profile is None and current_profile() is None
+
+    assert _work.__name__ == '_work'
+    assert not profiles.exists()
+
+@pytest.mark.asyncio
+async def test_enabled_run_writes_speedscope_and_pstats(profiles):
+    async with profile_run('job.test', CPROFILE) as profile:
+        assert current_profile() is profile
+        _work(1)
+        await asyncio.gather(_async_work(1), _async_work(2))
+        [item async for item in _stream(2)]
+        with pytest.raises(ValueError):
+            _fails()
+    assert current_profile() is None
+
+    speedscope, stats = profile.files()
+    assert speedscope.exists() and stats.exists()
+    assert speedscope.parent == profiles
+
+    document, frames = _check_speedscope(speedscope)
+    assert document['name'] == 'job.test'
+    assert {'job.test', 'helper.work', 'helper.async_work', 'helper.stream', 'helper.fails'} <= set(frames)
+    # Las corrutinas del gather van a carriles propios
+    assert len(document['profiles']) >= 3
+
+    functions = {function for _, _, function in pstats.Stats(str(stats)).stats}
+    assert '_work' in functions
+
+def test_root_traced_opens_a_run_when_profiling_is_on(profiles, monkeypatch):
+    monkeypatch.setattr(profiling.settings, 'default_mode', SPANS)
+    assert _root() == 6
+
+    files = sorted(profiles.iterdir())
+    assert [path.name.endswith('-helper_root.speedscope.json') for path in files] == [True]
+    _, frames = _check_speedscope(files[0])
+    assert set(frames) == {'helper.root', 'helper.work'}
+
+def test_old_profiles_are_pruned(profiles, monkeypatch):
+    monkeypatch.setattr(profiling.settings, 'keep', 2)
+    for _ in range(4):
+        with profile_run('job.prune', SPANS):
+            _work(1)
+    assert len(list(profiles.iterdir())) == 2
+
+@pytest.fixture
+def collector_copy(tmp_path):
+    """Copia de tools/metrics-collector.py con su propio tablero (escribe en tmp_path/metrics)"""
+    (tmp_path / 'tools').mkdir()
+    (tmp_path / 'kanban').mkdir()
+    shutil.copy(REPO_ROOT / 'tools' / 'metrics-collector.py', tmp_path / 'tools')
+    shutil.copy(REPO_ROOT / 'kanban' / 'board.md', tmp_path / 'kanban')
+    return tmp_path
+
+def _collector(root, *args, profiling_env=None):
+    env = {key: value for key, value in os.environ.items() if key != 'PROFILING'}
+    if profiling_env:
+        env['PROFILING'] = profiling_env
+    return subprocess.run([sys.executable, str(root / 'tools' / 'metrics-collector.py'), *args],
+                          cwd=root, env=env, capture_output=True, text=True, encoding='utf-8', timeout=60)
+
+def test_metrics_collector_profiles_only_on_demand(collector_copy):
+    result = _collector(collector_copy, 'snapshot')
+    assert result.returncode == 0, result.stderr
+    assert (collector_copy / 'metrics' / 'data.json').exists()
+    assert not (collector_copy / 'metrics' / 'profiles').exists()
+
+    result = _collector(collector_copy, 'snapshot', '--profile=cprofile')
+    assert result.returncode == 0, result.stderr
+    written = sorted((collector_copy / 'metrics' / 'profiles').iterdir())
+    assert [path.suffix for path in written] == ['.pstats', '.json']
+    _, frames = _check_speedscope(written[1])
+    assert {'metrics snapshot', 'read_board', 'analyze_board', 'save_data'} <= set(frames)
+    pstats.Stats(str(written[0]))
+
+    result = _collector(collector_copy, 'snapshot', profiling_env='speedscope')
+    assert result.returncode == 0, result.stderr
+    assert len(list((collector_copy / 'metrics' / 'profiles').glob('*.speedscope.json'))) == 2
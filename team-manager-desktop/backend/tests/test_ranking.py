@@ -0,0 +1,83 @@
+"""
+🔢 Tests de claves de orden
+Vecinos parciales, crecimiento al añadir al final y migración de posiciones enteras
+"""
+
+from sqlalchemy import create_engine, select, text
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.schema import CreateTable
+
+from models.database import Base, Card
+from services.ranking import MAX_RANK_LENGTH, RankingService, migrate_legacy_positions, rank_between, spread_ranks
+
+def _column_order(session, column_id):
+    return session.execute(
+        select(Card.id).where(Card.column_id == column_id).order_by(Card.position, Card.id)
+    ).scalars().all()
+
+def test_append_keys_grow_slowly():
+    rank = spread_ranks(3)[-1]
+    keys = [rank]
+    for _ in range(200):
+        keys.append(rank_between(keys[-1], None))
+
+    assert keys == sorted(keys)
+    assert len(set(keys)) == len(keys)
+    assert len(keys[-1]) <= 5 < MAX_RANK_LENGTH
+
+def test_move_with_only_before_lands_next_to_it(session, org):
+    ranking = RankingService()
+    column_id = 'board-0-ready'
+    order = _column_order(session, column_id)
+    moved = _column_order(session, 'board-0-review')[0]
+
+    ranking.move_card(session, session.get(Card, moved), column_id, before_id=order[0])
+    session.commit()
+
+    assert _column_order(session, column_id) == [order[0], moved] + order[1:]
+
+def test_move_with_only_after_lands_next_to_it(session, org):
+    ranking = RankingService()
+    column_id = 'board-0-ready'
+    order = _column_order(session, column_id)
+    moved = _column_order(session, 'board-0-review')[0]
+
+    ranking.move_card(session, session.get(Card, moved), column_id, after_id=order[-1])
+    session.commit()
+
+    assert _column_order(session, column_id) == order[:-1] + [moved, order[-1]]
+
+def test_move_syncs_status_with_column(session, org):
+    card = session.get(Card, _column_order(session, 'board-0-review')[0])
+
+    RankingService().move_card(session, card, 'board-0-done')
+    session.commit()
+
+    assert card.status == 'done'
+
+def test_migrate_legacy_integer_positions():
+    engine = create_engine('sqlite://')
+    Base.metadata.create_all(engine)
+    cards = Card.__table__
+    with engine.begin() as connection:
+        # Esquema anterior: position INTEGER
+        ddl = str(CreateTable(cards).compile(connection)).replace('position VARCHAR', 'position INTEGER')
+        connection.execute(text('DROP TABLE cards'))
+        connection.execute(text(ddl))
+        for i in range(12):
+            connection.execute(text(
+                "INSERT INTO cards (id, title, card_type, priority, status, team_id, project_id, column_id, "
+                "position, change_version) VALUES (:id, 't', 'task', 'medium', 'ready', 'team', 'project', "
+                "'column', :position, 0)"
+            ), {'id': f'card-{i}', 'position': (i * 7) % 12})
+
+    session_factory = sessionmaker(bind=engine)
+    assert migrate_legacy_positions(session_factory) == 12
+    assert migrate_legacy_positions(session_factory) == 0
+
+    legacy_order = [f'card-{i}' for i in sorted(range(12), key=lambda i: (i * 7) % 12)]
+    with session_factory() as session:
+        assert _column_order(session, 'column') == legacy_order
+        positions = session.execute(select(Card.position)).scalars().all()
+        assert all(isinstance(position, str) for position in positions)
+        assert session.execute(text("SELECT count(*) FROM cards WHERE typeof(position) != 'text'")).scalar() == 0
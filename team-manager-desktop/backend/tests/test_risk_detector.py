@@ -0,0 +1,117 @@
+"""
+🚨 Tests del detector de riesgos
+Carga, cambios por el ORM y detect(): riesgos creados, actualizados y
+resueltos en la tabla risks, y el resultado incremental igual a una carga completa
+"""
+
+from datetime import datetime
+
+import pytest
+from sqlalchemy import select
+
+from models.database import Card, Column, Risk, TimeEntry, User
+from services.dependency_graph import DependencyGraphService
+from services.risk_detector import RiskDetector
+from services.sync import install_version_hooks
+
+@pytest.fixture
+def detector(session_factory, org):
+    install_version_hooks(session_factory)
+    graph = DependencyGraphService(session_factory)
+    graph.install_hooks(session_factory)
+    detector = RiskDetector(session_factory, graph)
+    detector.install_hooks(session_factory)
+    return detector
+
+def _open_risks(session):
+    session.expire_all()
+    return {risk.title: risk for risk in session.execute(select(Risk).where(Risk.status != 'resolved')).scalars()}
+
+def _wip_title(board, name):
+    return f'WIP superado en Tablero {board} / {name}'
+
+def _full_load(detector, session):
+    """Detector nuevo con una carga completa del estado actual"""
+    fresh = RiskDetector(detector.session_factory, detector.dependency_graph)
+    fresh.load(session)
+    fresh._evaluate(datetime.now())
+    return fresh
+
+def test_detect_creates_updates_and_resolves_risks(session, detector):
+    result = detector.detect(session)
+    risks = _open_risks(session)
+    assert result['risks_created'] == len(risks) > 0
+    assert set(risks) == {risk['title'] for risk in detector.active_risks()}
+    assert 'tiene 23 tarjetas' in risks[_wip_title(0, 'Ready')].description
+
+    # Mover una tarjeta cambia dos columnas
+    card = session.execute(
+        select(Card).where(Card.column_id == 'board-0-ready').order_by(Card.id)
+    ).scalars().first()
+    card.column_id, card.status = 'board-0-in_progress', 'in_progress'
+    session.commit()
+
+    result = detector.detect(session)
+    risks = _open_risks(session)
+    assert result['risks_created'] == 0 and result['risks_updated'] >= 2
+    assert 'tiene 22 tarjetas' in risks[_wip_title(0, 'Ready')].description
+    assert 'tiene 39 tarjetas' in risks[_wip_title(0, 'In Progress')].description
+
+    # Subir un límite resuelve; ponerlo donde no había lo crea
+    review = session.get(Column, 'board-0-review')
+    review.wip_limit = 50
+    backlog = session.get(Column, 'board-0-backlog')
+    backlog.wip_limit = 1
+    session.commit()
+
+    result = detector.detect(session)
+    assert (result['risks_created'], result['risks_resolved']) == (1, 1)
+    resolved = session.execute(select(Risk).where(Risk.title == _wip_title(0, 'Review'))).scalar_one()
+    assert resolved.status == 'resolved' and resolved.resolved_at is not None
+    assert _wip_title(0, 'Backlog') in _open_risks(session)
+
+    # Sin cambios no se escribe nada
+    assert detector.detect(session) == {'evaluated': 0, 'risks_created': 0, 'risks_updated': 0,
+                                        'risks_resolved': 0}
+
+def test_user_changes_reach_the_detector_through_hooks(session, detector):
+    detector.detect(session)
+    title = 'Sobrecarga de Usuario 3'
+    assert title in _open_risks(session)
+
+    session.get(User, 'user-3').capacity = 100
+    session.commit()
+
+    result = detector.detect(session)
+    assert result['risks_resolved'] == 1
+    assert title not in _open_risks(session)
+
+def test_incremental_matches_a_full_load(session, detector):
+    detector.detect(session)
+
+    cards = session.execute(
+        select(Card).where(Card.id.notin_(select(TimeEntry.card_id))).order_by(Card.id)
+    ).scalars().all()
+    # Una transacción por cambio: varias versiones entre pasadas
+    for index, card in enumerate(cards[:40]):
+        target = ('done', 'blocked', 'review', 'backlog')[index % 4]
+        card.column_id, card.status = f'{card.team_id.replace("team", "board")}-{target}', target
+        card.estimated_hours = (card.estimated_hours or 0) + index
+        if index % 5 == 0:
+            card.assigned_to = 'user-0'
+        session.commit()
+        if index % 10 == 9:
+            detector.detect(session)
+    for card in cards[40:45]:
+        session.delete(card)
+    session.get(User, 'user-7').capacity = 60
+    session.get(Column, 'board-1-ready').wip_limit = 100
+    session.commit()
+    detector.detect(session)
+
+    assert detector.status()['reloads'] == 0
+    fresh = _full_load(detector, session)
+    assert detector.active_risks() == fresh.active_risks()
+    assert (dict(detector.column_cards), dict(detector.user_hours), dict(detector.project_done)) == \
+        (dict(fresh.column_cards), dict(fresh.user_hours), dict(fresh.project_done))
+    assert set(_open_risks(session)) == {risk['title'] for risk in fresh.active_risks()}
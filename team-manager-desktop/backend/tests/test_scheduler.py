@@ -0,0 +1,85 @@
+"""
+⏰ Tests del planificador
+Una tarea en un hilo sigue en marcha tras su tiempo límite hasta que el hilo
+termina; las cpu_bound van al pool propio del planificador
+"""
+
+import asyncio
+import threading
+
+import pytest
+
+from services.scheduler import JobScheduler
+
+@pytest.fixture
+def scheduler(tmp_path):
+    return JobScheduler(tmp_path / 'scheduler_state.json', max_workers=1)
+
+async def _run_once(scheduler, job):
+    job.running = True
+    job.task = asyncio.create_task(scheduler._execute(job))
+    return job.task
+
+@pytest.mark.asyncio
+async def test_thread_job_stays_running_after_timeout(scheduler):
+    release = threading.Event()
+    finished = threading.Event()
+
+    def slow():
+        release.wait(5)
+        finished.set()
+
+    job = scheduler.add_job('slow', slow, 60, cpu_bound=True, timeout=0.05)
+    task = await _run_once(scheduler, job)
+
+    await asyncio.sleep(0.2)
+    assert not task.done()
+    assert job.running
+    assert not scheduler.trigger('slow')
+    assert job.skipped == 1
+
+    release.set()
+    await task
+    assert finished.is_set()
+    assert not job.running
+    assert job.failures == 1 and 'Sin terminar' in job.last_error
+    assert job.last_duration_ms >= 200
+    await scheduler.stop()
+
+@pytest.mark.asyncio
+async def test_coroutine_job_is_cancelled_on_timeout(scheduler):
+    cancelled = asyncio.Event()
+
+    async def hangs():
+        try:
+            await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    job = scheduler.add_job('hangs', hangs, 60, timeout=0.05)
+    await asyncio.wait_for(await _run_once(scheduler, job), timeout=1)
+
+    assert cancelled.is_set()
+    assert not job.running
+    assert job.failures == 1 and 'Sin terminar' in job.last_error
+    await scheduler.stop()
+
+@pytest.mark.asyncio
+async def test_cpu_bound_jobs_use_the_scheduler_pool(scheduler):
+    threads = {}
+
+    def record(name):
+        return lambda: threads.__setitem__(name, threading.current_thread().name)
+
+    heavy = scheduler.add_job('heavy', record('heavy'), 60, cpu_bound=True)
+    light = scheduler.add_job('light', record('light'), 60)
+    failing = scheduler.add_job('failing', lambda: 1 / 0, 60, cpu_bound=True)
+    for job in (heavy, light, failing):
+        await asyncio.wait_for(await _run_once(scheduler, job), timeout=5)
+
+    assert threads['heavy'].startswith('scheduler')
+    assert not threads['light'].startswith('scheduler')
+    assert (heavy.runs, heavy.failures, heavy.last_error) == (1, 0, None)
+    assert failing.failures == 1 and failing.last_error == 'division by zero'
+    await scheduler.stop()
@@ -0,0 +1,92 @@
+"""
+🔄 Tests de la sincronización delta
+Cursores y límites con muchas filas por versión, tombstones y migración de
+bases de datos anteriores al versionado
+"""
+
+import pytest
+from sqlalchemy import inspect, select, text
+
+from models.database import Team, Card, TimeEntry, SyncTombstone
+from services.sync import SyncService, install_version_hooks, migrate_sync_state
+
+@pytest.fixture
+def versioned(session_factory, org):
+    install_version_hooks(session_factory)
+    return session_factory
+
+def _commit_titles(session_factory, card_ids, title):
+    """Un único flush: todas las filas comparten versión"""
+    with session_factory() as session:
+        for card in session.scalars(select(Card).where(Card.id.in_(card_ids))):
+            card.title = title
+        session.commit()
+
+def _card_ids(session, count):
+    """Tarjetas sin horas registradas (se pueden eliminar por el ORM)"""
+    return session.execute(
+        select(Card.id).where(Card.id.notin_(select(TimeEntry.card_id))).order_by(Card.id).limit(count)
+    ).scalars().all()
+
+def test_initial_sync_returns_the_whole_version_even_over_the_limit(session, org):
+    result = SyncService().changes_since(session, since=0, limit=10)
+
+    assert result['cursor'] == 1
+    assert result['has_more'] is False
+    assert len(result['changes']['cards']) == 600
+    assert len(result['changes']['teams']) == 3
+
+def test_pages_end_on_whole_versions(versioned):
+    sync = SyncService()
+    with versioned() as session:
+        first, second, third = _card_ids(session, 6)[:3], _card_ids(session, 6)[3:5], _card_ids(session, 6)[5:]
+    _commit_titles(versioned, first, 'v2')
+    _commit_titles(versioned, second, 'v3')
+    with versioned() as session:
+        session.delete(session.get(Card, third[0]))
+        session.commit()
+
+    with versioned() as session:
+        # v2 (3 filas) cabe; v3 (2 filas) ya no
+        page = sync.changes_since(session, since=1, limit=4)
+        assert (page['cursor'], page['has_more']) == (2, True)
+        assert sorted(row['id'] for row in page['changes']['cards']) == sorted(first)
+        assert page['deleted'] == []
+
+        page = sync.changes_since(session, since=page['cursor'], limit=4)
+        assert (page['cursor'], page['has_more']) == (4, False)
+        assert [row['change_version'] for row in page['changes']['cards']] == [3, 3]
+        assert page['deleted'] == [{'entity': 'cards', 'id': third[0], 'version': 4}]
+
+        assert sync.changes_since(session, since=4) == {'cursor': 4, 'has_more': False, 'changes': {}, 'deleted': []}
+
+def test_purged_tombstones_are_no_longer_returned(versioned):
+    sync = SyncService()
+    with versioned() as session:
+        card_id = _card_ids(session, 1)[0]
+        session.delete(session.get(Card, card_id))
+        session.commit()
+
+        assert sync.purge_tombstones(session, older_than_version=2) == 1
+        assert session.query(SyncTombstone).count() == 0
+        assert sync.changes_since(session, since=1)['deleted'] == []
+
+def test_migration_adds_and_backfills_change_version(engine, session_factory, org):
+    with engine.begin() as connection:
+        connection.execute(text("DROP INDEX ix_teams_change_version"))
+        connection.execute(text("ALTER TABLE teams DROP COLUMN change_version"))
+        connection.execute(text("UPDATE cards SET change_version = 0 WHERE id IN "
+                                "(SELECT id FROM cards ORDER BY id LIMIT 5)"))
+        connection.execute(text("DROP TABLE sync_tombstones"))
+
+    assert migrate_sync_state(session_factory) == 3 + 5
+    assert migrate_sync_state(session_factory) == 0
+
+    inspector = inspect(engine)
+    assert 'ix_teams_change_version' in {index['name'] for index in inspector.get_indexes('teams')}
+    assert inspector.has_table('sync_tombstones')
+    with session_factory() as session:
+        result = SyncService().changes_since(session, since=1)
+        assert result['cursor'] == 2
+        assert {row['id'] for row in result['changes']['teams']} == set(session.scalars(select(Team.id)))
+        assert len(result['changes']['cards']) == 5
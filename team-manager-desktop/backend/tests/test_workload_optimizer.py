@@ -0,0 +1,56 @@
+"""
+⚖️ Tests del optimizador de carga
+Ningún receptor acaba por encima de su límite y los miembros sobrecargados
+nunca aumentan
+"""
+
+from collections import defaultdict
+
+import pytest
+
+from benchmarks.bench_workload_optimizer import synthetic_snapshot
+from services.workload_optimizer import WorkloadOptimizer
+
+pytest.importorskip('scipy')
+
+def _loads(optimizer, snapshot, reassignments):
+    """Carga por (usuario, equipo) antes y después de aplicar las reasignaciones"""
+    hours = {card.id: optimizer._card_hours(card) for card in snapshot['cards']}
+    before = defaultdict(float)
+    for card in snapshot['cards']:
+        before[(card.assigned_to, card.team_id)] += hours[card.id]
+    after = before.copy()
+    for move in reassignments:
+        after[(move['from_user'], move['team_id'])] -= hours[move['card_id']]
+        after[(move['to_user'], move['team_id'])] += hours[move['card_id']]
+    return before, after
+
+@pytest.mark.parametrize('cards, seed', [(1700, 3), (1700, 11), (4000, 5), (10000, 3)])
+def test_receivers_stay_within_their_limit(cards, seed):
+    optimizer = WorkloadOptimizer()
+    snapshot = synthetic_snapshot(users=200, cards=cards, teams=20, seed=seed)
+    result = optimizer.solve(snapshot)
+
+    capacity = {(item['user_id'], item['team_id']): item['value'] for item in result['capacity']}
+    limit = {member: value * optimizer.max_utilization for member, value in capacity.items()}
+    before, after = _loads(optimizer, snapshot, result['reassignments'])
+
+    receivers = {(move['to_user'], move['team_id']) for move in result['reassignments']}
+    for member in receivers:
+        assert after[member] <= limit[member] + 1e-6, member
+
+    overloaded_before = sum(1 for member in limit if before[member] > limit[member] + 1e-6)
+    overloaded_after = sum(1 for member in limit if after[member] > limit[member] + 1e-6)
+    assert overloaded_after <= overloaded_before
+    assert len(result['unresolved']) == overloaded_after
+
+def test_spare_capacity_scenario_reduces_overload():
+    optimizer = WorkloadOptimizer()
+    result = optimizer.solve(synthetic_snapshot(users=200, cards=700, teams=20))
+
+    overloaded = [
+        sum(1 for item in result[key] if item['value'] > optimizer.max_utilization)
+        for key in ('utilization_before', 'utilization_after')
+    ]
+    assert result['reassignments']
+    assert overloaded[1] < overloaded[0]
@@ -0,0 +1,140 @@
+"""
+📈 Tests de agregados de carga
+Valores por ámbito, semanas de lunes a domingo calculadas en SQLite y
+reducción de datos antiguos sin cambiar los totales
+"""
+
+from datetime import date, datetime, timedelta
+
+import pytest
+from sqlalchemy import delete, func, select
+
+from models.database import Card, TimeEntry, WorkloadData, WorkloadRollup
+from services.workload_rollups import WorkloadRollupService, period_start, _period_expression
+
+@pytest.fixture
+def cards(session, org):
+    """Dos tarjetas de proyectos distintos del mismo equipo, sin registros previos"""
+    session.execute(delete(TimeEntry))
+    session.execute(delete(WorkloadData))
+    session.commit()
+    first = session.execute(select(Card).where(Card.team_id == 'team-0').order_by(Card.id)).scalars().first()
+    second = session.execute(
+        select(Card).where(Card.team_id == 'team-0', Card.project_id != first.project_id).order_by(Card.id)
+    ).scalars().first()
+    return first, second
+
+def _entries(session, rows):
+    for index, (card, user_id, when, hours) in enumerate(rows):
+        session.add(TimeEntry(id=f'entry-{index}', card_id=card.id, user_id=user_id, date=when, hours=hours))
+    session.commit()
+
+def _rollups(session, granularity, scope_type):
+    return {
+        (rollup.scope_id, rollup.period_start.date()): rollup
+        for rollup in session.execute(select(WorkloadRollup).where(
+            WorkloadRollup.granularity == granularity, WorkloadRollup.scope_type == scope_type
+        )).scalars()
+    }
+
+def test_week_expression_matches_monday_start(session):
+    # 2024-01-01 es lunes; dos semanas completas más los bordes, con horas distintas
+    days = [datetime(2023, 12, 31, 23, 30) + timedelta(days=offset, hours=offset) for offset in range(16)]
+    for value in days:
+        expected = period_start(value.date(), 'week').isoformat()
+        assert session.execute(select(_period_expression(func.datetime(value), 'week'))).scalar() == expected
+
+    assert period_start(date(2024, 1, 7), 'week') == date(2024, 1, 1)
+    assert period_start(date(2024, 1, 8), 'week') == date(2024, 1, 8)
+    assert period_start(date(2024, 2, 29), 'month') == date(2024, 2, 1)
+
+def test_rollup_values_per_scope(session, session_factory, cards):
+    first, second = cards
+    _entries(session, [
+        (first, 'user-0', datetime(2024, 1, 7, 18), 2.0),    # domingo: semana del 1
+        (first, 'user-0', datetime(2024, 1, 8, 9), 3.0),     # lunes: semana del 8
+        (second, 'user-0', datetime(2024, 1, 8, 15), 1.5),
+        (second, 'user-3', datetime(2024, 1, 31, 10), 4.0),  # último día del mes
+    ])
+    session.add_all([
+        WorkloadData(id='load-0', user_id='user-0', team_id='team-0', date=datetime(2024, 1, 8),
+                     planned_hours=6.0, actual_hours=4.5, capacity=8.0, overloaded=False),
+        WorkloadData(id='load-1', user_id='user-0', team_id='team-0', date=datetime(2024, 1, 9),
+                     planned_hours=9.0, actual_hours=10.0, capacity=8.0, overloaded=True),
+    ])
+    session.commit()
+
+    service = WorkloadRollupService(session_factory)
+    service.refresh(session, date(2024, 1, 1), date(2024, 1, 31), respect_frozen=False)
+
+    daily = _rollups(session, 'day', 'user')
+    assert daily[('user-0', date(2024, 1, 8))].hours_logged == 4.5
+    assert daily[('user-0', date(2024, 1, 8))].entries == 2
+    assert daily[('user-0', date(2024, 1, 9))].hours_logged == 0.0
+    assert daily[('user-0', date(2024, 1, 9))].utilization == 1.25
+
+    weekly = _rollups(session, 'week', 'user')
+    assert sorted(weekly) == [('user-0', date(2024, 1, 1)), ('user-0', date(2024, 1, 8)), ('user-3', date(2024, 1, 29))]
+    assert weekly[('user-0', date(2024, 1, 1))].hours_logged == 2.0
+    week = weekly[('user-0', date(2024, 1, 8))]
+    assert (week.hours_logged, week.entries) == (4.5, 2)
+    assert (week.planned_hours, week.actual_hours, week.capacity) == (15.0, 14.5, 16.0)
+    assert week.utilization == round(14.5 / 16.0, 4)
+    assert week.overloaded_days == 1
+
+    monthly_team = _rollups(session, 'month', 'team')[('team-0', date(2024, 1, 1))]
+    assert (monthly_team.hours_logged, monthly_team.entries, monthly_team.capacity) == (10.5, 4, 16.0)
+
+    projects = _rollups(session, 'month', 'project')
+    assert projects[(first.project_id, date(2024, 1, 1))].hours_logged == 5.0
+    assert projects[(second.project_id, date(2024, 1, 1))].hours_logged == 5.5
+    # La planificación no existe por proyecto
+    assert projects[(first.project_id, date(2024, 1, 1))].capacity == 0.0
+
+def test_downsample_keeps_totals(session, session_factory, cards):
+    first, second = cards
+    old = datetime.combine(date.today() - timedelta(days=400), datetime.min.time())
+    recent = datetime.combine(date.today() - timedelta(days=3), datetime.min.time())
+    rows = []
+    for day in range(10):
+        for hour in (9, 12, 16):
+            rows.append((first, 'user-0', old + timedelta(days=day, hours=hour), 1.25))
+        rows.append((second, 'user-3', old + timedelta(days=day, hours=11), 0.5))
+    rows += [(first, 'user-0', recent + timedelta(hours=9), 2.0), (first, 'user-0', recent + timedelta(hours=14), 1.0)]
+    _entries(session, rows)
+    session.add_all([
+        WorkloadData(id=f'load-{day}', user_id='user-0', team_id='team-0', date=old + timedelta(days=day),
+                     planned_hours=5.0, actual_hours=3.75, capacity=8.0, overloaded=False)
+        for day in range(10)
+    ])
+    session.commit()
+
+    service = WorkloadRollupService(session_factory, raw_retention_days=180, daily_retention_days=730)
+    service.catch_up()
+    before = {granularity: {key: (rollup.hours_logged, rollup.entries, rollup.capacity)
+                            for key, rollup in _rollups(session, granularity, 'team').items()}
+              for granularity in ('day', 'week', 'month')}
+    total_hours = session.execute(select(func.sum(TimeEntry.hours))).scalar()
+
+    stats = service.downsample()
+    session.expire_all()
+
+    assert stats['time_entries_compacted'] == 20
+    assert stats['workload_deleted'] == 10
+    assert stats['daily_rollups_deleted'] == 0
+    assert session.execute(select(func.sum(TimeEntry.hours))).scalar() == total_hours
+    # Los registros recientes no se compactan
+    assert session.execute(select(func.count()).where(TimeEntry.date >= recent)).scalar() == 2
+
+    # Los periodos reducidos no se recalculan con los datos que quedan
+    service.refresh(session, old.date(), date.today())
+    for granularity in ('day', 'week', 'month'):
+        after = {key: (rollup.hours_logged, rollup.entries, rollup.capacity)
+                 for key, rollup in _rollups(session, granularity, 'team').items()}
+        assert after == before[granularity]
+
+    # Compactar conserva las horas de cada día: recalcular desde los registros da lo mismo
+    service.refresh(session, old.date(), date.today(), respect_frozen=False)
+    for granularity in ('day', 'week', 'month'):
+        hours = {key: rollup.hours_logged for key, rollup in _rollups(session, granularity, 'team').items()}
+        assert hours == {key: values[0] for key, values in before[granularity].items()}
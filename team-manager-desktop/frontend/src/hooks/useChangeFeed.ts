@@ -0,0 +1,66 @@
+import { useEffect } from 'react'
+
+import { useAppStore } from '../store/appStore'
+import { API_BASE_URL } from '../services/analysisStream'
+import { ChangeEvent, ChangeFeedMessage } from '../types'
+
+interface ChangeFeedFilters {
+  teams?: string[]
+  boards?: string[]
+}
+
+const RECONNECT_DELAY = 5000
+
+// El backend publica en snake_case
+const toChangeEvent = (raw: any): ChangeEvent => ({
+  entity: raw.entity,
+  op: raw.op,
+  id: raw.id,
+  boardId: raw.board_id ?? undefined,
+  teams: raw.teams ?? [],
+  changes: raw.changes ?? {},
+})
+
+// Suscripción a los diffs en tiempo real del backend (reemplaza el polling)
+export const useChangeFeed = (filters: ChangeFeedFilters = {}) => {
+  const applyChanges = useAppStore(state => state.applyChanges)
+  const initializeApp = useAppStore(state => state.initializeApp)
+
+  const teamsKey = (filters.teams ?? []).join(',')
+  const boardsKey = (filters.boards ?? []).join(',')
+
+  useEffect(() => {
+    let socket: WebSocket | null = null
+    let reconnectTimer: ReturnType<typeof setTimeout> | undefined
+    let closed = false
+
+    const connect = () => {
+      const params = new URLSearchParams({ teams: teamsKey, boards: boardsKey })
+      socket = new WebSocket(`${API_BASE_URL.replace(/^http/, 'ws')}/api/events/ws?${params}`)
+
+      socket.onmessage = (event) => {
+        const message: ChangeFeedMessage = JSON.parse(event.data)
+        if (message.type === 'changes' && message.changes) {
+          applyChanges(message.changes.map(toChangeEvent))
+        } else if (message.type === 'resync') {
+          // Demasiados cambios pendientes: recargar todo
+          initializeApp()
+        }
+      }
+
+      socket.onclose = () => {
+        if (!closed) {
+          reconnectTimer = setTimeout(connect, RECONNECT_DELAY)
+        }
+      }
+    }
+
+    connect()
+
+    return () => {
+      closed = true
+      clearTimeout(reconnectTimer)
+      socket?.close()
+    }
+  }, [teamsKey, boardsKey, applyChanges, initializeApp])
+}
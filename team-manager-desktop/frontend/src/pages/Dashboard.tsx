@@ -13,6 +13,7 @@ import {
 } from 'lucide-react'
 
 import { useAppStore } from '../store/appStore'
+import { useChangeFeed } from '../hooks/useChangeFeed'
 import DashboardCard from '../components/dashboard/DashboardCard'
 import TeamOverview from '../components/dashboard/TeamOverview'
 import ProjectStatus from '../components/dashboard/ProjectStatus'
@@ -30,6 +31,7 @@ const Dashboard: React.FC = () => {
     workloadData,
     loading,
     requestGlobalAnalysis,
+    streamGlobalAnalysis,
     getActiveProjects,
     getOverloadedUsers,
     getCriticalRisks,
@@ -43,18 +45,17 @@ const Dashboard: React.FC = () => {
     const loadDashboardData = async () => {
       setRefreshing(true)
       try {
-        await requestGlobalAnalysis()
+        await streamGlobalAnalysis()
       } finally {
         setRefreshing(false)
       }
     }
 
     loadDashboardData()
-    
-    // Refresh automático cada 5 minutos
-    const interval = setInterval(loadDashboardData, 5 * 60 * 1000)
-    return () => clearInterval(interval)
-  }, [requestGlobalAnalysis])
+  }, [streamGlobalAnalysis])
+
+  // Cambios de tableros, insights y riesgos en tiempo real
+  useChangeFeed()
 
   // Calcular métricas principales
   const activeProjects = getActiveProjects()
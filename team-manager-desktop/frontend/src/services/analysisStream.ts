@@ -0,0 +1,71 @@
+// 📡 Cliente SSE para el análisis del Director IA en streaming
+
+import { AIInsight, Risk } from '../types'
+
+export const API_BASE_URL = process.env.REACT_APP_API_URL || 'http://127.0.0.1:8001'
+
+export interface AnalysisStreamHandlers {
+  onAnalysis?: (analysis: string) => void
+  onInsight?: (insight: AIInsight) => void
+  onRisk?: (risk: Risk) => void
+  onRecommendation?: (recommendation: string) => void
+  onComplete?: (result: any) => void
+  onError?: (error: Event) => void
+}
+
+const streamId = (prefix: string) =>
+  `${prefix}-${Date.now()}-${Math.random().toString(36).slice(2, 8)}`
+
+// El LLM devuelve snake_case sin IDs; adaptar a los tipos del frontend
+export const toInsight = (raw: any): AIInsight => ({
+  id: raw.id ?? streamId('insight'),
+  type: raw.type,
+  title: raw.title,
+  description: raw.description,
+  severity: raw.severity,
+  confidence: raw.confidence ?? 0,
+  recommendations: raw.recommendations ?? [],
+  affectedEntities: {
+    teams: raw.affected_teams ?? [],
+    projects: raw.affected_projects ?? [],
+    users: raw.affected_users ?? [],
+  },
+  createdAt: new Date().toISOString(),
+  acknowledged: false,
+})
+
+export const toRisk = (raw: any): Risk => ({
+  id: raw.id ?? streamId('risk'),
+  title: raw.title,
+  description: raw.description,
+  severity: raw.severity,
+  probability: raw.probability ?? 0,
+  impact: raw.impact ?? 0,
+  category: raw.category,
+  affectedTeams: raw.affected_teams ?? [],
+  affectedProjects: raw.affected_projects ?? [],
+  mitigation: raw.mitigation,
+  status: 'open',
+  detectedAt: new Date().toISOString(),
+})
+
+// Abre el stream y devuelve una función para cerrarlo
+export const streamGlobalAnalysis = (handlers: AnalysisStreamHandlers): (() => void) => {
+  const source = new EventSource(`${API_BASE_URL}/api/ai/analyze/stream`)
+  const parse = (event: MessageEvent) => JSON.parse(event.data).data
+
+  source.addEventListener('analysis', (event) => handlers.onAnalysis?.(parse(event as MessageEvent)))
+  source.addEventListener('insight', (event) => handlers.onInsight?.(toInsight(parse(event as MessageEvent))))
+  source.addEventListener('risk', (event) => handlers.onRisk?.(toRisk(parse(event as MessageEvent))))
+  source.addEventListener('recommendation', (event) => handlers.onRecommendation?.(parse(event as MessageEvent)))
+  source.addEventListener('complete', (event) => {
+    source.close()
+    handlers.onComplete?.(parse(event as MessageEvent))
+  })
+  source.onerror = (error) => {
+    source.close()
+    handlers.onError?.(error)
+  }
+
+  return () => source.close()
+}
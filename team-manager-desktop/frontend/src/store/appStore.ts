@@ -10,9 +10,12 @@ import {
   AppConfig,
   AIInsight,
   Risk,
-  WorkloadData 
+  WorkloadData,
+  Card,
+  ChangeEvent
 } from '../types'
 import { apiService } from '../services/api'
+import { streamGlobalAnalysis, toInsight, toRisk } from '../services/analysisStream'
 
 interface AppStore extends AppState {
   // Estado de configuración
@@ -71,9 +74,11 @@ interface AppStore extends AppState {
   setInsights: (insights: AIInsight[]) => void
   setRisks: (risks: Risk[]) => void
   setWorkloadData: (data: WorkloadData[]) => void
+  applyChanges: (changes: ChangeEvent[]) => void
   
   // Actions - Análisis IA
   requestGlobalAnalysis: () => Promise<void>
+  streamGlobalAnalysis: () => Promise<void>
   requestRiskDetection: () => Promise<void>
   requestFlowOptimization: () => Promise<void>
   
@@ -86,6 +91,61 @@ interface AppStore extends AppState {
   getCriticalRisks: () => Risk[]
 }
 
+// Campos de tarjeta publicados por el backend (snake_case) → Card
+const CARD_FIELD_MAP: Record<string, keyof Card> = {
+  title: 'title',
+  status: 'status',
+  priority: 'priority',
+  assigned_to: 'assignedTo',
+  position: 'position',
+  blocked_reason: 'blockedReason',
+  estimated_hours: 'estimatedHours',
+}
+
+const applyBoardChange = (boards: Board[], change: ChangeEvent): Board[] => {
+  if (change.entity === 'column') {
+    return boards.map(board => board.id !== change.boardId ? board : {
+      ...board,
+      columns: board.columns.map(column => (column.id !== change.id ? column : {
+        ...column,
+        name: change.changes.name ?? column.name,
+        position: change.changes.position ?? column.position,
+        wipLimit: 'wip_limit' in change.changes ? change.changes.wip_limit : column.wipLimit,
+      })).sort((a, b) => (a.position < b.position ? -1 : a.position > b.position ? 1 : 0)),
+    })
+  }
+
+  // Tarjetas: quitar de su columna actual y volver a insertar en la de destino
+  return boards.map(board => {
+    const existing = board.columns.flatMap(column => column.cards).find(card => card.id === change.id)
+    if (!existing && board.id !== change.boardId) return board
+
+    const updates: Partial<Card> = {}
+    Object.entries(CARD_FIELD_MAP).forEach(([field, key]) => {
+      if (field in change.changes) (updates as any)[key] = change.changes[field]
+    })
+
+    const currentColumnId = board.columns.find(column => column.cards.some(card => card.id === change.id))?.id
+    const targetColumnId = change.changes.column_id ?? currentColumnId
+    const card = existing ? { ...existing, ...updates } : ({ id: change.id, ...updates } as Card)
+
+    return {
+      ...board,
+      columns: board.columns.map(column => {
+        const cards = column.cards.filter(c => c.id !== change.id)
+        if (change.op !== 'delete' && column.id === targetColumnId) {
+          // Las claves de orden se comparan como cadenas
+          const index = card.position === undefined
+            ? -1
+            : cards.findIndex(c => c.position !== undefined && c.position > card.position!)
+          cards.splice(index === -1 ? cards.length : index, 0, card)
+        }
+        return { ...column, cards }
+      }),
+    }
+  })
+}
+
 const defaultConfig: AppConfig = {
   theme: 'system',
   language: 'es',
@@ -224,6 +284,30 @@ export const useAppStore = create<AppStore>()(
       setRisks: (risks) => set({ risks }),
       setWorkloadData: (data) => set({ workloadData: data }),
       
+      // Diffs del feed de cambios (WebSocket)
+      applyChanges: (changes) => set((state) => {
+        let { boards, insights, risks } = state
+        
+        changes.forEach(change => {
+          switch (change.entity) {
+            case 'card':
+            case 'column':
+              boards = applyBoardChange(boards, change)
+              break
+            case 'insight':
+              insights = [toInsight({ id: change.id, type: change.changes.insight_type, ...change.changes }), ...insights]
+              break
+            case 'risk':
+              risks = change.op === 'create'
+                ? [toRisk({ id: change.id, ...change.changes }), ...risks]
+                : risks.map(risk => risk.id !== change.id ? risk : { ...risk, ...change.changes })
+              break
+          }
+        })
+        
+        return { boards, insights, risks }
+      }),
+      
       // Análisis IA
       requestGlobalAnalysis: async () => {
         try {
@@ -237,6 +321,29 @@ export const useAppStore = create<AppStore>()(
         }
       },
       
+      // Insights y riesgos aparecen según el Director IA los genera
+      streamGlobalAnalysis: () => new Promise<void>((resolve) => {
+        const streamedInsights: AIInsight[] = []
+        const streamedRisks: Risk[] = []
+        
+        streamGlobalAnalysis({
+          onInsight: (insight) => {
+            streamedInsights.push(insight)
+            set({ insights: [...streamedInsights] })
+          },
+          onRisk: (risk) => {
+            streamedRisks.push(risk)
+            set({ risks: [...streamedRisks] })
+          },
+          onComplete: () => resolve(),
+          onError: async (error) => {
+            console.error('Error in streamed analysis, falling back:', error)
+            await get().requestGlobalAnalysis()
+            resolve()
+          },
+        })
+      }),
+      
       requestRiskDetection: async () => {
         try {
           const risks = await apiService.detectRisks()
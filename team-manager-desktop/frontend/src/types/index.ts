@@ -61,6 +61,7 @@ export interface Card {
   projectId: string
   teamId: string
   assignedTo?: string
+  position?: string // Clave de orden lexicográfica
   estimatedHours?: number
   actualHours?: number
   storyPoints?: number
@@ -90,7 +91,7 @@ export interface Column {
   id: string
   name: string
   type: ColumnType
-  position: number
+  position: string // Clave de orden lexicográfica
   wipLimit?: number
   cards: Card[]
 }
@@ -285,6 +286,23 @@ export interface PaginatedResponse<T> extends APIResponse<T[]> {
   }
 }
 
+// Tipos para el feed de cambios en tiempo real
+export type ChangeEntity = 'card' | 'column' | 'insight' | 'risk'
+
+export interface ChangeEvent {
+  entity: ChangeEntity
+  op: 'create' | 'update' | 'delete'
+  id: string
+  boardId?: string
+  teams: string[]
+  changes: Record<string, any>
+}
+
+export interface ChangeFeedMessage {
+  type: 'changes' | 'resync'
+  changes?: ChangeEvent[]
+}
+
 // Tipos para el store global
 export interface AppState {
   user: User | null
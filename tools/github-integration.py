@@ -11,10 +11,12 @@ import datetime
 from pathlib import Path
 
 class GitHubIntegration:
-    def __init__(self, token=None, repo=None, project_id=None):
+    def __init__(self, token=None, repo=None, project_id=None, api_url=None):
         self.token = token or os.getenv('GITHUB_TOKEN')
         self.repo = repo or os.getenv('GITHUB_REPO')  # formato: "owner/repo"
         self.project_id = project_id or os.getenv('GITHUB_PROJECT_ID')
+        # GitHub Enterprise o un servidor de pruebas (benchmarks)
+        self.api_url = (api_url or os.getenv('GITHUB_API_URL') or 'https://api.github.com').rstrip('/')
         
         self.base_path = Path(__file__).parent.parent
         self.config_file = self.base_path / "tools" / "github-config.json"
@@ -71,7 +73,7 @@ class GitHubIntegration:
             return False
         
         try:
-            url = f"https://api.github.com/repos/{self.repo}"
+            url = f"{self.api_url}/repos/{self.repo}"
             response = requests.get(url, headers=self.headers)
             
             if response.status_code == 200:
@@ -109,7 +111,7 @@ class GitHubIntegration:
         }
         
         try:
-            url = f"https://api.github.com/repos/{self.repo}/issues"
+            url = f"{self.api_url}/repos/{self.repo}/issues"
             response = requests.post(url, headers=self.headers, json=issue_data)
             
             if response.status_code == 201:
@@ -260,7 +262,7 @@ class GitHubIntegration:
         }
         
         try:
-            url = f"https://api.github.com/repos/{self.repo}/issues"
+            url = f"{self.api_url}/repos/{self.repo}/issues"
             response = requests.post(url, headers=self.headers, json=issue_data)
             
             if response.status_code == 201:
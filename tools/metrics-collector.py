@@ -8,15 +8,117 @@ import os
 import json
 import datetime
 import re
+import time
+import cProfile
+from contextlib import contextmanager, nullcontext
 from pathlib import Path
 from collections import defaultdict
 
+# Modos de perfilado aceptados en PROFILING y en --profile
+PROFILE_MODES = {"1": "speedscope", "true": "speedscope", "spans": "speedscope",
+                 "speedscope": "speedscope", "cprofile": "cprofile", "pstats": "cprofile"}
+
+# Columnas con trabajo empezado (inicio del tiempo de ciclo) y columnas del WIP
+STARTED_COLUMNS = ("in_progress", "review", "blocked")
+WIP_COLUMNS = ("ready", "in_progress", "review", "blocked")
+
+def percentiles(values):
+    """p50/p85/p95 por rango más cercano (None sin datos)"""
+    ordered = sorted(values)
+    count = len(ordered)
+    return {f"p{p}": round(ordered[-(-p * count // 100) - 1], 2) if count else None for p in (50, 85, 95)}
+
+def days_between(start, end):
+    """Días (con decimales) entre dos marcas ISO"""
+    delta = datetime.datetime.fromisoformat(end) - datetime.datetime.fromisoformat(start)
+    return round(delta.total_seconds() / 86400, 2)
+
+class CommandProfiler:
+    """
+    Perfilado opcional de un comando: spans de tiempo por fase (lectura del
+    tablero, análisis, cálculo, guardado) volcados a metrics/profiles en
+    formato speedscope y, en modo cprofile, también en .pstats.
+    Desactivado, cada span es un nullcontext.
+    """
+
+    def __init__(self, command, mode, directory):
+        self.command = command
+        self.mode = mode
+        self.directory = directory
+        self.spans = []
+        self.started = time.perf_counter()
+        self.ended = None
+        self._profiler = cProfile.Profile() if mode == "cprofile" else None
+        self.stem = f"{datetime.datetime.now().strftime('%Y%m%d-%H%M%S-%f')}-metrics-{command}"
+
+    @contextmanager
+    def span(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.spans.append((name, start, time.perf_counter()))
+
+    def start(self):
+        if self._profiler is not None:
+            self._profiler.enable()
+
+    def stop(self):
+        self.ended = time.perf_counter()
+        if self._profiler is not None:
+            self._profiler.disable()
+        self.spans.append((f"metrics {self.command}", self.started, self.ended))
+
+    def save(self):
+        """Guardar el perfil y mostrar el resumen de spans"""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with open(self.directory / f"{self.stem}.speedscope.json", 'w', encoding='utf-8') as f:
+            json.dump(self.to_speedscope(), f)
+        if self._profiler is not None:
+            self._profiler.dump_stats(str(self.directory / f"{self.stem}.pstats"))
+
+        totals = defaultdict(float)
+        for name, start, end in self.spans:
+            totals[name] += (end - start) * 1000
+        print(f"🔬 Perfil guardado: {self.directory / self.stem}")
+        for name, ms in sorted(totals.items(), key=lambda item: item[1], reverse=True):
+            print(f"  {ms:9.1f} ms  {name}")
+
+    def to_speedscope(self):
+        """Formato 'evented' de speedscope (https://www.speedscope.app)"""
+        frames, index, events = [], {}, []
+        for name, start, end in self.spans:
+            if name not in index:
+                index[name] = len(frames)
+                frames.append({"name": name})
+            start_ms = (start - self.started) * 1000
+            end_ms = max((end - self.started) * 1000, start_ms + 0.001)
+            events.append((start_ms, 1, -end_ms, {"type": "O", "frame": index[name], "at": start_ms}))
+            events.append((end_ms, 0, -start_ms, {"type": "C", "frame": index[name], "at": end_ms}))
+        events.sort(key=lambda e: e[:3])
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": f"metrics {self.command}",
+            "exporter": "metrics-collector",
+            "shared": {"frames": frames},
+            "profiles": [{
+                "type": "evented",
+                "name": "main",
+                "unit": "milliseconds",
+                "startValue": 0,
+                "endValue": ((self.ended or time.perf_counter()) - self.started) * 1000,
+                "events": [e[3] for e in events]
+            }]
+        }
+
 class MetricsCollector:
     def __init__(self):
         self.base_path = Path(__file__).parent.parent
         self.board_path = self.base_path / "kanban" / "board.md"
         self.metrics_path = self.base_path / "metrics"
         self.data_file = self.metrics_path / "data.json"
+        self.profiles_path = self.metrics_path / "profiles"
+        self.profiler = None
         
         # Crear directorio de métricas si no existe
         self.metrics_path.mkdir(exist_ok=True)
@@ -36,9 +138,15 @@ class MetricsCollector:
                 "metrics_history": []
             }
     
+    def span(self, name):
+        """Medir una fase si el comando se está perfilando"""
+        if self.profiler is None:
+            return nullcontext()
+        return self.profiler.span(name)
+    
     def save_data(self):
         """Guardar datos de métricas"""
-        with open(self.data_file, 'w', encoding='utf-8') as f:
+        with self.span("save_data"), open(self.data_file, 'w', encoding='utf-8') as f:
             json.dump(self.data, f, indent=2, ensure_ascii=False)
     
     def take_daily_snapshot(self):
@@ -47,17 +155,25 @@ class MetricsCollector:
             print("⚠️ Tablero no encontrado")
             return
         
-        with open(self.board_path, 'r', encoding='utf-8') as f:
+        with self.span("read_board"), open(self.board_path, 'r', encoding='utf-8') as f:
             content = f.read()
         
         # Analizar contenido del tablero
-        snapshot = {
-            "date": datetime.date.today().isoformat(),
-            "timestamp": datetime.datetime.now().isoformat(),
-            "columns": self.analyze_board_content(content),
-            "wip_limits": self.extract_wip_limits(content),
-            "blocked_items": self.count_blocked_items(content)
-        }
+        with self.span("analyze_board"):
+            snapshot = {
+                "date": datetime.date.today().isoformat(),
+                "timestamp": datetime.datetime.now().isoformat(),
+                "columns": self.analyze_board_content(content),
+                "wip_limits": self.extract_wip_limits(content),
+                "blocked_items": self.count_blocked_items(content)
+            }
+        
+        # Historial por item: si no existe, se reconstruye con los snapshots guardados
+        with self.span("item_history"):
+            if not self.data.setdefault("item_history", {}):
+                for previous in self.data["daily_snapshots"]:
+                    self.update_item_history(previous)
+            self.update_item_history(snapshot)
         
         # Agregar a historial
         self.data["daily_snapshots"].append(snapshot)
@@ -69,6 +185,11 @@ class MetricsCollector:
             if datetime.date.fromisoformat(s["date"]) >= cutoff_date
         ]
         
+        self.data["item_history"] = {
+            item_id: history for item_id, history in self.data["item_history"].items()
+            if datetime.date.fromisoformat(history["last_seen"][:10]) >= cutoff_date
+        }
+        
         self.save_data()
         print(f"📸 Snapshot guardado para {snapshot['date']}")
         
@@ -105,14 +226,64 @@ class MetricsCollector:
             elif "HECHO" in line.upper() or "DONE" in line.upper():
                 current_column = "done"
             
-            # Extraer items
-            if current_column and line.startswith("- [ ]"):
+            # Extraer items (los terminados van marcados con [x])
+            if current_column and re.match(r'- \[[ xX]\]', line):
                 item = self.extract_item_info(line)
                 if item:
                     columns[current_column].append(item)
         
         return columns
     
+    def update_item_history(self, snapshot):
+        """
+        Registrar las transiciones de columna de cada item desde el snapshot anterior.
+        
+        Cada item guarda sus tramos (columna, entrada, salida), los días
+        acumulados por columna y, al llegar a done, su tiempo de ciclo: las
+        métricas de flujo se leen de aquí sin recorrer los snapshots. La
+        resolución es la de los snapshots (un cambio se fecha cuando se ve).
+        """
+        history = self.data["item_history"]
+        timestamp = snapshot["timestamp"]
+        seen = set()
+        
+        for column, items in snapshot["columns"].items():
+            for item in items:
+                seen.add(item["id"])
+                entry = history.setdefault(item["id"], {
+                    "title": item["title"], "type": item["type"],
+                    "transitions": [], "column_days": {}, "cycle_days": None, "completed_at": None
+                })
+                entry["last_seen"] = timestamp
+                current = entry["transitions"][-1] if entry["transitions"] else None
+                if current and current["column"] == column and current["exited_at"] is None:
+                    continue
+                if current and current["exited_at"] is None:
+                    self.close_transition(entry, current, timestamp)
+                entry["transitions"].append({"column": column, "entered_at": timestamp, "exited_at": None})
+                
+                if column == "done" and current is not None:
+                    # Desde la primera entrada en una columna de trabajo (o en el tablero)
+                    started = next((t["entered_at"] for t in entry["transitions"] if t["column"] in STARTED_COLUMNS),
+                                   entry["transitions"][0]["entered_at"])
+                    entry["cycle_days"] = days_between(started, timestamp)
+                    entry["completed_at"] = timestamp
+                elif column != "done":
+                    entry["cycle_days"] = entry["completed_at"] = None
+        
+        # Items que ya no están en el tablero: se cierra su último tramo
+        for item_id, entry in history.items():
+            current = entry["transitions"][-1] if entry["transitions"] else None
+            if item_id not in seen and current and current["exited_at"] is None:
+                self.close_transition(entry, current, timestamp)
+    
+    def close_transition(self, entry, transition, timestamp):
+        """Cerrar un tramo y sumar su duración a los días de la columna"""
+        transition["exited_at"] = timestamp
+        transition["duration_days"] = days_between(transition["entered_at"], timestamp)
+        column_days = entry["column_days"]
+        column_days[transition["column"]] = round(column_days.get(transition["column"], 0) + transition["duration_days"], 2)
+    
     def extract_item_info(self, line):
         """Extraer información de un item del tablero"""
         # Buscar patrón [ID] Título
@@ -179,14 +350,16 @@ class MetricsCollector:
         # Obtener snapshots recientes
         recent_snapshots = self.data["daily_snapshots"][-14:]  # Últimas 2 semanas
         
-        metrics = {
-            "date": datetime.date.today().isoformat(),
-            "throughput": self.calculate_throughput(recent_snapshots),
-            "wip_utilization": self.calculate_wip_utilization(recent_snapshots[-1]),
-            "blocked_ratio": self.calculate_blocked_ratio(recent_snapshots[-1]),
-            "flow_efficiency": self.calculate_flow_efficiency(recent_snapshots),
-            "trend_analysis": self.analyze_trends(recent_snapshots)
-        }
+        with self.span("calculate_metrics"):
+            metrics = {
+                "date": datetime.date.today().isoformat(),
+                "throughput": self.calculate_throughput(recent_snapshots),
+                "wip_utilization": self.calculate_wip_utilization(recent_snapshots[-1]),
+                "blocked_ratio": self.calculate_blocked_ratio(recent_snapshots[-1]),
+                "flow_efficiency": self.calculate_flow_efficiency(recent_snapshots),
+                "trend_analysis": self.analyze_trends(recent_snapshots),
+                "flow_times": self.calculate_flow_times()
+            }
         
         # Guardar métricas
         self.data["metrics_history"].append(metrics)
@@ -257,6 +430,42 @@ class MetricsCollector:
         
         return round((in_progress / total_active) * 100, 1)
     
+    def calculate_flow_times(self, days=90):
+        """Envejecimiento del WIP y tiempo por columna y de ciclo, desde item_history"""
+        now = datetime.datetime.now().isoformat()
+        cutoff = (datetime.datetime.now() - datetime.timedelta(days=days)).isoformat()
+        aging = defaultdict(list)
+        column_time = defaultdict(list)
+        cycle_points = []
+        
+        for item_id, entry in self.data.get("item_history", {}).items():
+            for transition in entry["transitions"]:
+                if transition["exited_at"] is None:
+                    if transition["column"] in WIP_COLUMNS:
+                        aging[transition["column"]].append((days_between(transition["entered_at"], now), item_id))
+                elif transition["exited_at"] >= cutoff:
+                    column_time[transition["column"]].append(transition["duration_days"])
+            if entry["cycle_days"] is not None and entry["completed_at"] >= cutoff:
+                cycle_points.append({"id": item_id, "completed_at": entry["completed_at"], "cycle_days": entry["cycle_days"]})
+        
+        cycle_points.sort(key=lambda point: point["completed_at"])
+        return {
+            "aging_wip": {
+                column: {
+                    "items": len(aging[column]),
+                    **percentiles(age for age, _ in aging[column]),
+                    "oldest": [{"id": item_id, "age_days": age} for age, item_id in sorted(aging[column], reverse=True)[:3]]
+                }
+                for column in WIP_COLUMNS
+            },
+            "column_time": {column: percentiles(values) for column, values in column_time.items()},
+            "cycle_time": {
+                "count": len(cycle_points),
+                **percentiles(point["cycle_days"] for point in cycle_points),
+                "points": cycle_points
+            }
+        }
+    
     def analyze_trends(self, snapshots):
         """Analizar tendencias en las métricas"""
         if len(snapshots) < 7:
@@ -318,6 +527,18 @@ class MetricsCollector:
 - **Items bloqueados**: {metrics['blocked_ratio']}%
 - **Eficiencia de flujo**: {metrics['flow_efficiency']}%
 
+## ⏱️ TIEMPOS DE FLUJO
+"""
+        
+        flow = metrics['flow_times']
+        cycle = flow['cycle_time']
+        report += f"- **Tiempo de ciclo** ({cycle['count']} items, 90 días): p50 {cycle['p50']} · p85 {cycle['p85']} · p95 {cycle['p95']} días\n"
+        for column, aging in flow['aging_wip'].items():
+            if aging['items']:
+                oldest = ", ".join(f"{item['id']} ({item['age_days']}d)" for item in aging['oldest'])
+                report += f"- **Edad en {column.title()}** ({aging['items']} items): p50 {aging['p50']} · p85 {aging['p85']} días — {oldest}\n"
+        
+        report += f"""
 ## 📈 TENDENCIAS
 - **Throughput**: {metrics['trend_analysis']['throughput_trend']}
 - **WIP**: {metrics['trend_analysis']['wip_trend']}
@@ -337,6 +558,12 @@ class MetricsCollector:
             if util['percentage'] > 90:
                 alerts.append("🔴 Límite WIP cerca del máximo")
         
+        # Items que ya llevan más que el p85 del tiempo de ciclo
+        if cycle['p85'] is not None:
+            for column, aging in flow['aging_wip'].items():
+                if column in STARTED_COLUMNS and aging['oldest'] and aging['oldest'][0]['age_days'] > cycle['p85']:
+                    alerts.append(f"🟡 WIP envejecido en {column.title()} (más de {cycle['p85']} días)")
+        
         if not alerts:
             alerts.append("✅ No hay alertas críticas")
         
@@ -345,7 +572,7 @@ class MetricsCollector:
         
         # Guardar reporte
         report_file = self.metrics_path / f"report-{datetime.date.today()}.md"
-        with open(report_file, 'w', encoding='utf-8') as f:
+        with self.span("write_report"), open(report_file, 'w', encoding='utf-8') as f:
             f.write(report)
         
         print(f"📋 Reporte generado: {report_file}")
@@ -353,24 +580,43 @@ class MetricsCollector:
         print(report)
 
 def main():
+    args = [arg for arg in os.sys.argv[1:] if not arg.startswith("--profile")]
+    flags = [arg for arg in os.sys.argv[1:] if arg.startswith("--profile")]
+    # --profile o --profile=cprofile; si no, la variable de entorno PROFILING
+    profile_value = (flags[-1].partition("=")[2] or "speedscope") if flags else os.environ.get("PROFILING", "")
+    profile_mode = PROFILE_MODES.get(profile_value.strip().lower())
+    
     collector = MetricsCollector()
+    commands = {
+        "snapshot": collector.take_daily_snapshot,
+        "metrics": collector.calculate_metrics,
+        "report": collector.generate_report
+    }
     
-    if len(os.sys.argv) > 1:
-        command = os.sys.argv[1]
-        
-        if command == "snapshot":
-            collector.take_daily_snapshot()
-        elif command == "metrics":
-            collector.calculate_metrics()
-        elif command == "report":
-            collector.generate_report()
-        else:
+    if args:
+        command = args[0]
+        
+        if command not in commands:
             print(f"❌ Comando desconocido: {command}")
+            return
+        
+        if profile_mode is None:
+            commands[command]()
+            return
+        
+        collector.profiler = CommandProfiler(command, profile_mode, collector.profiles_path)
+        collector.profiler.start()
+        try:
+            commands[command]()
+        finally:
+            collector.profiler.stop()
+            collector.profiler.save()
     else:
         print("📊 Metrics Collector - Comandos disponibles:")
         print("  snapshot  - Tomar snapshot del tablero")
         print("  metrics   - Calcular métricas")
         print("  report    - Generar reporte completo")
+        print("  --profile[=cprofile]  - Perfilar el comando (o PROFILING=speedscope|cprofile)")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file